@@ -0,0 +1,291 @@
+"""
+생성 파이프라인 부하 벤치마크 - 가짜 LLM(LLM_PROVIDER=fake)으로 Celery 생성 태스크를 끝까지 실행
+
+사용법 (저장소 루트에서, DB/Redis 는 docker-compose 의 postgres/redis 사용):
+    python scripts/bench_pipelines/bench_pipelines.py --service math --jobs 20 --workers 4
+    python scripts/bench_pipelines/bench_pipelines.py --service all --latency-scale 0.1 --malformed-rate 0.05 --output result.json
+    python scripts/bench_pipelines/bench_pipelines.py --service math --baseline result.json --max-regression 0.15
+
+- 워커 프로세스 N개가 Celery prefork 워커처럼 태스크를 하나씩 꺼내 task.apply() 로 실행
+  (브로커 없이 실행하지만 태스크 코드, DB 저장, Redis 진행 상태/스트림 발행은 실제와 동일)
+- 태스크별: 소요 시간, DB 시간(SQLAlchemy 커서 실행 합), 모델 시간(LLM 게이트웨이 호출 지연 합)
+- 워커별: 최대 RSS
+- 가짜 LLM 규칙: responses/<서비스>.json, 요청 목록: workloads/<서비스>.json
+- 게이트웨이 RPM/TPM 제한(GEMINI_RPM_LIMIT 등)도 그대로 적용되므로 한도 자체를 시험할 때가 아니면 환경변수로 올려서 실행
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import threading
+import multiprocessing
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICES_DIR = os.path.join(BENCH_DIR, "..", "..", "services")
+
+SERVICES = {
+    "math": {"dir": "math-service", "gateway": "app.services.llm_gateway"},
+    "korean": {"dir": "korean-service", "gateway": "app.services.llm_gateway"},
+    "english": {"dir": "english-service", "gateway": "app.services.ai.llm_gateway"},
+}
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def _worker(service: str, worker_idx: int, env: Dict[str, str], verbose: bool, job_queue, result_queue):
+    """워커 프로세스 - 서비스 코드를 import 하고 큐에서 받은 태스크를 하나씩 실행"""
+    service_dir = os.path.abspath(os.path.join(SERVICES_DIR, SERVICES[service]["dir"]))
+    os.chdir(service_dir)
+    sys.path.insert(0, service_dir)
+    os.environ.update(env)
+    os.environ["FAKE_LLM_SEED"] = str(int(env["FAKE_LLM_SEED"]) + worker_idx)
+    if not verbose:
+        sys.stdout = open(os.devnull, "w")
+
+    import importlib
+    from sqlalchemy import event
+
+    database = importlib.import_module("app.database")
+    tasks = importlib.import_module("app.tasks")
+    gateway = importlib.import_module(SERVICES[service]["gateway"]).get_llm_gateway()
+
+    db_time = {"ms": 0.0, "queries": 0}
+    db_lock = threading.Lock()
+
+    @event.listens_for(database.engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("bench_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(database.engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = (time.perf_counter() - conn.info["bench_query_start"].pop()) * 1000
+        with db_lock:
+            db_time["ms"] += elapsed
+            db_time["queries"] += 1
+
+    def model_ms() -> float:
+        return sum(stats.latency_total_ms for stats in gateway.stats.values())
+
+    result_queue.put({"type": "ready", "worker": worker_idx})
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+        task = getattr(tasks, job["task"])
+        db_before, queries_before, model_before = db_time["ms"], db_time["queries"], model_ms()
+        start = time.perf_counter()
+        result = task.apply(args=job.get("args", []), kwargs=job.get("kwargs", {}))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        result_queue.put({
+            "type": "job",
+            "worker": worker_idx,
+            "ok": result.successful(),
+            "error": None if result.successful() else repr(result.result)[:300],
+            "elapsed_ms": elapsed_ms,
+            "db_ms": db_time["ms"] - db_before,
+            "db_queries": db_time["queries"] - queries_before,
+            "model_ms": model_ms() - model_before,
+        })
+
+    gateway_stats = gateway.get_stats()
+    result_queue.put({
+        "type": "worker",
+        "worker": worker_idx,
+        # Linux: ru_maxrss 단위는 KB
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "fake": gateway_stats.get("fake", {}),
+        "providers": gateway_stats["providers"],
+    })
+
+
+def run_service(service: str, args) -> Dict:
+    with open(os.path.join(BENCH_DIR, "workloads", f"{service}.json"), "r", encoding="utf-8") as f:
+        workload = json.load(f)
+    jobs = [
+        {"task": workload["task"], **workload["jobs"][i % len(workload["jobs"])]}
+        for i in range(args.jobs)
+    ]
+
+    env = {
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_RESPONSES": os.path.join(BENCH_DIR, "responses", f"{service}.json"),
+        "FAKE_LLM_LATENCY_SCALE": str(args.latency_scale),
+        "FAKE_LLM_LATENCY_SIGMA": str(args.latency_sigma),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "FAKE_LLM_MALFORMED_RATE": str(args.malformed_rate),
+        "FAKE_LLM_SEED": str(args.seed),
+        # 키 존재 여부만 확인하는 코드 경로용 (실제 API는 호출되지 않음)
+        "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY") or "fake-key",
+        "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "fake-key",
+    }
+    if args.recordings:
+        env["FAKE_LLM_RECORDINGS"] = os.path.abspath(args.recordings)
+    if not args.with_cache:
+        env["LLM_CACHE_DISABLED"] = "1"
+
+    ctx = multiprocessing.get_context("spawn")
+    job_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    workers = [
+        ctx.Process(target=_worker, args=(service, idx, env, args.verbose, job_queue, result_queue), daemon=True)
+        for idx in range(args.workers)
+    ]
+    for process in workers:
+        process.start()
+
+    # 서비스 코드 import 시간은 제외하고 측정
+    ready = 0
+    while ready < len(workers):
+        if result_queue.get(timeout=120)["type"] == "ready":
+            ready += 1
+
+    print(f"🚀 {service}: 태스크 {len(jobs)}개, 워커 {len(workers)}개")
+    start = time.perf_counter()
+    for job in jobs:
+        job_queue.put(job)
+
+    results = []
+    while len(results) < len(jobs):
+        message = result_queue.get(timeout=args.timeout)
+        if message["type"] == "job":
+            results.append(message)
+            mark = "✅" if message["ok"] else "❌"
+            print(f"   {mark} {len(results)}/{len(jobs)} {message['elapsed_ms'] / 1000:.1f}s"
+                  + (f" {message['error']}" if message["error"] else ""))
+    wall_s = time.perf_counter() - start
+
+    for _ in workers:
+        job_queue.put(None)
+    worker_stats = []
+    while len(worker_stats) < len(workers):
+        message = result_queue.get(timeout=60)
+        if message["type"] == "worker":
+            worker_stats.append(message)
+    for process in workers:
+        process.join(timeout=10)
+
+    latencies = [r["elapsed_ms"] for r in results]
+    total_ms = sum(latencies) or 1.0
+    db_ms = sum(r["db_ms"] for r in results)
+    model_ms = sum(r["model_ms"] for r in results)
+    fake_calls = sum(w["fake"].get("calls", 0) for w in worker_stats)
+
+    return {
+        "service": service,
+        "jobs": len(results),
+        "succeeded": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "workers": len(workers),
+        "wall_s": round(wall_s, 2),
+        "throughput_jobs_per_min": round(len(results) / wall_s * 60, 2) if wall_s else 0.0,
+        "latency_ms_p50": round(_percentile(latencies, 0.5), 1),
+        "latency_ms_p95": round(_percentile(latencies, 0.95), 1),
+        "latency_ms_p99": round(_percentile(latencies, 0.99), 1),
+        "db_ms_total": round(db_ms, 1),
+        "db_queries": sum(r["db_queries"] for r in results),
+        # 모델 시간은 병렬 호출 지연의 합이라 태스크 시간보다 클 수 있음
+        "model_ms_total": round(model_ms, 1),
+        "db_share_of_task_time": round(db_ms / total_ms, 3),
+        "model_calls": fake_calls,
+        "model_errors_injected": sum(w["fake"].get("errors", 0) for w in worker_stats),
+        "model_malformed_injected": sum(w["fake"].get("malformed", 0) for w in worker_stats),
+        "model_unmatched": sum(w["fake"].get("unmatched", 0) for w in worker_stats),
+        "peak_rss_mb_per_worker": {w["worker"]: round(w["peak_rss_mb"], 1) for w in worker_stats},
+        "errors": sorted({r["error"] for r in results if r["error"]})[:5],
+    }
+
+
+def _print_summary(summary: Dict):
+    rss = summary["peak_rss_mb_per_worker"]
+    print(f"\n{'=' * 60}")
+    print(f"📊 {summary['service']}: {summary['succeeded']}/{summary['jobs']} 성공, 워커 {summary['workers']}개, {summary['wall_s']}s")
+    print(f"   처리량: {summary['throughput_jobs_per_min']} jobs/min")
+    print(f"   지연: p50 {summary['latency_ms_p50'] / 1000:.2f}s / p95 {summary['latency_ms_p95'] / 1000:.2f}s"
+          f" / p99 {summary['latency_ms_p99'] / 1000:.2f}s")
+    print(f"   DB: {summary['db_ms_total'] / 1000:.2f}s ({summary['db_queries']}쿼리, 태스크 시간의 {summary['db_share_of_task_time'] * 100:.1f}%)")
+    print(f"   모델: {summary['model_ms_total'] / 1000:.2f}s (호출 {summary['model_calls']}회, 주입 오류 "
+          f"{summary['model_errors_injected']}회, 깨진 JSON {summary['model_malformed_injected']}회, 규칙 미일치 {summary['model_unmatched']}회)")
+    print(f"   최대 RSS: " + ", ".join(f"w{idx} {mb}MB" for idx, mb in sorted(rss.items())))
+    for error in summary["errors"]:
+        print(f"   ❌ {error}")
+    print(f"{'=' * 60}")
+
+
+def _check_regression(summaries: List[Dict], baseline_path: str, max_regression: float) -> List[str]:
+    """기준 결과 대비 처리량 감소/지연·RSS 증가가 허용치를 넘으면 메시지 반환"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {item["service"]: item for item in json.load(f)}
+
+    regressions = []
+    for summary in summaries:
+        base = baseline.get(summary["service"])
+        if not base:
+            continue
+        checks = [
+            ("throughput_jobs_per_min", base["throughput_jobs_per_min"], summary["throughput_jobs_per_min"], False),
+            ("latency_ms_p95", base["latency_ms_p95"], summary["latency_ms_p95"], True),
+            ("latency_ms_p99", base["latency_ms_p99"], summary["latency_ms_p99"], True),
+            ("peak_rss_mb", max(base["peak_rss_mb_per_worker"].values()),
+             max(summary["peak_rss_mb_per_worker"].values()), True),
+        ]
+        for name, before, after, higher_is_worse in checks:
+            if not before:
+                continue
+            change = (after - before) / before
+            if (change if higher_is_worse else -change) > max_regression:
+                regressions.append(f"{summary['service']} {name}: {before} → {after} ({change * 100:+.1f}%)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="생성 파이프라인 부하 벤치마크 (가짜 LLM)")
+    parser.add_argument("--service", choices=[*SERVICES, "all"], default="all")
+    parser.add_argument("--jobs", type=int, default=10, help="서비스별 실행할 태스크 수")
+    parser.add_argument("--workers", type=int, default=4, help="워커 프로세스 수 (Celery --concurrency)")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="규칙별 모델 지연 배율")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="로그정규 지연 분포 폭")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="모델 호출 오류 주입 확률")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="깨진 JSON 응답 주입 확률")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--recordings", help="녹화된 실제 응답 JSONL (LLM_RECORD_PATH 로 생성)")
+    parser.add_argument("--with-cache", action="store_true", help="LLM 응답 캐시 사용 (기본: 비활성)")
+    parser.add_argument("--timeout", type=float, default=600, help="태스크 하나의 최대 대기 시간(초)")
+    parser.add_argument("--verbose", action="store_true", help="태스크 로그 출력")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="허용 성능 저하 비율")
+    args = parser.parse_args()
+
+    services = list(SERVICES) if args.service == "all" else [args.service]
+    summaries = []
+    for service in services:
+        summary = run_service(service, args)
+        _print_summary(summary)
+        summaries.append(summary)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summaries, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+    exit_code = 0 if all(s["failed"] == 0 for s in summaries) or args.error_rate or args.malformed_rate else 1
+    if args.baseline:
+        regressions = _check_regression(summaries, args.baseline, args.max_regression)
+        for message in regressions:
+            print(f"⚠️ 성능 저하: {message}")
+        if regressions:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
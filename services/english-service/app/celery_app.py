@@ -47,7 +47,9 @@ celery_app.conf.update(
     worker_task_log_format='[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s',
     # 영어 서비스 전용 큐 설정
     task_default_queue='english_queue',
+    # 답안 채점은 전용 큐(english_grading)에서 별도 워커/동시성으로 처리
     task_routes={
+        'app.tasks.grade_english_submission_task': {'queue': 'english_grading'},
         'app.tasks.*': {'queue': 'english_queue'},
     },
 )
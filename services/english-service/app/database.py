@@ -37,8 +37,12 @@ def init_db():
     from app.models import (
         GrammarCategory, GrammarTopic, GrammarAchievement,
         VocabularyCategory, Word,
-        ReadingType, TextType,
+        ReadingType, TextType, PassageLibraryEntry,
         Worksheet, Passage, Question,
         GradingResult, QuestionResult
     )
+    from app.services.assignment_deploy import ensure_deployment_unique_constraint
     Base.metadata.create_all(bind=engine)
+
+    # 기존 배포 테이블에도 (assignment_id, student_id) 유니크 인덱스 적용 (일괄 배포의 ON CONFLICT 대상)
+    ensure_deployment_unique_constraint(engine)
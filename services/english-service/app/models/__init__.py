@@ -1,7 +1,7 @@
 # 모든 모델을 한 곳에서 import할 수 있도록 함
 from .grammar import GrammarCategory, GrammarTopic, GrammarAchievement
 from .vocabulary import VocabularyCategory, Word
-from .content import ReadingType, TextType
+from .content import ReadingType, TextType, PassageLibraryEntry
 from .worksheet import Worksheet, Passage, Question
 from .grading import GradingResult, QuestionResult
 
@@ -14,6 +14,7 @@ __all__ = [
     "Word",
     "ReadingType",
     "TextType",
+    "PassageLibraryEntry",
     "Worksheet",
     "Passage",
     "Question",
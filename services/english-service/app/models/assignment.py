@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -32,7 +32,10 @@ class Assignment(Base):
 class AssignmentDeployment(Base):
     """과제 배포 정보"""
     __tablename__ = "assignment_deployments"
-    __table_args__ = {"schema": "english_service"}
+    __table_args__ = (
+        UniqueConstraint("assignment_id", "student_id", name="uq_assignment_deployments_assignment_student"),
+        {"schema": "english_service"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("english_service.assignments.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index
 from app.database import Base
 
 
@@ -23,4 +23,31 @@ class TextType(Base):
     display_name = Column(String(100), nullable=False)  # 한국어 표시명
     description = Column(Text, nullable=True)  # 유형 설명
     json_format = Column(JSON, nullable=False)  # 각 유형별 JSON 형식 예시
-    created_at = Column(DateTime, nullable=True)
\ No newline at end of file
+    created_at = Column(DateTime, nullable=True)
+
+# Passage Library 테이블 모델 (검증된 지문 재사용 라이브러리)
+class PassageLibraryEntry(Base):
+    __tablename__ = "passage_library"
+    __table_args__ = (
+        Index(
+            "ix_passage_library_lookup",
+            "school_level", "grade", "cefr_level", "passage_type", "topic", "word_count_bucket"
+        ),
+        {"schema": "english_service"},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True)  # 원본 지문 해시 (중복 저장 방지)
+    school_level = Column(String(20), nullable=False)  # 중학교, 고등학교
+    grade = Column(Integer, nullable=False)  # 1, 2, 3
+    cefr_level = Column(String(20), nullable=False)  # 학년 기준 CEFR 레벨
+    passage_type = Column(String(50), nullable=False)  # article, dialogue 등
+    topic = Column(String(200), nullable=True)  # 소재 카테고리 (TOPIC_CATEGORIES 키, 없으면 NULL)
+    word_count = Column(Integer, nullable=False)
+    word_count_bucket = Column(Integer, nullable=False)  # 단어 수 구간 (50단어 단위)
+    passage_content = Column(JSON, nullable=False)  # 재사용 시 학생용 지문 (빈칸/밑줄 없는 원본)
+    korean_translation = Column(JSON, nullable=True)
+    source_worksheet_id = Column(Integer, nullable=True)  # 처음 저장된 문제지 ID
+    use_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    last_used_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
@@ -10,11 +10,15 @@ from app.models.grading import GradingResult
 from app.schemas.assignment import (
     AssignmentDeployRequest,
     SimpleAssignmentDeployRequest,
+    BulkAssignmentDeployRequest,
     AssignmentDeploymentResponse,
     StudentAssignmentResponse,
 )
 from app.schemas import SubmissionRequest
 from app.schemas.assignment_results import EnglishAssignmentResultResponse
+from app.tasks import grade_english_submission_task
+from app.services.assignment_deploy import resolve_assignments, deploy_students, notify_assignment_deployed
+from app.services.worksheet_crud.worksheet_view import WorksheetView, load_worksheet
 from typing import Dict, Any
 
 router = APIRouter()
@@ -87,6 +91,7 @@ async def create_assignment(
 @router.post("/assignments/deploy", response_model=dict)
 async def deploy_assignment_simple(
     deploy_request: SimpleAssignmentDeployRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """과제를 학생들에게 배포 (프론트엔드용)"""
@@ -105,54 +110,29 @@ async def deploy_assignment_simple(
                 detail="워크시트를 찾을 수 없습니다"
             )
 
-        # 기존 Assignment 확인 (같은 워크시트, 같은 클래스룸)
-        assignment = db.query(Assignment).filter(
-            Assignment.worksheet_id == worksheet_id,
-            Assignment.classroom_id == deploy_request.classroom_id
-        ).first()
-
-        # Assignment가 없으면 새로 생성
-        if not assignment:
-            assignment = Assignment(
-                title=worksheet.worksheet_name,
-                worksheet_id=worksheet.worksheet_id,
-                classroom_id=deploy_request.classroom_id,
-                teacher_id=worksheet.teacher_id,
-                problem_type=worksheet.problem_type,
-                total_questions=worksheet.total_questions,
-                is_deployed="deployed"
-            )
-            db.add(assignment)
-            db.flush()  # ID를 얻기 위해 flush
-        else:
-            # 기존 Assignment의 배포 상태 업데이트
-            assignment.is_deployed = "deployed"
-
-        # 배포 정보 생성 (중복 배포 방지)
-        deployed_count = 0
-        for student_id in deploy_request.student_ids:
-            # 기존 배포 정보 확인
-            existing_deployment = db.query(AssignmentDeployment).filter(
-                AssignmentDeployment.assignment_id == assignment.id,
-                AssignmentDeployment.student_id == student_id
-            ).first()
-
-            if not existing_deployment:
-                deployment = AssignmentDeployment(
-                    assignment_id=assignment.id,
-                    student_id=student_id,
-                    classroom_id=deploy_request.classroom_id,
-                    status="assigned"
-                )
-                db.add(deployment)
-                deployed_count += 1
+        # 같은 워크시트/클래스룸의 Assignment (없으면 생성) 후 일괄 배포 (중복 배포 방지)
+        assignment = resolve_assignments(db, [worksheet], [deploy_request.classroom_id])[
+            (worksheet_id, deploy_request.classroom_id)
+        ]
+        _, new_students = deploy_students(
+            db, [(assignment, deploy_request.classroom_id, deploy_request.student_ids)]
+        )
+        deployed_count = len(new_students.get(assignment.id, []))
+        assignment_id = assignment.id
 
         db.commit()
 
+        background_tasks.add_task(notify_assignment_deployed, [{
+            "assignment_id": assignment_id,
+            "title": worksheet.worksheet_name,
+            "classroom_id": deploy_request.classroom_id,
+            "student_ids": new_students.get(assignment_id, [])
+        }], worksheet.teacher_id)
+
         return {
             "success": True,
             "message": f"과제가 {deployed_count}명의 학생에게 배포되었습니다.",
-            "assignment_id": assignment.id,
+            "assignment_id": assignment_id,
             "worksheet_id": worksheet_id,
             "deployed_count": deployed_count,
             "total_students": len(deploy_request.student_ids)
@@ -170,6 +150,7 @@ async def deploy_assignment_simple(
 @router.post("/assignments/deploy-detailed", response_model=List[AssignmentDeploymentResponse])
 async def deploy_assignment_detailed(
     deploy_request: AssignmentDeployRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """과제를 학생들에게 배포"""
@@ -185,64 +166,36 @@ async def deploy_assignment_detailed(
                 detail="워크시트를 찾을 수 없습니다"
             )
         
-        # 기존 Assignment 확인 (같은 워크시트, 같은 클래스룸)
-        assignment = db.query(Assignment).filter(
-            Assignment.worksheet_id == worksheet.worksheet_id,
-            Assignment.classroom_id == deploy_request.classroom_id
-        ).first()
-        
-        # Assignment가 없으면 새로 생성
-        if not assignment:
-            assignment = Assignment(
-                title=worksheet.worksheet_name,
-                worksheet_id=worksheet.worksheet_id,
-                classroom_id=deploy_request.classroom_id,
-                teacher_id=worksheet.teacher_id,
-                problem_type=worksheet.problem_type,
-                total_questions=worksheet.total_questions,
-                is_deployed="deployed"
-            )
-            db.add(assignment)
-            db.flush()  # ID를 얻기 위해 flush
-        else:
-            # 기존 Assignment의 배포 상태 업데이트
-            assignment.is_deployed = "deployed"
-        
-        # 배포 정보 생성 (중복 배포 방지)
-        deployments = []
-        for student_id in deploy_request.student_ids:
-            # 기존 배포 정보 확인
-            existing_deployment = db.query(AssignmentDeployment).filter(
-                AssignmentDeployment.assignment_id == assignment.id,
-                AssignmentDeployment.student_id == student_id
-            ).first()
-            
-            if not existing_deployment:
-                deployment = AssignmentDeployment(
-                    assignment_id=assignment.id,
-                    student_id=student_id,
-                    classroom_id=deploy_request.classroom_id,
-                    status="assigned"
-                )
-                db.add(deployment)
-                deployments.append(deployment)
-            else:
-                deployments.append(existing_deployment)
-        
-        db.commit()
+        # 같은 워크시트/클래스룸의 Assignment (없으면 생성) 후 일괄 배포 (중복 배포 방지)
+        assignment = resolve_assignments(db, [worksheet], [deploy_request.classroom_id])[
+            (worksheet.worksheet_id, deploy_request.classroom_id)
+        ]
+        deployments, new_students = deploy_students(
+            db, [(assignment, deploy_request.classroom_id, deploy_request.student_ids)]
+        )
         
-        # 응답 데이터 생성
-        response_data = []
-        for deployment in deployments:
-            db.refresh(deployment)
-            response_data.append(AssignmentDeploymentResponse(
+        # 응답 데이터 생성 (INSERT ... RETURNING 으로 채워진 값 사용, 커밋 전 생성)
+        response_data = [
+            AssignmentDeploymentResponse(
                 id=deployment.id,
                 assignment_id=deployment.assignment_id,
                 student_id=deployment.student_id,
                 classroom_id=deployment.classroom_id,
                 status=deployment.status,
                 deployed_at=deployment.deployed_at
-            ))
+            )
+            for deployment in deployments
+        ]
+        assignment_id = assignment.id
+        
+        db.commit()
+
+        background_tasks.add_task(notify_assignment_deployed, [{
+            "assignment_id": assignment_id,
+            "title": worksheet.worksheet_name,
+            "classroom_id": deploy_request.classroom_id,
+            "student_ids": new_students.get(assignment_id, [])
+        }], worksheet.teacher_id)
         
         return response_data
         
@@ -255,6 +208,77 @@ async def deploy_assignment_detailed(
             detail=f"과제 배포 중 오류 발생: {str(e)}"
         )
 
+@router.post("/assignments/deploy-bulk", response_model=dict)
+async def deploy_assignments_bulk(
+    deploy_request: BulkAssignmentDeployRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """여러 워크시트를 여러 클래스룸에 일괄 배포"""
+    try:
+        worksheets = db.query(Worksheet).filter(
+            Worksheet.worksheet_id.in_(deploy_request.assignment_ids)
+        ).all()
+        missing_ids = set(deploy_request.assignment_ids) - {worksheet.worksheet_id for worksheet in worksheets}
+        if missing_ids:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"워크시트를 찾을 수 없습니다: {sorted(missing_ids)}"
+            )
+
+        assignments = resolve_assignments(
+            db, worksheets, [classroom.classroom_id for classroom in deploy_request.classrooms]
+        )
+        targets = [
+            (assignments[(worksheet.worksheet_id, classroom.classroom_id)], classroom.classroom_id, classroom.student_ids)
+            for worksheet in worksheets
+            for classroom in deploy_request.classrooms
+        ]
+        deployments, new_students = deploy_students(db, targets)
+
+        results = [
+            {
+                "assignment_id": assignment.id,
+                "worksheet_id": assignment.worksheet_id,
+                "classroom_id": classroom_id,
+                "title": assignment.title,
+                "deployed_count": len(new_students.get(assignment.id, [])),
+                "total_students": len(set(student_ids))
+            }
+            for assignment, classroom_id, student_ids in targets
+        ]
+        teacher_id = worksheets[0].teacher_id if worksheets else None
+
+        db.commit()
+
+        background_tasks.add_task(notify_assignment_deployed, [
+            {
+                "assignment_id": result["assignment_id"],
+                "title": result["title"],
+                "classroom_id": result["classroom_id"],
+                "student_ids": new_students.get(result["assignment_id"], [])
+            }
+            for result in results
+        ], teacher_id)
+
+        deployed_count = sum(result["deployed_count"] for result in results)
+        return {
+            "success": True,
+            "message": f"{len(results)}개 과제가 {deployed_count}건 새로 배포되었습니다.",
+            "assignments": results,
+            "deployed_count": deployed_count,
+            "total_deployments": len(deployments)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"과제 일괄 배포 중 오류 발생: {str(e)}"
+        )
+
 @router.get("/assignments/student/{student_id}", response_model=List[StudentAssignmentResponse])
 async def get_student_assignments(
     student_id: int,
@@ -397,54 +421,9 @@ async def get_assignment_detail_for_student(
         
         assignment = deployment.assignment
 
-        # 워크시트의 문제들 가져오기
-        questions = db.query(Question).filter(
-            Question.worksheet_id == assignment.worksheet_id
-        ).order_by(Question.question_id).all()
-
-        # 워크시트의 지문들 가져오기
-        from app.models.worksheet import Passage
-        passages = db.query(Passage).filter(
-            Passage.worksheet_id == assignment.worksheet_id
-        ).order_by(Passage.passage_id).all()
-
-        # 지문 데이터를 딕셔너리로 변환
-        passages_data = []
-        for passage in passages:
-            passages_data.append({
-                "id": passage.id,
-                "worksheet_id": passage.worksheet_id,
-                "passage_id": passage.passage_id,
-                "passage_type": passage.passage_type,
-                "passage_content": passage.passage_content,
-                "original_content": passage.original_content,
-                "korean_translation": passage.korean_translation,
-                "related_questions": passage.related_questions,
-                "created_at": passage.created_at
-            })
-
-        # 문제 데이터를 딕셔너리로 변환
-        questions_data = []
-        for question in questions:
-            questions_data.append({
-                "id": question.id,
-                "worksheet_id": question.worksheet_id,
-                "question_id": question.question_id,
-                "question_text": question.question_text,
-                "question_type": question.question_type,
-                "question_subject": question.question_subject,
-                "question_difficulty": question.question_difficulty,
-                "question_detail_type": question.question_detail_type,
-                "question_choices": question.question_choices,
-                "passage_id": question.passage_id,
-                "correct_answer": question.correct_answer,
-                "example_content": question.example_content,
-                "example_original_content": question.example_original_content,
-                "example_korean_translation": question.example_korean_translation,
-                "explanation": question.explanation,
-                "learning_point": question.learning_point,
-                "created_at": question.created_at
-            })
+        # 워크시트의 지문/문제를 한 번에 로드
+        worksheet = load_worksheet(db, assignment.worksheet_id)
+        view_data = WorksheetView(worksheet).assignment_data() if worksheet else {"passages": [], "questions": []}
 
         return {
             "assignment": {
@@ -458,8 +437,8 @@ async def get_assignment_detail_for_student(
                 "status": deployment.status,
                 "deployed_at": deployment.deployed_at
             },
-            "passages": passages_data,
-            "questions": questions_data
+            "passages": view_data["passages"],
+            "questions": view_data["questions"]
         }
         
     except HTTPException:
@@ -475,7 +454,7 @@ async def submit_assignment(
     submission_data: SubmissionRequest,
     db: Session = Depends(get_db)
 ):
-    """과제 답안을 제출하고 자동 채점을 수행합니다."""
+    """과제 답안을 제출하고 자동 채점 태스크를 시작합니다."""
     try:
         # assignment_id로 워크시트 ID 찾기
         assignment_id = submission_data.assignment_id if hasattr(submission_data, 'assignment_id') else None
@@ -510,19 +489,7 @@ async def submit_assignment(
                 detail=f"모든 문제에 답안을 제출해야 합니다. 현재 {answered_questions}/{total_questions}개 문제에 답안이 제출되었습니다."
             )
 
-        # 기존 채점 서비스 사용
-        from app.services.grading.grading_service import GradingService
-        grading_service = GradingService(db)
-
-        # 채점 수행
-        result = await grading_service.grade_worksheet(
-            worksheet_id=worksheet_id,
-            student_id=submission_data.student_id,
-            answers=submission_data.answers,
-            completion_time=0  # 기본값
-        )
-
-        # Assignment 배포 상태 업데이트 (완료로 변경)
+        # Assignment 배포 상태 업데이트 (제출됨, 채점 완료 시 태스크에서 completed 로 변경)
         if assignment_id:
             deployment = db.query(AssignmentDeployment).filter(
                 AssignmentDeployment.assignment_id == assignment_id,
@@ -530,13 +497,23 @@ async def submit_assignment(
             ).first()
 
             if deployment:
-                deployment.status = "completed"
+                deployment.status = "submitted"
                 deployment.submitted_at = datetime.utcnow()
                 db.commit()
 
+        # 채점은 english_grading 큐에서 비동기로 수행 (완료 시 알림 전송)
+        task = grade_english_submission_task.delay(
+            worksheet_id=worksheet_id,
+            student_id=submission_data.student_id,
+            answers=submission_data.answers,
+            completion_time=0,  # 기본값
+            assignment_id=assignment_id
+        )
+
         return {
-            "message": "과제가 성공적으로 제출되었습니다.",
-            "grading_result": result,
+            "message": "과제가 성공적으로 제출되었습니다. 채점이 완료되면 알림으로 알려드립니다.",
+            "task_id": task.id,
+            "status": "PENDING",
             "worksheet_id": worksheet_id,
             "assignment_id": assignment_id
         }
@@ -4,9 +4,7 @@ from typing import List
 from datetime import datetime
 
 from app.database import get_db
-from app.models import (
-    GrammarCategory, VocabularyCategory, ReadingType
-)
+from app.services.generation.taxonomy_snapshot import taxonomy_snapshot
 
 router = APIRouter(tags=["Categories"])
 
@@ -15,31 +13,12 @@ async def get_categories(db: Session = Depends(get_db)):
     """
     문법, 어휘, 독해 카테고리 정보를 조회하는 엔드포인트
     프론트엔드에서 선택 옵션을 만들 때 사용합니다.
+    (분류 체계 스냅샷에서 응답 - 버전 키가 바뀌었을 때만 DB 조회)
     """
     try:
-        # 문법 카테고리와 주제들 조회
-        grammar_categories = db.query(GrammarCategory).all()
-        grammar_data = []
-        for category in grammar_categories:
-            topics = [{"id": topic.id, "name": topic.name} for topic in category.topics]
-            grammar_data.append({
-                "id": category.id,
-                "name": category.name,
-                "topics": topics
-            })
-        
-        # 어휘 카테고리 조회
-        vocabulary_categories = db.query(VocabularyCategory).all()
-        vocabulary_data = [{"id": cat.id, "name": cat.name} for cat in vocabulary_categories]
-        
-        # 독해 유형 조회
-        reading_types = db.query(ReadingType).all()
-        reading_data = [{"id": rt.id, "name": rt.name, "description": rt.description} for rt in reading_types]
-        
-        return {
-            "grammar_categories": grammar_data,
-            "vocabulary_categories": vocabulary_data,
-            "reading_types": reading_data
-        }
+        snapshot = taxonomy_snapshot.get(db)
+        if snapshot is None:
+            return {"error": "카테고리 조회 중 오류 발생: 분류 체계를 불러올 수 없습니다."}
+        return snapshot.categories_response
     except Exception as e:
         return {"error": f"카테고리 조회 중 오류 발생: {str(e)}"}
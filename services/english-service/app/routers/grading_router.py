@@ -11,7 +11,7 @@ from app.schemas import (
 from app.models import (
     Worksheet, GradingResult, QuestionResult, Passage
 )
-from app.services.grading.grading_service import GradingService
+from app.tasks import grade_english_submission_task
 
 router = APIRouter(tags=["Grading"])
 
@@ -21,28 +21,27 @@ async def submit_answers_and_grade(
     submission_data: SubmissionRequest,
     db: Session = Depends(get_db)
 ):
-    """답안을 제출하고 자동 채점을 수행합니다."""
+    """답안을 제출하고 자동 채점 태스크를 시작합니다."""
     try:
         # 문제지 조회
         worksheet = db.query(Worksheet).filter(Worksheet.worksheet_id == worksheet_id).first()
         if not worksheet:
             raise HTTPException(status_code=404, detail="문제지를 찾을 수 없습니다.")
         
-        student_name = submission_data.student_name
-        answers = submission_data.answers
-        completion_time = submission_data.completion_time
-        
-        # 새로운 채점 서비스로 채점 수행
-        grading_service = GradingService(db)
-        grading_result = await grading_service.grade_worksheet(
-            worksheet_id, student_name, answers, completion_time
+        # 채점은 english_grading 큐에서 비동기로 수행 (완료 시 알림 전송)
+        task = grade_english_submission_task.delay(
+            worksheet_id=worksheet_id,
+            student_id=submission_data.student_id,
+            answers=submission_data.answers,
+            completion_time=getattr(submission_data, "completion_time", 0) or 0,
+            assignment_id=submission_data.assignment_id
         )
-        
-        # 결과 반환 (grading_result 내용을 직접 반환)
+
         return {
-            "status": "success",
-            "message": "답안이 제출되고 채점이 완료되었습니다.",
-            **grading_result  # grading_result의 모든 필드를 펼쳐서 포함
+            "status": "PENDING",
+            "message": "답안이 제출되었습니다. 채점이 완료되면 알림으로 알려드립니다.",
+            "task_id": task.id,
+            "worksheet_id": worksheet_id
         }
         
     except HTTPException:
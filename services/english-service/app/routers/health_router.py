@@ -24,3 +24,18 @@ async def health_check():
             "database": "disconnected", 
             "error": str(e)
         }
+
+
+@router.get("/health/llm")
+async def llm_gateway_health():
+    """LLM 게이트웨이 대기열/지연 시간 카운터 (현재 프로세스 기준)"""
+    from app.services.ai.llm_gateway import get_llm_gateway
+    from app.services.ai.llm_cache import llm_response_cache
+    return {**get_llm_gateway().get_stats(), "cache": llm_response_cache.get_stats()}
+
+
+@router.get("/health/generation")
+async def generation_scheduler_health():
+    """문제 생성 스케줄러 대기열/실행 카운터 (현재 프로세스 기준)"""
+    from app.services.generation.question_scheduler import get_question_scheduler
+    return get_question_scheduler().get_stats()
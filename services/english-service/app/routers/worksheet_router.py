@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from datetime import datetime
@@ -15,6 +15,10 @@ from app.models import (
     GradingResult, QuestionResult, Worksheet, Passage, Question
 )
 from app.services.generation.question_generator import PromptGenerator
+from app.services.generation.passage_library import passage_library
+from app.services.worksheet_crud.worksheet_view import (
+    WorksheetView, load_worksheet, solve_view_cache, bump_worksheet_version
+)
 from app.tasks import generate_english_worksheet_task
 from app.celery_app import celery_app
 
@@ -271,6 +275,19 @@ async def save_worksheet(request: WorksheetSaveRequest, db: Session = Depends(ge
         db.commit()
         db.refresh(db_worksheet)
         
+        # 저장된(선생님이 검토한) 지문은 지문 라이브러리에 추가 - 실패해도 문제지 저장에는 영향 없음
+        try:
+            added = passage_library.add_from_worksheet(
+                db, db_worksheet.worksheet_id, school_level, int(request.worksheet_grade),
+                PromptGenerator()._get_cefr_level(school_level, int(request.worksheet_grade)),
+                [passage_data.model_dump() for passage_data in request.passages]
+            )
+            if added:
+                db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ 지문 라이브러리 추가 실패: {str(e)}")
+
         return {
             "message": "문제지가 성공적으로 저장되었습니다.",
             "worksheet_id": db_worksheet.worksheet_id,
@@ -324,64 +341,14 @@ async def get_worksheets(user_id: int, limit: int = 100, db: Session = Depends(g
 async def get_worksheet_for_editing(worksheet_id: int, user_id: int, db: Session = Depends(get_db)):
     """문제지 편집용 워크시트를 조회합니다"""
     try:
-        worksheet = db.query(Worksheet).filter(
-            Worksheet.worksheet_id == worksheet_id,
-            Worksheet.teacher_id == user_id
-        ).first()
+        worksheet = load_worksheet(db, worksheet_id, teacher_id=user_id)
         if not worksheet:
             raise HTTPException(status_code=404, detail="문제지를 찾을 수 없습니다.")
-        
-        # 문제지 데이터를 딕셔너리로 변환
-        worksheet_data = {
-            "worksheet_id": worksheet.worksheet_id,
-            "teacher_id": worksheet.teacher_id,
-            "worksheet_name": worksheet.worksheet_name,
-            "worksheet_level": worksheet.school_level,
-            "worksheet_grade": worksheet.grade,
-            "worksheet_subject": worksheet.subject,
-            "problem_type": worksheet.problem_type,
-            "total_questions": worksheet.total_questions,
-            "worksheet_duration": worksheet.duration,
-            "passages": [],
-            "questions": []
-        }
-        
-        # 지문 데이터 추가
-        for passage in worksheet.passages:
-            passage_data = {
-                "passage_id": passage.passage_id,
-                "passage_type": passage.passage_type,
-                "passage_content": passage.passage_content,
-                "original_content": passage.original_content,
-                "korean_translation": passage.korean_translation,
-                "related_questions": passage.related_questions
-            }
-            worksheet_data["passages"].append(passage_data)
-        
-        # 문제 데이터 추가 (정답/해설 포함)
-        for question in worksheet.questions:
-            question_data = {
-                "question_id": question.question_id,
-                "question_text": question.question_text,
-                "question_type": question.question_type,
-                "question_subject": question.question_subject,
-                "question_difficulty": question.question_difficulty,
-                "question_detail_type": question.question_detail_type,
-                "question_choices": question.question_choices,
-                "question_passage_id": question.passage_id,
-                "correct_answer": question.correct_answer,
-                "example_content": question.example_content,
-                "example_original_content": question.example_original_content,
-                "example_korean_translation": question.example_korean_translation,
-                "explanation": question.explanation,
-                "learning_point": question.learning_point
-            }
-            worksheet_data["questions"].append(question_data)
-        
+
         return {
             "status": "success",
             "message": "편집용 문제지를 성공적으로 조회했습니다.",
-            "worksheet_data": worksheet_data
+            "worksheet_data": WorksheetView(worksheet).editing_data()
         }
         
     except HTTPException:
@@ -393,72 +360,11 @@ async def get_worksheet_for_editing(worksheet_id: int, user_id: int, db: Session
 async def get_worksheet_for_solving(worksheet_id: int, db: Session = Depends(get_db)):
     """문제 풀이용 문제지를 조회합니다 (답안 제외)."""
     try:
-        worksheet = db.query(Worksheet).filter(Worksheet.worksheet_id == worksheet_id).first()
-        if not worksheet:
+        # 직렬화된 JSON 을 그대로 반환 (Redis 캐시 적중 시 DB 조회 없음)
+        payload = solve_view_cache.get_json(db, worksheet_id)
+        if payload is None:
             raise HTTPException(status_code=404, detail="문제지를 찾을 수 없습니다.")
-        
-        # 문제지 데이터를 딕셔너리로 변환
-        worksheet_data = {
-            "worksheet_id": worksheet.worksheet_id,
-            "worksheet_name": worksheet.worksheet_name,
-            "worksheet_level": worksheet.school_level,
-            "worksheet_grade": worksheet.grade,
-            "worksheet_subject": worksheet.subject,
-            "total_questions": worksheet.total_questions,
-            "worksheet_duration": worksheet.duration,
-            "passages": [],
-            "examples": [],
-            "questions": []
-        }
-        
-        # 지문 데이터 추가 (한글 번역 포함)
-        for passage in worksheet.passages:
-            worksheet_data["passages"].append({
-                "passage_id": passage.passage_id,
-                "passage_type": passage.passage_type,
-                "passage_content": passage.passage_content,
-                "original_content": passage.original_content,
-                "korean_translation": passage.korean_translation,
-                "related_questions": passage.related_questions
-            })
-        
-        # 예문 데이터 추가 (한글 번역 포함)
-        for example in worksheet.examples:
-            worksheet_data["examples"].append({
-                "example_id": example.example_id,
-                "example_content": example.example_content,
-                "original_content": example.original_content,
-                "korean_translation": example.korean_translation,
-                "related_question": example.related_question
-            })
-        
-        # 문제 데이터 추가 (답안 제외)
-        for question in worksheet.questions:
-            worksheet_data["questions"].append({
-                "question_id": question.question_id,
-                "question_text": question.question_text,
-                "question_type": question.question_type,
-                "question_subject": question.question_subject,
-                "question_difficulty": question.question_difficulty,
-                "question_detail_type": question.question_detail_type,
-                "question_choices": question.question_choices,
-                "question_passage_id": question.passage_id,
-                "question_example_id": question.example_id
-            })
-        
-        # 응답 데이터 구조 통일 (채점 결과 호환성)
-        return {
-            "worksheet_id": worksheet_data["worksheet_id"],
-            "worksheet_name": worksheet_data["worksheet_name"],
-            "worksheet_level": worksheet_data["worksheet_level"],
-            "worksheet_grade": worksheet_data["worksheet_grade"],
-            "worksheet_subject": worksheet_data["worksheet_subject"],
-            "total_questions": worksheet_data["total_questions"],
-            "worksheet_duration": worksheet_data["worksheet_duration"],
-            "passages": worksheet_data["passages"],
-            "examples": worksheet_data["examples"],
-            "questions": worksheet_data["questions"]
-        }
+        return Response(content=payload, media_type="application/json")
         
     except HTTPException:
         raise
@@ -616,6 +522,7 @@ async def delete_worksheet(worksheet_id: int, db: Session = Depends(get_db)):
         
         # 변경사항 커밋
         db.commit()
+        bump_worksheet_version(worksheet_id)
         
         return {
             "status": "success",
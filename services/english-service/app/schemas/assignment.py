@@ -14,6 +14,16 @@ class SimpleAssignmentDeployRequest(BaseModel):
     student_ids: List[int] = Field(..., description="배포할 학생 ID 목록")
     classroom_id: int = Field(..., description="배포할 클래스룸 ID")
 
+class ClassroomDeployTarget(BaseModel):
+    """일괄 배포 대상 클래스룸"""
+    classroom_id: int = Field(..., description="배포할 클래스룸 ID")
+    student_ids: List[int] = Field(..., description="배포할 학생 ID 목록")
+
+class BulkAssignmentDeployRequest(BaseModel):
+    """과제 일괄 배포 요청 (워크시트 x 클래스룸)"""
+    assignment_ids: List[int] = Field(..., description="워크시트 ID 목록 (assignment_id로 사용)")
+    classrooms: List[ClassroomDeployTarget] = Field(..., description="배포할 클래스룸과 학생 목록")
+
 class AssignmentDeploymentResponse(BaseModel):
     """과제 배포 응답"""
     id: int
@@ -51,6 +51,12 @@ class WorksheetGenerationRequest(BaseModel):
     # 추가 요구사항
     additional_requirements: Optional[str] = Field(None, description="추가 요구사항 (선택사항)")
 
+    # 지문 라이브러리 재사용 비율 (없으면 서버 기본값)
+    passage_reuse_ratio: Optional[float] = Field(None, ge=0, le=1, description="독해 문제 중 검증된 라이브러리 지문을 재사용할 비율 (0-1)")
+    # 재사용 지문 조건 (없으면 학년/CEFR/단어 수 구간만 일치)
+    passage_types: Optional[List[str]] = Field(None, description="재사용할 지문 유형 (article, dialogue, correspondence, informational, review)")
+    passage_topic_categories: Optional[List[str]] = Field(None, description="재사용할 지문 소재 카테고리 (개인생활, 학교생활 등 - 선택사항)")
+
     @validator('subject_ratios')
     def validate_subject_ratios(cls, v):
         if v:  # 비어있지 않을 때만 검증
@@ -1,4 +1,6 @@
 from .ai_service import AIService
 from .gemini_client import GeminiClient
+from .llm_gateway import LLMGateway, get_llm_gateway
+from .json_repair import repair_json, loads_tolerant
 
-__all__ = ["AIService", "GeminiClient"]
\ No newline at end of file
+__all__ = ["AIService", "GeminiClient", "LLMGateway", "get_llm_gateway", "repair_json", "loads_tolerant"]
\ No newline at end of file
@@ -1,7 +1,9 @@
 import json
 import re
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .gemini_client import GeminiClient
+from .json_repair import loads_tolerant
+from .llm_cache import llm_response_cache, CACHE_TTLS
 
 
 class AIService:
@@ -10,9 +12,11 @@ class AIService:
     def __init__(self):
         self.gemini_client = GeminiClient()
 
-    async def grade_subjective_question(self, question_text: str, correct_answer: str, student_answer: str, passage_content: str = None, example_content: str = None, explanation: str = None, learning_point: str = None) -> Dict[str, Any]:
+    async def grade_subjective_question(self, question_text: str, correct_answer: str, student_answer: str, passage_content: str = None, example_content: str = None, explanation: str = None, learning_point: str = None, cache_key: Optional[str] = None) -> Dict[str, Any]:
         """
         AI를 사용하여 단답형/서술형 문제를 채점합니다.
+        cache_key 가 있으면 같은 키로 저장된 AI 응답을 먼저 조회합니다. (같은 문제/같은 답안 재채점 방지)
+        동시에 같은 키로 미스가 나면 락을 잡은 한 곳만 AI 를 호출하고 나머지는 그 결과를 기다립니다.
         """
         if not self.gemini_client.is_available():
             return {"score": 0, "is_correct": False, "feedback": "AI 서비스가 비활성화되었습니다."}
@@ -104,10 +108,25 @@ class AIService:
         print(prompt)
         print("="*80)
 
+        # grading 패키지가 이 모듈을 가져오므로 순환 import 를 피해 여기서 가져옴
+        from ..grading.grading_cache import grading_lock
+
+        lock_token = None
         try:
-            response = await self.gemini_client.generate_content(prompt)
-            if not response:
-                return {"score": 0, "is_correct": False, "feedback": "AI 응답을 받지 못했습니다."}
+            response = llm_response_cache.get(cache_key) if cache_key else None
+            if response is None and cache_key:
+                lock_token = grading_lock.acquire(cache_key)
+                if lock_token is None:
+                    # 같은 답안을 다른 곳에서 채점 중 - 결과가 캐시에 올라오기를 기다림
+                    response = await grading_lock.wait_for(cache_key, llm_response_cache.get)
+            if response is not None:
+                print(f"♻️ 채점 캐시 적중: {cache_key}")
+            else:
+                response = await self.gemini_client.generate_content(prompt)
+                if not response:
+                    return {"score": 0, "is_correct": False, "feedback": "AI 응답을 받지 못했습니다."}
+                if cache_key and self._is_parseable(response):
+                    llm_response_cache.set(cache_key, response, CACHE_TTLS["english_subjective_grading"])
 
             # AI 응답 로그 출력
             print("🤖 AI 원본 응답:")
@@ -136,27 +155,28 @@ class AIService:
         except Exception as e:
             print(f"AI 채점 중 오류 발생: {e}")
             return {"score": 0, "is_correct": False, "feedback": f"채점 중 오류가 발생했습니다: {str(e)}"}
+        finally:
+            if lock_token:
+                grading_lock.release(cache_key, lock_token)
+
+    @staticmethod
+    def _is_parseable(response: str) -> bool:
+        """캐시에 저장해도 되는 응답인지 (JSON 객체로 파싱 가능)"""
+        try:
+            return isinstance(loads_tolerant(response), dict)
+        except (json.JSONDecodeError, ValueError):
+            return False
 
     def _parse_ai_response(self, response: str) -> Dict[str, Any]:
         """AI 응답에서 JSON을 추출합니다."""
-        # JSON 블록 패턴 매칭
-        json_pattern = r'```(?:json)?\s*(\{.*?\})\s*```'
-        match = re.search(json_pattern, response, re.DOTALL)
-
-        if match:
-            json_str = match.group(1)
-            try:
-                return json.loads(json_str)
-            except json.JSONDecodeError as e:
-                print(f"JSON 파싱 실패: {e}")
-                print(f"응답 내용: {response}")
-
-        # JSON 블록이 없는 경우 전체 응답에서 JSON 찾기
+        # 코드 블록 추출 및 LLM 출력 결함 복구를 한 번에 처리
         try:
-            # 응답 전체가 JSON인 경우
-            return json.loads(response.strip())
-        except json.JSONDecodeError:
-            pass
+            result = loads_tolerant(response)
+            if isinstance(result, dict):
+                return result
+        except json.JSONDecodeError as e:
+            print(f"JSON 파싱 실패: {e}")
+            print(f"응답 내용: {response}")
 
         # 정규식으로 필드별 추출 시도
         return self._extract_fields_by_regex(response)
@@ -1,5 +1,6 @@
 from typing import Optional
 from app.core.config import get_settings
+from .llm_gateway import get_llm_gateway
 
 try:
     import google.generativeai as genai
@@ -22,8 +23,8 @@ class GeminiClient:
         if not self.settings.gemini_api_key:
             raise ValueError("GEMINI_API_KEY environment variable not set.")
 
-        genai.configure(api_key=self.settings.gemini_api_key)
-        self.model = genai.GenerativeModel(self.settings.gemini_flash_model)
+        # LLM 게이트웨이의 공용 비동기 클라이언트 사용 (동시성/RPM/TPM 예산 공유)
+        self.model = get_llm_gateway().gemini_model(self.settings.gemini_flash_model)
 
     def is_available(self) -> bool:
         """Gemini 서비스가 사용 가능한지 확인"""
@@ -0,0 +1,554 @@
+"""
+LLM 게이트웨이 - Gemini/OpenAI 호출을 한 곳에서 관리
+
+- 프로바이더별로 오래 유지되는 비동기 클라이언트 1개를 전용 이벤트 루프 스레드에서 공유
+- API 키별 RPM/TPM 토큰 버킷을 Redis에 두어 여러 Celery 워커 프로세스가 예산을 함께 사용
+  (Redis를 쓸 수 없으면 LLM_GATEWAY_REDIS_RETRY_SECONDS 동안 프로세스 내부 버킷으로 대체 후 다시 시도)
+- 대기열 깊이, 진행 중 호출 수, 지연 시간 카운터 제공
+- LLM_PROVIDER=fake 이면 실제 API 대신 가짜 프로바이더 호출 (부하 테스트용, fake_llm 참고)
+- CompiledPrompt 의 정적 접두부는 Gemini 컨텍스트 캐시(CachedContent)에 한 번 올리고 접미부만 전송
+  (캐시 이름은 Redis로 워커 간 공유, 너무 짧은 접두부는 프로바이더 암묵적 캐시에 맡김)
+"""
+import os
+import time
+import asyncio
+import datetime
+import hashlib
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+from app.core.config import get_settings
+
+try:
+    import google.generativeai as genai
+    GEMINI_AVAILABLE = True
+except ImportError:
+    GEMINI_AVAILABLE = False
+
+try:
+    from openai import AsyncOpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from .fake_llm import FAKE_LLM_ENABLED, LLM_RECORD_PATH, get_fake_llm, record_response
+from .prompt_cache import CompiledPrompt, prefix_stats
+
+settings = get_settings()
+
+REDIS_URL = settings.redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# 프로바이더별 기본 예산 (환경변수로 조정)
+DEFAULT_BUDGETS = {
+    "gemini": {
+        "rpm": int(os.getenv("GEMINI_RPM_LIMIT", "150")),
+        "tpm": int(os.getenv("GEMINI_TPM_LIMIT", "2000000")),
+        "concurrency": int(os.getenv("GEMINI_MAX_CONCURRENCY", "8")),
+    },
+    "openai": {
+        "rpm": int(os.getenv("OPENAI_RPM_LIMIT", "500")),
+        "tpm": int(os.getenv("OPENAI_TPM_LIMIT", "200000")),
+        "concurrency": int(os.getenv("OPENAI_MAX_CONCURRENCY", "16")),
+    },
+}
+
+# 정적 접두부 컨텍스트 캐시 (GEMINI_CONTEXT_CACHE=0 이면 전체 프롬프트 전송)
+GEMINI_CONTEXT_CACHE_ENABLED = os.getenv("GEMINI_CONTEXT_CACHE", "1") == "1"
+GEMINI_CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+# 이보다 짧은(추정 토큰) 접두부는 캐시 생성 안 함 (0이면 모델 기본값: flash 1024, 그 외 2048)
+GEMINI_CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "0"))
+
+# Redis 오류 후 다시 사용을 시도하기까지 대기 (초)
+LLM_GATEWAY_REDIS_RETRY_SECONDS = float(os.getenv("LLM_GATEWAY_REDIS_RETRY_SECONDS", "30"))
+
+# RPM/TPM 토큰 버킷 (원자적 갱신). 통과하면 0, 아니면 대기해야 할 ms 반환
+TOKEN_BUCKET_SCRIPT = """
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm)
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts')
+local req = tonumber(state[1]) or rpm
+local tok = tonumber(state[2]) or tpm
+local ts = tonumber(state[3]) or now
+local elapsed = math.max(0, now - ts)
+req = math.min(rpm, req + elapsed * rpm / 60000)
+tok = math.min(tpm, tok + elapsed * tpm / 60000)
+local wait = 0
+if req >= 1 and tok >= cost then
+  req = req - 1
+  tok = tok - cost
+else
+  if req < 1 then wait = math.max(wait, (1 - req) * 60000 / rpm) end
+  if tok < cost then wait = math.max(wait, (cost - tok) * 60000 / tpm) end
+end
+redis.call('HSET', KEYS[1], 'req', tostring(req), 'tok', tostring(tok), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return math.ceil(wait)
+"""
+
+
+class _LocalTokenBucket:
+    """Redis를 사용할 수 없을 때 쓰는 프로세스 내부 토큰 버킷"""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.req = float(rpm)
+        self.tok = float(tpm)
+        self.ts = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self, cost: int) -> int:
+        """통과하면 0, 아니면 대기해야 할 ms 반환"""
+        with self.lock:
+            now = time.monotonic()
+            elapsed_ms = (now - self.ts) * 1000
+            self.ts = now
+            self.req = min(self.rpm, self.req + elapsed_ms * self.rpm / 60000)
+            self.tok = min(self.tpm, self.tok + elapsed_ms * self.tpm / 60000)
+            cost = min(cost, self.tpm)
+
+            if self.req >= 1 and self.tok >= cost:
+                self.req -= 1
+                self.tok -= cost
+                return 0
+
+            wait = 0.0
+            if self.req < 1:
+                wait = max(wait, (1 - self.req) * 60000 / self.rpm)
+            if self.tok < cost:
+                wait = max(wait, (cost - self.tok) * 60000 / self.tpm)
+            return int(wait) + 1
+
+
+class _ProviderStats:
+    """프로바이더별 호출 카운터"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.queued = 0
+        self.in_flight = 0
+        self.throttled = 0
+        self.latency_total_ms = 0.0
+        self.latencies = deque(maxlen=500)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1)
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "throttled_waits": self.throttled,
+            "latency_ms_p50": percentile(0.5),
+            "latency_ms_p95": percentile(0.95),
+            "latency_ms_max": round(latencies[-1], 1) if latencies else 0.0,
+            "latency_ms_total": round(self.latency_total_ms, 1),
+        }
+
+
+class GatewayGeminiModel:
+    """genai.GenerativeModel 대신 사용하는 게이트웨이 경유 모델 핸들"""
+
+    def __init__(self, gateway: "LLMGateway", model_name: str, generation_config: Any = None):
+        self.gateway = gateway
+        self.model_name = model_name
+        self.generation_config = generation_config
+
+    def generate_content(self, prompt: Any, **kwargs):
+        kwargs.setdefault("generation_config", self.generation_config)
+        return self.gateway.generate_content(self.model_name, prompt, **kwargs)
+
+    async def generate_content_async(self, prompt: Any, **kwargs):
+        kwargs.setdefault("generation_config", self.generation_config)
+        return await self.gateway.generate_content_async(self.model_name, prompt, **kwargs)
+
+
+class LLMGateway:
+    """프로세스 전역 LLM 호출 게이트웨이"""
+
+    def __init__(self, service_name: str, gemini_api_key: Optional[str] = None,
+                 openai_api_key: Optional[str] = None, redis_url: str = REDIS_URL):
+        self.service_name = service_name
+        self.gemini_api_key = gemini_api_key
+        self.openai_api_key = openai_api_key
+        self.redis_url = redis_url
+        self.stats = {provider: _ProviderStats() for provider in DEFAULT_BUDGETS}
+        self.context_cache_stats = {"hits": 0, "created": 0, "shared": 0, "skipped": 0, "errors": 0}
+        self._init_lock = threading.Lock()
+        self._reset_runtime()
+
+    def _reset_runtime(self):
+        """이벤트 루프/클라이언트 상태 초기화 (fork 이후 자식 프로세스에서도 호출)"""
+        self._pid = os.getpid()
+        self._loop = None
+        self._loop_thread = None
+        self._semaphores = {}
+        self._gemini_models = {}
+        self._openai_client = None
+        self._redis = None
+        self._bucket_script = None
+        self._redis_disabled = not REDIS_AVAILABLE
+        self._redis_retry_at = 0.0
+        self._local_buckets = {}
+        self._context_caches = {}
+        self._context_cache_locks = {}
+        self._uncacheable_prefixes = set()
+
+    # ========== 이벤트 루프 ==========
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        if self._pid != os.getpid():
+            # Celery prefork 워커: 부모 프로세스의 루프 스레드는 상속되지 않음
+            self._reset_runtime()
+
+        if self._loop is not None:
+            return self._loop
+
+        with self._init_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name=f"llm-gateway-{self.service_name}", daemon=True
+                )
+                thread.start()
+                self._loop_thread = thread
+                self._loop = loop
+                print(f"✅ LLM 게이트웨이 시작 ({self.service_name}, pid={self._pid})")
+        return self._loop
+
+    def _run(self, coro):
+        """게이트웨이 루프에서 코루틴을 실행하고 결과를 동기적으로 기다림"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def _run_async(self, coro):
+        """다른 이벤트 루프(FastAPI 등)에서 게이트웨이 루프의 코루틴을 기다림"""
+        loop = self._ensure_loop()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    # ========== 클라이언트 ==========
+
+    def gemini_model(self, model_name: str, generation_config: Any = None) -> GatewayGeminiModel:
+        """게이트웨이를 경유하는 Gemini 모델 핸들 반환"""
+        if FAKE_LLM_ENABLED:
+            return GatewayGeminiModel(self, model_name, generation_config)
+        if not GEMINI_AVAILABLE:
+            raise ImportError("google-generativeai 라이브러리가 설치되지 않았습니다.")
+        if not self.gemini_api_key:
+            raise ValueError("Gemini API key is not configured")
+        return GatewayGeminiModel(self, model_name, generation_config)
+
+    def openai_available(self) -> bool:
+        return FAKE_LLM_ENABLED or (OPENAI_AVAILABLE and bool(self.openai_api_key))
+
+    def _get_gemini_model(self, model_name: str):
+        model = self._gemini_models.get(model_name)
+        if model is None:
+            if not self._gemini_models:
+                genai.configure(api_key=self.gemini_api_key)
+            model = genai.GenerativeModel(model_name)
+            self._gemini_models[model_name] = model
+        return model
+
+    def _get_openai_client(self):
+        if self._openai_client is None:
+            if not self.openai_available():
+                raise ValueError("OpenAI API key is not configured")
+            self._openai_client = AsyncOpenAI(api_key=self.openai_api_key, max_retries=2)
+        return self._openai_client
+
+    def _get_semaphore(self, provider: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(DEFAULT_BUDGETS[provider]["concurrency"])
+            self._semaphores[provider] = semaphore
+        return semaphore
+
+    # ========== 예산 (토큰 버킷) ==========
+
+    def _bucket_key(self, provider: str) -> str:
+        api_key = self.gemini_api_key if provider == "gemini" else self.openai_api_key
+        key_hash = hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+        return f"llm_budget:{provider}:{key_hash}"
+
+    def _get_redis(self):
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url)
+            self._bucket_script = self._redis.register_script(TOKEN_BUCKET_SCRIPT)
+        return self._redis
+
+    def _redis_usable(self) -> bool:
+        """Redis 사용 가능 여부 (오류 후 대기 시간이 지나면 다시 시도)"""
+        if self._redis_disabled and REDIS_AVAILABLE and time.time() >= self._redis_retry_at:
+            self._redis_disabled = False
+        return not self._redis_disabled
+
+    def _redis_failed(self):
+        self._redis_disabled = True
+        self._redis = None
+        self._redis_retry_at = time.time() + LLM_GATEWAY_REDIS_RETRY_SECONDS
+
+    async def _try_acquire_budget(self, provider: str, cost: int) -> int:
+        budget = DEFAULT_BUDGETS[provider]
+
+        if self._redis_usable():
+            try:
+                self._get_redis()
+                return int(await self._bucket_script(
+                    keys=[self._bucket_key(provider)],
+                    args=[budget["rpm"], budget["tpm"], cost]
+                ))
+            except Exception as e:
+                print(f"⚠️ Redis 예산 버킷 사용 불가, {LLM_GATEWAY_REDIS_RETRY_SECONDS:.0f}초 동안 프로세스 내부 버킷 사용: {str(e)}")
+                self._redis_failed()
+
+        bucket = self._local_buckets.get(provider)
+        if bucket is None:
+            bucket = _LocalTokenBucket(budget["rpm"], budget["tpm"])
+            self._local_buckets[provider] = bucket
+        return bucket.try_acquire(cost)
+
+    async def _acquire_budget(self, provider: str, cost: int):
+        while True:
+            wait_ms = await self._try_acquire_budget(provider, cost)
+            if wait_ms <= 0:
+                return
+            self.stats[provider].throttled += 1
+            await asyncio.sleep(min(wait_ms, 5000) / 1000)
+
+    @staticmethod
+    def _estimate_tokens(prompt: Any, max_output_tokens: Optional[int]) -> int:
+        """입력(문자 수 기반 근사) + 최대 출력 토큰으로 TPM 비용 추정"""
+        if isinstance(prompt, str):
+            prompt_chars = len(prompt)
+        elif isinstance(prompt, list):
+            prompt_chars = sum(len(str(part.get("content", part))) if isinstance(part, dict) else len(str(part))
+                               for part in prompt)
+        else:
+            prompt_chars = len(str(prompt))
+        return prompt_chars // 3 + (max_output_tokens or 1024)
+
+    # ========== 컨텍스트 캐시 (정적 접두부) ==========
+
+    @staticmethod
+    def _context_cache_key(model_name: str, prefix: str) -> str:
+        prefix_hash = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:24]
+        return f"llm_context_cache:{model_name}:{prefix_hash}"
+
+    async def _load_shared_context_cache(self, key: str):
+        """다른 워커가 만든 CachedContent 재사용 → (cached_content, 남은 초) 또는 None"""
+        if not self._redis_usable():
+            return None
+        try:
+            redis_client = self._get_redis()
+            name = await redis_client.get(key)
+            ttl = await redis_client.ttl(key)
+            if not name or ttl <= 60:
+                return None
+            name = name.decode() if isinstance(name, bytes) else name
+            return await asyncio.to_thread(genai.caching.CachedContent.get, name), ttl
+        except Exception:
+            # 만료/삭제된 캐시 - 새로 생성
+            return None
+
+    async def _store_shared_context_cache(self, key: str, name: str):
+        if not self._redis_usable():
+            return
+        try:
+            # 실제 만료보다 조금 먼저 지워 만료 직전 캐시를 공유하지 않도록 함
+            await self._get_redis().set(key, name, ex=max(1, GEMINI_CONTEXT_CACHE_TTL - 120))
+        except Exception as e:
+            print(f"⚠️ 컨텍스트 캐시 이름 공유 실패: {str(e)}")
+
+    async def _get_context_cached_model(self, model_name: str, prefix: str):
+        """접두부를 올린 CachedContent 기반 모델 (사용할 수 없으면 None → 전체 프롬프트 전송)"""
+        key = self._context_cache_key(model_name, prefix)
+        if key in self._uncacheable_prefixes:
+            return None
+
+        entry = self._context_caches.get(key)
+        if entry is not None and entry[1] - time.time() > 60:
+            self.context_cache_stats["hits"] += 1
+            return entry[0]
+
+        min_tokens = GEMINI_CONTEXT_CACHE_MIN_TOKENS or (1024 if "flash" in model_name else 2048)
+        if len(prefix) // 3 < min_tokens:
+            self._uncacheable_prefixes.add(key)
+            self.context_cache_stats["skipped"] += 1
+            return None
+
+        lock = self._context_cache_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            entry = self._context_caches.get(key)
+            if entry is not None and entry[1] - time.time() > 60:
+                self.context_cache_stats["hits"] += 1
+                return entry[0]
+            try:
+                shared = await self._load_shared_context_cache(key)
+                if shared is not None:
+                    cached_content, ttl = shared
+                    self.context_cache_stats["shared"] += 1
+                else:
+                    cached_content = await asyncio.to_thread(
+                        genai.caching.CachedContent.create,
+                        model=model_name if model_name.startswith("models/") else f"models/{model_name}",
+                        system_instruction=prefix,
+                        ttl=datetime.timedelta(seconds=GEMINI_CONTEXT_CACHE_TTL),
+                    )
+                    ttl = GEMINI_CONTEXT_CACHE_TTL
+                    await self._store_shared_context_cache(key, cached_content.name)
+                    self.context_cache_stats["created"] += 1
+                    print(f"✅ 컨텍스트 캐시 생성 ({model_name}, 접두부 {len(prefix)}자)")
+                model = genai.GenerativeModel.from_cached_content(cached_content=cached_content)
+                self._context_caches[key] = (model, time.time() + ttl)
+                return model
+            except Exception as e:
+                # 최소 토큰 미달/모델 미지원 등 - 이 접두부는 전체 프롬프트로 전송
+                print(f"⚠️ 컨텍스트 캐시 사용 불가, 전체 프롬프트로 전송: {str(e)}")
+                self._uncacheable_prefixes.add(key)
+                self.context_cache_stats["errors"] += 1
+                return None
+
+    # ========== 호출 ==========
+
+    async def _call(self, provider: str, cost: int, make_request):
+        stats = self.stats[provider]
+        stats.queued += 1
+        dequeued = False
+        try:
+            async with self._get_semaphore(provider):
+                await self._acquire_budget(provider, cost)
+                stats.queued -= 1
+                dequeued = True
+                stats.in_flight += 1
+                start = time.perf_counter()
+                try:
+                    return await make_request()
+                except Exception:
+                    stats.errors += 1
+                    raise
+                finally:
+                    elapsed_ms = (time.perf_counter() - start) * 1000
+                    stats.in_flight -= 1
+                    stats.requests += 1
+                    stats.latency_total_ms += elapsed_ms
+                    stats.latencies.append(elapsed_ms)
+        finally:
+            if not dequeued:
+                stats.queued -= 1
+
+    async def _gemini_request(self, model_name: str, prompt: Any, generation_config: Any = None, **kwargs):
+        max_output_tokens = getattr(generation_config, "max_output_tokens", None)
+        if isinstance(generation_config, dict):
+            max_output_tokens = generation_config.get("max_output_tokens")
+        cost = self._estimate_tokens(prompt, max_output_tokens)
+
+        if FAKE_LLM_ENABLED:
+            async def make_request():
+                return await get_fake_llm().gemini_generate(model_name, prompt)
+            return await self._call("gemini", cost, make_request)
+
+        model = self._get_gemini_model(model_name)
+        request_prompt = prompt
+        if isinstance(prompt, CompiledPrompt) and GEMINI_CONTEXT_CACHE_ENABLED:
+            cached_model = await self._get_context_cached_model(model_name, prompt.prefix)
+            if cached_model is not None:
+                model, request_prompt = cached_model, prompt.suffix
+
+        async def make_request():
+            response = await model.generate_content_async(request_prompt, generation_config=generation_config, **kwargs)
+            if LLM_RECORD_PATH:
+                try:
+                    record_response("gemini", model_name, prompt, response.text)
+                except ValueError:
+                    # 안전 필터 등으로 text가 없는 응답
+                    pass
+            return response
+
+        return await self._call("gemini", cost, make_request)
+
+    async def _openai_request(self, **kwargs):
+        cost = self._estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+
+        if FAKE_LLM_ENABLED:
+            async def make_request():
+                return await get_fake_llm().chat_completion(kwargs.get("model"), kwargs.get("messages", []))
+            return await self._call("openai", cost, make_request)
+
+        client = self._get_openai_client()
+
+        async def make_request():
+            response = await client.chat.completions.create(**kwargs)
+            if LLM_RECORD_PATH:
+                record_response("openai", kwargs.get("model"), kwargs.get("messages", []),
+                                response.choices[0].message.content)
+            return response
+
+        return await self._call("openai", cost, make_request)
+
+    def generate_content(self, model_name: str, prompt: Any, generation_config: Any = None, **kwargs):
+        """Gemini generate_content (동기 호출용: Celery 태스크, 스레드 풀)"""
+        return self._run(self._gemini_request(model_name, prompt, generation_config, **kwargs))
+
+    async def generate_content_async(self, model_name: str, prompt: Any, generation_config: Any = None, **kwargs):
+        """Gemini generate_content (비동기 호출용: FastAPI 라우터)"""
+        return await self._run_async(self._gemini_request(model_name, prompt, generation_config, **kwargs))
+
+    def chat_completion(self, **kwargs):
+        """OpenAI chat.completions.create (동기 호출용)"""
+        return self._run(self._openai_request(**kwargs))
+
+    async def chat_completion_async(self, **kwargs):
+        """OpenAI chat.completions.create (비동기 호출용)"""
+        return await self._run_async(self._openai_request(**kwargs))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """대기열 깊이/지연 시간 카운터 조회"""
+        stats = {
+            "service": self.service_name,
+            "pid": os.getpid(),
+            "budget_backend": "local" if self._redis_disabled else "redis",
+            "providers": {
+                provider: {**stats.snapshot(), **DEFAULT_BUDGETS[provider]}
+                for provider, stats in self.stats.items()
+            }
+        }
+        if GEMINI_CONTEXT_CACHE_ENABLED:
+            stats["context_cache"] = {**self.context_cache_stats, "prompt_prefixes": dict(prefix_stats)}
+        if FAKE_LLM_ENABLED:
+            stats["fake"] = get_fake_llm().get_stats()
+        return stats
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """영어 서비스용 게이트웨이 싱글톤"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    service_name="english",
+                    gemini_api_key=settings.gemini_api_key,
+                    openai_api_key=os.getenv("OPENAI_API_KEY"),
+                )
+    return _gateway
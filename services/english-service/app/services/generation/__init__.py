@@ -1,3 +1,9 @@
 from .question_generator import PromptGenerator, QuestionDistributionCalculator
+from .question_scheduler import QuestionScheduler, get_question_scheduler
+from .taxonomy_snapshot import TaxonomySnapshot, taxonomy_snapshot, bump_taxonomy_version
+from .vocabulary_index import VocabularyIndex, vocabulary_index
 
-__all__ = ["PromptGenerator", "QuestionDistributionCalculator"]
\ No newline at end of file
+__all__ = [
+    "PromptGenerator", "QuestionDistributionCalculator", "QuestionScheduler", "get_question_scheduler",
+    "TaxonomySnapshot", "taxonomy_snapshot", "bump_taxonomy_version", "VocabularyIndex", "vocabulary_index",
+]
\ No newline at end of file
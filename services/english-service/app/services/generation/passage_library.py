@@ -0,0 +1,204 @@
+"""
+지문 라이브러리 - 저장된 문제지의 지문을 (학교급, 학년, CEFR, 지문 유형, 소재 카테고리, 단어 수 구간)으로 색인해 재사용
+
+- 문제지 저장 시(선생님이 검토 후 저장한 지문) 원본 지문을 자동으로 라이브러리에 추가 (내용 해시로 중복 제외)
+- 워크시트 생성 시 독해 문제 일부를 "기존 지문에 대한 문제만 생성" 프롬프트로 대체
+  (지문 작성 가이드/지문 JSON 출력이 빠져 입력·출력 토큰과 지연이 줄어듦)
+- 재사용 비율: 요청의 passage_reuse_ratio, 없으면 ENGLISH_PASSAGE_REUSE_RATIO (기본 0 = 사용 안 함)
+- 사용 횟수(use_count)는 워크시트가 완성돼 지문이 실제로 채택된 뒤에만 증가
+- 소재 카테고리(topic)는 생성 시 지문 metadata.topic_category 에 기록된 TOPIC_CATEGORIES 키
+  (기록이 없는 지문은 NULL - 카테고리 조건이 없을 때만 재사용 대상)
+"""
+import os
+import json
+import random
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.content import PassageLibraryEntry
+from app.services.generation.topic_categories import normalize_topic_category
+
+ENGLISH_PASSAGE_REUSE_RATIO = float(os.getenv("ENGLISH_PASSAGE_REUSE_RATIO", "0"))
+
+# 단어 수 구간 크기
+WORD_COUNT_BUCKET_SIZE = 50
+# 후보를 고를 때 사용 횟수가 적은 순으로 살펴볼 개수 (요청 지문 수의 배수)
+CANDIDATE_POOL_FACTOR = 4
+
+_BLANK_MARKERS = ("<u>", "___")
+
+
+def _iter_text(content: Any) -> Iterable[str]:
+    """지문 JSON 의 문자열 값들 (metadata 제외)"""
+    if isinstance(content, str):
+        yield content
+    elif isinstance(content, dict):
+        for key, value in content.items():
+            if key != "metadata":
+                yield from _iter_text(value)
+    elif isinstance(content, list):
+        for item in content:
+            yield from _iter_text(item)
+
+
+def count_words(content: Any) -> int:
+    return sum(len(text.split()) for text in _iter_text(content))
+
+
+def word_count_bucket(word_count: int) -> int:
+    return word_count // WORD_COUNT_BUCKET_SIZE * WORD_COUNT_BUCKET_SIZE
+
+
+def extract_topic_category(*contents: Any) -> Optional[str]:
+    """지문 metadata.topic_category 의 소재 카테고리 (TOPIC_CATEGORIES 키가 아니면 None)"""
+    for content in contents:
+        if isinstance(content, dict) and isinstance(content.get("metadata"), dict):
+            category = normalize_topic_category(content["metadata"].get("topic_category"))
+            if category:
+                return category
+    return None
+
+
+def content_hash(content: Any) -> str:
+    return hashlib.sha256(json.dumps(content, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _library_content(passage: Dict[str, Any]) -> Optional[Any]:
+    """재사용할 지문 내용 - 원본(빈칸/밑줄 없음), 원본이 없으면 표시가 없는 학생용 지문만"""
+    original = passage.get("original_content")
+    if original:
+        return original
+    content = passage.get("passage_content")
+    if content and not any(marker in text for text in _iter_text(content) for marker in _BLANK_MARKERS):
+        return content
+    return None
+
+
+class PassageLibrary:
+    """지문 라이브러리 저장/조회"""
+
+    def add_from_worksheet(self, db, worksheet_id: int, school_level: str, grade: int, cefr_level: str,
+                           passages: List[Dict[str, Any]]) -> int:
+        """저장된 문제지의 지문을 라이브러리에 추가 (커밋은 호출자) - 추가한 개수 반환"""
+        candidates = {}
+        for passage in passages:
+            content = _library_content(passage)
+            if not content or not passage.get("passage_type"):
+                continue
+            candidates.setdefault(content_hash(content), (passage, content))
+        if not candidates:
+            return 0
+
+        existing = {
+            row.content_hash for row in db.query(PassageLibraryEntry.content_hash).filter(
+                PassageLibraryEntry.content_hash.in_(list(candidates))
+            ).all()
+        }
+
+        now = datetime.now()
+        added = 0
+        for digest, (passage, content) in candidates.items():
+            if digest in existing:
+                continue
+            word_count = count_words(content)
+            db.add(PassageLibraryEntry(
+                content_hash=digest,
+                school_level=school_level,
+                grade=grade,
+                cefr_level=cefr_level,
+                passage_type=passage["passage_type"],
+                topic=extract_topic_category(content, passage.get("passage_content")),
+                word_count=word_count,
+                word_count_bucket=word_count_bucket(word_count),
+                passage_content=content,
+                korean_translation=passage.get("korean_translation"),
+                source_worksheet_id=worksheet_id,
+                use_count=0,
+                created_at=now,
+            ))
+            added += 1
+
+        if added:
+            print(f"📚 지문 라이브러리 추가: {added}개 (문제지 {worksheet_id})")
+        return added
+
+    def pick(self, db, school_level: str, grade: int, cefr_level: str, count: int,
+             passage_types: Optional[List[str]] = None, topic_categories: Optional[List[str]] = None,
+             word_count_range: Optional[Tuple[int, Optional[int]]] = None) -> List[Dict[str, Any]]:
+        """재사용할 지문 선택 (사용 횟수가 적은 지문 위주로 무작위)
+
+        passage_types / topic_categories(소재 카테고리) / word_count_range(최소, 최대 단어 수 - 최대 None 이면 상한 없음)로
+        색인 컬럼을 거름. 사용 횟수는 문제가 채택된 뒤 mark_used 로 갱신
+        """
+        if count <= 0:
+            return []
+
+        query = db.query(PassageLibraryEntry).filter(
+            PassageLibraryEntry.school_level == school_level,
+            PassageLibraryEntry.grade == grade,
+            PassageLibraryEntry.cefr_level == cefr_level,
+        )
+        if passage_types:
+            query = query.filter(PassageLibraryEntry.passage_type.in_(passage_types))
+        if topic_categories:
+            categories = [c for c in map(normalize_topic_category, topic_categories) if c]
+            if not categories:
+                return []
+            query = query.filter(PassageLibraryEntry.topic.in_(categories))
+        if word_count_range:
+            min_words, max_words = word_count_range
+            query = query.filter(PassageLibraryEntry.word_count_bucket >= word_count_bucket(min_words))
+            if max_words is not None:
+                query = query.filter(PassageLibraryEntry.word_count_bucket <= word_count_bucket(max_words))
+
+        pool = query.order_by(
+            PassageLibraryEntry.use_count.asc(), PassageLibraryEntry.id.desc()
+        ).limit(count * CANDIDATE_POOL_FACTOR).all()
+        if not pool:
+            return []
+
+        # 소재 카테고리가 겹치지 않는 지문을 먼저 고르고, 모자라면 나머지에서 채움
+        random.shuffle(pool)
+        chosen, rest, categories_seen = [], [], set()
+        for entry in pool:
+            # 이전 형식(제목)으로 저장된 topic 은 카테고리 없음으로 취급
+            category = normalize_topic_category(entry.topic)
+            if category and category in categories_seen:
+                rest.append(entry)
+                continue
+            chosen.append(entry)
+            categories_seen.add(category)
+        chosen = (chosen + rest)[:count]
+
+        return [
+            {
+                "library_id": entry.id,
+                "passage_type": entry.passage_type,
+                "topic": entry.topic,
+                "word_count": entry.word_count,
+                "passage_content": entry.passage_content,
+                "original_content": entry.passage_content,
+                "korean_translation": entry.korean_translation,
+            }
+            for entry in chosen
+        ]
+
+    def mark_used(self, db, library_ids: List[int]) -> int:
+        """채택된 문제의 지문 사용 횟수 갱신 (UPDATE 1회) 후 커밋 - 갱신한 개수 반환"""
+        if not library_ids:
+            return 0
+        updated = db.query(PassageLibraryEntry).filter(
+            PassageLibraryEntry.id.in_(list(library_ids))
+        ).update(
+            {
+                PassageLibraryEntry.use_count: PassageLibraryEntry.use_count + 1,
+                PassageLibraryEntry.last_used_at: datetime.now(),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+        return updated
+
+
+passage_library = PassageLibrary()
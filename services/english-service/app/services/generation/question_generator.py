@@ -3,74 +3,14 @@
 """
 import math
 import json
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-import random
 from sqlalchemy.orm import Session
-from app.models import Word
-
-
-# 소재 카테고리 (모든 학년 공통)
-TOPIC_CATEGORIES = {
-    "개인생활": [
-        "취미, 오락, 여행, 운동, 쇼핑 등 여가 선용",
-        "보건, 위생, 영양 등 개인 건강 관리",
-        "생일, 관심사, 생활 방식 등 개인 일상"
-    ],
-    "가정생활": [
-        "의복, 음식, 주거",
-        "명절, 가족 행사, 집안일 등 가정 일상"
-    ],
-    "학교생활": [
-        "다양한 교육 내용 및 방법, 학교 활동",
-        "교우 관계, 진로, 진학 등 학교 일상"
-    ],
-    "사회생활": [
-        "일, 노동, 직업 윤리 등 근로",
-        "서신 왕래, 소셜 미디어 등 온라인 활동, 면대면 대화 등 대인 관계",
-        "회의, 지역 행사, 졸업, 결혼, 장례식 등 사회적 행사"
-    ],
-    "문화": [
-        "동일 문화권 내의 다른 세대, 성별 간의 문화적 차이",
-        "우리의 문화와 생활 양식 소개",
-        "우리 문화와 다른 문화의 언어⋅문화적 차이",
-        "다양한 문화권의 관습, 규범, 가치, 사고방식, 행동 양식, 의사소통 방식",
-        "세계 문화: 의식주, 명절과 축제, 종교, 언어, 문학, 음악, 예술, 대중문화, 여행 및 관광지, 건축물, 전통, 지리, 역사, 인물, 스포츠, 관혼상제 등",
-        "다양한 문화권의 사람들과의 의사소통, 교류, 협력"
-    ],
-    "민주시민": [
-        "공중도덕, 예절, 협력, 배려, 봉사, 정의, 책임감 등 인성",
-        "인권, 양성평등, 글로벌 에티켓, 평화 등 민주시민 의식 및 세계시민 의식",
-        "올바른 미디어 리터러시를 통한 비판적 사고의 성찰, 사회적 공감과 의사소통",
-        "문제에 대한 비판적 사고와 민주적 의사 결정 및 갈등 해결",
-        "가난 및 기아 해결, 인구 문제, 청소년 문제, 고령화, 다문화 사회, 사회 정의와 불평등 해소",
-        "책임 있는 소비와 생산, 자원과 에너지 문제, 국제 문제 해결을 위한 협력 등 사회 현안",
-        "변화하는 사회 및 국제적 현안을 해결하기 위한 가정, 학교, 지역, 국가 및 세계 공동체의 참여"
-    ],
-    "생태전환": [
-        "인간과 생태계의 관계, 자연환경과 생태 윤리, 생태 감수성과 책임감",
-        "현재 및 미래 세대의 권리로서 환경권 존중",
-        "생태계의 특성과 시스템 탐구, 생태 시스템과 인간 사회 시스템의 연관성",
-        "기후변화와 생태계 문제 탐구",
-        "생태전환을 위한 사회 체계의 변화 제안 및 실천",
-        "생태전환을 위한 지속가능한 과학 기술 제안 및 실천",
-        "일상생활에서의 생태 전환 참여와 실천"
-    ],
-    "디지털및인공지능": [
-        "컴퓨터와 인터넷 활용, 소프트웨어의 이해와 활용 등 디지털 기술의 이해와 활용",
-        "정보의 공유, 온라인 활동 참여와 협업 등 디지털 의사소통과 협력",
-        "정보의 수집, 관리, 분석, 표현 등 정보의 처리와 생성",
-        "디지털 기술과 정보의 안전한 사용 및 윤리적 사용"
-    ],
-    "일반교양": [
-        "생활 안전, 교통안전, 재난 안전, 직업 안전 등의 안전",
-        "동식물 또는 계절, 날씨 등의 자연 현상",
-        "애국심, 평화, 안보, 독도 교육 및 통일",
-        "정치, 경제, 금융, 역사, 지리, 수학, 과학, 교통, 정보 통신, 우주, 해양, 탐험 등 일반 교양",
-        "인문학, 사회 과학, 자연 과학, 예술 분야 등의 학문적 소양",
-        "언어, 문학, 예술 등 심미적 심성과 창의력, 상상력"
-    ]
-}
+from app.services.ai.prompt_cache import CompiledPrompt, static_prefix
+from app.services.generation.passage_library import ENGLISH_PASSAGE_REUSE_RATIO, passage_library
+from app.services.generation.topic_categories import TOPIC_CATEGORIES
+from app.services.generation.taxonomy_snapshot import taxonomy_snapshot
+from app.services.generation.vocabulary_index import vocabulary_index
 
 
 class QuestionDistributionCalculator:
@@ -122,10 +62,12 @@ class PromptGenerator:
         self, 
         db: Session, 
         difficulty_distribution: List[Dict[str, Any]], 
-        total_words: int = 50
+        total_words: int = 50,
+        teacher_id: Optional[int] = None
     ) -> str:
         """
-        난이도 분배에 따라 words 테이블에서 단어를 추출하여 프롬프트용 문자열 생성
+        난이도 분배에 따라 어휘 인덱스에서 단어를 균등 샘플링하여 프롬프트용 문자열 생성
+        (db는 words.json 이 없을 때만 인덱스 로드에 사용, teacher_id 가 있으면 최근 사용 단어 제외)
         
         중1 수준 매핑:
         - 하 → basic 레벨
@@ -146,19 +88,12 @@ class PromptGenerator:
             basic_count = math.floor(total_words * basic_ratio / 100)
             middle_count = total_words - basic_count
             
-            # 데이터베이스에서 단어 추출
-            basic_words = []
-            middle_words = []
-            
-            if basic_count > 0:
-                basic_query = db.query(Word).filter(Word.level == 'basic').limit(basic_count * 2)  # 여유분 확보
-                basic_words = [word.word for word in basic_query.all()]
-                basic_words = random.sample(basic_words, min(basic_count, len(basic_words)))
-            
-            if middle_count > 0:
-                middle_query = db.query(Word).filter(Word.level == 'middle').limit(middle_count * 2)  # 여유분 확보
-                middle_words = [word.word for word in middle_query.all()]
-                middle_words = random.sample(middle_words, min(middle_count, len(middle_words)))
+            # 어휘 인덱스에서 단어 추출 (워크시트마다 DB 조회 없음)
+            sampled = vocabulary_index.sample_for_teacher(
+                teacher_id, {'basic': basic_count, 'middle': middle_count}, db=db
+            )
+            basic_words = sampled.get('basic', [])
+            middle_words = sampled.get('middle', [])
             
             # 프롬프트용 문자열 생성
             vocabulary_text = "-- 단어목록 :"
@@ -177,55 +112,40 @@ class PromptGenerator:
             return "-- 단어목록 : 데이터베이스에서 적절한 수준의 영어 단어들을 활용하여 문제를 생성하세요."
     
     def _generate_subject_types_lines(self, subject_distribution: List[Dict], subject_details: Dict, db: Session = None) -> List[str]:
-        """영역별 출제 유형 문자열을 DB에서 조회하여 생성합니다."""
+        """영역별 출제 유형 문자열을 분류 체계 스냅샷에서 조회하여 생성합니다."""
         subject_types_lines = []
+        taxonomy = taxonomy_snapshot.get(db)
 
         for subj in subject_distribution:
             subject_name = subj['subject']
             types_str = ""
 
             try:
-                if subject_name == '독해' and db:
-                    # DB에서 reading_types 조회
-                    from app.models.content import ReadingType
+                if subject_name == '독해' and taxonomy:
                     reading_ids = subject_details.get('reading_types', [])
                     if reading_ids:
-                        reading_types = db.query(ReadingType).filter(ReadingType.id.in_(reading_ids)).all()
-                        types_list = [f"{rt.name} : {rt.description}" for rt in reading_types]
+                        types_list = [f"{rt.name} : {rt.description}" for rt in taxonomy.reading_types_by_ids(reading_ids)]
                         types_str = "\n".join([f"  {t}" for t in types_list])
                     else:
                         types_str = "  주제/제목/요지 추론, 세부 정보 파악, 내용 일치/불일치, 빈칸 추론 등"
 
-                elif subject_name == '어휘' and db:
-                    # DB에서 vocabulary_categories 조회
-                    from app.models.vocabulary import VocabularyCategory
+                elif subject_name == '어휘' and taxonomy:
                     vocab_ids = subject_details.get('vocabulary_categories', [])
                     if vocab_ids:
-                        vocab_categories = db.query(VocabularyCategory).filter(VocabularyCategory.id.in_(vocab_ids)).all()
-                        types_list = [f"{vc.name} : {vc.learning_objective}" for vc in vocab_categories]
+                        types_list = [f"{vc.name} : {vc.description}" for vc in taxonomy.vocabulary_categories_by_ids(vocab_ids)]
                         types_str = "\n".join([f"  {t}" for t in types_list])
                     else:
                         types_str = "  개인 및 주변 생활 어휘, 사회 및 공공 주제 어휘, 추상적 개념 및 감정 등"
 
-                elif subject_name == '문법' and db:
-                    # DB에서 grammar_categories로 해당 grammar_topics 조회
-                    from app.models.grammar import GrammarCategory, GrammarTopic
-
+                elif subject_name == '문법' and taxonomy:
+                    # 선택한 grammar_categories 와 각 카테고리의 토픽들 (스냅샷에 미리 묶여 있음)
                     category_ids = subject_details.get('grammar_categories', [])
                     types_list = []
 
-                    if category_ids:
-                        categories = db.query(GrammarCategory).filter(GrammarCategory.id.in_(category_ids)).all()
-                        for category in categories:
-                            types_list.append(f"▶ {category.name}")
-
-                            # 해당 카테고리의 모든 토픽들 조회
-                            category_topics = db.query(GrammarTopic).filter(
-                                GrammarTopic.category_id == category.id
-                            ).all()
-
-                            for topic in category_topics:
-                                types_list.append(f"  • {topic.name} : {topic.learning_objective}")
+                    for category in taxonomy.grammar_categories_by_ids(category_ids):
+                        types_list.append(f"▶ {category.name}")
+                        for topic in category.topics:
+                            types_list.append(f"  • {topic.name} : {topic.description}")
 
                     if types_list:
                         types_str = "\n".join(types_list)
@@ -257,14 +177,16 @@ class PromptGenerator:
 
         return subject_types_lines
     
-    def _get_vocabulary_list(self, db: Session, difficulty_distribution: List[Dict]) -> str:
+    def _get_vocabulary_list(self, db: Session, difficulty_distribution: List[Dict],
+                             teacher_id: Optional[int] = None) -> str:
         """어휘 목록을 생성합니다."""
         if db is not None:
             try:
                 return self.extract_vocabulary_by_difficulty(
                     db, 
                     difficulty_distribution, 
-                    total_words=50
+                    total_words=50,
+                    teacher_id=teacher_id
                 )
             except Exception as e:
                 print(f"단어 추출 실패, 기본 메시지 사용: {str(e)}")
@@ -297,20 +219,27 @@ class PromptGenerator:
             ], total_questions)
         }
 
-    def _get_word_count_range(self, school_level: str, grade: int) -> str:
-        """학년별 지문 단어 수 범위를 반환합니다."""
+    def _get_word_count_bounds(self, school_level: str, grade: int) -> Tuple[int, Optional[int]]:
+        """학년별 지문 단어 수 (최소, 최대) - 최대가 None 이면 상한 없음"""
         if school_level == '중학교':
             if grade <= 2:
-                return "50~150단어"
+                return (50, 150)
             else:  # 중3
-                return "200~300단어"
+                return (200, 300)
         elif school_level == '고등학교':
             if grade == 1:
-                return "200~300단어"
+                return (200, 300)
             else:  # 고2~고3
-                return "400단어 이상"
+                return (400, None)
         else:
-            return "120~150단어"  # 기본값
+            return (120, 150)  # 기본값
+
+    def _get_word_count_range(self, school_level: str, grade: int) -> str:
+        """학년별 지문 단어 수 범위를 반환합니다."""
+        min_words, max_words = self._get_word_count_bounds(school_level, grade)
+        if max_words is None:
+            return f"{min_words}단어 이상"
+        return f"{min_words}~{max_words}단어"
 
     def _get_cefr_level(self, school_level: str, grade: int) -> str:
         """학년별 CEFR 레벨을 반환합니다."""
@@ -432,6 +361,201 @@ class PromptGenerator:
 - 사회생활: 대인 관계, 직업 등
 - 문화: 다른 문화권의 관습 등"""
 
+    def _build_library_question_prefix(self, school_level: str, grade: int) -> str:
+        """라이브러리 지문용 독해 문제 접두부 (지문 작성 가이드 없이 문제 작성 규칙만)"""
+        depth_guide = self._get_depth_guidelines(school_level, grade)
+
+        return f"""당신은 영어 교육 전문가입니다.
+{school_level} {grade}학년 학생을 위한 독해 문제를 **이미 검증된 지문**으로 출제합니다. 지문은 새로 쓰지 않습니다. 생성할 문제의 정보와 지문은 마지막의 '# 작업', '# 문제 정보', '# 주어진 지문'에 있습니다.
+
+# 학년별 문제 깊이 가이드라인 (반드시 준수)
+- **어휘 수준**: {depth_guide['vocabulary_level']}
+- **인지 수준**: {depth_guide['cognitive_level']}
+
+# 문제 작성 가이드
+
+## 지문 표시 (passage_content)
+- 출제 유형에 빈칸/밑줄/강조 표시가 필요하면 주어진 지문과 **동일한 JSON 구조**에 표시만 추가해 passage_content로 응답
+  - 빈칸: `<u>___</u>` 형식 사용
+  - 밑줄: `<u>텍스트</u>` 형식 사용
+  - 강조: `<strong>텍스트</strong>` 형식 사용
+- 표시가 필요 없으면 passage_content는 null (주어진 지문을 그대로 사용)
+- 지문의 문장/내용은 수정하지 않음
+
+### 예문(example): 지문, 질문, 선택지와 별개의 추가적인 보기
+- **반드시 단순 문자열** (no array, no object)
+- **문제 유형에 따라 필요한 경우 추가, 필요없으면 null로 설정**
+- 지문에 있는 문장이나 지문의 일부를 example에 다시 넣지 않음
+- example_original_content: 완전한 원본 보기
+- example_korean_translation: example_original_content의 한국어 번역
+
+**지시문(question_text) 작성 시 주의사항**:
+- 지시문은 순수한 한국어 지시문만
+- 지시문은 영어 예문이나 보기, 선택지, 삽입할 문장 등을 포함하지 않음
+- 부정 표현은 밑줄 표시 (ex, <u>does not</u> | ~~옳지 <u>않은</u>~~ 것을)
+"""
+
+    def _build_static_prefix(self, school_level: str, grade: int, needs_passage: bool) -> str:
+        """학년/문제 종류별 정적 접두부 (문제마다 같은 가이드라인, 소재, 형식 설명)"""
+        word_count_range = self._get_word_count_range(school_level, grade)
+        cefr_level = self._get_cefr_level(school_level, grade)
+        depth_guide = self._get_depth_guidelines(school_level, grade)
+        topic_categories_str = self._format_topic_categories()
+
+        depth_section = f"""# 학년별 내용 깊이 가이드라인 (반드시 준수)
+- **어휘 수준**: {depth_guide['vocabulary_level']}
+- **문장 구조**: {depth_guide['sentence_structure']}
+- **내용 추상도**: {depth_guide['abstraction']}
+- **정보 밀도**: {depth_guide['information_density']}
+- **인지 수준**: {depth_guide['cognitive_level']}
+- **접근 방식**: {depth_guide['content_approach']}
+"""
+
+        if needs_passage:
+            return f"""당신은 영어 교육 전문가입니다.
+{school_level} {grade}학년 학생을 위한 독해 문제를 **지문과 함께** 생성합니다. 생성할 문제의 정보는 마지막의 '# 작업'과 '# 문제 정보'에 있습니다.
+
+{depth_section}
+# 지문 생성 가이드
+
+## 지문 요구사항:
+- 단어 수: {word_count_range} (학년 수준에 맞게 엄격히 준수)
+- CEFR 레벨: {cefr_level} (학년 기준선)
+- 난이도 반영: 문제 정보의 난이도에 맞는 어휘와 문장 구조 (문제 정보의 난이도 설명 참고)
+- **출제 유형, 소재를 고려하고 적합한 지문 유형을 선택하여 최적화된 내용과 구조로 작성**
+- **위 깊이 가이드라인을 엄격히 준수하여 학년 수준에 맞는 내용 작성**
+- **소재와 지문 유형을 다양하게 섞어서 작성**
+
+## 글의 소재 (모든 학년 공통 - 깊이만 조절):
+{topic_categories_str}
+
+**중요**: 위 소재는 모든 학년이 공통으로 사용하되, 학년별 깊이 가이드라인에 따라 내용의 복잡도와 추상도를 조절하세요.
+- 중1-2: 구체적 사례, 일상 경험 중심
+- 중3: 원인-결과, 비교-대조 중심
+- 고1: 사회적 맥락, 다양한 관점 소개
+- 고2-3: 추상적 개념, 철학적 사고, 복합적 논점
+
+## 지문 유형별 JSON 구조:
+
+**1. article (일반 글)**:
+ - 설명 : 설명문, 논설문, 기사, 연구 보고서, 블로그 포스트, 책의 한 부분 등 (가장 기본적인 '만능' 유형)
+반드시 passage_content안에 {{"content": [{{"type": "title", "value": "..."}}, {{"type": "paragraph", "value": "..."}}]}} 형식 사용
+
+**2. informational (정보성 양식)**:
+ - 설명 : 광고, 안내문, 포스터, 일정표, 메뉴판, 영수증 등
+반드시 passage_content안에 {{"content": [{{"type": "title"}}, {{"type": "paragraph"}}, {{"type": "list", "items": [...]}}, {{"type": "key_value", "pairs": [...]}}]}} 형식 사용
+
+**3. dialogue (대화문)**:
+ - 설명 : 문자 메시지, 채팅, 인터뷰, 연극 대본 등
+반드시 passage_content안에 {{"metadata": {{"participants": [...]}}, "content": [{{"speaker": "...", "line": "..."}}]}} 형식 사용
+
+**4. correspondence (서신/소통)**:
+ - 설명 : 이메일, 편지, 메모, 사내 공지 등
+반드시 passage_content안에 {{"metadata": {{"sender": "...", "recipient": "...", "subject": "...", "date": "..."}}, "content": [{{"type": "paragraph", "value": "..."}}]}} 형식 사용
+
+**5. review (리뷰/후기)**:
+ - 설명 : 상품 후기, 영화 평점, 식당 리뷰 등
+반드시 passage_content안에 {{"metadata": {{"rating": 4.5, "product_name": "...", "reviewer": "...", "date": "..."}}, "content": [{{"type": "paragraph", "value": "..."}}]}} 형식 사용
+
+## 지문 작성 시 주의사항:
+- passage_type: article, dialogue, correspondence, informational, review 중 선택
+- passage_content: 해당 유형에 맞는 JSON 구조 사용 (반드시 passage_content와 유형 별 content를 구분해서 사용, 무조건 content 키 사용 혹은 metadata 키 사용 생략 금지)
+- passage_content: 학생용 (빈칸/보기 포함 가능), **출제 유형에 최적화**
+  - 빈칸: `<u>___</u>` 형식 사용
+  - 밑줄: `<u>텍스트</u>` 형식 사용
+  - 강조: `<strong>텍스트</strong>` 형식 사용
+- original_content: passage_content와 동일한 구조의 완전한 원본 (빈칸 없음, HTML 태그 없음)
+- passage_content, original_content 의 metadata.topic_category: 지문 소재가 속한 '글의 소재' 카테고리 이름 하나 (예: "학교생활", metadata 가 없는 유형도 metadata 를 추가해 기록)
+- korean_translation: passage_content와 동일한 구조의 original_content의 자연스러운 한글 번역
+
+## 지문(passage) vs 예문(example) 구분
+
+### 지문(passage): 독해 문제의 본문 (필수)
+- **긴 글** (50단어 이상의 읽기 자료)
+- article, dialogue, correspondence, informational, review 등
+- JSON 구조로 작성
+
+### 예문(example): 지문, 질문, 선택지와 별개의 추가적인 보기
+- **반드시 단순 문자열** (no array, no object)
+- **문제 유형에 따라 필요한 경우 추가, 필요없으면 null로 설정**
+- example_content: 학생용 보기 (빈칸/보기 포함 가능), **출제 유형에 최적화**
+  - 빈칸: `<u>___</u>` 형식 사용
+  - 밑줄: `<u>텍스트</u>` 형식 사용
+  - 강조: `<strong>텍스트</strong>` 형식 사용
+- example_original_content: 완전한 원본 보기
+- example_korean_translation: example_original_content의 한국어 번역
+
+**지문 내용 중복 금지**:
+- 지문에 있는 문장을 example에 다시 넣기
+- 지문의 일부를 떼어서 example에 넣기
+
+**지시문(question_text) 작성 시 주의사항**:
+- 지시문은 순수한 한국어 지시문만
+- 지시문은 영어 예문이나 보기, 선택지, 삽입할 문장 등을 포함하지 않음
+- 부정 표현은 밑줄 표시 (ex, <u>does not</u> | ~~옳지 <u>않은</u>~~ 것을)
+"""
+
+        return f"""당신은 영어 교육 전문가입니다.
+{school_level} {grade}학년 학생을 위한 문법/어휘 문제를 생성합니다. 생성할 문제의 정보는 마지막의 '# 작업'과 '# 문제 정보'에 있습니다.
+
+{depth_section}
+# 예문 및 선택지 작성 가이드
+
+## 글의 소재 (모든 학년 공통 - 깊이만 조절):
+{topic_categories_str}
+
+**중요**: 위 소재는 모든 학년이 공통으로 사용하되, 학년별 깊이 가이드라인에 따라 내용의 복잡도와 추상도를 조절하세요.
+
+## 문장 구조 및 어휘:
+- CEFR {cefr_level} 수준에 맞는 문장 구조와 어휘 사용
+- 예문은 {school_level} {grade}학년이 이해 가능한 길이와 복잡도로 작성
+- **위 깊이 가이드라인을 엄격히 준수하여 학년 수준에 맞는 예문 작성**
+
+### 예문(example): 지문, 질문, 선택지와 별개의 추가적인 보기
+- **반드시 단순 문자열** (no array, no object)
+- **문제 유형에 따라 필요한 경우 추가, 필요없으면 null로 설정**
+- example_content: 학생용 보기 (빈칸/보기 포함 가능), **출제 유형에 최적화**
+  - 빈칸: `<u>___</u>` 형식 사용
+  - 밑줄: `<u>텍스트</u>` 형식 사용
+  - 강조: `<strong>텍스트</strong>` 형식 사용
+- example_original_content: 완전한 원본 보기
+- example_korean_translation: example_original_content의 한국어 번역
+
+**지시문(question_text) 작성 시 주의사항**:
+- 지시문은 순수한 한국어 지시문만
+- 지시문은 영어 예문이나 보기, 선택지, 삽입할 문장 등을 포함하지 않음
+- 부정 표현은 밑줄 표시 (ex, <u>does not</u> | ~~옳지 <u>않은</u>~~ 것을 등)
+
+**올바른 예시들:**
+1. **빈칸 채우기**:
+   ```
+   example_content: "She <u>___</u> to school every day."
+   example_original_content: "She goes to school every day."
+   example_korean_translation: "그녀는 매일 학교에 간다."
+   question_text: "다음 빈칸에 알맞은 것을 고르시오."
+   question_choices: ["go", "goes", "went", "gone"]
+   ```
+
+2. **밑줄 친 부분 고르기**:
+   ```
+   example_content: "I have <u>seen</u> that movie before."
+   example_original_content: "I have seen that movie before."
+   example_korean_translation: "나는 전에 그 영화를 본 적이 있다."
+   question_text: "다음 밑줄 친 부분이 문법적으로 올바른지 판단하시오."
+   ```
+
+3. **어휘 의미 파악**:
+   ```
+   example_content: "The book was very <u>interesting</u>."
+   example_original_content: "The book was very interesting."
+   example_korean_translation: "그 책은 매우 흥미로웠다."
+   question_text: "다음 밑줄 친 단어의 의미로 가장 적절한 것은?"
+   question_choices: ["지루한", "흥미로운", "어려운", "쉬운"]
+   ```
+
+**중요**: example은 단순 문자열만 허용 (no array, no object)
+"""
+
     def generate_question_prompts(
         self,
         request_data: Dict[str, Any],
@@ -450,7 +574,6 @@ class PromptGenerator:
         grade = request_data.get('grade', 1)
 
         # 학년별 설정 가져오기
-        word_count_range = self._get_word_count_range(school_level, grade)
         cefr_level = self._get_cefr_level(school_level, grade)
         topic_guidelines = self._get_topic_guidelines(school_level, grade)
 
@@ -506,13 +629,32 @@ class PromptGenerator:
         reading_count = sum(1 for p in question_plan if p['needs_passage'])
         print(f"📋 배치 계획: 독해 {reading_count}문제(지문 포함), 문법/어휘 {total_questions - reading_count}문제")
 
+        # 독해 문제 일부는 지문 라이브러리의 검증된 지문 재사용 (문제만 생성)
+        reuse_ratio = request_data.get('passage_reuse_ratio')
+        if reuse_ratio is None:
+            reuse_ratio = ENGLISH_PASSAGE_REUSE_RATIO
+        reuse_count = int(reading_count * reuse_ratio)
+        if db is not None and reuse_count > 0:
+            try:
+                library_passages = passage_library.pick(
+                    db, school_level, grade, cefr_level, reuse_count,
+                    passage_types=request_data.get('passage_types'),
+                    topic_categories=request_data.get('passage_topic_categories'),
+                    word_count_range=self._get_word_count_bounds(school_level, grade)
+                )
+                reading_plans = [p for p in question_plan if p['needs_passage']]
+                for plan, library_passage in zip(reading_plans, library_passages):
+                    plan['library_passage'] = library_passage
+                print(f"📚 지문 라이브러리 재사용: {len(library_passages)}/{reuse_count}개")
+            except Exception as e:
+                print(f"⚠️ 지문 라이브러리 조회 실패, 지문을 새로 생성합니다: {e}")
+
         # 독해 세부 유형 정보 가져오기
         reading_types_info = ""
         if db and subject_details.get('reading_types'):
             try:
-                from app.models.content import ReadingType
-                reading_ids = subject_details.get('reading_types', [])
-                reading_types = db.query(ReadingType).filter(ReadingType.id.in_(reading_ids)).all()
+                taxonomy = taxonomy_snapshot.get(db)
+                reading_types = taxonomy.reading_types_by_ids(subject_details.get('reading_types', [])) if taxonomy else []
                 if reading_types:
                     types_list = [f"- **{rt.name}**: {rt.description}" for rt in reading_types]
                     reading_types_info = "\n# 독해 출제 유형 (지문 작성 시 반드시 고려):\n" + "\n".join(types_list) + "\n\n위 유형에 맞는 내용과 구조를 가진 지문을 작성해야 합니다."
@@ -521,33 +663,45 @@ class PromptGenerator:
 
         # 각 문제에 대한 프롬프트 생성
         prompts = []
+        subject_types_cache = {}
 
         for idx, plan in enumerate(question_plan):
             qid = plan['question_id']
             subject = plan['subject']
             needs_passage = plan['needs_passage']
             passage_id = plan.get('passage_id')
+            library_passage = plan.get('library_passage')
 
             # 난이도/형식 할당 (순환)
             difficulty = difficulty_dist[idx % len(difficulty_dist)]['difficulty']
             format_type = format_dist[idx % len(format_dist)]['format']
 
-            # 세부 유형 정보
-            subject_types_info = self._generate_subject_types_lines(
-                [{'subject': subject, 'count': 1, 'ratio': 100}],
-                subject_details,
-                db
-            )
-
-            # 깊이 가이드라인 가져오기
-            depth_guide = self._get_depth_guidelines(school_level, grade)
-            topic_categories_str = self._format_topic_categories()
+            # 세부 유형 정보 (영역별로 한 번만 조회)
+            if subject not in subject_types_cache:
+                subject_types_cache[subject] = self._generate_subject_types_lines(
+                    [{'subject': subject, 'count': 1, 'ratio': 100}],
+                    subject_details,
+                    db
+                )
+            subject_types_info = subject_types_cache[subject]
 
-            # 독해 문제는 지문 생성 포함
-            if needs_passage:
-                prompt = f"""당신은 영어 교육 전문가입니다.
+            # 학년/문제 종류별 정적 접두부 (가이드라인, 소재, 지문 구조 등)
+            if library_passage:
+                prefix = static_prefix(
+                    ("english", school_level, grade, "library_reading"),
+                    lambda: self._build_library_question_prefix(school_level, grade)
+                )
+            else:
+                prefix = static_prefix(
+                    ("english", school_level, grade, "reading" if needs_passage else "question"),
+                    lambda: self._build_static_prefix(school_level, grade, needs_passage)
+                )
 
-{school_level} {grade}학년 학생을 위한 독해 문제 1개를 **지문과 함께** 생성해주세요.
+            # 라이브러리 지문 재사용: 주어진 지문으로 문제만 생성
+            if library_passage:
+                suffix = f"""
+# 작업
+{school_level} {grade}학년 학생을 위해 아래 주어진 지문을 사용하는 독해 문제 1개를 생성해주세요.
 
 # 문제 정보
 - 문제 번호: {qid}
@@ -559,95 +713,59 @@ class PromptGenerator:
   - 상: 해당 학년에서 도전적이고 복잡한 수준
 - 형식: {format_type}
 - 지문 ID: {passage_id}
-{reading_types_info}
+
+# 주어진 지문 ({library_passage['passage_type']})
+{json.dumps(library_passage['passage_content'], ensure_ascii=False)}
 
 # 출제 유형
 {chr(10).join(subject_types_info)}
 
-# 학년별 내용 깊이 가이드라인 (반드시 준수)
-- **어휘 수준**: {depth_guide['vocabulary_level']}
-- **문장 구조**: {depth_guide['sentence_structure']}
-- **내용 추상도**: {depth_guide['abstraction']}
-- **정보 밀도**: {depth_guide['information_density']}
-- **인지 수준**: {depth_guide['cognitive_level']}
-- **접근 방식**: {depth_guide['content_approach']}
-
-# 지문 생성 가이드
-
-## 지문 요구사항:
-- 단어 수: {word_count_range} (학년 수준에 맞게 엄격히 준수)
-- CEFR 레벨: {cefr_level} (학년 기준선)
-- 난이도: {difficulty}에 맞는 어휘와 문장 구조 (위 난이도 설명 참고)
-- **출제 유형, 소재를 고려하고 적합한 지문 유형을 선택하여 최적화된 내용과 구조로 작성**
-- **위 깊이 가이드라인을 엄격히 준수하여 학년 수준에 맞는 내용 작성**
-- **소재와 지문 유형을 다양하게 섞어서 작성**
-
-## 글의 소재 (모든 학년 공통 - 깊이만 조절):
-{topic_categories_str}
-
-**중요**: 위 소재는 모든 학년이 공통으로 사용하되, 학년별 깊이 가이드라인에 따라 내용의 복잡도와 추상도를 조절하세요.
-- 중1-2: 구체적 사례, 일상 경험 중심
-- 중3: 원인-결과, 비교-대조 중심
-- 고1: 사회적 맥락, 다양한 관점 소개
-- 고2-3: 추상적 개념, 철학적 사고, 복합적 논점
-
-## 지문 유형별 JSON 구조:
-
-**1. article (일반 글)**:
- - 설명 : 설명문, 논설문, 기사, 연구 보고서, 블로그 포스트, 책의 한 부분 등 (가장 기본적인 '만능' 유형)
-반드시 passage_content안에 {{"content": [{{"type": "title", "value": "..."}}, {{"type": "paragraph", "value": "..."}}]}} 형식 사용
-
-**2. informational (정보성 양식)**:
- - 설명 : 광고, 안내문, 포스터, 일정표, 메뉴판, 영수증 등
-반드시 passage_content안에 {{"content": [{{"type": "title"}}, {{"type": "paragraph"}}, {{"type": "list", "items": [...]}}, {{"type": "key_value", "pairs": [...]}}]}} 형식 사용
-
-**3. dialogue (대화문)**:
- - 설명 : 문자 메시지, 채팅, 인터뷰, 연극 대본 등
-반드시 passage_content안에 {{"metadata": {{"participants": [...]}}, "content": [{{"speaker": "...", "line": "..."}}]}} 형식 사용
-
-**4. correspondence (서신/소통)**:
- - 설명 : 이메일, 편지, 메모, 사내 공지 등
-반드시 passage_content안에 {{"metadata": {{"sender": "...", "recipient": "...", "subject": "...", "date": "..."}}, "content": [{{"type": "paragraph", "value": "..."}}]}} 형식 사용
-
-**5. review (리뷰/후기)**:
- - 설명 : 상품 후기, 영화 평점, 식당 리뷰 등
-반드시 passage_content안에 {{"metadata": {{"rating": 4.5, "product_name": "...", "reviewer": "...", "date": "..."}}, "content": [{{"type": "paragraph", "value": "..."}}]}} 형식 사용
-
-## 지문 작성 시 주의사항:
-- passage_type: article, dialogue, correspondence, informational, review 중 선택
-- passage_content: 해당 유형에 맞는 JSON 구조 사용 (반드시 passage_content와 유형 별 content를 구분해서 사용, 무조건 content 키 사용 혹은 metadata 키 사용 생략 금지)
-- passage_content: 학생용 (빈칸/보기 포함 가능), **출제 유형에 최적화**
-  - 빈칸: `<u>___</u>` 형식 사용
-  - 밑줄: `<u>텍스트</u>` 형식 사용
-  - 강조: `<strong>텍스트</strong>` 형식 사용
-- original_content: passage_content와 동일한 구조의 완전한 원본 (빈칸 없음, HTML 태그 없음)
-- korean_translation: passage_content와 동일한 구조의 original_content의 자연스러운 한글 번역
-
-## 지문(passage) vs 예문(example) 구분
+# 응답 형식 (JSON)
+{{
+    "passage_content": null 또는 {{...주어진 지문과 동일한 구조에 빈칸/밑줄 표시 추가...}},
+    "question": {{
+        "question_id": {qid},
+        "question_type": "{format_type}",
+        "question_subject": "{subject}",
+        "question_detail_type": "세부 유형명",
+        "question_difficulty": "{difficulty}",
+        "question_text": "순수한 한국어 지시문만",
+        "example_content": "필요시 추가 예문, 불필요하면 null",
+        "example_original_content": "필요시 완전한 원본 예문, 불필요하면 null",
+        "example_korean_translation": "필요시 예문 한글 번역, 불필요하면 null",
+        "question_passage_id": {passage_id},
+        "question_choices": ["선택지1", "선택지2", ...],
+        "correct_answer": 정답인덱스(객관식) | "정답텍스트"(주관식),
+        "explanation": "정답 해설 (한국어)",
+        "learning_point": "핵심 학습 포인트"
+    }}
+}}
 
-### 지문(passage): 독해 문제의 본문 (필수)
-- **긴 글** (50단어 이상의 읽기 자료)
-- article, dialogue, correspondence, informational, review 등
-- JSON 구조로 작성
+**중요 규칙**:
+- 지문은 새로 작성하지 않고 주어진 지문의 내용만으로 풀 수 있는 문제 출제
+- 다른 텍스트나 설명 없이 JSON만 응답
+"""
 
-### 예문(example): 지문, 질문, 선택지와 별개의 추가적인 보기
-- **반드시 단순 문자열** (no array, no object)
-- **문제 유형에 따라 필요한 경우 추가, 필요없으면 null로 설정**
-- example_content: 학생용 보기 (빈칸/보기 포함 가능), **출제 유형에 최적화**
-  - 빈칸: `<u>___</u>` 형식 사용
-  - 밑줄: `<u>텍스트</u>` 형식 사용
-  - 강조: `<strong>텍스트</strong>` 형식 사용
-- example_original_content: 완전한 원본 보기
-- example_korean_translation: example_original_content의 한국어 번역
+            # 독해 문제는 지문 생성 포함
+            elif needs_passage:
+                suffix = f"""
+# 작업
+{school_level} {grade}학년 학생을 위한 독해 문제 1개를 **지문과 함께** 생성해주세요.
 
-**지문 내용 중복 금지**:
-- 지문에 있는 문장을 example에 다시 넣기
-- 지문의 일부를 떼어서 example에 넣기
+# 문제 정보
+- 문제 번호: {qid}
+- 영역: {subject}
+- 난이도: {difficulty}
+  - **난이도는 {school_level} {grade}학년 수준 내에서의 상대적 난이도입니다**
+  - 하: 해당 학년에서 기본적이고 쉬운 수준
+  - 중: 해당 학년에서 표준적인 수준
+  - 상: 해당 학년에서 도전적이고 복잡한 수준
+- 형식: {format_type}
+- 지문 ID: {passage_id}
+{reading_types_info}
 
-**지시문(question_text) 작성 시 주의사항**:
-- 지시문은 순수한 한국어 지시문만
-- 지시문은 영어 예문이나 보기, 선택지, 삽입할 문장 등을 포함하지 않음
-- 부정 표현은 밑줄 표시 (ex, <u>does not</u> | ~~옳지 <u>않은</u>~~ 것을)
+# 출제 유형
+{chr(10).join(subject_types_info)}
 
 # 응답 형식 (JSON)
 {{
@@ -685,8 +803,8 @@ class PromptGenerator:
 """
             else:
                 # 문법/어휘 문제 (지문 없음)
-                prompt = f"""당신은 영어 교육 전문가입니다.
-
+                suffix = f"""
+# 작업
 {school_level} {grade}학년 학생을 위한 {subject} 문제 1개를 생성해주세요.
 
 # 문제 정보
@@ -703,70 +821,6 @@ class PromptGenerator:
 # 출제 유형
 {chr(10).join(subject_types_info)}
 
-# 학년별 내용 깊이 가이드라인 (반드시 준수)
-- **어휘 수준**: {depth_guide['vocabulary_level']}
-- **문장 구조**: {depth_guide['sentence_structure']}
-- **내용 추상도**: {depth_guide['abstraction']}
-- **정보 밀도**: {depth_guide['information_density']}
-- **인지 수준**: {depth_guide['cognitive_level']}
-- **접근 방식**: {depth_guide['content_approach']}
-
-# 예문 및 선택지 작성 가이드
-
-## 글의 소재 (모든 학년 공통 - 깊이만 조절):
-{topic_categories_str}
-
-**중요**: 위 소재는 모든 학년이 공통으로 사용하되, 학년별 깊이 가이드라인에 따라 내용의 복잡도와 추상도를 조절하세요.
-
-## 문장 구조 및 어휘:
-- CEFR {cefr_level} 수준에 맞는 문장 구조와 어휘 사용
-- 예문은 {school_level} {grade}학년이 이해 가능한 길이와 복잡도로 작성
-- **위 깊이 가이드라인을 엄격히 준수하여 학년 수준에 맞는 예문 작성**
-
-### 예문(example): 지문, 질문, 선택지와 별개의 추가적인 보기
-- **반드시 단순 문자열** (no array, no object)
-- **문제 유형에 따라 필요한 경우 추가, 필요없으면 null로 설정**
-- example_content: 학생용 보기 (빈칸/보기 포함 가능), **출제 유형에 최적화**
-  - 빈칸: `<u>___</u>` 형식 사용
-  - 밑줄: `<u>텍스트</u>` 형식 사용
-  - 강조: `<strong>텍스트</strong>` 형식 사용
-- example_original_content: 완전한 원본 보기
-- example_korean_translation: example_original_content의 한국어 번역
-
-**지시문(question_text) 작성 시 주의사항**:
-- 지시문은 순수한 한국어 지시문만
-- 지시문은 영어 예문이나 보기, 선택지, 삽입할 문장 등을 포함하지 않음
-- 부정 표현은 밑줄 표시 (ex, <u>does not</u> | ~~옳지 <u>않은</u>~~ 것을 등)
-
-**올바른 예시들:**
-1. **빈칸 채우기**:
-   ```
-   example_content: "She <u>___</u> to school every day."
-   example_original_content: "She goes to school every day."
-   example_korean_translation: "그녀는 매일 학교에 간다."
-   question_text: "다음 빈칸에 알맞은 것을 고르시오."
-   question_choices: ["go", "goes", "went", "gone"]
-   ```
-
-2. **밑줄 친 부분 고르기**:
-   ```
-   example_content: "I have <u>seen</u> that movie before."
-   example_original_content: "I have seen that movie before."
-   example_korean_translation: "나는 전에 그 영화를 본 적이 있다."
-   question_text: "다음 밑줄 친 부분이 문법적으로 올바른지 판단하시오."
-   ```
-
-3. **어휘 의미 파악**:
-   ```
-   example_content: "The book was very <u>interesting</u>."
-   example_original_content: "The book was very interesting."
-   example_korean_translation: "그 책은 매우 흥미로웠다."
-   question_text: "다음 밑줄 친 단어의 의미로 가장 적절한 것은?"
-   question_choices: ["지루한", "흥미로운", "어려운", "쉬운"]
-   ```
-
-**중요**: example은 단순 문자열만 허용 (no array, no object)
-
 # 응답 형식 (JSON)
 {{
     "question_id": {qid},
@@ -793,6 +847,8 @@ class PromptGenerator:
 - 다른 텍스트나 설명 없이 JSON만 응답
 """
 
+            prompt = CompiledPrompt(prefix, suffix)
+
             prompts.append({
                 'question_id': qid,
                 'subject': subject,
@@ -800,6 +856,7 @@ class PromptGenerator:
                 'format': format_type,
                 'needs_passage': needs_passage,
                 'passage_id': passage_id,
+                'library_passage': {**library_passage, 'passage_id': passage_id} if library_passage else None,
                 'prompt': prompt,
                 'metadata': {  # AI Judge 검증에 필요한 메타데이터
                     'school_level': school_level,
@@ -811,5 +868,6 @@ class PromptGenerator:
                 }
             })
 
-        print(f"✅ 문제 {len(prompts)}개에 대한 프롬프트 생성 완료 (독해 {reading_count}개는 지문 포함)")
+        reused_count = sum(1 for p in prompts if p['library_passage'])
+        print(f"✅ 문제 {len(prompts)}개에 대한 프롬프트 생성 완료 (독해 {reading_count}개는 지문 포함, 라이브러리 지문 {reused_count}개)")
         return prompts
\ No newline at end of file
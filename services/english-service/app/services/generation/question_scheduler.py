@@ -0,0 +1,192 @@
+"""
+문제 생성 스케줄러 - 워커 프로세스 전역에서 공유하는 고정 크기 스레드 풀
+
+- 워크시트 크기와 무관하게 스레드 수는 ENGLISH_GENERATION_MAX_WORKERS 로 고정
+- 워크시트(job)별 대기열을 라운드로빈으로 돌며 꺼내므로 동시에 실행 중인 워크시트가 공정하게 나눠 씀
+- 같은 워크시트 안에서는 지문을 포함한 독해 문제(가장 느림)를 먼저 실행
+- 대기열 깊이/실행 중 작업 수/대기 시간 카운터 제공 (/health/generation)
+- AI Judge 파이프라인의 생성/검증 호출도 같은 워크시트(job)로 등록되어 같은 우선순위·공정 분배를 따름
+  (파이프라인은 Future 완료 콜백으로 진행하므로 문제 수만큼 조정 스레드를 두지 않음)
+"""
+import os
+import time
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+ENGLISH_GENERATION_MAX_WORKERS = int(os.getenv("ENGLISH_GENERATION_MAX_WORKERS", "8"))
+
+PRIORITY_READING = 0
+PRIORITY_NORMAL = 1
+
+_WorkItem = Tuple[Future, Callable, tuple, float]
+
+
+class _Job:
+    """워크시트 하나의 대기 작업 (우선순위별 FIFO)"""
+
+    def __init__(self, job_id: int, name: str):
+        self.job_id = job_id
+        self.name = name
+        self.queues: Tuple[Deque[_WorkItem], Deque[_WorkItem]] = (deque(), deque())
+        self.running = 0
+
+    def pending(self) -> int:
+        return sum(len(queue) for queue in self.queues)
+
+    def pop(self) -> Optional[_WorkItem]:
+        for queue in self.queues:
+            if queue:
+                return queue.popleft()
+        return None
+
+
+class QuestionScheduler:
+    """워크시트 간 공정 분배 + 독해 우선 스케줄러"""
+
+    def __init__(self, max_workers: int = ENGLISH_GENERATION_MAX_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._cond = threading.Condition()
+        self._job_ids = itertools.count(1)
+        self._reset_runtime()
+
+    def _reset_runtime(self):
+        """스레드/대기열 초기화 (fork 이후 자식 프로세스에서도 호출)"""
+        self._pid = os.getpid()
+        self._threads = []
+        self._jobs: Dict[int, _Job] = {}
+        self._rotation: Deque[int] = deque()
+        self._running = 0
+        self.stats = {
+            "submitted": 0, "completed": 0, "failed": 0, "cancelled": 0,
+            "wait_ms_total": 0.0, "wait_ms_max": 0.0,
+        }
+
+    def _ensure_workers(self):
+        if self._pid != os.getpid():
+            # Celery prefork 워커: 부모 프로세스의 스레드는 상속되지 않음
+            self._reset_runtime()
+        if len(self._threads) >= self.max_workers:
+            return
+        for i in range(len(self._threads), self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"english-question-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"✅ 문제 생성 스케줄러 시작 (워커 {self.max_workers}개, pid={self._pid})")
+
+    # ========== 워크시트(job) ==========
+
+    def open_job(self, name: str = "") -> int:
+        """워크시트 하나의 작업 묶음 등록"""
+        with self._cond:
+            self._ensure_workers()
+            job_id = next(self._job_ids)
+            self._jobs[job_id] = _Job(job_id, name or f"job-{job_id}")
+            self._rotation.append(job_id)
+            return job_id
+
+    def submit(self, job_id: int, fn: Callable, *args: Any, priority: int = PRIORITY_NORMAL) -> Future:
+        """작업 등록 → concurrent.futures.Future (as_completed 사용 가능)"""
+        future = Future()
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise Exception(f"종료되었거나 없는 작업 묶음입니다: {job_id}")
+            job.queues[min(max(priority, PRIORITY_READING), PRIORITY_NORMAL)].append(
+                (future, fn, args, time.monotonic())
+            )
+            self.stats["submitted"] += 1
+            self._cond.notify()
+        return future
+
+    def close_job(self, job_id: int):
+        """작업 묶음 종료 - 아직 시작하지 않은 작업은 취소"""
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+            if job is None:
+                return
+            self._rotation.remove(job_id)
+            pending = [item[0] for queue in job.queues for item in queue]
+            for queue in job.queues:
+                queue.clear()
+
+        # 취소 콜백(AI Judge 파이프라인)이 submit 을 다시 부를 수 있으므로 락 밖에서 취소
+        cancelled = sum(1 for future in pending if future.cancel())
+        with self._cond:
+            self.stats["cancelled"] += cancelled
+
+    # ========== 실행 ==========
+
+    def _next_item(self) -> Optional[Tuple[_Job, _WorkItem]]:
+        """라운드로빈으로 다음 워크시트의 가장 높은 우선순위 작업"""
+        for _ in range(len(self._rotation)):
+            job_id = self._rotation[0]
+            self._rotation.rotate(-1)
+            job = self._jobs[job_id]
+            item = job.pop()
+            if item is not None:
+                return job, item
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                picked = self._next_item()
+                while picked is None:
+                    self._cond.wait()
+                    picked = self._next_item()
+                job, (future, fn, args, enqueued_at) = picked
+                job.running += 1
+                self._running += 1
+
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                wait_ms = (time.monotonic() - enqueued_at) * 1000
+                self.stats["wait_ms_total"] += wait_ms
+                self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], wait_ms)
+                try:
+                    future.set_result(fn(*args))
+                    self.stats["completed"] += 1
+                except BaseException as e:
+                    future.set_exception(e)
+                    self.stats["failed"] += 1
+            finally:
+                with self._cond:
+                    job.running -= 1
+                    self._running -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """대기열 깊이/실행 중 작업/대기 시간 카운터 조회"""
+        with self._cond:
+            started = self.stats["completed"] + self.stats["failed"]
+            return {
+                "pid": os.getpid(),
+                "max_workers": self.max_workers,
+                "running": self._running,
+                "queue_depth": sum(job.pending() for job in self._jobs.values()),
+                "queue_depth_reading": sum(len(job.queues[PRIORITY_READING]) for job in self._jobs.values()),
+                "active_jobs": [
+                    {"job_id": job.job_id, "name": job.name, "pending": job.pending(), "running": job.running}
+                    for job in self._jobs.values()
+                ],
+                **{key: round(value, 1) if isinstance(value, float) else value for key, value in self.stats.items()},
+                "wait_ms_avg": round(self.stats["wait_ms_total"] / started, 1) if started else 0.0,
+            }
+
+
+_scheduler: Optional[QuestionScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_question_scheduler() -> QuestionScheduler:
+    """영어 서비스용 문제 생성 스케줄러 싱글톤"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = QuestionScheduler()
+    return _scheduler
+
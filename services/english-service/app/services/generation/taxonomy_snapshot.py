@@ -0,0 +1,228 @@
+"""
+분류 체계 스냅샷 - 문법 카테고리/토픽, 어휘 카테고리, 독해 유형 테이블을 한 번에 읽어 id 로 색인한 불변 구조
+
+- 프롬프트 조립(_generate_subject_types_lines 등)과 /categories 응답이 같은 스냅샷을 사용 (요청마다 DB 조회 없음)
+- Redis 버전 키(TAXONOMY_VERSION_KEY)가 바뀌면 다음 조회 때 다시 로드
+  (init_all_data.py 또는 관리자 수정 후 bump_taxonomy_version() 호출)
+- Redis 를 쓸 수 없으면 TAXONOMY_SNAPSHOT_TTL 초마다 다시 로드
+"""
+import os
+import time
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+from app.core.config import get_settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+settings = get_settings()
+
+REDIS_URL = settings.redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+TAXONOMY_VERSION_KEY = "english_service:taxonomy_version"
+
+# 버전 키 확인 주기 (초)
+TAXONOMY_VERSION_CHECK_INTERVAL = float(os.getenv("TAXONOMY_VERSION_CHECK_INTERVAL", "5"))
+# Redis 없이 동작할 때 다시 로드하는 주기 (초)
+TAXONOMY_SNAPSHOT_TTL = float(os.getenv("TAXONOMY_SNAPSHOT_TTL", "300"))
+
+
+class GrammarCategoryEntry:
+    __slots__ = ("id", "name", "topics")
+
+    def __init__(self, id: int, name: str, topics: Tuple["TaxonomyEntry", ...]):
+        self.id = id
+        self.name = name
+        self.topics = topics
+
+
+class TaxonomyEntry:
+    """토픽/어휘 카테고리/독해 유형 (id, 이름, 설명)"""
+    __slots__ = ("id", "name", "description")
+
+    def __init__(self, id: int, name: str, description: Optional[str]):
+        self.id = id
+        self.name = name
+        self.description = description
+
+
+class TaxonomySnapshot:
+    """한 번 로드한 분류 체계 (불변)"""
+
+    def __init__(self, version: Optional[str], grammar_categories: Iterable[GrammarCategoryEntry],
+                 vocabulary_categories: Iterable[TaxonomyEntry], reading_types: Iterable[TaxonomyEntry]):
+        self.version = version
+        self.grammar_categories: Mapping[int, GrammarCategoryEntry] = MappingProxyType(
+            {category.id: category for category in grammar_categories}
+        )
+        self.vocabulary_categories: Mapping[int, TaxonomyEntry] = MappingProxyType(
+            {category.id: category for category in vocabulary_categories}
+        )
+        self.reading_types: Mapping[int, TaxonomyEntry] = MappingProxyType(
+            {reading_type.id: reading_type for reading_type in reading_types}
+        )
+
+        # /categories 응답 (기존 응답 형식 그대로)
+        self.categories_response = {
+            "grammar_categories": [
+                {
+                    "id": category.id,
+                    "name": category.name,
+                    "topics": [{"id": topic.id, "name": topic.name} for topic in category.topics]
+                }
+                for category in self.grammar_categories.values()
+            ],
+            "vocabulary_categories": [
+                {"id": category.id, "name": category.name} for category in self.vocabulary_categories.values()
+            ],
+            "reading_types": [
+                {"id": rt.id, "name": rt.name, "description": rt.description} for rt in self.reading_types.values()
+            ],
+        }
+
+    @staticmethod
+    def _select(table: Mapping, ids: Iterable[int]) -> List:
+        # 요청 순서가 아닌 테이블(id) 순서 - 기존 IN 조회 결과와 동일
+        wanted = set(ids or ())
+        return [entry for entry_id, entry in table.items() if entry_id in wanted]
+
+    def grammar_categories_by_ids(self, ids: Iterable[int]) -> List[GrammarCategoryEntry]:
+        return self._select(self.grammar_categories, ids)
+
+    def vocabulary_categories_by_ids(self, ids: Iterable[int]) -> List[TaxonomyEntry]:
+        return self._select(self.vocabulary_categories, ids)
+
+    def reading_types_by_ids(self, ids: Iterable[int]) -> List[TaxonomyEntry]:
+        return self._select(self.reading_types, ids)
+
+    @classmethod
+    def load(cls, db, version: Optional[str]) -> "TaxonomySnapshot":
+        """테이블별 한 번씩 (총 4회) 조회"""
+        from app.models import GrammarCategory, GrammarTopic, VocabularyCategory, ReadingType
+
+        topics_by_category: Dict[int, List[TaxonomyEntry]] = {}
+        for topic in db.query(GrammarTopic.id, GrammarTopic.category_id, GrammarTopic.name,
+                              GrammarTopic.learning_objective).order_by(GrammarTopic.id).all():
+            topics_by_category.setdefault(topic.category_id, []).append(
+                TaxonomyEntry(topic.id, topic.name, topic.learning_objective)
+            )
+
+        grammar_categories = [
+            GrammarCategoryEntry(row.id, row.name, tuple(topics_by_category.get(row.id, ())))
+            for row in db.query(GrammarCategory.id, GrammarCategory.name).order_by(GrammarCategory.id).all()
+        ]
+        vocabulary_categories = [
+            TaxonomyEntry(row.id, row.name, row.learning_objective)
+            for row in db.query(VocabularyCategory.id, VocabularyCategory.name,
+                                VocabularyCategory.learning_objective).order_by(VocabularyCategory.id).all()
+        ]
+        reading_types = [
+            TaxonomyEntry(row.id, row.name, row.description)
+            for row in db.query(ReadingType.id, ReadingType.name,
+                                ReadingType.description).order_by(ReadingType.id).all()
+        ]
+        return cls(version, grammar_categories, vocabulary_categories, reading_types)
+
+
+class TaxonomySnapshotCache:
+    """버전 키 기반 스냅샷 캐시"""
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        self.redis_url = redis_url
+        self._snapshot: Optional[TaxonomySnapshot] = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_disabled = not REDIS_AVAILABLE or os.getenv("TAXONOMY_CACHE_REDIS_DISABLED") == "1"
+        self.stats = {"hits": 0, "loads": 0, "version_checks": 0}
+
+    def _get_redis(self):
+        if self._redis_disabled:
+            return None
+        if self._redis is None:
+            try:
+                self._redis = redis.Redis.from_url(self.redis_url, decode_responses=True, socket_timeout=0.5)
+                self._redis.ping()
+            except Exception as e:
+                print(f"⚠️ 분류 체계 캐시 Redis 연결 실패, TTL 기반으로 갱신: {str(e)}")
+                self._redis_disabled = True
+                self._redis = None
+        return self._redis
+
+    def _remote_version(self) -> Tuple[bool, Optional[str]]:
+        """(Redis 확인 성공 여부, 버전)"""
+        client = self._get_redis()
+        if client is None:
+            return False, None
+        try:
+            self.stats["version_checks"] += 1
+            return True, client.get(TAXONOMY_VERSION_KEY) or "0"
+        except Exception:
+            return False, None
+
+    def _is_fresh(self, now: float) -> bool:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return False
+        if now - self._checked_at < TAXONOMY_VERSION_CHECK_INTERVAL:
+            return True
+        ok, version = self._remote_version()
+        self._checked_at = now
+        if ok:
+            return version == snapshot.version
+        return now - self._loaded_at < TAXONOMY_SNAPSHOT_TTL
+
+    def get(self, db=None) -> Optional[TaxonomySnapshot]:
+        """현재 스냅샷 (없거나 오래됐고 db 가 있으면 다시 로드, 로드 실패 시 기존 스냅샷 유지)"""
+        now = time.monotonic()
+        if self._is_fresh(now):
+            self.stats["hits"] += 1
+            return self._snapshot
+        if db is None:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is not None and self._loaded_at >= now:
+                return self._snapshot
+            _, version = self._remote_version()
+            try:
+                snapshot = TaxonomySnapshot.load(db, version)
+            except Exception as e:
+                print(f"⚠️ 분류 체계 로드 실패, 기존 스냅샷 유지: {str(e)}")
+                return self._snapshot
+            self._snapshot = snapshot
+            self._loaded_at = self._checked_at = time.monotonic()
+            self.stats["loads"] += 1
+            print(
+                f"✅ 분류 체계 스냅샷 로드 (version={version}): 문법 {len(snapshot.grammar_categories)}개, "
+                f"어휘 {len(snapshot.vocabulary_categories)}개, 독해 {len(snapshot.reading_types)}개"
+            )
+            return snapshot
+
+    def invalidate(self):
+        """현재 프로세스의 스냅샷 폐기"""
+        with self._lock:
+            self._snapshot = None
+
+
+taxonomy_snapshot = TaxonomySnapshotCache()
+
+
+def bump_taxonomy_version() -> bool:
+    """분류 체계 테이블 변경 후 호출 - 모든 프로세스가 다음 조회 때 스냅샷을 다시 로드"""
+    taxonomy_snapshot.invalidate()
+    client = taxonomy_snapshot._get_redis()
+    if client is None:
+        print("⚠️ Redis 를 사용할 수 없어 현재 프로세스의 분류 체계 스냅샷만 폐기했습니다.")
+        return False
+    try:
+        version = client.incr(TAXONOMY_VERSION_KEY)
+        print(f"✅ 분류 체계 버전 갱신: {version}")
+        return True
+    except Exception as e:
+        print(f"⚠️ 분류 체계 버전 갱신 실패: {str(e)}")
+        return False
@@ -0,0 +1,75 @@
+"""
+글의 소재 카테고리 - 지문 생성 프롬프트와 지문 라이브러리 색인(주제 키)이 함께 사용
+"""
+from typing import Any, Optional
+
+
+# 소재 카테고리 (모든 학년 공통)
+TOPIC_CATEGORIES = {
+    "개인생활": [
+        "취미, 오락, 여행, 운동, 쇼핑 등 여가 선용",
+        "보건, 위생, 영양 등 개인 건강 관리",
+        "생일, 관심사, 생활 방식 등 개인 일상"
+    ],
+    "가정생활": [
+        "의복, 음식, 주거",
+        "명절, 가족 행사, 집안일 등 가정 일상"
+    ],
+    "학교생활": [
+        "다양한 교육 내용 및 방법, 학교 활동",
+        "교우 관계, 진로, 진학 등 학교 일상"
+    ],
+    "사회생활": [
+        "일, 노동, 직업 윤리 등 근로",
+        "서신 왕래, 소셜 미디어 등 온라인 활동, 면대면 대화 등 대인 관계",
+        "회의, 지역 행사, 졸업, 결혼, 장례식 등 사회적 행사"
+    ],
+    "문화": [
+        "동일 문화권 내의 다른 세대, 성별 간의 문화적 차이",
+        "우리의 문화와 생활 양식 소개",
+        "우리 문화와 다른 문화의 언어⋅문화적 차이",
+        "다양한 문화권의 관습, 규범, 가치, 사고방식, 행동 양식, 의사소통 방식",
+        "세계 문화: 의식주, 명절과 축제, 종교, 언어, 문학, 음악, 예술, 대중문화, 여행 및 관광지, 건축물, 전통, 지리, 역사, 인물, 스포츠, 관혼상제 등",
+        "다양한 문화권의 사람들과의 의사소통, 교류, 협력"
+    ],
+    "민주시민": [
+        "공중도덕, 예절, 협력, 배려, 봉사, 정의, 책임감 등 인성",
+        "인권, 양성평등, 글로벌 에티켓, 평화 등 민주시민 의식 및 세계시민 의식",
+        "올바른 미디어 리터러시를 통한 비판적 사고의 성찰, 사회적 공감과 의사소통",
+        "문제에 대한 비판적 사고와 민주적 의사 결정 및 갈등 해결",
+        "가난 및 기아 해결, 인구 문제, 청소년 문제, 고령화, 다문화 사회, 사회 정의와 불평등 해소",
+        "책임 있는 소비와 생산, 자원과 에너지 문제, 국제 문제 해결을 위한 협력 등 사회 현안",
+        "변화하는 사회 및 국제적 현안을 해결하기 위한 가정, 학교, 지역, 국가 및 세계 공동체의 참여"
+    ],
+    "생태전환": [
+        "인간과 생태계의 관계, 자연환경과 생태 윤리, 생태 감수성과 책임감",
+        "현재 및 미래 세대의 권리로서 환경권 존중",
+        "생태계의 특성과 시스템 탐구, 생태 시스템과 인간 사회 시스템의 연관성",
+        "기후변화와 생태계 문제 탐구",
+        "생태전환을 위한 사회 체계의 변화 제안 및 실천",
+        "생태전환을 위한 지속가능한 과학 기술 제안 및 실천",
+        "일상생활에서의 생태 전환 참여와 실천"
+    ],
+    "디지털및인공지능": [
+        "컴퓨터와 인터넷 활용, 소프트웨어의 이해와 활용 등 디지털 기술의 이해와 활용",
+        "정보의 공유, 온라인 활동 참여와 협업 등 디지털 의사소통과 협력",
+        "정보의 수집, 관리, 분석, 표현 등 정보의 처리와 생성",
+        "디지털 기술과 정보의 안전한 사용 및 윤리적 사용"
+    ],
+    "일반교양": [
+        "생활 안전, 교통안전, 재난 안전, 직업 안전 등의 안전",
+        "동식물 또는 계절, 날씨 등의 자연 현상",
+        "애국심, 평화, 안보, 독도 교육 및 통일",
+        "정치, 경제, 금융, 역사, 지리, 수학, 과학, 교통, 정보 통신, 우주, 해양, 탐험 등 일반 교양",
+        "인문학, 사회 과학, 자연 과학, 예술 분야 등의 학문적 소양",
+        "언어, 문학, 예술 등 심미적 심성과 창의력, 상상력"
+    ]
+}
+
+
+def normalize_topic_category(value: Any) -> Optional[str]:
+    """소재 카테고리 이름 정규화 (공백 무시) - 카테고리가 아니면 None"""
+    if not isinstance(value, str):
+        return None
+    name = "".join(value.split())
+    return name if name in TOPIC_CATEGORIES else None
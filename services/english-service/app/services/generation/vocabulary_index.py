@@ -0,0 +1,169 @@
+"""
+어휘 샘플링 인덱스 - words 데이터를 프로세스당 한 번 로드해 레벨별 단어 배열로 보관
+
+- data/words.json (words 테이블 시드) 을 로드하고 mtime 이 바뀌면 다음 조회 때 다시 로드
+  (파일이 없으면 words 테이블에서 한 번 읽고 VOCABULARY_DB_TTL 초마다 갱신)
+- 레벨별 단어 튜플에서 O(k) 균등 샘플링 (워크시트 생성마다 DB 조회 없음)
+- 교사별 최근 사용 단어(VOCABULARY_RECENT_WINDOW 개) 제외 옵션 (현재 프로세스 기준)
+"""
+import os
+import json
+import time
+import random
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+WORDS_FILE_PATH = os.path.join(os.path.dirname(__file__), "../../../data/words.json")
+
+# mtime 확인 주기 (초)
+VOCABULARY_RELOAD_INTERVAL = float(os.getenv("VOCABULARY_RELOAD_INTERVAL", "5"))
+# 파일이 없을 때 DB에서 다시 읽는 주기 (초)
+VOCABULARY_DB_TTL = float(os.getenv("VOCABULARY_DB_TTL", "600"))
+# 교사별로 기억할 최근 사용 단어 수 / 기억할 교사 수
+VOCABULARY_RECENT_WINDOW = int(os.getenv("VOCABULARY_RECENT_WINDOW", "300"))
+VOCABULARY_RECENT_TEACHERS = 1024
+
+
+def _group_by_level(items: Iterable[Tuple[str, str]]) -> Dict[str, Tuple[str, ...]]:
+    """(단어, 레벨) → 레벨별 중복 없는 단어 튜플"""
+    levels: Dict[str, Dict[str, None]] = {}
+    for word, level in items:
+        if word and level:
+            levels.setdefault(level, {})[word] = None
+    return {level: tuple(words) for level, words in levels.items()}
+
+
+class _RecentWords:
+    """교사별 최근 사용 단어 (교사 수와 단어 수 모두 상한)"""
+
+    def __init__(self, window: int = VOCABULARY_RECENT_WINDOW, max_teachers: int = VOCABULARY_RECENT_TEACHERS):
+        self.window = window
+        self.max_teachers = max_teachers
+        self._teachers: "OrderedDict[int, deque]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, teacher_id: int) -> frozenset:
+        with self._lock:
+            recent = self._teachers.get(teacher_id)
+            return frozenset(recent) if recent else frozenset()
+
+    def add(self, teacher_id: int, words: List[str]):
+        with self._lock:
+            recent = self._teachers.get(teacher_id)
+            if recent is None:
+                recent = deque(maxlen=self.window)
+                self._teachers[teacher_id] = recent
+                if len(self._teachers) > self.max_teachers:
+                    self._teachers.popitem(last=False)
+            else:
+                self._teachers.move_to_end(teacher_id)
+            recent.extend(words)
+
+
+class VocabularyIndex:
+    """레벨별 단어 배열 + 균등 샘플링"""
+
+    def __init__(self, path: str = WORDS_FILE_PATH):
+        self.path = path
+        self._levels: Dict[str, Tuple[str, ...]] = {}
+        self._source: Optional[str] = None
+        self._mtime: Optional[float] = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self.recent = _RecentWords()
+
+    def _load_file(self) -> bool:
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return False
+        if self._source == "file" and self._mtime == mtime:
+            return True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+            self._levels = _group_by_level((item.get("word"), item.get("level")) for item in items)
+            self._source, self._mtime, self._loaded_at = "file", mtime, time.monotonic()
+            print(f"✅ 어휘 인덱스 로드: {self._summary()}")
+        except (json.JSONDecodeError, AttributeError, OSError) as e:
+            # 편집 중인 파일 등 - 기존 인덱스 유지
+            print(f"⚠️ 어휘 파일 로드 실패, 기존 인덱스 유지: {str(e)}")
+        return bool(self._levels)
+
+    def _load_db(self, db) -> bool:
+        if self._source == "db" and time.monotonic() - self._loaded_at < VOCABULARY_DB_TTL:
+            return True
+        from app.models import Word
+        rows = db.query(Word.word, Word.level).all()
+        self._levels = _group_by_level((row.word, row.level) for row in rows)
+        self._source, self._mtime, self._loaded_at = "db", None, time.monotonic()
+        print(f"✅ 어휘 인덱스 로드 (DB): {self._summary()}")
+        return bool(self._levels)
+
+    def _summary(self) -> str:
+        return ", ".join(f"{level} {len(words)}개" for level, words in self._levels.items())
+
+    def _ensure_loaded(self, db=None) -> bool:
+        now = time.monotonic()
+        if self._levels and now - self._checked_at < VOCABULARY_RELOAD_INTERVAL and self._source != "db":
+            return True
+        with self._lock:
+            self._checked_at = now
+            if self._load_file():
+                return True
+            if db is not None:
+                return self._load_db(db)
+            return bool(self._levels)
+
+    def load(self, db=None) -> bool:
+        """시작 시 미리 로드"""
+        return self._ensure_loaded(db)
+
+    def level_size(self, level: str) -> int:
+        self._ensure_loaded()
+        return len(self._levels.get(level, ()))
+
+    def sample(self, level: str, k: int, exclude: frozenset = frozenset(), db=None) -> List[str]:
+        """레벨에서 k개 균등 샘플링 (exclude 단어는 가능한 한 제외)"""
+        if not self._ensure_loaded(db):
+            raise Exception("어휘 데이터를 불러올 수 없습니다.")
+        words = self._levels.get(level, ())
+        k = min(k, len(words))
+        if k <= 0:
+            return []
+        if not exclude:
+            return self._rng.sample(words, k)
+
+        # 제외 단어가 적으면 인덱스를 뽑아 거르는 방식으로 O(k)
+        chosen: Dict[int, None] = {}
+        attempts = 0
+        while len(chosen) < k and attempts < 4 * k:
+            attempts += 1
+            idx = self._rng.randrange(len(words))
+            if idx not in chosen and words[idx] not in exclude:
+                chosen[idx] = None
+        result = [words[idx] for idx in chosen]
+        if len(result) < k:
+            # 제외 단어가 레벨 대부분을 차지 - 남은 단어에서 채우고 그래도 부족하면 제외 단어 재사용
+            taken = set(result)
+            remaining = [word for word in words if word not in exclude and word not in taken]
+            result += self._rng.sample(remaining, min(k - len(result), len(remaining)))
+            if len(result) < k:
+                taken = set(result)
+                reused = [word for word in words if word not in taken]
+                result += self._rng.sample(reused, k - len(result))
+        return result
+
+    def sample_for_teacher(self, teacher_id: Optional[int], counts: Dict[str, int], db=None) -> Dict[str, List[str]]:
+        """레벨별 개수만큼 샘플링, teacher_id 가 있으면 최근 사용 단어 제외 후 기록"""
+        exclude = self.recent.get(teacher_id) if teacher_id is not None else frozenset()
+        sampled = {level: self.sample(level, count, exclude, db) for level, count in counts.items() if count > 0}
+        if teacher_id is not None:
+            self.recent.add(teacher_id, [word for words in sampled.values() for word in words])
+        return sampled
+
+
+vocabulary_index = VocabularyIndex()
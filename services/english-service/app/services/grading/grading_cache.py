@@ -0,0 +1,151 @@
+"""
+AI 채점 결과 메모이제이션 - 같은 문제에 같은 답안을 낸 학생들은 AI 채점을 한 번만 호출
+
+- 키: (문제지 ID, 문제 ID, 정규화된 학생 답안, 채점기 버전, 문제 내용 지문(fingerprint))
+  문제 ID 는 문제지 안에서의 번호이므로 문제지 ID 를 함께 사용
+  정답/해설/문제/지문 등이 수정되면 fingerprint 가 바뀌어 이전 결과는 더 이상 조회되지 않음
+- 저장: LLM 응답 캐시(LRU + Redis)에 AI 원본 응답을 저장하고 조회 시 다시 파싱
+- 같은 키의 동시 미스는 Redis SET NX EX 락을 잡은 한 곳만 AI 를 호출하고
+  나머지는 GRADING_LOCK_WAIT 초까지 캐시를 확인하며 기다림 (Redis 가 없으면 각자 호출)
+"""
+import os
+import re
+import time
+import uuid
+import asyncio
+import hashlib
+import unicodedata
+from typing import Any, Callable, Optional
+
+from app.core.config import get_settings
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+settings = get_settings()
+
+REDIS_URL = settings.redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# 채점 프롬프트/파싱 규칙을 바꾸면 올려서 이전 결과를 무효화
+GRADER_VERSION = "1"
+
+# 채점 락 유지 시간 / 다른 곳의 채점 결과를 기다리는 최대 시간 / 캐시 확인 주기 (초)
+GRADING_LOCK_TTL = int(os.getenv("ENGLISH_GRADING_LOCK_TTL", "60"))
+GRADING_LOCK_WAIT = float(os.getenv("ENGLISH_GRADING_LOCK_WAIT", "20"))
+GRADING_LOCK_POLL = 0.2
+# Redis 오류 후 다시 연결을 시도하기까지 대기 (초)
+GRADING_LOCK_REDIS_RETRY_SECONDS = 30
+
+GRADING_LOCK_KEY = "english_service:grading_lock:{cache_key}"
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_answer(answer: str) -> str:
+    """학생 답안 정규화 (전각/반각 통일, 공백 정리) - 대소문자/문장부호는 채점에 영향이 있을 수 있어 유지"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", answer or "")).strip()
+
+
+def _digest(*parts: Any) -> str:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(("" if part is None else str(part)).encode("utf-8"))
+        hasher.update(b"\x00")
+    return hasher.hexdigest()
+
+
+def make_grading_cache_key(worksheet_id: int, question_id: int, student_answer: str, question_text: str,
+                           correct_answer: str, explanation: Optional[str] = None,
+                           learning_point: Optional[str] = None, example_content: Optional[str] = None,
+                           passage_content: Optional[str] = None) -> str:
+    """채점 결과 캐시 키"""
+    fingerprint = _digest(question_text, correct_answer, explanation, learning_point, example_content, passage_content)
+    return (
+        f"english_subjective_grading:v{GRADER_VERSION}:{worksheet_id}:{question_id}:"
+        f"{fingerprint[:16]}:{_digest(normalize_answer(student_answer))}"
+    )
+
+
+class GradingLock:
+    """같은 채점 캐시 키에 대한 단일 실행 락"""
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        self.redis_url = redis_url
+        self._redis = None
+        self._redis_retry_at = 0.0
+        self.stats = {"led": 0, "waited": 0, "shared": 0}
+
+    def _get_redis(self):
+        if not REDIS_AVAILABLE:
+            return None
+        if self._redis is None:
+            if time.time() < self._redis_retry_at:
+                return None
+            try:
+                client = redis.Redis.from_url(self.redis_url, decode_responses=True, socket_timeout=0.5)
+                client.ping()
+                self._redis = client
+            except Exception as e:
+                self._redis_failed(e)
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        print(f"⚠️ 채점 락 Redis 오류, {GRADING_LOCK_REDIS_RETRY_SECONDS}초 동안 락 없이 채점: {str(e)}")
+        self._redis = None
+        self._redis_retry_at = time.time() + GRADING_LOCK_REDIS_RETRY_SECONDS
+
+    def acquire(self, cache_key: str) -> Optional[str]:
+        """락 획득 시 토큰, 다른 곳에서 채점 중이면 None (Redis 를 쓸 수 없으면 빈 토큰 - 바로 채점)"""
+        client = self._get_redis()
+        if client is None:
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            if client.set(GRADING_LOCK_KEY.format(cache_key=cache_key), token, nx=True, ex=GRADING_LOCK_TTL):
+                self.stats["led"] += 1
+                return token
+            return None
+        except Exception as e:
+            self._redis_failed(e)
+            return ""
+
+    def release(self, cache_key: str, token: Optional[str]) -> None:
+        client = self._get_redis()
+        if client is None or not token:
+            return
+        try:
+            client.eval(_RELEASE_LOCK_SCRIPT, 1, GRADING_LOCK_KEY.format(cache_key=cache_key), token)
+        except Exception as e:
+            self._redis_failed(e)
+
+    async def wait_for(self, cache_key: str, lookup: Callable[[str], Optional[str]]) -> Optional[str]:
+        """다른 곳의 채점 결과를 캐시에서 기다림 - 락이 풀렸는데 결과가 없거나 시간이 지나면 None"""
+        self.stats["waited"] += 1
+        deadline = time.monotonic() + GRADING_LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(GRADING_LOCK_POLL)
+            value = lookup(cache_key)
+            if value is not None:
+                self.stats["shared"] += 1
+                return value
+            client = self._get_redis()
+            try:
+                if client is None or not client.exists(GRADING_LOCK_KEY.format(cache_key=cache_key)):
+                    return lookup(cache_key)
+            except Exception as e:
+                self._redis_failed(e)
+                return None
+        return None
+
+
+grading_lock = GradingLock()
@@ -0,0 +1,57 @@
+"""
+채점 완료 알림 - notification-service(/api/notifications/grading)로 학생/선생님에게 결과 전송
+
+Celery 채점 워커에서 호출하므로 동기 HTTP 사용, 알림 실패는 채점 결과에 영향 없음
+"""
+import os
+import json
+import urllib.request
+from typing import Any, Dict, Optional
+
+NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://localhost:8006")
+NOTIFICATION_TIMEOUT = float(os.getenv("NOTIFICATION_TIMEOUT", "5"))
+
+
+def _post(payload: Dict[str, Any]) -> bool:
+    request = urllib.request.Request(
+        f"{NOTIFICATION_SERVICE_URL}/api/notifications/grading",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=NOTIFICATION_TIMEOUT) as response:
+            return response.status == 200
+    except Exception as e:
+        print(f"⚠️ 채점 알림 전송 실패 ({payload['receiver_type']}:{payload['receiver_id']}): {str(e)}")
+        return False
+
+
+def notify_grading_result(worksheet_id: int, student_id: int, task_id: Optional[str],
+                          result: Optional[Dict[str, Any]] = None, assignment_id: Optional[int] = None,
+                          teacher_id: Optional[int] = None, error: Optional[str] = None) -> int:
+    """학생(및 과제의 선생님)에게 채점 완료/실패 알림 - 전송 성공 수 반환"""
+    payload = {
+        "service": "english",
+        "worksheet_id": worksheet_id,
+        "assignment_id": assignment_id,
+        "student_id": student_id,
+        "task_id": task_id,
+        "status": "failed" if error else "completed",
+    }
+    if result:
+        payload.update({
+            "result_id": result.get("result_id"),
+            "total_score": result.get("total_score"),
+            "max_score": result.get("max_score"),
+            "percentage": result.get("percentage"),
+        })
+
+    receivers = [("student", student_id)]
+    if teacher_id is not None:
+        receivers.append(("teacher", teacher_id))
+
+    return sum(
+        _post({**payload, "receiver_type": receiver_type, "receiver_id": receiver_id})
+        for receiver_type, receiver_id in receivers
+    )
@@ -1,3 +1,5 @@
+import os
+import asyncio
 from typing import Dict, List, Any, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
@@ -9,6 +11,11 @@ from app.models import (
 from .objective_grader import ObjectiveGrader
 from .subjective_grader import SubjectiveGrader
 
+# 한 답안지에서 동시에 실행하는 AI 채점 수 (전체 Gemini 동시성은 LLM 게이트웨이가 제한)
+GRADING_MAX_CONCURRENCY = int(os.getenv("ENGLISH_GRADING_MAX_CONCURRENCY", "8"))
+
+SUBJECTIVE_TYPES = ("단답형", "서술형")
+
 
 class GradingService:
     """통합 채점 서비스 - 객관식은 DB 비교, 주관식/서술형은 AI 채점"""
@@ -38,24 +45,40 @@ class GradingService:
             if not questions:
                 raise Exception("문제를 찾을 수 없습니다.")
 
-            # 각 문제별 채점
-            question_results = []
-            total_score = 0
-            max_score = 0
+            # 지문은 한 번에 조회
+            passages = self._get_passage_contents(worksheet_id, questions)
+            print(f"🔍 answers 딕셔너리 키들: {list(answers.keys())}")
+
+            # 객관식은 바로 채점, 단답형/서술형(AI 채점)은 동시에 실행 (최대 GRADING_MAX_CONCURRENCY 개)
+            semaphore = asyncio.Semaphore(GRADING_MAX_CONCURRENCY)
 
+            async def grade(question: Question, student_answer: str) -> Dict[str, Any]:
+                async with semaphore:
+                    return await self._grade_single_question(
+                        question, student_answer, passages.get(question.passage_id)
+                    )
+
+            question_results: List[Optional[Dict[str, Any]]] = []
+            pending = []
             for question in questions:
                 student_answer = answers.get(question.question_id, "")
                 print(f"🔍 문제 {question.question_id}: 학생답안 '{student_answer}' (타입: {type(student_answer)}) 문제타입: {question.question_type}")
-                print(f"🔍 answers 딕셔너리 키들: {list(answers.keys())}")
 
-                # 문제별 채점
-                result = await self._grade_single_question(
-                    question, student_answer, worksheet_id
-                )
+                if self._needs_ai_grading(question, student_answer):
+                    pending.append((len(question_results), question, student_answer))
+                    question_results.append(None)
+                else:
+                    question_results.append(
+                        await self._grade_single_question(question, student_answer, None)
+                    )
+
+            if pending:
+                graded = await asyncio.gather(*(grade(question, answer) for _, question, answer in pending))
+                for (index, _, _), result in zip(pending, graded):
+                    question_results[index] = result
 
-                question_results.append(result)
-                total_score += result["score"]
-                max_score += result["max_score"]
+            total_score = sum(result["score"] for result in question_results)
+            max_score = sum(result["max_score"] for result in question_results)
 
             # 채점 결과 저장
             grading_result = await self._save_grading_result(
@@ -83,8 +106,13 @@ class GradingService:
             print(f"❌ 채점 오류: {str(e)}")
             raise e
 
+    @staticmethod
+    def _needs_ai_grading(question: Question, student_answer: str) -> bool:
+        """AI 채점 대상 여부 (답안이 있는 단답형/서술형)"""
+        return bool(student_answer.strip()) and question.question_type in SUBJECTIVE_TYPES
+
     async def _grade_single_question(self, question: Question, student_answer: str,
-                                   worksheet_id: str) -> Dict[str, Any]:
+                                   passage_content: Optional[str] = None) -> Dict[str, Any]:
         """개별 문제 채점"""
 
         question_result = {
@@ -116,10 +144,8 @@ class GradingService:
             question_result["student_answer"] = student_answer  # 프론트 원본값 그대로 저장
             question_result["needs_review"] = True  # 객관식도 검수 필요
 
-        elif question.question_type in ["단답형", "서술형"]:
-            # 단답형/서술형: AI 채점
-            # 관련 지문과 예문 조회
-            passage_content = self._get_passage_content(worksheet_id, question.passage_id)
+        elif question.question_type in SUBJECTIVE_TYPES:
+            # 단답형/서술형: AI 채점 (지문은 grade_worksheet 에서 미리 조회)
             example_content = question.example_content
 
             grading_result = await self.subjective_grader.grade_subjective(
@@ -129,7 +155,9 @@ class GradingService:
                 passage_content=passage_content,
                 example_content=example_content,
                 explanation=question.explanation,
-                learning_point=question.learning_point
+                learning_point=question.learning_point,
+                question_id=question.question_id,
+                worksheet_id=question.worksheet_id
             )
 
             question_result.update(grading_result)
@@ -137,17 +165,18 @@ class GradingService:
 
         return question_result
 
-    def _get_passage_content(self, worksheet_id: int, passage_id: Optional[int]) -> Optional[str]:
-        """지문 내용을 조회합니다."""
-        if not passage_id:
-            return None
+    def _get_passage_contents(self, worksheet_id: int, questions: List[Question]) -> Dict[int, str]:
+        """AI 채점에 필요한 지문들을 한 번에 조회합니다. (passage_id → 지문 내용)"""
+        passage_ids = {q.passage_id for q in questions if q.passage_id and q.question_type in SUBJECTIVE_TYPES}
+        if not passage_ids:
+            return {}
 
-        passage = self.db.query(Passage).filter(
+        passages = self.db.query(Passage.passage_id, Passage.passage_content).filter(
             Passage.worksheet_id == worksheet_id,
-            Passage.passage_id == passage_id
-        ).first()
+            Passage.passage_id.in_(passage_ids)
+        ).all()
 
-        return str(passage.passage_content) if passage else None
+        return {passage.passage_id: str(passage.passage_content) for passage in passages}
 
     async def _save_grading_result(self, worksheet_id: int, student_id: int,
                                  completion_time: int, total_score: int, max_score: int,
@@ -1,5 +1,6 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from ..ai.ai_service import AIService
+from .grading_cache import make_grading_cache_key
 
 
 class SubjectiveGrader:
@@ -10,9 +11,12 @@ class SubjectiveGrader:
 
     async def grade_subjective(self, question_text: str, correct_answer: str, student_answer: str,
                              passage_content: str = None, example_content: str = None,
-                             explanation: str = None, learning_point: str = None) -> Dict[str, Any]:
+                             explanation: str = None, learning_point: str = None,
+                             question_id: Optional[int] = None,
+                             worksheet_id: Optional[int] = None) -> Dict[str, Any]:
         """
         단답형/서술형 문제를 AI로 채점합니다.
+        worksheet_id/question_id 가 있으면 같은 문제/같은 답안의 이전 AI 채점 결과를 재사용합니다.
 
         Args:
             question_text: 문제 텍스트
@@ -20,10 +24,19 @@ class SubjectiveGrader:
             student_answer: 학생 답안
             passage_content: 관련 지문 (선택사항)
             example_content: 관련 예문 (선택사항)
+            question_id: 문제 ID (채점 결과 캐시 키)
+            worksheet_id: 문제지 ID (채점 결과 캐시 키)
 
         Returns:
             채점 결과 딕셔너리
         """
+        cache_key = None
+        if worksheet_id is not None and question_id is not None:
+            cache_key = make_grading_cache_key(
+                worksheet_id, question_id, student_answer, question_text, correct_answer,
+                explanation, learning_point, example_content, passage_content
+            )
+
         result = await self.ai_service.grade_subjective_question(
             question_text=question_text,
             correct_answer=correct_answer,
@@ -31,7 +44,8 @@ class SubjectiveGrader:
             passage_content=passage_content,
             example_content=example_content,
             explanation=explanation,
-            learning_point=learning_point
+            learning_point=learning_point,
+            cache_key=cache_key
         )
 
         # grading_method 추가
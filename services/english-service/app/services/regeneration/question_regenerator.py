@@ -11,6 +11,8 @@ from app.schemas.regeneration import (
     EnglishRegenerationRequest
 )
 from app.core.config import get_settings
+from app.services.ai.llm_gateway import get_llm_gateway
+from app.services.ai.json_repair import loads_tolerant
 
 try:
     import google.generativeai as genai
@@ -26,8 +28,7 @@ class QuestionRegenerator:
 
     def __init__(self):
         if GEMINI_AVAILABLE and settings.gemini_api_key:
-            genai.configure(api_key=settings.gemini_api_key)
-            self.model = genai.GenerativeModel(settings.gemini_flash_model)
+            self.model = get_llm_gateway().gemini_model(settings.gemini_flash_model)
         else:
             self.model = None
 
@@ -479,20 +480,8 @@ class QuestionRegenerator:
     def _parse_ai_response(self, response_text: str) -> Optional[Dict[str, Any]]:
         """AI 응답을 파싱합니다."""
         try:
-            # JSON 블록 추출
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                if end != -1:
-                    json_text = response_text[start:end].strip()
-                else:
-                    json_text = response_text[start:].strip()
-            else:
-                # JSON 블록이 없으면 전체 텍스트에서 JSON 찾기
-                json_text = response_text.strip()
-
-            # JSON 파싱
-            parsed_data = json.loads(json_text)
+            # JSON 블록 추출 및 파싱 (LLM 출력 결함 복구 포함)
+            parsed_data = loads_tolerant(response_text)
 
             return parsed_data
 
@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 
 from app.models.worksheet import Passage
+from app.services.worksheet_crud.worksheet_view import bump_worksheet_version
 
 
 class PassageService:
@@ -39,6 +40,7 @@ class PassageService:
                 setattr(passage, field, new_value)
 
         self.db.commit()
+        bump_worksheet_version(worksheet_id)
         self.db.refresh(passage)
         return passage
 
@@ -6,6 +6,7 @@ from typing import Dict, Any, Optional
 from sqlalchemy.orm import Session
 
 from app.models.worksheet import Question
+from app.services.worksheet_crud.worksheet_view import bump_worksheet_version
 
 
 class QuestionService:
@@ -37,6 +38,7 @@ class QuestionService:
                 setattr(question, field, new_value)
 
         self.db.commit()
+        bump_worksheet_version(worksheet_id)
         self.db.refresh(question)
         return question
 
@@ -7,6 +7,7 @@ from typing import List, Optional, Dict, Any
 from app.models.worksheet import Worksheet, Question, Passage
 from app.models.grading import GradingResult, QuestionResult
 from app.models.assignment import Assignment, AssignmentDeployment
+from app.services.worksheet_crud.worksheet_view import bump_worksheet_version
 
 class WorksheetService:
     @staticmethod
@@ -32,6 +33,7 @@ class WorksheetService:
             for key, value in worksheet_data.items():
                 setattr(db_worksheet, key, value)
             db.commit()
+            bump_worksheet_version(worksheet_id)
             db.refresh(db_worksheet)
         return db_worksheet
 
@@ -44,6 +46,7 @@ class WorksheetService:
 
         db_worksheet.worksheet_name = new_title
         db.commit()
+        bump_worksheet_version(worksheet_id)
         db.refresh(db_worksheet)
         return db_worksheet
 
@@ -107,6 +110,7 @@ class WorksheetService:
                 print(f"워크시트 ID {worksheet_id} 삭제 완료")
 
             db.commit()
+            bump_worksheet_version(*worksheet_ids)
             return deleted_count
 
         except Exception as e:
@@ -120,6 +124,7 @@ class WorksheetService:
         if db_worksheet:
             db.delete(db_worksheet)
             db.commit()
+            bump_worksheet_version(worksheet_id)
             return True
         return False
 
@@ -0,0 +1,275 @@
+"""
+문제지 조회용 단일 읽기 경로 - 편집(/worksheets/{id}), 풀이(/worksheets/{id}/solve), 학생 과제 상세 조회가 공유
+
+- selectinload 로 지문/문제를 워크시트 조회와 함께 한 번에 로드 (지연 로딩으로 인한 추가 조회 없음)
+- WorksheetView 가 응답 DTO(dict)를 만들어 두고 각 엔드포인트는 필요한 형태만 꺼내 씀
+- 풀이용 응답(답안 제외)은 Redis 에 직렬화된 JSON 으로 캐시 (선택, 기본 사용)
+  워크시트에 updated_at 이 없으므로 워크시트별 버전 키를 키에 포함하고,
+  지문/문제/제목 수정·삭제 시 bump_worksheet_version() 으로 버전을 올려 이전 캐시를 무효화
+- Redis 오류 시 SOLVE_VIEW_REDIS_RETRY_SECONDS 동안 캐시 없이 동작 후 다시 연결
+  (버전 갱신에 실패한 문제지는 갱신이 반영될 때까지 캐시를 읽지 않고, 재연결 시 갱신을 다시 시도)
+"""
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.config import get_settings
+from app.models.worksheet import Worksheet
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+settings = get_settings()
+
+REDIS_URL = settings.redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+SOLVE_VIEW_CACHE_TTL = int(os.getenv("ENGLISH_SOLVE_VIEW_CACHE_TTL", "3600"))
+SOLVE_VIEW_CACHE_DISABLED = os.getenv("ENGLISH_SOLVE_VIEW_CACHE_DISABLED") == "1"
+# Redis 오류 후 다시 연결을 시도하기까지 대기 (초)
+SOLVE_VIEW_REDIS_RETRY_SECONDS = 30
+
+WORKSHEET_VERSION_KEY = "english_service:worksheet_version:{worksheet_id}"
+SOLVE_VIEW_KEY = "english_service:solve_view:{worksheet_id}:v{version}"
+
+
+def load_worksheet(db: Session, worksheet_id: int, teacher_id: Optional[int] = None) -> Optional[Worksheet]:
+    """지문/문제를 함께 로드한 워크시트 (총 3회 조회)"""
+    query = db.query(Worksheet).options(
+        selectinload(Worksheet.passages),
+        selectinload(Worksheet.questions),
+    ).filter(Worksheet.worksheet_id == worksheet_id)
+    if teacher_id is not None:
+        query = query.filter(Worksheet.teacher_id == teacher_id)
+    return query.first()
+
+
+class WorksheetView:
+    """로드된 워크시트의 응답 DTO"""
+
+    def __init__(self, worksheet: Worksheet):
+        self.worksheet = worksheet
+        # 지문/문제 번호 순 (학생 과제 조회의 기존 정렬과 동일)
+        self.passages = sorted(worksheet.passages, key=lambda p: p.passage_id)
+        self.questions = sorted(worksheet.questions, key=lambda q: q.question_id)
+
+    @staticmethod
+    def _passage(passage) -> Dict[str, Any]:
+        return {
+            "passage_id": passage.passage_id,
+            "passage_type": passage.passage_type,
+            "passage_content": passage.passage_content,
+            "original_content": passage.original_content,
+            "korean_translation": passage.korean_translation,
+            "related_questions": passage.related_questions,
+        }
+
+    @staticmethod
+    def _question_base(question) -> Dict[str, Any]:
+        return {
+            "question_id": question.question_id,
+            "question_text": question.question_text,
+            "question_type": question.question_type,
+            "question_subject": question.question_subject,
+            "question_difficulty": question.question_difficulty,
+            "question_detail_type": question.question_detail_type,
+            "question_choices": question.question_choices,
+        }
+
+    def editing_data(self) -> Dict[str, Any]:
+        """편집용 (정답/해설 포함)"""
+        worksheet = self.worksheet
+        return {
+            "worksheet_id": worksheet.worksheet_id,
+            "teacher_id": worksheet.teacher_id,
+            "worksheet_name": worksheet.worksheet_name,
+            "worksheet_level": worksheet.school_level,
+            "worksheet_grade": worksheet.grade,
+            "worksheet_subject": worksheet.subject,
+            "problem_type": worksheet.problem_type,
+            "total_questions": worksheet.total_questions,
+            "worksheet_duration": worksheet.duration,
+            "passages": [self._passage(passage) for passage in self.passages],
+            "questions": [
+                {
+                    **self._question_base(question),
+                    "question_passage_id": question.passage_id,
+                    "correct_answer": question.correct_answer,
+                    "example_content": question.example_content,
+                    "example_original_content": question.example_original_content,
+                    "example_korean_translation": question.example_korean_translation,
+                    "explanation": question.explanation,
+                    "learning_point": question.learning_point,
+                }
+                for question in self.questions
+            ],
+        }
+
+    def solving_data(self) -> Dict[str, Any]:
+        """풀이용 (정답/해설/예문 원본·번역 제외)"""
+        worksheet = self.worksheet
+        return {
+            "worksheet_id": worksheet.worksheet_id,
+            "worksheet_name": worksheet.worksheet_name,
+            "worksheet_level": worksheet.school_level,
+            "worksheet_grade": worksheet.grade,
+            "worksheet_subject": worksheet.subject,
+            "total_questions": worksheet.total_questions,
+            "worksheet_duration": worksheet.duration,
+            "passages": [self._passage(passage) for passage in self.passages],
+            # 예문은 문제(example_content)에 포함되어 별도 테이블이 없음 - 응답 형식 호환용
+            "examples": [],
+            "questions": [
+                {
+                    **self._question_base(question),
+                    "question_passage_id": question.passage_id,
+                    "question_example_id": None,
+                    "example_content": question.example_content,
+                }
+                for question in self.questions
+            ],
+        }
+
+    def assignment_data(self) -> Dict[str, List[Dict[str, Any]]]:
+        """학생 과제 상세용 지문/문제 (기존 응답 형식 그대로)"""
+        return {
+            "passages": [
+                {
+                    "id": passage.id,
+                    "worksheet_id": passage.worksheet_id,
+                    **self._passage(passage),
+                    "created_at": passage.created_at,
+                }
+                for passage in self.passages
+            ],
+            "questions": [
+                {
+                    "id": question.id,
+                    "worksheet_id": question.worksheet_id,
+                    **self._question_base(question),
+                    "passage_id": question.passage_id,
+                    "correct_answer": question.correct_answer,
+                    "example_content": question.example_content,
+                    "example_original_content": question.example_original_content,
+                    "example_korean_translation": question.example_korean_translation,
+                    "explanation": question.explanation,
+                    "learning_point": question.learning_point,
+                    "created_at": question.created_at,
+                }
+                for question in self.questions
+            ],
+        }
+
+
+class SolveViewCache:
+    """풀이용 응답 JSON 캐시 (Redis 가 없으면 매번 DB 에서 생성)"""
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        self.redis_url = redis_url
+        self._redis = None
+        self._redis_disabled = not REDIS_AVAILABLE or SOLVE_VIEW_CACHE_DISABLED
+        self._redis_retry_at = 0.0
+        # 버전 갱신에 실패한 문제지 (반영될 때까지 캐시 읽지 않음)
+        self._pending_bumps = set()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+    def _get_redis(self):
+        if self._redis_disabled:
+            return None
+        if self._redis is None:
+            if time.time() < self._redis_retry_at:
+                return None
+            try:
+                client = redis.Redis.from_url(self.redis_url, socket_timeout=0.5)
+                client.ping()
+            except Exception as e:
+                self._redis_failed(e)
+                return None
+            self._redis = client
+            self._flush_pending_bumps(client)
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        print(f"⚠️ 풀이용 문제지 캐시 Redis 오류, {SOLVE_VIEW_REDIS_RETRY_SECONDS}초 동안 캐시 없이 동작: {str(e)}")
+        self._redis = None
+        self._redis_retry_at = time.time() + SOLVE_VIEW_REDIS_RETRY_SECONDS
+
+    def _flush_pending_bumps(self, client):
+        """재연결 후 실패했던 버전 갱신 다시 반영"""
+        with self._lock:
+            pending = list(self._pending_bumps)
+        for worksheet_id in pending:
+            try:
+                client.incr(WORKSHEET_VERSION_KEY.format(worksheet_id=worksheet_id))
+            except Exception as e:
+                self._redis_failed(e)
+                return
+            with self._lock:
+                self._pending_bumps.discard(worksheet_id)
+        if pending:
+            print(f"✅ 밀린 문제지 버전 갱신 반영: {len(pending)}개")
+
+    def get_json(self, db: Session, worksheet_id: int) -> Optional[bytes]:
+        """풀이용 응답 JSON (문제지가 없으면 None)"""
+        client = self._get_redis()
+        key = None
+        if client is not None and worksheet_id in self._pending_bumps:
+            # 버전 갱신이 반영되지 않아 이전 버전 캐시가 남아 있을 수 있음
+            self.stats["bypassed"] += 1
+            client = None
+        if client is not None:
+            try:
+                version = client.get(WORKSHEET_VERSION_KEY.format(worksheet_id=worksheet_id))
+                key = SOLVE_VIEW_KEY.format(worksheet_id=worksheet_id, version=int(version or 0))
+                cached = client.get(key)
+                if cached is not None:
+                    self.stats["hits"] += 1
+                    return cached
+            except Exception as e:
+                self._redis_failed(e)
+                key = None
+
+        self.stats["misses"] += 1
+        worksheet = load_worksheet(db, worksheet_id)
+        if worksheet is None:
+            return None
+        payload = json.dumps(WorksheetView(worksheet).solving_data(), ensure_ascii=False, default=str).encode("utf-8")
+
+        if key is not None:
+            try:
+                client.set(key, payload, ex=SOLVE_VIEW_CACHE_TTL)
+            except Exception as e:
+                self._redis_failed(e)
+        return payload
+
+    def bump_version(self, worksheet_id: int) -> bool:
+        if self._redis_disabled:
+            return False
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.incr(WORKSHEET_VERSION_KEY.format(worksheet_id=worksheet_id))
+                with self._lock:
+                    self._pending_bumps.discard(worksheet_id)
+                return True
+            except Exception as e:
+                print(f"⚠️ 문제지 버전 갱신 실패 ({worksheet_id}): {str(e)}")
+                self._redis_failed(e)
+        # 재연결 후 다시 갱신 (그 전까지 이 문제지는 캐시를 읽지 않음)
+        with self._lock:
+            self._pending_bumps.add(worksheet_id)
+        return False
+
+
+solve_view_cache = SolveViewCache()
+
+
+def bump_worksheet_version(*worksheet_ids: int) -> None:
+    """문제지 내용(지문/문제/제목) 변경·삭제 후 호출 - 캐시된 풀이용 응답 무효화"""
+    for worksheet_id in worksheet_ids:
+        solve_view_cache.bump_version(worksheet_id)
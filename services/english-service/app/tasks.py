@@ -1,9 +1,11 @@
+import asyncio
 from celery import current_task
 from sqlalchemy.orm import Session
 import json
 from datetime import datetime
-from typing import Dict, Any, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Any, List
+import threading
+from concurrent.futures import Future, as_completed
 
 from .celery_app import celery_app
 from .database import SessionLocal
@@ -12,10 +14,15 @@ from .schemas.generation import WorksheetGenerationRequest
 from .schemas.regeneration import RegenerateEnglishQuestionRequest
 from .schemas.validation import QuestionValidationResult
 from .services.generation.question_generator import PromptGenerator
+from .services.generation.passage_library import passage_library
+from .services.generation.question_scheduler import (
+    get_question_scheduler, PRIORITY_READING, PRIORITY_NORMAL
+)
 from .services.regeneration.question_regenerator import QuestionRegenerator
-from .services.validation.validator import QuestionValidator
 from .services.validation.judge import QuestionJudge
 from .core.validation_config import VALIDATION_SETTINGS
+from .services.ai.llm_gateway import get_llm_gateway
+from .services.ai.llm_cache import llm_response_cache
 
 try:
     import google.generativeai as genai
@@ -25,6 +32,9 @@ except ImportError:
 
 settings = get_settings()
 
+# 한 문제에서 동시에 검증 결과를 기다리는 후보 최대 수 (후보 k 검증 중 k+1 을 미리 생성 → 2)
+PIPELINE_DEPTH = 2
+
 
 def get_session():
     """데이터베이스 세션 생성"""
@@ -36,18 +46,18 @@ def call_gemini_for_question(prompt_info: Dict[str, Any]) -> Dict[str, Any]:
     try:
         question_id = prompt_info['question_id']
         needs_passage = prompt_info.get('needs_passage', False)
+        library_passage = prompt_info.get('library_passage')
         prompt = prompt_info['prompt']
 
-        if needs_passage:
+        if library_passage:
+            print(f"📚❓ 독해 문제 {question_id} (라이브러리 지문) 생성 시작...")
+        elif needs_passage:
             print(f"📚❓ 독해 문제 {question_id} (지문 포함) 생성 시작...")
         else:
             print(f"❓ 문제 {question_id} 생성 시작...")
 
-        # Gemini API 키 설정
-        genai.configure(api_key=settings.gemini_api_key)
-
-        # Gemini 모델 생성 (2.5 Flash 사용)
-        model = genai.GenerativeModel(settings.gemini_flash_model)
+        # Gemini 모델 (2.5 Flash) - 게이트웨이의 공용 클라이언트 재사용
+        model = get_llm_gateway().gemini_model(settings.gemini_flash_model)
 
         # API 호출
         response = model.generate_content(
@@ -57,6 +67,8 @@ def call_gemini_for_question(prompt_info: Dict[str, Any]) -> Dict[str, Any]:
 
         # JSON 파싱
         result = json.loads(response.text)
+        if library_passage:
+            result = attach_library_passage(result, library_passage)
 
         if needs_passage:
             print(f"✅ 독해 문제 {question_id} (지문 포함) 생성 완료!")
@@ -70,27 +82,57 @@ def call_gemini_for_question(prompt_info: Dict[str, Any]) -> Dict[str, Any]:
         raise Exception(f"문제 {prompt_info['question_id']} 생성 실패: {str(e)}")
 
 
+def attach_library_passage(result: Dict[str, Any], library_passage: Dict[str, Any]) -> Dict[str, Any]:
+    """문제만 생성한 응답에 라이브러리 지문을 붙여 지문 포함 독해 문제와 같은 형태로 변환"""
+    question = result.get('question', result)
+    question['question_passage_id'] = library_passage['passage_id']
+    return {
+        'passage': {
+            'passage_id': library_passage['passage_id'],
+            'passage_type': library_passage['passage_type'],
+            # 빈칸/밑줄 표시가 필요한 유형이면 모델이 표시한 지문, 아니면 원본 그대로
+            'passage_content': result.get('passage_content') or library_passage['passage_content'],
+            'original_content': library_passage['original_content'],
+            'korean_translation': library_passage['korean_translation'],
+        },
+        'question': question
+    }
+
+
+def _is_valid_judge_response(text: str) -> bool:
+    """캐시 저장 전 AI Judge 응답이 스키마에 맞는지 확인"""
+    try:
+        QuestionValidationResult.model_validate(json.loads(text))
+        return True
+    except Exception:
+        return False
+
+
 def call_gemini_for_validation(prompt: str) -> QuestionValidationResult:
     """문제 검증을 위한 Gemini API 호출 (AI Judge)"""
     try:
         print(f"🔍 AI Judge 검증 시작...")
 
-        # Gemini API 키 설정
-        genai.configure(api_key=settings.gemini_api_key)
+        # Gemini 모델 (Pro 모델 사용 - 검증은 더 정확한 모델 사용)
+        model = get_llm_gateway().gemini_model(settings.gemini_model)
 
-        # Gemini 모델 생성 (Pro 모델 사용 - 검증은 더 정확한 모델 사용)
-        model = genai.GenerativeModel(settings.gemini_model)
+        # 판정은 낮은 온도로 고정하여 같은 문항에 대한 결과를 캐시에서 재사용
+        judge_config = {
+            "response_mime_type": "application/json",
+            "temperature": 0.1
+        }
 
         # API 호출 (response_schema 없이 프롬프트만 사용)
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "response_mime_type": "application/json"
-            }
+        response_text = llm_response_cache.cached_call(
+            "english_ai_judge", settings.gemini_model, prompt,
+            lambda: model.generate_content(prompt, generation_config=judge_config).text,
+            config=judge_config,
+            temperature=judge_config["temperature"],
+            validate=_is_valid_judge_response
         )
 
         # JSON 파싱 및 Pydantic 변환
-        result_dict = json.loads(response.text)
+        result_dict = json.loads(response_text)
         validation_result = QuestionValidationResult.model_validate(result_dict)
 
         print(f"✅ AI Judge 검증 완료: {validation_result.final_judgment} ({validation_result.total_score}/100)")
@@ -102,6 +144,139 @@ def call_gemini_for_validation(prompt: str) -> QuestionValidationResult:
         raise Exception(f"AI Judge 검증 실패: {str(e)}")
 
 
+class _PipelinedValidation:
+    """문제 하나의 생성 → AI Judge 파이프라인 상태
+
+    별도 조정 스레드 없이 스케줄러 Future 완료 콜백에서 다음 단계로 진행
+    (콜백은 호출을 끝낸 스케줄러 워커 스레드에서 실행되므로 스레드 수는 문제 수와 무관)
+    """
+
+    def __init__(self, prompt_info: Dict[str, Any], metadata: Dict[str, Any],
+                 max_candidates: int, submit: Callable[..., Future]):
+        self.prompt_info = prompt_info
+        self.question_id = prompt_info['question_id']
+        self.metadata = metadata
+        self.max_candidates = max_candidates
+        self.submit = submit
+        self.judge = QuestionJudge()
+        self.result = Future()
+
+        # 취소/즉시 완료된 Future 는 add_done_callback 시점에 같은 스레드에서 콜백을 부르므로 재진입 가능한 락 사용
+        self._lock = threading.RLock()
+        self._finished = False
+        self.generated = 0
+        self.generating = None
+        self.judging = {}  # 검증 Future → (후보 번호, 문제 데이터)
+        self.best_question, self.best_validation, self.best_score = None, None, -1
+        self.last_error = None
+
+    def start(self) -> Future:
+        self.result.set_running_or_notify_cancel()
+        with self._lock:
+            self._advance()
+        return self.result
+
+    def _start_next_candidate(self):
+        if self.generating is None and self.generated < self.max_candidates and len(self.judging) < PIPELINE_DEPTH:
+            self.generated += 1
+            self.generating = self.submit(call_gemini_for_question, self.prompt_info)
+            self.generating.add_done_callback(self._on_generated)
+
+    def _advance(self):
+        """다음 후보 생성을 시작하고, 더 기다릴 호출이 없으면 결과 확정"""
+        try:
+            self._start_next_candidate()
+        except Exception as e:
+            # 워크시트 작업 묶음이 이미 종료된 경우 (다른 문제 실패 등)
+            self._finish(exception=e)
+            return
+
+        if self.generating is None and not self.judging:
+            if self.best_question is None:
+                self._finish(exception=self.last_error or Exception(f"문제 {self.question_id} 생성 실패"))
+                return
+
+            # 최대 시도 후 최고 점수 문제 사용
+            print(f"⚠️ 문제 {self.question_id}: 최대 재시도 도달. 최고 점수 버전 사용 (score {self.best_score}/100)")
+            self._finish(value=(self.best_question, self.best_validation))
+
+    def _on_generated(self, future: Future):
+        with self._lock:
+            if self._finished or future is not self.generating:
+                return
+            self.generating = None
+            attempt = self.generated
+            try:
+                question_data = future.result()
+                judge_prompt = self.judge.create_judge_prompt(question_data, self.metadata)
+                judge_future = self.submit(call_gemini_for_validation, judge_prompt)
+                self.judging[judge_future] = (attempt, question_data)
+                judge_future.add_done_callback(self._on_judged)
+            except Exception as e:
+                self.last_error = e
+                print(f"❌ 문제 {self.question_id} 후보 {attempt} 생성 실패: {str(e)}")
+            if not self._finished:
+                self._advance()
+
+    def _on_judged(self, future: Future):
+        with self._lock:
+            if self._finished or future not in self.judging:
+                return
+            attempt, question_data = self.judging.pop(future)
+            try:
+                validation_result = future.result()
+            except Exception as e:
+                self.last_error = e
+                print(f"❌ 문제 {self.question_id} 검증 중 오류 (attempt {attempt}): {str(e)}")
+                self._advance()
+                return
+
+            # 최고 점수 추적
+            if validation_result.total_score > self.best_score:
+                self.best_score = validation_result.total_score
+                self.best_question = question_data
+                self.best_validation = validation_result
+
+            # Pass 판정이면 바로 사용
+            if validation_result.final_judgment == "Pass":
+                print(f"✅ 문제 {self.question_id}: Pass 판정 (attempt {attempt}, score {validation_result.total_score}/100)")
+                self._finish(value=(question_data, validation_result))
+                return
+
+            # 재시도 필요
+            print(f"⚠️ 문제 {self.question_id}: {validation_result.final_judgment} (attempt {attempt}, score {validation_result.total_score}/100)")
+            self._advance()
+
+    def _finish(self, value: tuple = None, exception: BaseException = None):
+        if self._finished:
+            return
+        self._finished = True
+
+        # Pass 후 남은 후보: 시작 전이면 취소, 이미 진행 중이면 결과를 버림
+        outstanding = list(self.judging) + ([self.generating] if self.generating is not None else [])
+        self.judging.clear()
+        self.generating = None
+        cancelled = sum(1 for future in outstanding if future.cancel())
+        if outstanding:
+            print(f"🗑️ 문제 {self.question_id}: 남은 후보 {len(outstanding)}개 정리 (취소 {cancelled}개)")
+
+        if exception is not None:
+            self.result.set_exception(exception)
+        else:
+            self.result.set_result(value)
+
+
+def generate_with_pipelined_validation(prompt_info: Dict[str, Any], metadata: Dict[str, Any],
+                                       max_candidates: int, submit: Callable[..., Future]) -> Future:
+    """생성 → AI Judge 2단계 파이프라인 시작 → (문제 데이터, 검증 결과) Future
+
+    후보 k를 검증하는 동안 후보 k+1 생성을 미리 시작 (검증 대기 후보는 최대 PIPELINE_DEPTH개)
+    처음 Pass 판정을 받은 후보를 채택하고 남은 후보는 취소, 끝까지 Pass가 없으면 최고 점수 후보 사용
+    submit(fn, *args): 생성/검증 호출을 문제 생성 스케줄러에 등록 (독해 우선·워크시트 간 공정 분배 적용)
+    """
+    return _PipelinedValidation(prompt_info, metadata, max_candidates, submit).start()
+
+
 def generate_questions_parallel(question_prompts: List[Dict[str, Any]], enable_validation: bool = False) -> Dict[str, Any]:
     """
     문제들을 병렬로 생성 (독해는 지문 포함)
@@ -118,70 +293,30 @@ def generate_questions_parallel(question_prompts: List[Dict[str, Any]], enable_v
     results = []
     validation_results = []
 
-    def generate_with_validation(prompt_info: Dict[str, Any]) -> tuple:
-        """단일 문제 생성 + 검증"""
-        question_id = prompt_info['question_id']
-        metadata = prompt_info.get('metadata', {})
-
-        if not enable_validation:
-            # 검증 없이 바로 생성
-            question_data = call_gemini_for_question(prompt_info)
-            return question_data, None
+    def generate_without_validation(prompt_info: Dict[str, Any]) -> tuple:
+        """단일 문제 생성 (검증 없음)"""
+        return call_gemini_for_question(prompt_info), None
 
-        # 검증 포함 생성
-        validator = QuestionValidator(
-            max_retries=VALIDATION_SETTINGS['max_retries']
-        )
-        judge = QuestionJudge()
-
-        best_question = None
-        best_validation = None
-        best_score = -1
-
-        for attempt in range(1, VALIDATION_SETTINGS['max_retries'] + 1):
-            try:
-                # 문제 생성
-                question_data = call_gemini_for_question(prompt_info)
-
-                # 검증 프롬프트 생성
-                judge_prompt = judge.create_judge_prompt(question_data, metadata)
-
-                # AI Judge 검증
-                validation_result = call_gemini_for_validation(judge_prompt)
-
-                # 최고 점수 추적
-                if validation_result.total_score > best_score:
-                    best_score = validation_result.total_score
-                    best_question = question_data
-                    best_validation = validation_result
-
-                # Pass 판정이면 바로 사용
-                if validation_result.final_judgment == "Pass":
-                    print(f"✅ 문제 {question_id}: Pass 판정 (attempt {attempt}, score {validation_result.total_score}/100)")
-                    return question_data, validation_result
-
-                # 재시도 필요
-                print(f"⚠️ 문제 {question_id}: {validation_result.final_judgment} (attempt {attempt}, score {validation_result.total_score}/100)")
-
-            except Exception as e:
-                print(f"❌ 문제 {question_id} 검증 중 오류 (attempt {attempt}): {str(e)}")
-                if attempt >= VALIDATION_SETTINGS['max_retries']:
-                    # 최대 시도 도달 - 최고 점수 문제 사용
-                    if best_question:
-                        print(f"⚠️ 문제 {question_id}: 최고 점수 버전 사용 (score {best_score}/100)")
-                        return best_question, best_validation
-                    raise
-
-        # 최대 시도 후 최고 점수 문제 사용
-        print(f"⚠️ 문제 {question_id}: 최대 재시도 도달. 최고 점수 버전 사용 (score {best_score}/100)")
-        return best_question, best_validation
-
-    # ThreadPoolExecutor로 병렬 처리
-    with ThreadPoolExecutor(max_workers=len(question_prompts)) as executor:
-        future_to_prompt = {
-            executor.submit(generate_with_validation, prompt): prompt
-            for prompt in question_prompts
-        }
+    # 모든 Gemini 호출은 워커 프로세스 전역 스케줄러로 처리 (스레드 수 고정, 독해 문제 우선, 동시 워크시트 간 공정 분배)
+    # 검증 포함 시 문제별 파이프라인은 스케줄러 Future 완료 콜백으로 진행 (문제 수만큼 조정 스레드를 만들지 않음)
+    scheduler = get_question_scheduler()
+    job_id = scheduler.open_job(f"worksheet-{len(question_prompts)}q")
+    try:
+        future_to_prompt = {}
+        for prompt in question_prompts:
+            priority = PRIORITY_READING if prompt.get('needs_passage') else PRIORITY_NORMAL
+            if not enable_validation:
+                future = scheduler.submit(job_id, generate_without_validation, prompt, priority=priority)
+            else:
+                # 검증 포함 생성 (다음 후보 생성과 이전 후보 검증을 겹쳐 실행)
+                def submit(fn, *args, _priority=priority):
+                    return scheduler.submit(job_id, fn, *args, priority=_priority)
+
+                future = generate_with_pipelined_validation(
+                    prompt, prompt.get('metadata', {}),
+                    VALIDATION_SETTINGS['max_retries'], submit
+                )
+            future_to_prompt[future] = prompt
 
         # 완료되는 순서대로 결과 수집
         for future in as_completed(future_to_prompt):
@@ -194,6 +329,9 @@ def generate_questions_parallel(question_prompts: List[Dict[str, Any]], enable_v
                 prompt_info = future_to_prompt[future]
                 print(f"❌ 문제 {prompt_info['question_id']} 처리 실패: {str(e)}")
                 raise
+    finally:
+        # 실패 시 아직 시작하지 않은 호출은 취소 (파이프라인은 취소 콜백에서 실패로 종료)
+        scheduler.close_job(job_id)
 
     # question_id 순서로 정렬
     results.sort(key=lambda x: x.get('question', x).get('question_id'))
@@ -382,6 +520,15 @@ def generate_english_worksheet_task(self, request_data: dict):
             parsed_llm_response = json.loads(llm_response)
             print("✅ 워크시트 조립 및 파싱 완료!")
 
+            # 워크시트에 채택된 라이브러리 지문만 사용 횟수 갱신
+            library_ids = [p['library_passage']['library_id'] for p in question_prompts if p.get('library_passage')]
+            if library_ids:
+                try:
+                    passage_library.mark_used(db, library_ids)
+                except Exception as mark_error:
+                    db.rollback()
+                    print(f"⚠️ 지문 라이브러리 사용 횟수 갱신 실패: {mark_error}")
+
         except Exception as e:
             print(f"❌ 워크시트 조립 오류: {e}")
             db.close()
@@ -426,6 +573,70 @@ def generate_english_worksheet_task(self, request_data: dict):
         raise Exception(f"영어 워크시트 생성 중 오류: {str(e)}")
 
 
+@celery_app.task(bind=True, name="app.tasks.grade_english_submission_task")
+def grade_english_submission_task(self, worksheet_id: int, student_id: int, answers: Dict[str, str],
+                                  completion_time: int = 0, assignment_id: int = None):
+    """답안 채점 비동기 태스크 (english_grading 큐) - 완료 시 학생/선생님에게 알림"""
+    from .models.assignment import Assignment, AssignmentDeployment
+    from .services.grading.grading_service import GradingService
+    from .services.grading.grading_notifier import notify_grading_result
+
+    task_id = self.request.id
+    print(f"📝 English grading task started: {task_id} (worksheet={worksheet_id}, student={student_id})")
+
+    db = get_session()
+    teacher_id = None
+    try:
+        current_task.update_state(
+            state='PROGRESS',
+            meta={'current': 10, 'total': 100, 'status': '채점 중...'}
+        )
+
+        assignment = None
+        if assignment_id:
+            assignment = db.query(Assignment).filter(Assignment.id == assignment_id).first()
+            teacher_id = assignment.teacher_id if assignment else None
+
+        # JSON 직렬화로 문자열이 된 question_id 키 복원
+        result = asyncio.run(GradingService(db).grade_worksheet(
+            worksheet_id=worksheet_id,
+            student_id=student_id,
+            answers={int(question_id): answer for question_id, answer in answers.items()},
+            completion_time=completion_time
+        ))
+
+        # 과제 배포 상태 업데이트 (채점 완료)
+        if assignment is not None:
+            deployment = db.query(AssignmentDeployment).filter(
+                AssignmentDeployment.assignment_id == assignment_id,
+                AssignmentDeployment.student_id == student_id
+            ).first()
+            if deployment:
+                deployment.status = "completed"
+                db.commit()
+
+        if result.get("created_at") is not None:
+            result["created_at"] = result["created_at"].isoformat()
+
+        notify_grading_result(worksheet_id, student_id, task_id, result, assignment_id, teacher_id)
+        print(f"✅ English grading task completed: {task_id} ({result['total_score']}/{result['max_score']})")
+
+        return {
+            "status": "success",
+            "worksheet_id": worksheet_id,
+            "assignment_id": assignment_id,
+            "grading_result": result
+        }
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 영어 답안 채점 실패: {str(e)}")
+        notify_grading_result(worksheet_id, student_id, task_id, None, assignment_id, teacher_id, error=str(e))
+        raise Exception(f"영어 답안 채점 중 오류: {str(e)}")
+    finally:
+        db.close()
+
+
 @celery_app.task(bind=True, name="app.tasks.get_task_status")
 def get_task_status(self, task_id: str):
     """태스크 상태 조회"""
@@ -287,6 +287,10 @@ def init_all_data():
         init_words(db)
         init_reading_types(db)
         init_text_types(db)
+
+        # 실행 중인 서비스 프로세스들이 분류 체계 스냅샷을 다시 로드하도록
+        from app.services.generation.taxonomy_snapshot import bump_taxonomy_version
+        bump_taxonomy_version()
         
         print("\n" + "="*80)
         print("✨ 모든 초기 데이터 생성이 완료되었습니다!")
@@ -1,5 +1,5 @@
 from celery import Celery
-from celery.signals import after_setup_logger
+from celery.signals import after_setup_logger, worker_init
 import os
 import logging
 from dotenv import load_dotenv
@@ -30,6 +30,15 @@ def setup_loggers(logger, *args, **kwargs):
     logger.addHandler(console_handler)
     logger.setLevel(logging.INFO)
 
+@worker_init.connect
+def preload_literature_corpus(**kwargs):
+    """워커 프로세스를 fork 하기 전에 국어 코퍼스 색인/mmap 로드 (자식 프로세스가 그대로 공유)"""
+    try:
+        from app.services.literature_corpus import literature_corpus
+        literature_corpus.load()
+    except Exception as e:
+        print(f"⚠️ 국어 코퍼스 미리 로드 실패 (첫 조회 때 다시 시도): {str(e)}")
+
 # Celery 설정
 celery_app.conf.update(
     task_serializer="json",
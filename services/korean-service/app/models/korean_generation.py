@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -31,7 +31,10 @@ class Assignment(Base):
 class AssignmentDeployment(Base):
     """국어 과제 배포 모델"""
     __tablename__ = "korean_assignment_deployments"
-    __table_args__ = {"schema": "korean_service"}
+    __table_args__ = (
+        UniqueConstraint("assignment_id", "student_id", name="uq_korean_assignment_deployments_assignment_student"),
+        {"schema": "korean_service"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     assignment_id = Column(Integer, ForeignKey("korean_service.korean_assignments.id"), nullable=False)
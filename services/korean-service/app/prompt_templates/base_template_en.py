@@ -1,6 +1,9 @@
 """
 English-based prompt templates for Korean language problem generation
 Designed with Korean language teacher perspective
+
+Prompts are built as a static prefix (system instruction, type guidelines, output format)
+shared per (problem type, difficulty) plus a small per-request suffix (see prompt_cache)
 """
 
 from typing import Dict, Optional
@@ -175,6 +178,17 @@ Key Grammar Areas:
 
 **Remember:** Write ALL content in Korean, including the question, all 4 choices, and explanation."""
 
+    def get_type_specific_guidelines(self, korean_type: str) -> str:
+        """Guidelines for the given Korean problem type"""
+        guidelines = {
+            '시': self.get_poetry_guidelines,
+            '소설': self.get_novel_guidelines,
+            '수필/비문학': self.get_nonfiction_guidelines,
+            '문법': self.get_grammar_guidelines,
+        }
+        builder = guidelines.get(korean_type)
+        return builder() if builder else ""
+
     def get_output_format_instruction(self, korean_type: str) -> str:
         """JSON output format with detailed instructions"""
 
@@ -4,6 +4,7 @@ English-based multiple problems generation template
 
 from typing import Dict, List
 from .base_template_en import EnglishKoreanPromptTemplate
+from ..services.prompt_cache import CompiledPrompt, static_prefix
 
 
 class MultipleProblemEnglishTemplate(EnglishKoreanPromptTemplate):
@@ -11,14 +12,17 @@ class MultipleProblemEnglishTemplate(EnglishKoreanPromptTemplate):
 
     def generate_prompt(self, source_text: str, source_info: Dict, korean_type: str,
                        count: int, question_types: List[str], difficulties: List[str],
-                       user_prompt: str, korean_data: Dict) -> str:
+                       user_prompt: str, korean_data: Dict) -> CompiledPrompt:
         """Generate enhanced English prompt for multiple Korean problems"""
 
-        # System instruction
-        prompt = self.get_system_instruction(korean_type)
-        prompt += "\n\n"
+        # Static prefix: system instruction, type guidelines, output format, checklist
+        prefix = static_prefix(
+            ("korean", "multiple", korean_type),
+            lambda: self._build_static_prefix(korean_type)
+        )
 
         # Problem specifications
+        prompt = "\n\n---\n\n## Your Task\n"
         prompt += self.get_base_requirements(korean_data, difficulties[0] if difficulties else '중', user_prompt)
 
         # Source text presentation
@@ -56,39 +60,37 @@ Author: {source_info.get('author', 'Unknown')}
             diff_info = self.difficulty_levels.get(difficulty, self.difficulty_levels['중'])
             prompt += f"- Problem {i+1}: {diff_info['en']} level - {diff_info['description']}\n"
 
-        prompt += "\n"
+        prompt += "\n**OUTPUT REMINDER:** Respond with ONLY the JSON object, no additional text.\n"
+
+        return CompiledPrompt(prefix, prompt)
+
+    def _build_static_prefix(self, korean_type: str) -> str:
+        """Request-independent part of the prompt (built once per problem type)"""
+        prompt = self.get_system_instruction(korean_type)
+        prompt += "\n\n"
 
         # Type-specific guidelines
-        if korean_type == '시':
-            prompt += self.get_poetry_guidelines()
-        elif korean_type == '소설':
-            prompt += self.get_novel_guidelines()
-        elif korean_type == '수필/비문학':
-            prompt += self.get_nonfiction_guidelines()
-        elif korean_type == '문법':
-            prompt += self.get_grammar_guidelines()
+        prompt += self.get_type_specific_guidelines(korean_type)
 
         # Output format for multiple problems
-        prompt += self._get_multiple_output_format(count, source_info, korean_type)
+        prompt += self._get_multiple_output_format(korean_type)
 
         # Quality checklist
         prompt += self.get_quality_checklist()
 
         return prompt
 
-    def _get_multiple_output_format(self, count: int, source_info: Dict, korean_type: str) -> str:
+    def _get_multiple_output_format(self, korean_type: str) -> str:
         """Output format for multiple problems"""
 
-        example = self._get_example_question(korean_type)
-
-        return f"""
+        return """
 
 **REQUIRED JSON OUTPUT FORMAT:**
 
 ```json
-{{
+{
     "problems": [
-        {{
+        {
             "question": "문제 1 내용 (in Korean)",
             "choices": [
                 "선택지 1 (in Korean)",
@@ -98,8 +100,8 @@ Author: {source_info.get('author', 'Unknown')}
             ],
             "correct_answer": "A",
             "explanation": "해설 1 (in Korean)"
-        }},
-        {{
+        },
+        {
             "question": "문제 2 내용 (in Korean)",
             "choices": [
                 "선택지 1 (in Korean)",
@@ -109,15 +111,15 @@ Author: {source_info.get('author', 'Unknown')}
             ],
             "correct_answer": "B",
             "explanation": "해설 2 (in Korean)"
-        }}
-        // ... continue for all {count} problems
+        }
+        // ... continue for all requested problems
     ]
-}}
+}
 ```
 
 **CRITICAL REQUIREMENTS:**
 1. Output ONLY valid JSON - no markdown, no explanatory text
-2. Create EXACTLY {count} problems
+2. Create EXACTLY the number of problems given in **Problem Set Requirements**
 3. ALL content (questions, choices, explanations) MUST be in KOREAN
 4. Each problem must have exactly 4 distinct choices
 5. correct_answer must be "A", "B", "C", or "D" (corresponding to choice position)
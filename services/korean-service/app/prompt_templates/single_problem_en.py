@@ -4,6 +4,7 @@ English-based single problem template for Korean language problem generation
 
 from typing import Dict
 from .base_template_en import EnglishKoreanPromptTemplate
+from ..services.prompt_cache import CompiledPrompt, static_prefix
 
 
 class SingleProblemEnglishTemplate(EnglishKoreanPromptTemplate):
@@ -11,11 +12,14 @@ class SingleProblemEnglishTemplate(EnglishKoreanPromptTemplate):
 
     def generate_prompt(self, source_text: str, korean_type: str,
                        question_type: str, difficulty: str,
-                       user_prompt: str, korean_data: Dict) -> str:
+                       user_prompt: str, korean_data: Dict) -> CompiledPrompt:
         """Generate prompt for single problem creation"""
 
-        system_instruction = self.get_system_instruction(korean_type)
-        type_guidelines = self.get_type_specific_guidelines(korean_type)
+        # Static prefix: system instruction, type guidelines, output format, checklist
+        prefix = static_prefix(
+            ("korean", "single", korean_type, difficulty),
+            lambda: self._build_static_prefix(korean_type, difficulty)
+        )
 
         difficulty_info = self.difficulty_levels.get(difficulty, self.difficulty_levels['중'])
         type_en = self.korean_types.get(korean_type, 'Korean Language')
@@ -25,10 +29,7 @@ class SingleProblemEnglishTemplate(EnglishKoreanPromptTemplate):
         if user_prompt and user_prompt.strip():
             user_requirements = f"\n**Special User Requirements:**\n{user_prompt}\n"
 
-        prompt = f"""{system_instruction}
-
-{type_guidelines}
-
+        suffix = f"""
 ---
 
 ## Your Task
@@ -50,6 +51,25 @@ Create **ONE (1) high-quality Korean language problem** based on the provided te
 
 ---
 
+Generate the problem now:
+"""
+
+        return CompiledPrompt(prefix, suffix)
+
+    def _build_static_prefix(self, korean_type: str, difficulty: str) -> str:
+        """Request-independent part of the prompt (built once per problem type and difficulty)"""
+
+        system_instruction = self.get_system_instruction(korean_type)
+        type_guidelines = self.get_type_specific_guidelines(korean_type)
+
+        difficulty_info = self.difficulty_levels.get(difficulty, self.difficulty_levels['중'])
+
+        return f"""{system_instruction}
+
+{type_guidelines}
+
+---
+
 ## Output Format
 
 Return ONLY valid JSON (no markdown, no code blocks):
@@ -78,8 +98,4 @@ Before submitting, verify:
 - ✓ Appropriate difficulty level for {difficulty_info['en']} students
 - ✓ ALL text content is in KOREAN language
 - ✓ Professional, educational tone
-
-Generate the problem now:
 """
-
-        return prompt
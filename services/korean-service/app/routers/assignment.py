@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Body
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from typing import List, Dict, Any
 import json
 from datetime import datetime
 
 from ..database import get_db
-from ..schemas.korean_generation import AssignmentDeployRequest, AssignmentDeploymentResponse, StudentAssignmentResponse
+from ..schemas.korean_generation import AssignmentDeployRequest, BulkAssignmentDeployRequest, AssignmentDeploymentResponse, StudentAssignmentResponse
 from ..models.worksheet import Worksheet
 from ..models.problem import Problem
 from ..models.korean_generation import Assignment, AssignmentDeployment
 from ..models.grading_result import KoreanGradingSession, KoreanProblemGradingResult
+from ..services.assignment_deploy import resolve_assignments, deploy_students, notify_assignment_deployed
+from ..services.grading_service import grade_answers
 
 router = APIRouter()
 
@@ -58,6 +62,7 @@ async def create_assignment(
 @router.post("/deploy", response_model=List[AssignmentDeploymentResponse])
 async def deploy_assignment(
     deploy_request: AssignmentDeployRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     # 먼저 assignment_id로 Assignment를 찾기
@@ -73,26 +78,80 @@ async def deploy_assignment(
     # assignment 상태를 deployed로 변경
     assignment.is_deployed = "deployed"
 
-    deployments = []
-    for student_id in deploy_request.student_ids:
-        existing_deployment = db.query(AssignmentDeployment).filter(
-            AssignmentDeployment.assignment_id == assignment.id,
-            AssignmentDeployment.student_id == student_id
-        ).first()
-        if not existing_deployment:
-            deployment = AssignmentDeployment(
-                assignment_id=assignment.id,
-                student_id=student_id,
-                classroom_id=deploy_request.classroom_id,
-                status="assigned"
-            )
-            db.add(deployment)
-            deployments.append(deployment)
-        else:
-            deployments.append(existing_deployment)
-
+    # 기존 배포 조회 1회 + 다중 행 INSERT 1회
+    deployments, new_students = deploy_students(
+        db, [(assignment, deploy_request.classroom_id, deploy_request.student_ids)]
+    )
+    response = [AssignmentDeploymentResponse.from_orm(d) for d in deployments]
     db.commit()
-    return [AssignmentDeploymentResponse.from_orm(d) for d in deployments]
+
+    background_tasks.add_task(notify_assignment_deployed, [{
+        "assignment_id": assignment.id,
+        "title": assignment.title,
+        "classroom_id": deploy_request.classroom_id,
+        "student_ids": new_students.get(assignment.id, [])
+    }], assignment.teacher_id)
+    return response
+
+@router.post("/deploy-bulk")
+async def deploy_assignments_bulk(
+    deploy_request: BulkAssignmentDeployRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """여러 과제를 여러 클래스룸에 일괄 배포 (클래스룸에 과제가 없으면 원본 과제를 복사해 생성)"""
+    sources = db.query(Assignment).filter(Assignment.id.in_(deploy_request.assignment_ids)).all()
+    missing_ids = set(deploy_request.assignment_ids) - {source.id for source in sources}
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"Assignment not found: {sorted(missing_ids)}")
+
+    try:
+        assignments = resolve_assignments(
+            db, sources, [classroom.classroom_id for classroom in deploy_request.classrooms]
+        )
+        targets = [
+            (assignments[(source.worksheet_id, classroom.classroom_id)], classroom.classroom_id, classroom.student_ids)
+            for source in sources
+            for classroom in deploy_request.classrooms
+        ]
+        deployments, new_students = deploy_students(db, targets)
+
+        results = [
+            {
+                "assignment_id": assignment.id,
+                "worksheet_id": assignment.worksheet_id,
+                "classroom_id": classroom_id,
+                "title": assignment.title,
+                "deployed_count": len(new_students.get(assignment.id, [])),
+                "total_students": len(set(student_ids))
+            }
+            for assignment, classroom_id, student_ids in targets
+        ]
+        teacher_id = sources[0].teacher_id if sources else None
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 과제 일괄 배포 실패: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Bulk deploy failed: {str(e)}")
+
+    background_tasks.add_task(notify_assignment_deployed, [
+        {
+            "assignment_id": result["assignment_id"],
+            "title": result["title"],
+            "classroom_id": result["classroom_id"],
+            "student_ids": new_students.get(result["assignment_id"], [])
+        }
+        for result in results
+    ], teacher_id)
+
+    deployed_count = sum(result["deployed_count"] for result in results)
+    return {
+        "success": True,
+        "message": f"Deployed {len(results)} assignments ({deployed_count} new deployments)",
+        "assignments": results,
+        "deployed_count": deployed_count,
+        "total_deployments": len(deployments)
+    }
 
 @router.get("/student/{student_id}", response_model=List[StudentAssignmentResponse])
 async def get_student_assignments(
@@ -188,7 +247,6 @@ async def submit_korean_assignment(
         raise HTTPException(status_code=404, detail="Assignment not found")
 
     problems = db.query(Problem).filter(Problem.worksheet_id == assignment.worksheet_id).all()
-    problem_map = {str(p.id): p for p in problems}
 
     total_problems = len(problems)
     if total_problems == 0:
@@ -203,7 +261,6 @@ async def submit_korean_assignment(
         )
 
     points_per_problem = 10 if total_problems <= 10 else 5
-    correct_count = 0
 
     grading_session = KoreanGradingSession(
         worksheet_id=assignment.worksheet_id,
@@ -217,31 +274,47 @@ async def submit_korean_assignment(
     db.add(grading_session)
     db.flush()
 
-    for problem_id_str, student_answer in answers.items():
-        problem = problem_map.get(problem_id_str)
-        if not problem:
-            continue
-
-        is_correct = student_answer == problem.correct_answer
-        if is_correct:
-            correct_count += 1
-
-        problem_result = KoreanProblemGradingResult(
-            grading_session_id=grading_session.id,
-            problem_id=int(problem_id_str),
-            user_answer=student_answer,
-            correct_answer=problem.correct_answer,
-            is_correct=is_correct,
-            score=points_per_problem if is_correct else 0,
-            points_per_problem=points_per_problem,
-            problem_type=problem.problem_type,
-            input_method="manual",
-            explanation=problem.explanation
-        )
-        db.add(problem_result)
-
+    # 제출 답안을 문제 순서대로 모아 일괄 채점 (객관식은 바로 비교, 서술형만 동시에 AI 채점)
+    answered = [(problem, str(answers[str(problem.id)] or "")) for problem in problems if str(problem.id) in answers]
+    items = [
+        {
+            "question": problem.question,
+            "correct_answer": problem.correct_answer,
+            "student_answer": student_answer,
+            "explanation": problem.explanation,
+            "question_type": problem.problem_type.value if hasattr(problem.problem_type, 'value') else str(problem.problem_type)
+        }
+        for problem, student_answer in answered
+    ]
+    grading_results = await run_in_threadpool(grade_answers, items)
+
+    # 채점 결과 저장 (다중 행 INSERT 1회, 서술형 부분 점수는 배점에 비례)
+    rows = [
+        {
+            "grading_session_id": grading_session.id,
+            "problem_id": problem.id,
+            "user_answer": item["student_answer"],
+            "correct_answer": problem.correct_answer,
+            "is_correct": bool(grading_result['is_correct']),
+            "score": points_per_problem * float(grading_result['score']) / 100,
+            "points_per_problem": points_per_problem,
+            "problem_type": item["question_type"],
+            "input_method": "manual",
+            "ai_score": grading_result.get('score'),
+            "ai_feedback": grading_result.get('ai_feedback', ''),
+            "strengths": grading_result.get('strengths', ''),
+            "improvements": grading_result.get('improvements', ''),
+            "keyword_score_ratio": grading_result.get('keyword_score_ratio', 0.0),
+            "explanation": problem.explanation
+        }
+        for (problem, _), item, grading_result in zip(answered, items, grading_results)
+    ]
+    if rows:
+        db.execute(insert(KoreanProblemGradingResult), rows)
+
+    correct_count = sum(1 for row in rows if row["is_correct"])
     grading_session.correct_count = correct_count
-    grading_session.total_score = correct_count * points_per_problem
+    grading_session.total_score = sum(row["score"] for row in rows)
     
     # Update deployment status to completed
     deployment = db.query(AssignmentDeployment).filter(
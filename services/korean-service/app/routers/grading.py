@@ -116,17 +116,26 @@ async def update_grading_session(
         session.teacher_id = current_teacher["id"]
         session.approved_at = datetime.now()
 
+        # 세션의 문제별 결과는 한 번만 조회해 메모리에서 수정
+        needs_results = "problem_corrections" in update_data or "updated_correct_answers" in update_data
+        results_by_problem = {}
+        if needs_results:
+            from ..models.grading_result import KoreanProblemGradingResult
+            results_by_problem = {
+                problem_result.problem_id: problem_result
+                for problem_result in db.query(KoreanProblemGradingResult).filter(
+                    KoreanProblemGradingResult.grading_session_id == session_id
+                ).all()
+            }
+
         # 문제별 정답/오답 수정사항 적용
         if "problem_corrections" in update_data:
-            from ..models.grading_result import KoreanProblemGradingResult
             corrections = update_data["problem_corrections"]
+            new_results = []
 
             for problem_id_str, is_correct in corrections.items():
                 problem_id = int(problem_id_str)
-                problem_result = db.query(KoreanProblemGradingResult).filter(
-                    KoreanProblemGradingResult.grading_session_id == session_id,
-                    KoreanProblemGradingResult.problem_id == problem_id
-                ).first()
+                problem_result = results_by_problem.get(problem_id)
 
                 if problem_result:
                     problem_result.is_correct = is_correct
@@ -163,19 +172,19 @@ async def update_grading_session(
                         problem_type="객관식",
                         input_method="manual"
                     )
-                    db.add(new_result)
+                    results_by_problem[problem_id] = new_result
+                    new_results.append(new_result)
+
+            if new_results:
+                db.add_all(new_results)
 
         # 업데이트된 정답들 처리 (선생님이 정답처리한 경우 학생 답안을 정답으로 설정)
         if "updated_correct_answers" in update_data:
-            from ..models.grading_result import KoreanProblemGradingResult
             updated_answers = update_data["updated_correct_answers"]
 
             for problem_id_str, new_correct_answer in updated_answers.items():
                 problem_id = int(problem_id_str)
-                problem_result = db.query(KoreanProblemGradingResult).filter(
-                    KoreanProblemGradingResult.grading_session_id == session_id,
-                    KoreanProblemGradingResult.problem_id == problem_id
-                ).first()
+                problem_result = results_by_problem.get(problem_id)
 
                 if problem_result:
                     # 선생님이 정답처리한 경우: 학생 답안을 새로운 정답으로 설정
@@ -186,11 +195,9 @@ async def update_grading_session(
                     problem_result.score = problem_result.points_per_problem
                     print(f"🔄 국어 문제 {problem_id}: 학생답안과 정답을 모두 '{new_correct_answer}'로 업데이트, 정답처리")
 
-        # 모든 문제별 결과를 기반으로 총점과 정답 수 재계산
-        if "problem_corrections" in update_data or "updated_correct_answers" in update_data:
-            all_problem_results = db.query(KoreanProblemGradingResult).filter(
-                KoreanProblemGradingResult.grading_session_id == session_id
-            ).all()
+        # 모든 문제별 결과를 기반으로 총점과 정답 수 재계산 (추가 조회 없이 메모리의 결과 사용)
+        if needs_results:
+            all_problem_results = list(results_by_problem.values())
 
             correct_count = sum(1 for pr in all_problem_results if pr.is_correct)
             total_score = sum(pr.score for pr in all_problem_results)
@@ -97,6 +97,15 @@ class AssignmentDeployRequest(BaseModel):
     classroom_id: int
     student_ids: List[int]
 
+class ClassroomDeployTarget(BaseModel):
+    classroom_id: int
+    student_ids: List[int]
+
+class BulkAssignmentDeployRequest(BaseModel):
+    """과제 일괄 배포 요청 (과제 x 클래스룸)"""
+    assignment_ids: List[int]
+    classrooms: List[ClassroomDeployTarget]
+
 class AssignmentDeploymentResponse(BaseModel):
     id: int
     assignment_id: int
@@ -1,11 +1,11 @@
 import os
 import json
-import google.generativeai as genai
 from typing import Dict, List
 from dotenv import load_dotenv
 from .korean_problem_generator import KoreanProblemGenerator
 from .grading_service import GradingService
 from .ocr_service import OCRService
+from .llm_gateway import get_llm_gateway
 
 load_dotenv()
 
@@ -16,8 +16,7 @@ class AIService:
         if not gemini_api_key:
             raise ValueError("KOREAN_GEMINI_API_KEY or GEMINI_API_KEY environment variable is required")
 
-        genai.configure(api_key=gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        self.model = get_llm_gateway().gemini_model('gemini-2.5-pro')
 
         # 서비스 인스턴스 초기화
         self.problem_generator = KoreanProblemGenerator()
@@ -124,4 +123,8 @@ Return ONLY valid JSON (no markdown, no code blocks):
                 correct_answer=correct_answer,
                 student_answer=student_answer,
                 explanation=explanation
-            )
\ No newline at end of file
+            )
+
+    def grade_korean_answers(self, items: List[Dict]) -> List[Dict]:
+        """국어 답안 일괄 채점 (서술형은 동시에 AI 채점) - 분리된 서비스 사용"""
+        return self.grading_service.grade_problems(items)
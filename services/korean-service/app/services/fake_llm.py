@@ -0,0 +1,260 @@
+"""
+가짜 LLM 프로바이더 - API 쿼터 없이 생성 파이프라인을 부하 테스트하기 위한 대역
+
+LLM_PROVIDER=fake 이면 LLM 게이트웨이가 Gemini/OpenAI 대신 이 프로바이더를 호출
+(게이트웨이의 동시성 제한/예산 버킷/통계는 그대로 거침)
+
+- 응답: 녹화 파일(FAKE_LLM_RECORDINGS, 모델+프롬프트 해시 일치) → 규칙 파일(FAKE_LLM_RESPONSES) 순으로 선택
+- 지연: 로그정규 분포 (FAKE_LLM_LATENCY_MS 중앙값, FAKE_LLM_LATENCY_SIGMA 분포 폭,
+  FAKE_LLM_LATENCY_SCALE 로 규칙별 지연까지 일괄 배율 조정)
+- 오류: FAKE_LLM_ERROR_RATE 확률로 예외, FAKE_LLM_MALFORMED_RATE 확률로 깨진 JSON 응답
+- FAKE_LLM_SEED 로 응답/지연/오류 순서 재현
+
+규칙 파일 (JSON 리스트, 위에서부터 처음 일치하는 규칙 사용):
+    {
+      "name": "math_problem",
+      "provider": "gemini",                      # 생략 시 모든 프로바이더
+      "match": ["Master Test Creator"],          # 프롬프트에 모두 포함되어야 하는 문자열
+      "capture": {"count": "Generate\\*\\*: (\\d+)"},  # 첫 번째 그룹 값을 변수로 사용
+      "defaults": {"count": 1},
+      "latency_ms": 4000,                        # 이 규칙만 지연 중앙값 변경 (선택)
+      "response": {...}                          # JSON 값(직렬화해서 반환) 또는 문자열(그대로 반환)
+    }
+    템플릿 안의 "{{변수}}" 는 캡처 값으로 치환, {"$repeat": "변수", "item": {...}} 는 N개 리스트로 확장
+    (item 안에서 {{index}} 는 0부터, {{number}} 는 1부터)
+
+실제 응답 녹화: LLM_RECORD_PATH 를 지정하면 게이트웨이가 실제 호출 응답을 JSONL로 추가 저장
+"""
+import os
+import re
+import json
+import math
+import random
+import asyncio
+import hashlib
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+FAKE_LLM_ENABLED = os.getenv("LLM_PROVIDER", "").lower() == "fake"
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH")
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+# 실제 API에서 흔히 보는 일시적 오류
+_FAKE_ERRORS = [
+    "429 Resource has been exhausted (fake)",
+    "500 Internal error encountered (fake)",
+    "503 The model is overloaded (fake)",
+    "Request timed out (fake)",
+]
+
+
+class FakeLLMError(Exception):
+    """가짜 프로바이더가 주입한 오류"""
+
+
+def _prompt_text(prompt: Any) -> str:
+    """Gemini 프롬프트(문자열/파트 리스트) 또는 OpenAI messages → 매칭용 텍스트"""
+    if isinstance(prompt, str):
+        return prompt
+    if isinstance(prompt, list):
+        parts = []
+        for part in prompt:
+            if isinstance(part, dict):
+                parts.append(str(part.get("content", "")))
+            elif isinstance(part, str):
+                parts.append(part)
+        return "\n".join(parts)
+    return str(prompt)
+
+
+def prompt_hash(model: str, prompt: Any) -> str:
+    return hashlib.sha256(f"{model}\n{_prompt_text(prompt)}".encode("utf-8")).hexdigest()
+
+
+def _render(template: Any, variables: Dict[str, Any]) -> Any:
+    """규칙 응답 템플릿 렌더링"""
+    if isinstance(template, str):
+        whole = _PLACEHOLDER.fullmatch(template)
+        if whole and whole.group(1) in variables:
+            value = variables[whole.group(1)]
+            return int(value) if isinstance(value, str) and value.isdigit() else value
+        return _PLACEHOLDER.sub(lambda m: str(variables.get(m.group(1), m.group(0))), template)
+    if isinstance(template, list):
+        return [_render(item, variables) for item in template]
+    if isinstance(template, dict):
+        if "$repeat" in template:
+            count = int(variables.get(template["$repeat"], 1))
+            return [
+                _render(template["item"], {**variables, "index": i, "number": i + 1})
+                for i in range(count)
+            ]
+        return {key: _render(value, variables) for key, value in template.items()}
+    return template
+
+
+class FakeLLMProvider:
+    """규칙/녹화 기반 가짜 LLM"""
+
+    def __init__(self, rules_path: Optional[str] = None, recordings_path: Optional[str] = None,
+                 latency_ms: float = 800.0, latency_sigma: float = 0.4, latency_scale: float = 1.0,
+                 error_rate: float = 0.0, malformed_rate: float = 0.0, seed: Optional[int] = None):
+        self.rules = self._load_rules(rules_path)
+        self.recordings = self._load_recordings(recordings_path)
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.rng = random.Random(seed)
+        self.stats = {
+            "calls": 0, "errors": 0, "malformed": 0, "recorded_hits": 0, "unmatched": 0,
+            "latency_ms_total": 0.0, "by_rule": {},
+        }
+
+    @staticmethod
+    def _load_rules(path: Optional[str]) -> List[Dict]:
+        if not path:
+            print("⚠️ FAKE_LLM_RESPONSES 미지정 - 모든 호출에 빈 JSON 객체 응답")
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+        for rule in rules:
+            rule["_capture"] = {name: re.compile(pattern) for name, pattern in rule.get("capture", {}).items()}
+        print(f"✅ 가짜 LLM 규칙 {len(rules)}개 로드: {path}")
+        return rules
+
+    @staticmethod
+    def _load_recordings(path: Optional[str]) -> Dict[str, str]:
+        recordings = {}
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        item = json.loads(line)
+                        recordings[item["prompt_hash"]] = item["response"]
+            print(f"✅ 녹화된 LLM 응답 {len(recordings)}개 로드: {path}")
+        return recordings
+
+    def _match_rule(self, provider: str, text: str) -> Optional[Dict]:
+        for rule in self.rules:
+            if rule.get("provider") not in (None, provider):
+                continue
+            if all(needle in text for needle in rule.get("match", [])):
+                return rule
+        return None
+
+    def _respond(self, provider: str, model: str, prompt: Any) -> tuple:
+        """(응답 텍스트, 규칙 이름, 지연 중앙값)"""
+        recorded = self.recordings.get(prompt_hash(model, prompt))
+        if recorded is not None:
+            self.stats["recorded_hits"] += 1
+            return recorded, "recorded", self.latency_ms
+
+        text = _prompt_text(prompt)
+        rule = self._match_rule(provider, text)
+        if rule is None:
+            self.stats["unmatched"] += 1
+            return "{}", "unmatched", self.latency_ms
+
+        variables = {name: str(value) for name, value in rule.get("defaults", {}).items()}
+        for name, pattern in rule["_capture"].items():
+            m = pattern.search(text)
+            if m:
+                variables[name] = m.group(1)
+
+        response = _render(rule["response"], variables)
+        if not isinstance(response, str):
+            response = json.dumps(response, ensure_ascii=False)
+        return response, rule.get("name", "rule"), rule.get("latency_ms", self.latency_ms)
+
+    def _corrupt(self, text: str) -> str:
+        """흔한 LLM JSON 결함 하나를 주입"""
+        mode = self.rng.choice(["truncate", "trailing_comma", "fenced", "single_quotes"])
+        if mode == "truncate" and len(text) > 10:
+            return text[:int(len(text) * self.rng.uniform(0.5, 0.95))]
+        if mode == "trailing_comma" and text.rstrip().endswith(("}", "]")):
+            stripped = text.rstrip()
+            return stripped[:-1] + "," + stripped[-1]
+        if mode == "single_quotes":
+            return text.replace('"', "'")
+        return f"다음은 요청하신 결과입니다.\n```json\n{text}\n```\n"
+
+    async def generate(self, provider: str, model: str, prompt: Any) -> str:
+        text, rule_name, median_ms = self._respond(provider, model, prompt)
+
+        median_ms *= self.latency_scale
+        latency_ms = self.rng.lognormvariate(math.log(median_ms), self.latency_sigma) if median_ms > 0 else 0.0
+        fail = self.rng.random() < self.error_rate
+        malformed = not fail and self.rng.random() < self.malformed_rate
+
+        self.stats["calls"] += 1
+        self.stats["latency_ms_total"] += latency_ms
+        self.stats["by_rule"][rule_name] = self.stats["by_rule"].get(rule_name, 0) + 1
+        await asyncio.sleep(latency_ms / 1000)
+
+        if fail:
+            self.stats["errors"] += 1
+            raise FakeLLMError(self.rng.choice(_FAKE_ERRORS))
+        if malformed:
+            self.stats["malformed"] += 1
+            text = self._corrupt(text)
+        return text
+
+    async def gemini_generate(self, model: str, prompt: Any):
+        """genai generate_content_async 응답 대역 (.text)"""
+        return SimpleNamespace(text=await self.generate("gemini", model, prompt))
+
+    async def chat_completion(self, model: str, messages: List[Dict]):
+        """OpenAI chat.completions.create 응답 대역 (.choices[0].message.content)"""
+        content = await self.generate("openai", model, messages)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(index=0, finish_reason="stop",
+                                     message=SimpleNamespace(role="assistant", content=content))]
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "latency_ms_total": round(self.stats["latency_ms_total"], 1),
+                "by_rule": dict(self.stats["by_rule"])}
+
+
+_fake_llm: Optional[FakeLLMProvider] = None
+_fake_llm_lock = threading.Lock()
+_record_lock = threading.Lock()
+
+
+def get_fake_llm() -> FakeLLMProvider:
+    """환경변수 설정으로 만든 가짜 프로바이더 싱글톤"""
+    global _fake_llm
+    if _fake_llm is None:
+        with _fake_llm_lock:
+            if _fake_llm is None:
+                seed = os.getenv("FAKE_LLM_SEED")
+                _fake_llm = FakeLLMProvider(
+                    rules_path=os.getenv("FAKE_LLM_RESPONSES"),
+                    recordings_path=os.getenv("FAKE_LLM_RECORDINGS"),
+                    latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "800")),
+                    latency_sigma=float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.4")),
+                    latency_scale=float(os.getenv("FAKE_LLM_LATENCY_SCALE", "1.0")),
+                    error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+                    malformed_rate=float(os.getenv("FAKE_LLM_MALFORMED_RATE", "0")),
+                    seed=int(seed) if seed else None,
+                )
+    return _fake_llm
+
+
+def record_response(provider: str, model: str, prompt: Any, response_text: Optional[str]):
+    """실제 호출 응답을 LLM_RECORD_PATH 에 추가 (FAKE_LLM_RECORDINGS 로 재생)"""
+    if not LLM_RECORD_PATH or response_text is None:
+        return
+    line = json.dumps({
+        "provider": provider, "model": model,
+        "prompt_hash": prompt_hash(model, prompt), "response": response_text,
+    }, ensure_ascii=False)
+    try:
+        with _record_lock, open(LLM_RECORD_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        print(f"⚠️ LLM 응답 녹화 실패: {str(e)}")
@@ -1,18 +1,60 @@
 import os
-import google.generativeai as genai
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 from dotenv import load_dotenv
+from .llm_gateway import get_llm_gateway
 
 load_dotenv()
 
+# 한 번의 일괄 채점에서 동시에 실행하는 서술형 AI 채점 수 (전체 Gemini 동시성은 LLM 게이트웨이가 제한)
+GRADING_MAX_WORKERS = int(os.getenv("KOREAN_GRADING_MAX_WORKERS", "8"))
+
+ESSAY_TYPES = ("essay", "서술형")
+
+
+def is_essay_type(question_type: str) -> bool:
+    return (question_type or "").lower() in ESSAY_TYPES
+
+
+def grade_objective_answer(correct_answer: str, student_answer: str, explanation: str) -> Dict:
+    """객관식/단답형 채점 (AI 호출 없음)"""
+    is_correct = student_answer.strip().lower() == correct_answer.strip().lower()
+
+    return {
+        "is_correct": is_correct,
+        "score": 100 if is_correct else 0,
+        "ai_feedback": "정답입니다." if is_correct else f"오답입니다. 정답은 '{correct_answer}'입니다.",
+        "strengths": "정확한 답안을 작성했습니다." if is_correct else "",
+        "improvements": "" if is_correct else f"정답: {correct_answer}. {explanation}",
+        "keyword_score_ratio": 1.0 if is_correct else 0.0
+    }
+
+
+def needs_essay_grading(item: Dict) -> bool:
+    """답안이 있는 서술형만 AI 채점 대상"""
+    return is_essay_type(item["question_type"]) and bool(str(item["student_answer"] or "").strip())
+
+
+def grade_answers(items: List[Dict]) -> List[Dict]:
+    """일괄 채점 진입점 - 서술형이 없으면 GradingService(API 키) 없이 바로 비교"""
+    if any(needs_essay_grading(item) for item in items):
+        return GradingService().grade_problems(items)
+    return [
+        grade_objective_answer(
+            correct_answer=str(item["correct_answer"] or ""),
+            student_answer=str(item["student_answer"] or ""),
+            explanation=item["explanation"] or ""
+        )
+        for item in items
+    ]
+
 class GradingService:
     def __init__(self):
         gemini_api_key = os.getenv("KOREAN_GEMINI_API_KEY") or os.getenv("GEMINI_API_KEY")
         if not gemini_api_key:
             raise ValueError("KOREAN_GEMINI_API_KEY or GEMINI_API_KEY environment variable is required")
 
-        genai.configure(api_key=gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        self.model = get_llm_gateway().gemini_model('gemini-2.5-pro')
 
     def grade_essay_problem(self, question: str, correct_answer: str, student_answer: str, explanation: str) -> Dict:
         """서술형 문제 채점"""
@@ -72,13 +114,40 @@ JSON 형식으로 응답해주세요:
 
     def grade_objective_problem(self, question: str, correct_answer: str, student_answer: str, explanation: str) -> Dict:
         """객관식/단답형 문제 채점"""
-        is_correct = student_answer.strip().lower() == correct_answer.strip().lower()
-
-        return {
-            "is_correct": is_correct,
-            "score": 100 if is_correct else 0,
-            "ai_feedback": "정답입니다." if is_correct else f"오답입니다. 정답은 '{correct_answer}'입니다.",
-            "strengths": "정확한 답안을 작성했습니다." if is_correct else "",
-            "improvements": "" if is_correct else f"정답: {correct_answer}. {explanation}",
-            "keyword_score_ratio": 1.0 if is_correct else 0.0
-        }
\ No newline at end of file
+        return grade_objective_answer(correct_answer, student_answer, explanation)
+
+    def grade_problems(self, items: List[Dict], max_workers: int = GRADING_MAX_WORKERS) -> List[Dict]:
+        """여러 문제 일괄 채점 - 객관식/단답형은 바로 비교, 답안이 있는 서술형만 동시에 AI 채점
+
+        items: [{"question", "correct_answer", "student_answer", "explanation", "question_type"}]
+        결과는 items 와 같은 순서
+        """
+        results: List[Dict] = [None] * len(items)
+        essay_indexes = []
+        for index, item in enumerate(items):
+            if needs_essay_grading(item):
+                essay_indexes.append(index)
+            else:
+                results[index] = self.grade_objective_problem(
+                    question=item["question"],
+                    correct_answer=str(item["correct_answer"] or ""),
+                    student_answer=str(item["student_answer"] or ""),
+                    explanation=item["explanation"] or ""
+                )
+
+        if essay_indexes:
+            def grade_essay(index: int) -> Dict:
+                item = items[index]
+                return self.grade_essay_problem(
+                    question=item["question"],
+                    correct_answer=item["correct_answer"],
+                    student_answer=item["student_answer"],
+                    explanation=item["explanation"]
+                )
+
+            # grade_essay_problem 은 실패 시 0점 결과를 반환하므로 한 문제의 오류가 전체를 멈추지 않음
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(essay_indexes)))) as executor:
+                for index, result in zip(essay_indexes, executor.map(grade_essay, essay_indexes)):
+                    results[index] = result
+
+        return results
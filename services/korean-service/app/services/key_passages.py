@@ -0,0 +1,212 @@
+"""
+작품별 핵심 지문 후보 - (작품 파일, 국어 유형)마다 미리 발췌해 둔 지문 중 하나를 요청 시 선택
+
+- 발췌는 오프라인 CLI 로 한 번만 수행 (작품 원문 전체를 보내는 긴 컨텍스트 호출이 생성 경로에서 빠짐)
+    python -m app.services.key_passages build [--type 소설] [--candidates 3] [--force]
+- 저장: data/key_passages.json (KOREAN_KEY_PASSAGES_PATH 로 변경 가능)
+  원문 해시를 함께 저장해 원문이 바뀐 작품의 후보는 사용하지 않음 (다시 build 필요)
+- 조회 시 KOREAN_CORPUS_CHECK_INTERVAL 초마다 파일 수정 시각을 확인해 다시 build 된 후보를 반영
+- 후보가 없는 작품은 기존처럼 생성 중에 발췌 (llm_response_cache 로 캐시)
+"""
+import os
+import sys
+import json
+import random
+import hashlib
+import time
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from .literature_corpus import CORPUS_CHECK_INTERVAL, literature_corpus
+from .json_repair import loads_tolerant
+
+KEY_PASSAGES_PATH = os.getenv("KOREAN_KEY_PASSAGES_PATH") or os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "key_passages.json")
+)
+
+# 발췌 대상 유형과 최소 원문 길이 (이보다 짧은 작품은 원문 그대로 사용)
+KEY_PASSAGE_TYPES = ("소설", "수필/비문학")
+KEY_PASSAGE_MIN_SOURCE_LENGTH = 1000
+KEY_PASSAGE_MIN_LENGTH = 200
+DEFAULT_CANDIDATES = 3
+
+KEY_PASSAGE_CRITERIA = {
+    "소설": "Choose a passage with rich narrative content: character conflict, dialogue revealing personality, crucial plot development, or thematic significance. The passage should show character interactions or internal conflict.",
+    "수필/비문학": "Choose a passage containing the main argument, key evidence, or central thesis. The passage should be logically complete and contain the author's main point or important supporting details.",
+}
+
+
+def source_hash(source_text: str) -> str:
+    return hashlib.sha256(source_text.encode("utf-8")).hexdigest()[:16]
+
+
+def _store_key(file_name: str, korean_type: str) -> str:
+    return f"{korean_type}/{file_name}"
+
+
+def _normalize(text: str) -> str:
+    return "".join(text.split())
+
+
+class KeyPassageStore:
+    """미리 발췌한 핵심 지문 후보 (파일 수정 시각이 바뀌면 다시 로드)"""
+
+    def __init__(self, path: str = KEY_PASSAGES_PATH):
+        self.path = path
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is not None and time.monotonic() - self._checked_at < CORPUS_CHECK_INTERVAL:
+            return self._entries
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if self._entries is not None and mtime == self._mtime:
+                return self._entries
+            if mtime is None:
+                self._entries, self._mtime = {}, None
+                return self._entries
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f).get("works", {})
+                self._mtime = mtime
+                print(f"✅ 핵심 지문 후보 로드: {len(self._entries)}개 작품")
+            except Exception as e:
+                # build 가 임시 파일 → rename 으로 저장하므로 보통 일어나지 않음 - 기존 후보 유지
+                print(f"⚠️ 핵심 지문 후보 로드 실패: {str(e)}")
+                if self._entries is None:
+                    self._entries = {}
+        return self._entries
+
+    def candidates(self, file_name: str, korean_type: str, source_text: str) -> List[str]:
+        """원문이 발췌 당시와 같을 때만 후보 반환"""
+        entry = self._load().get(_store_key(file_name, korean_type))
+        if not entry or entry.get("source_hash") != source_hash(source_text):
+            return []
+        return entry.get("passages", [])
+
+    def pick(self, file_name: str, korean_type: str, source_text: str) -> Optional[str]:
+        candidates = self.candidates(file_name, korean_type, source_text)
+        return random.choice(candidates) if candidates else None
+
+
+key_passage_store = KeyPassageStore()
+
+
+# ========== 오프라인 발췌 (CLI) ==========
+
+def _build_prompt(source_text: str, korean_type: str, count: int) -> str:
+    criteria = KEY_PASSAGE_CRITERIA.get(korean_type, "Choose the most important and representative passage.")
+    return f"""You are an expert Korean literature teacher. Extract {count} different key passages from the following {korean_type} text that are most suitable for creating comprehension questions.
+
+**Requirements:**
+- Each passage: 800-1200 characters (Korean characters)
+- {criteria}
+- Passages should come from different parts of the text and overlap as little as possible
+- Each passage should be self-contained and understandable without additional context
+- Preserve the exact original text (do not modify, paraphrase, or summarize)
+- Include complete sentences only (start and end with complete thoughts)
+
+**Original Text:**
+```
+{source_text}
+```
+
+Return ONLY a JSON array of {count} strings, each being one extracted passage in Korean:
+"""
+
+
+def extract_candidates(model, source_text: str, korean_type: str, count: int) -> List[str]:
+    """원문 전체에서 후보 count 개 발췌 - 원문에 실제로 있는 (공백 무시) 발췌만 사용"""
+    response = model.generate_content(
+        _build_prompt(source_text, korean_type, count), generation_config={"temperature": 0.2}
+    )
+    parsed = loads_tolerant(response.text.strip())
+    if not isinstance(parsed, list):
+        return []
+
+    normalized_source = _normalize(source_text)
+    passages = []
+    for passage in parsed:
+        if not isinstance(passage, str):
+            continue
+        passage = passage.strip()
+        if len(passage) >= KEY_PASSAGE_MIN_LENGTH and _normalize(passage) in normalized_source and passage not in passages:
+            passages.append(passage)
+    return passages
+
+
+def build(korean_types=KEY_PASSAGE_TYPES, candidates: int = DEFAULT_CANDIDATES, force: bool = False,
+          path: str = KEY_PASSAGES_PATH) -> Dict[str, int]:
+    """코퍼스의 긴 작품들에 대해 후보를 발췌해 저장 (원문이 바뀌지 않은 작품은 건너뜀)"""
+    from .llm_gateway import get_llm_gateway
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            works = json.load(f).get("works", {})
+    except FileNotFoundError:
+        works = {}
+
+    model = get_llm_gateway().gemini_model('gemini-2.5-pro')
+    stats = {"extracted": 0, "skipped": 0, "failed": 0}
+
+    for korean_type in korean_types:
+        for work in literature_corpus.works(korean_type):
+            if work.char_count <= KEY_PASSAGE_MIN_SOURCE_LENGTH:
+                continue
+            key = _store_key(work.file, korean_type)
+            text = work.text
+            digest = source_hash(text)
+            if not force and works.get(key, {}).get("source_hash") == digest:
+                stats["skipped"] += 1
+                continue
+            try:
+                passages = extract_candidates(model, text, korean_type, candidates)
+            except Exception as e:
+                passages = []
+                print(f"⚠️ {key}: 발췌 실패 - {str(e)}")
+            if not passages:
+                stats["failed"] += 1
+                continue
+            works[key] = {"title": work.title, "author": work.author, "source_hash": digest, "passages": passages}
+            stats["extracted"] += 1
+            print(f"✅ {key}: 후보 {len(passages)}개")
+
+            # 작품마다 저장 (중단되어도 이미 발췌한 작품은 유지)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "works": dict(sorted(works.items()))}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="국어 작품별 핵심 지문 후보 발췌")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="후보 발췌 후 저장")
+    build_parser.add_argument("--type", action="append", choices=KEY_PASSAGE_TYPES,
+                              help="발췌할 국어 유형 (여러 번 지정 가능, 기본: 전체)")
+    build_parser.add_argument("--candidates", type=int, default=DEFAULT_CANDIDATES, help="작품당 후보 수")
+    build_parser.add_argument("--force", action="store_true", help="원문이 바뀌지 않은 작품도 다시 발췌")
+    build_parser.add_argument("--output", default=KEY_PASSAGES_PATH, help="저장 경로")
+    args = parser.parse_args(argv)
+
+    stats = build(tuple(args.type or KEY_PASSAGE_TYPES), args.candidates, args.force, args.output)
+    print(f"발췌 {stats['extracted']}개, 건너뜀 {stats['skipped']}개, 실패 {stats['failed']}개 → {args.output}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,87 +2,64 @@ import os
 import json
 import random
 import time
-import google.generativeai as genai
 from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 from ..prompt_templates.single_problem_en import SingleProblemEnglishTemplate
 from ..prompt_templates.multiple_problems_en import MultipleProblemEnglishTemplate
 from .validators.ai_judge_validator import AIJudgeValidator
 from .utils.retry_handler import retry_with_backoff
+from .llm_gateway import get_llm_gateway
+from .llm_cache import llm_response_cache
+from .json_repair import loads_tolerant
+from .literature_corpus import literature_corpus
+from .key_passages import key_passage_store, KEY_PASSAGE_CRITERIA
 
 # .env 파일 로드 (여러 경로 시도)
 load_dotenv()  # 현재 디렉토리
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", ".env"))  # backend/.env
 
+# 문법 영역별 생성 제한 시간 (초) - 한 영역이 실패/지연되어도 문제지 전체가 기다리지 않음
+GRAMMAR_SECTION_TIMEOUT = float(os.getenv("KOREAN_GRAMMAR_SECTION_TIMEOUT", "180"))
+
 class KoreanProblemGenerator:
     def __init__(self):
         gemini_api_key = os.getenv("KOREAN_GEMINI_API_KEY") or os.getenv("GEMINI_API_KEY")
         if not gemini_api_key:
             raise ValueError("KOREAN_GEMINI_API_KEY or GEMINI_API_KEY environment variable is required")
 
-        genai.configure(api_key=gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        # 프로세스 공용 LLM 게이트웨이 경유 (동시성/RPM/TPM 예산 공유)
+        self.model = get_llm_gateway().gemini_model('gemini-2.5-pro')
 
         # AI Judge Validator 초기화
         self.ai_judge_validator = AIJudgeValidator()
 
-        # 데이터 파일 경로
-        self.data_path = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+        # 작품/문법 자료 색인 (mmap, 프로세스당 한 번 로드)
+        self.corpus = literature_corpus
 
         # 영어 프롬프트 템플릿 인스턴스
         self.single_template_en = SingleProblemEnglishTemplate()
         self.multiple_template_en = MultipleProblemEnglishTemplate()
 
-    def _extract_user_specified_works(self, user_prompt: str, available_files: List[str]) -> List[str]:
-        """사용자가 언급한 작품들을 추출하여 해당하는 파일들을 반환"""
-        if not user_prompt:
-            return []
-
-        user_specified_files = []
-        user_prompt_lower = user_prompt.lower()
-
-        # 각 파일에 대해 사용자가 언급했는지 확인
-        for file_name in available_files:
-            # 파일명에서 제목과 작가 추출 (예: "나무-윤동주.txt" -> "나무", "윤동주")
-            title_author = file_name.replace('.txt', '')
-            if '-' in title_author:
-                title, author = title_author.split('-', 1)
-            else:
-                title, author = title_author, ""
-
-            # 사용자 프롬프트에서 제목이나 작가가 언급되었는지 확인
-            title_mentioned = title.lower() in user_prompt_lower
-            author_mentioned = author.lower() in user_prompt_lower if author else False
-
-            # 제목-작가 형태로 언급되었는지도 확인 (예: "나무-윤동주")
-            full_name_mentioned = title_author.lower() in user_prompt_lower
-
-            if title_mentioned or author_mentioned or full_name_mentioned:
-                user_specified_files.append(file_name)
-
-        return user_specified_files
-
     def _preprocess_source_by_type(self, source_text: str, korean_type: str, source_info: Dict) -> str:
         """유형별 지문 전처리 - 4가지 유형에 맞게 최적화"""
 
         if korean_type == "시":
             return source_text[:2000] if len(source_text) > 2000 else source_text
         elif korean_type in ["소설", "수필/비문학"]:
-            return self._extract_key_passage(source_text, korean_type) if len(source_text) > 1500 else source_text
+            return self._extract_key_passage(source_text, korean_type, source_info) if len(source_text) > 1500 else source_text
         return source_text
 
-    def _extract_key_passage(self, source_text: str, korean_type: str) -> str:
-        """긴 지문에서 핵심 부분 발췌 (유형별 맞춤 영어 프롬프트 사용)"""
-        try:
-            # 유형별 발췌 기준 설정
-            type_specific_criteria = {
-                "소설": "Choose a passage with rich narrative content: character conflict, dialogue revealing personality, crucial plot development, or thematic significance. The passage should show character interactions or internal conflict.",
-                "수필/비문학": "Choose a passage containing the main argument, key evidence, or central thesis. The passage should be logically complete and contain the author's main point or important supporting details.",
-            }
+    def _extract_key_passage(self, source_text: str, korean_type: str, source_info: Dict = None) -> str:
+        """긴 지문에서 핵심 부분 발췌 - 미리 발췌해 둔 후보가 있으면 그중 하나, 없으면 유형별 영어 프롬프트로 발췌"""
+        if source_info and source_info.get("file"):
+            precomputed = key_passage_store.pick(source_info["file"], korean_type, source_text)
+            if precomputed:
+                return precomputed
 
-            criteria = type_specific_criteria.get(korean_type, "Choose the most important and representative passage.")
+        try:
+            criteria = KEY_PASSAGE_CRITERIA.get(korean_type, "Choose the most important and representative passage.")
 
             # 영어 프롬프트로 핵심 부분 추출 요청
             prompt = f"""You are an expert Korean literature teacher. Extract a key passage from the following {korean_type} text that is most suitable for creating comprehension questions.
@@ -102,8 +79,15 @@ class KoreanProblemGenerator:
 Return ONLY the extracted passage in Korean (no explanations, no markdown, no JSON, just the extracted text):
 """
 
-            response = self.model.generate_content(prompt)
-            extracted_text = response.text.strip()
+            # 같은 작품에 대한 발췌는 결정적 호출로 보고 캐시 재사용
+            extraction_config = {"temperature": 0.0}
+            extracted_text = llm_response_cache.cached_call(
+                "korean_key_passage", "gemini-2.5-pro", prompt,
+                lambda: self.model.generate_content(prompt, generation_config=extraction_config).text.strip(),
+                config=extraction_config,
+                temperature=extraction_config["temperature"],
+                validate=lambda text: len(text) >= 200
+            )
             if len(extracted_text) < 200:
                 return source_text[:1200] + "..." if len(source_text) > 1200 else source_text
             return extracted_text
@@ -179,17 +163,18 @@ Return ONLY the extracted passage in Korean (no explanations, no markdown, no JS
                 # AI Judge 검증
                 print(f"  📋 생성된 문제 {len(problems)}개 AI Judge 검증 시작...")
                 invalid_problems = []
-                for idx, problem in enumerate(problems):
-                    try:
-                        is_valid, scores, feedback = self.ai_judge_validator.validate_problem(problem, korean_type)
-                        if is_valid:
-                            valid_problems.append(problem)
-                            print(f"  ✅ 문제 검증 통과 (누적: {len(valid_problems)}/{count}개)")
-                        else:
-                            print(f"  ❌ 문제 {idx+1} 검증 실패: {feedback}")
-                            invalid_problems.append({"problem": problem, "feedback": feedback, "scores": scores})
-                    except Exception as e:
-                        invalid_problems.append({"problem": problem, "feedback": f"검증 오류: {str(e)}", "scores": {"overall_score": 0}})
+                judge_results = self.ai_judge_validator.validate_problems_batch(problems, korean_type)
+                for idx, (problem, judge_result) in enumerate(zip(problems, judge_results)):
+                    if isinstance(judge_result, Exception):
+                        invalid_problems.append({"problem": problem, "feedback": f"검증 오류: {str(judge_result)}", "scores": {"overall_score": 0}})
+                        continue
+                    is_valid, scores, feedback = judge_result
+                    if is_valid:
+                        valid_problems.append(problem)
+                        print(f"  ✅ 문제 검증 통과 (누적: {len(valid_problems)}/{count}개)")
+                    else:
+                        print(f"  ❌ 문제 {idx+1} 검증 실패: {feedback}")
+                        invalid_problems.append({"problem": problem, "feedback": feedback, "scores": scores})
 
                 # 목표 달성 확인
                 if len(valid_problems) >= count:
@@ -213,16 +198,12 @@ Return ONLY the extracted passage in Korean (no explanations, no markdown, no JS
                                      source_info: Dict, korean_type: str, count: int,
                                      difficulties: List[str]) -> List[Dict]:
 
-        # JSON 파싱
+        # JSON 파싱 (코드 블록 추출 및 LLM 출력 결함 복구 포함)
         try:
-            if "```json" in result_text:
-                json_start = result_text.find("```json") + 7
-                json_end = result_text.find("```", json_start)
-                json_text = result_text[json_start:json_end].strip()
-            else:
-                json_text = result_text.strip()
-
-            problems_data = json.loads(json_text)
+            problems_data = loads_tolerant(result_text)
+            if isinstance(problems_data, list):
+                # {"problems": [...]} 대신 문제 객체들만 나열된 응답
+                problems_data = {'problems': [item for item in problems_data if isinstance(item, dict)]}
 
             # 문제 데이터 변환
             problems = []
@@ -261,28 +242,39 @@ Return ONLY the extracted passage in Korean (no explanations, no markdown, no JS
         problems = []
 
         for i in range(count):
-            try:
-                # 문제 타입 결정
-                question_type = self._determine_question_type(question_type_ratio, korean_data)
+            problem = self._generate_individual_problem(
+                i, source_text, source_info, korean_type,
+                question_type_ratio, difficulty_ratio, user_prompt, korean_data
+            )
+            if problem:
+                problems.append(problem)
+
+        return problems
 
-                # 난이도 결정
-                difficulty = self._determine_difficulty(difficulty_ratio, korean_data)
+    def _generate_individual_problem(self, index: int, source_text: str, source_info: Dict, korean_type: str,
+                                     question_type_ratio: Dict, difficulty_ratio: Dict,
+                                     user_prompt: str, korean_data: Dict) -> Optional[Dict]:
+        """개별 문제 1개 생성 (실패 시 None)"""
+        try:
+            # 문제 타입 결정
+            question_type = self._determine_question_type(question_type_ratio, korean_data)
 
-                # AI를 통한 문제 생성
-                problem = self._generate_single_problem(
-                    source_text, korean_type, question_type, difficulty, user_prompt, korean_data
-                )
+            # 난이도 결정
+            difficulty = self._determine_difficulty(difficulty_ratio, korean_data)
 
-                if problem:
-                    problem['sequence_order'] = i + 1
-                    problem['source_title'] = source_info.get('title', '')
-                    problem['source_author'] = source_info.get('author', '')
-                    problems.append(problem)
+            # AI를 통한 문제 생성
+            problem = self._generate_single_problem(
+                source_text, korean_type, question_type, difficulty, user_prompt, korean_data
+            )
 
-            except Exception:
-                continue
+            if problem:
+                problem['sequence_order'] = index + 1
+                problem['source_title'] = source_info.get('title', '')
+                problem['source_author'] = source_info.get('author', '')
+            return problem
 
-        return problems
+        except Exception:
+            return None
 
     def _determine_question_type(self, question_type_ratio: Dict, korean_data: Dict) -> str:
         """문제 형식 결정 - 국어는 모두 객관식"""
@@ -336,15 +328,7 @@ Return ONLY the extracted passage in Korean (no explanations, no markdown, no JS
 
             # JSON 파싱
             try:
-                # JSON 부분만 추출
-                if "```json" in result_text:
-                    json_start = result_text.find("```json") + 7
-                    json_end = result_text.find("```", json_start)
-                    json_text = result_text[json_start:json_end].strip()
-                else:
-                    json_text = result_text.strip()
-
-                problem_data = json.loads(json_text)
+                problem_data = loads_tolerant(result_text)
                 rendered_source_text = self._get_rendered_source_text(korean_type, source_text, problem_data)
                 problem = {
                     'korean_type': korean_type,
@@ -413,7 +397,7 @@ Return ONLY the extracted passage in Korean (no explanations, no markdown, no JS
                 work_problem_count = problems_per_work + (1 if i < remaining_problems else 0)
                 if work_problem_count > 0:
                     if korean_type == "소설" and len(source_text) > 1000:
-                        source_text = self._extract_key_passage(source_text, korean_type)
+                        source_text = self._extract_key_passage(source_text, korean_type, source_info)
                     try:
                         work_problems = self._generate_multiple_problems_from_single_text(
                             source_text, source_info, korean_type, work_problem_count,
@@ -455,140 +439,114 @@ Return ONLY the extracted passage in Korean (no explanations, no markdown, no JS
                 # 20문제 초과 시 기본값
                 work_count = min(problem_count // 3, 10)
 
-            # 해당 유형의 모든 파일 목록 가져오기
-            if korean_type == "시":
-                data_dir = os.path.join(self.data_path, "poem")
-                all_files = [f for f in os.listdir(data_dir) if f.endswith('.txt')]
-            elif korean_type == "소설":
-                data_dir = os.path.join(self.data_path, "novel")
-                all_files = [f for f in os.listdir(data_dir) if f.endswith('.txt')]
-            elif korean_type == "수필/비문학":
-                data_dir = os.path.join(self.data_path, "non-fiction")
-                all_files = [f for f in os.listdir(data_dir) if f.endswith('.txt')]
-            else:
+            # 해당 유형의 작품 목록 (색인)
+            all_works = self.corpus.works(korean_type)
+            if not all_works:
                 return []
 
             # 사용자가 특정 작품을 언급했는지 확인
-            user_specified_files = self._extract_user_specified_works(user_prompt, all_files)
+            user_specified_works = self.corpus.find_works(korean_type, user_prompt)
 
-            if user_specified_files:
-                selected_files = user_specified_files[:work_count]
+            if user_specified_works:
+                selected_works = user_specified_works[:work_count]
             else:
                 import secrets
-                if len(all_files) <= work_count:
-                    selected_files = all_files
+                if len(all_works) <= work_count:
+                    selected_works = all_works
                 else:
-                    selected_files = []
-                    available_files = all_files.copy()
+                    selected_works = []
+                    available_works = list(all_works)
                     for _ in range(work_count):
-                        if not available_files:
+                        if not available_works:
                             break
-                        random_index = secrets.randbelow(len(available_files))
-                        selected_files.append(available_files.pop(random_index))
-
-            # 선택된 파일들의 내용과 정보 로드
-            source_texts_info = []
-            for file_name in selected_files:
-                file_path = os.path.join(data_dir, file_name)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # 파일명에서 제목과 작가 추출
-                title_author = file_name.replace('.txt', '')
-                if '-' in title_author:
-                    title, author = title_author.split('-', 1)
-                else:
-                    title, author = title_author, "작자미상"
-
-                source_texts_info.append((content, {
-                    "title": title,
-                    "author": author,
-                    "file": file_name
-                }))
-            return source_texts_info
+                        random_index = secrets.randbelow(len(available_works))
+                        selected_works.append(available_works.pop(random_index))
+
+            # 선택된 작품의 본문(mmap)과 정보
+            return [(work.text, work.source_info()) for work in selected_works]
         except Exception:
             return []
 
     def _generate_grammar_problems(self, korean_data: Dict, user_prompt: str, count: int,
                                  question_type_ratio: Dict = None,
-                                 difficulty_ratio: Dict = None) -> List[Dict]:
-        """문법 영역 문제 생성 - I~V 영역별 분배"""
-        problems = []
+                                 difficulty_ratio: Dict = None, max_workers: int = 5) -> List[Dict]:
+        """문법 영역 문제 생성 - I~V 영역별 분배, 영역 호출과 개별 폴백 호출을 같은 스레드 풀에서 병렬 실행
 
+        영역 호출이 실패하거나 문제가 부족하면 부족한 개수만큼만 개별 생성 호출을 바로 추가 (영역별 폴백 예산)
+        모든 영역이 동시에 시작하므로 GRAMMAR_SECTION_TIMEOUT 초가 지나도 끝나지 않은 호출은 기다리지 않음
+        """
         try:
-            # 전체 문법 내용 로드
-            grammar_file_path = os.path.join(self.data_path, "grammar.txt")
-            with open(grammar_file_path, 'r', encoding='utf-8') as f:
-                full_grammar_content = f.read()
-
-            grammar_sections = self._split_grammar_content(full_grammar_content)
+            # 미리 분할된 I~V 영역
+            grammar_sections = self.corpus.grammar()
             if not grammar_sections:
                 return []
 
             problems_per_section = count // len(grammar_sections)
             remaining_problems = count % len(grammar_sections)
-            section_names = ["I. 음운", "II. 품사와 어휘", "III. 문장", "IV. 기타", "V. 부록"]
 
-            for i, (section_name, section_content) in enumerate(zip(section_names, grammar_sections)):
-                if not section_content.strip():
-                    continue
+            sections = []
+            for i, section in enumerate(grammar_sections):
                 section_problem_count = problems_per_section + (1 if i < remaining_problems else 0)
-                if section_problem_count > 0:
-                    try:
-                        section_problems = self._generate_multiple_problems_from_single_text(
-                            section_content,
-                            {"title": section_name, "author": "교육부", "file": "grammar.txt"},
-                            "문법", section_problem_count,
-                            question_type_ratio, difficulty_ratio, user_prompt, korean_data
-                        )
-                        problems.extend(section_problems)
-                    except Exception:
+                section_content = section.text
+                if section_problem_count > 0 and section_content.strip():
+                    sections.append({
+                        "content": section_content,
+                        "source_info": {"title": section.title, "author": "교육부", "file": "grammar.txt"},
+                        "count": section_problem_count,
+                        "problems": [],
+                        "fallback": [],
+                    })
+            if not sections:
+                return []
+
+            executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, count)))
+            try:
+                deadline = time.monotonic() + GRAMMAR_SECTION_TIMEOUT
+                pending = {}
+                for section in sections:
+                    future = executor.submit(
+                        self._generate_multiple_problems_from_single_text,
+                        section["content"], section["source_info"], "문법", section["count"],
+                        question_type_ratio, difficulty_ratio, user_prompt, korean_data
+                    )
+                    pending[future] = (section, None)
+
+                while pending:
+                    done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                    if not done:
+                        for section, _ in pending.values():
+                            print(f"⚠️ 문법 영역 '{section['source_info']['title']}' 시간 초과 - 생성된 문제만 사용")
+                        break
+
+                    for future in done:
+                        section, slot = pending.pop(future)
                         try:
-                            section_problems = self._generate_problems_individually(
-                                section_content,
-                                {"title": section_name, "author": "교육부", "file": "grammar.txt"},
-                                "문법", section_problem_count,
-                                question_type_ratio, difficulty_ratio, user_prompt, korean_data
-                            )
-                            problems.extend(section_problems)
+                            result = future.result()
                         except Exception:
-                            continue
-            return problems
-        except Exception:
-            return []
+                            result = None
 
-    def _split_grammar_content(self, content: str) -> List[str]:
-        """문법 내용을 I~V 영역별로 분할"""
-        try:
-            sections = []
-            lines = content.split('\n')
-            current_section = []
-
-            section_markers = ["I. 음운", "II. 품사와 어휘", "III. 문장", "IV. 기타", "V. 부록"]
-            current_section_index = -1
-
-            for line in lines:
-                # 새로운 섹션 시작 확인
-                for i, marker in enumerate(section_markers):
-                    if line.strip().startswith(marker):
-                        # 이전 섹션 저장
-                        if current_section_index >= 0 and current_section:
-                            sections.append('\n'.join(current_section))
-
-                        # 새 섹션 시작
-                        current_section = [line]
-                        current_section_index = i
-                        break
-                else:
-                    # 현재 섹션에 라인 추가
-                    if current_section_index >= 0:
-                        current_section.append(line)
+                        if slot is not None:
+                            if result:
+                                section["fallback"].append(result)
+                            continue
 
-            # 마지막 섹션 저장
-            if current_section_index >= 0 and current_section:
-                sections.append('\n'.join(current_section))
+                        section["problems"] = list(result or [])[:section["count"]]
+                        # 부족한 개수만큼 개별 생성 (영역 실패가 다른 영역을 기다리게 하지 않음)
+                        for index in range(len(section["problems"]), section["count"]):
+                            slot_future = executor.submit(
+                                self._generate_individual_problem, index,
+                                section["content"], section["source_info"], "문법",
+                                question_type_ratio, difficulty_ratio, user_prompt, korean_data
+                            )
+                            pending[slot_future] = (section, index)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
 
-            return sections
+            problems = []
+            for section in sections:
+                fallback = sorted(section["fallback"], key=lambda problem: problem.get('sequence_order', 0))
+                problems.extend(section["problems"] + fallback)
+            return problems
         except Exception:
             return []
 
@@ -602,9 +560,9 @@ Return ONLY the extracted passage in Korean (no explanations, no markdown, no JS
         problems = []
 
         if korean_type == "문법":
-            # 문법은 기존 방식 사용
+            # 문법은 I~V 영역별 병렬 생성
             return self._generate_grammar_problems(
-                korean_data, user_prompt, problem_count, None, difficulty_ratio
+                korean_data, user_prompt, problem_count, None, difficulty_ratio, max_workers
             )
 
         # 시, 소설, 수필/비문학 - 병렬 처리
@@ -0,0 +1,275 @@
+"""
+국어 문학/비문학 코퍼스 - data/ 의 작품과 문법 자료를 한 번에 읽어 둔 읽기 전용 색인
+
+- 모든 본문을 하나의 파일(KOREAN_CORPUS_CACHE_DIR/corpus-*.bin)로 묶고 mmap 으로 읽음
+  (파일 페이지 캐시를 공유하므로 fork 된 Celery 워커들이 본문을 각자 복사해 들고 있지 않음)
+- 색인: 작품별 (장르, 제목, 작가, 파일명, 바이트 오프셋/길이, 글자 수), 문법은 I~V 영역별로 미리 분할
+- 사용자 프롬프트의 작품 언급은 (제목, 작가, "제목-작가") 키 사전으로 조회 (디렉터리 스캔 없음)
+- data/ 파일 구성(이름/크기/수정 시각)을 조회 시 KOREAN_CORPUS_CHECK_INTERVAL 초마다 확인해 바뀌면 다시 묶고 mmap 교체
+  (다른 프로세스가 이미 묶어 둔 같은 구성의 .bin/.json 이 있으면 그대로 매핑)
+- Celery 메인 프로세스(worker_init)에서 미리 로드하고, 그 외 프로세스는 첫 조회 때 로드
+"""
+import os
+import json
+import mmap
+import hashlib
+import time
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+
+DATA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "data"))
+CORPUS_CACHE_DIR = os.getenv("KOREAN_CORPUS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "korean_corpus")
+
+# 국어 유형 → data/ 하위 디렉터리
+GENRE_DIRS = {
+    "시": "poem",
+    "소설": "novel",
+    "수필/비문학": "non-fiction",
+}
+GRAMMAR_FILE = "grammar.txt"
+GRAMMAR_SECTION_MARKERS = ["I. 음운", "II. 품사와 어휘", "III. 문장", "IV. 기타", "V. 부록"]
+
+INDEX_FORMAT_VERSION = 1
+
+# 조회 시 data/ 구성 변경을 확인하는 주기 (초)
+CORPUS_CHECK_INTERVAL = float(os.getenv("KOREAN_CORPUS_CHECK_INTERVAL", "5"))
+
+
+def split_grammar_sections(content: str) -> List[Tuple[str, str]]:
+    """문법 내용을 I~V 영역별로 분할 - [(영역 이름, 내용)]"""
+    sections = []
+    current_name, current_lines = None, []
+
+    for line in content.split('\n'):
+        marker = next((m for m in GRAMMAR_SECTION_MARKERS if line.strip().startswith(m)), None)
+        if marker is not None:
+            if current_name is not None and current_lines:
+                sections.append((current_name, '\n'.join(current_lines)))
+            current_name, current_lines = marker, [line]
+        elif current_name is not None:
+            current_lines.append(line)
+
+    if current_name is not None and current_lines:
+        sections.append((current_name, '\n'.join(current_lines)))
+    return sections
+
+
+def parse_work_file_name(file_name: str) -> Tuple[str, str]:
+    """"나무-윤동주.txt" -> ("나무", "윤동주"), 작가가 없으면 ("제목", "")"""
+    title_author = file_name[:-4] if file_name.endswith('.txt') else file_name
+    if '-' in title_author:
+        title, author = title_author.split('-', 1)
+        return title, author
+    return title_author, ""
+
+
+class CorpusWork:
+    """작품(또는 문법 영역) 색인 항목 - 본문은 mmap 에서 필요할 때 디코드"""
+    __slots__ = ("genre", "title", "author", "file", "offset", "length", "char_count", "_mmap")
+
+    def __init__(self, mapped: mmap.mmap, genre: str, title: str, author: str, file: str,
+                 offset: int, length: int, char_count: int):
+        # 다시 로드되더라도 이미 꺼낸 항목은 자신이 만들어진 mmap 을 계속 참조
+        self._mmap = mapped
+        self.genre = genre
+        self.title = title
+        self.author = author
+        self.file = file
+        self.offset = offset
+        self.length = length
+        self.char_count = char_count
+
+    @property
+    def text(self) -> str:
+        return self._mmap[self.offset:self.offset + self.length].decode("utf-8")
+
+    def source_info(self) -> Dict[str, str]:
+        return {"title": self.title, "author": self.author or "작자미상", "file": self.file}
+
+
+class LiteratureCorpus:
+    """data/ 코퍼스 색인 + mmap 본문"""
+
+    def __init__(self, data_path: str = DATA_PATH, cache_dir: str = CORPUS_CACHE_DIR):
+        self.data_path = data_path
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._mmap: Optional[mmap.mmap] = None
+        self._signature: Optional[str] = None
+        self._checked_at = 0.0
+        self.works_by_genre: Dict[str, List[CorpusWork]] = {}
+        self.grammar_sections: List[CorpusWork] = []
+        # 정규화한 (제목 / 작가 / 제목-작가) → 작품 목록
+        self._lookup: Dict[str, Dict[str, List[CorpusWork]]] = {}
+        self._key_lengths: Dict[str, List[int]] = {}
+
+    # ---------- 빌드 ----------
+
+    def _source_files(self) -> List[Tuple[str, str]]:
+        """(장르 키, data/ 기준 상대 경로) - 파일명 순"""
+        files = []
+        for genre, dir_name in GENRE_DIRS.items():
+            dir_path = os.path.join(self.data_path, dir_name)
+            if os.path.isdir(dir_path):
+                files.extend((genre, f"{dir_name}/{name}") for name in sorted(os.listdir(dir_path)) if name.endswith('.txt'))
+        if os.path.isfile(os.path.join(self.data_path, GRAMMAR_FILE)):
+            files.append(("문법", GRAMMAR_FILE))
+        return files
+
+    def _compute_signature(self, files: List[Tuple[str, str]]) -> str:
+        hasher = hashlib.sha256(f"v{INDEX_FORMAT_VERSION}".encode())
+        for _, rel_path in files:
+            stat = os.stat(os.path.join(self.data_path, rel_path))
+            hasher.update(f"{rel_path}\x00{stat.st_size}\x00{stat.st_mtime_ns}\n".encode("utf-8"))
+        return hasher.hexdigest()
+
+    def _build(self, files: List[Tuple[str, str]], signature: str, bin_path: str, index_path: str) -> Dict:
+        """본문을 하나의 .bin 으로 묶고 색인 JSON 작성 (임시 파일 → rename)"""
+        entries = []
+        chunks = []
+        offset = 0
+
+        def append(genre: str, title: str, author: str, file: str, text: str):
+            nonlocal offset
+            data = text.encode("utf-8")
+            entries.append({
+                "genre": genre, "title": title, "author": author, "file": file,
+                "offset": offset, "length": len(data), "char_count": len(text),
+            })
+            chunks.append(data)
+            offset += len(data)
+
+        for genre, rel_path in files:
+            with open(os.path.join(self.data_path, rel_path), 'r', encoding='utf-8') as f:
+                content = f.read()
+            file_name = os.path.basename(rel_path)
+            if genre == "문법":
+                for section_name, section_content in split_grammar_sections(content):
+                    append(genre, section_name, "교육부", file_name, section_content)
+            else:
+                title, author = parse_work_file_name(file_name)
+                append(genre, title, author, file_name, content)
+
+        index = {"signature": signature, "entries": entries}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for path, payload, mode in (
+            (bin_path, b"".join(chunks) or b"\0", "wb"),
+            (index_path, json.dumps(index, ensure_ascii=False).encode("utf-8"), "wb"),
+        ):
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, mode) as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        return index
+
+    # ---------- 로드 ----------
+
+    def load(self, force: bool = False) -> "LiteratureCorpus":
+        """색인 로드 (구성이 바뀌었거나 처음이면 다시 묶음)"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            files = self._source_files()
+            signature = self._compute_signature(files)
+            if self._mmap is not None and signature == self._signature and not force:
+                return self
+
+            bin_path = os.path.join(self.cache_dir, f"corpus-{signature[:16]}.bin")
+            index_path = os.path.join(self.cache_dir, f"corpus-{signature[:16]}.json")
+            index = None
+            if not force and os.path.exists(bin_path) and os.path.exists(index_path):
+                try:
+                    with open(index_path, 'r', encoding='utf-8') as f:
+                        index = json.load(f)
+                    if index.get("signature") != signature:
+                        index = None
+                except Exception:
+                    index = None
+            if index is None:
+                index = self._build(files, signature, bin_path, index_path)
+
+            with open(bin_path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            self._install(index["entries"], mapped, signature)
+            print(
+                f"✅ 국어 코퍼스 로드: "
+                + ", ".join(f"{genre} {len(works)}편" for genre, works in self.works_by_genre.items())
+                + f", 문법 {len(self.grammar_sections)}개 영역 ({os.path.getsize(bin_path) // 1024}KB mmap)"
+            )
+            return self
+
+    def _install(self, entries: List[Dict], mapped: mmap.mmap, signature: str):
+        works_by_genre: Dict[str, List[CorpusWork]] = {genre: [] for genre in GENRE_DIRS}
+        grammar_sections: List[CorpusWork] = []
+        lookup: Dict[str, Dict[str, List[CorpusWork]]] = {genre: {} for genre in GENRE_DIRS}
+
+        for entry in entries:
+            work = CorpusWork(mapped, **entry)
+            if work.genre == "문법":
+                grammar_sections.append(work)
+                continue
+            works_by_genre.setdefault(work.genre, []).append(work)
+            keys = {work.title.lower(), f"{work.title}-{work.author}".lower()}
+            if work.author:
+                keys.add(work.author.lower())
+            genre_lookup = lookup.setdefault(work.genre, {})
+            for key in keys:
+                if key:
+                    genre_lookup.setdefault(key, []).append(work)
+
+        self.works_by_genre = works_by_genre
+        self.grammar_sections = grammar_sections
+        self._lookup = lookup
+        self._key_lengths = {genre: sorted({len(key) for key in keys}, reverse=True) for genre, keys in lookup.items()}
+        self._mmap = mapped
+        self._signature = signature
+
+    def _ensure_loaded(self):
+        if self._mmap is None:
+            self.load()
+            return
+        if time.monotonic() - self._checked_at < CORPUS_CHECK_INTERVAL:
+            return
+        # 구성이 같으면 load() 는 서명만 비교하고 바로 반환
+        try:
+            self.load()
+        except Exception as e:
+            self._checked_at = time.monotonic()
+            print(f"⚠️ 국어 코퍼스 다시 로드 실패, 기존 색인 유지: {str(e)}")
+
+    # ---------- 조회 ----------
+
+    def works(self, korean_type: str) -> List[CorpusWork]:
+        """국어 유형(시/소설/수필/비문학)의 작품 목록 (파일명 순)"""
+        self._ensure_loaded()
+        return self.works_by_genre.get(korean_type, [])
+
+    def find_works(self, korean_type: str, user_prompt: str) -> List[CorpusWork]:
+        """사용자 프롬프트에서 제목/작가/"제목-작가"가 언급된 작품 (파일명 순)
+
+        프롬프트의 부분 문자열 중 색인 키 길이인 것만 사전 조회
+        """
+        if not user_prompt:
+            return []
+        self._ensure_loaded()
+        genre_lookup = self._lookup.get(korean_type)
+        if not genre_lookup:
+            return []
+
+        prompt = user_prompt.lower()
+        matched = {}
+        for key_length in self._key_lengths.get(korean_type, ()):
+            for start in range(len(prompt) - key_length + 1):
+                for work in genre_lookup.get(prompt[start:start + key_length], ()):
+                    matched[id(work)] = work
+        order = {id(work): i for i, work in enumerate(self.works_by_genre.get(korean_type, []))}
+        return sorted(matched.values(), key=lambda work: order[id(work)])
+
+    def grammar(self) -> List[CorpusWork]:
+        """문법 I~V 영역 (미리 분할됨)"""
+        self._ensure_loaded()
+        return self.grammar_sections
+
+
+literature_corpus = LiteratureCorpus()
@@ -1,12 +1,12 @@
 import io
 import base64
-import google.generativeai as genai
 from PIL import Image
 from typing import Optional
+from .llm_gateway import get_llm_gateway
 
 class OCRService:
     def __init__(self):
-        # Gemini 모델은 이미 ai_service에서 설정됨
+        # Gemini 호출은 LLM 게이트웨이를 통해 수행
         pass
 
     def extract_text_from_image(self, image_data: bytes) -> str:
@@ -16,7 +16,7 @@ class OCRService:
             image = Image.open(io.BytesIO(image_data))
 
             # Gemini Vision API를 사용한 OCR
-            model = genai.GenerativeModel('gemini-2.5-pro')
+            model = get_llm_gateway().gemini_model('gemini-2.5-pro')
 
             prompt = """
 이 이미지에서 한글 텍스트를 추출해주세요.
@@ -5,21 +5,89 @@ AI Judge를 사용한 국어 문제 검증
 
 import os
 import json
-from typing import Dict, Tuple
-from openai import OpenAI
+from typing import Dict, List, Optional, Tuple, Union
+from ..llm_gateway import get_llm_gateway
+from ..llm_cache import llm_response_cache, CACHE_TTLS
+
+JUDGE_MODEL = "gpt-4o-mini"
+JUDGE_SYSTEM_PROMPT = "You are a Korean language education expert who validates Korean language problems and returns structured JSON responses."
+JUDGE_CACHE_CONFIG = {"max_tokens": 800, "response_format": "json_object"}
+
+# 배치 AI Judge 한 번에 검증할 최대 문제 수
+AI_JUDGE_MAX_BATCH_SIZE = int(os.getenv("AI_JUDGE_MAX_BATCH_SIZE", "8"))
 
 
 class AIJudgeValidator:
     """OpenAI GPT-4o-mini를 사용한 AI Judge 검증"""
 
     def __init__(self):
-        """OpenAI 클라이언트 초기화"""
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
+        """OpenAI 클라이언트 초기화 (LLM 게이트웨이 공용 클라이언트 사용)"""
+        self.llm_gateway = get_llm_gateway()
+        if not self.llm_gateway.openai_available():
             print("⚠️ Warning: OPENAI_API_KEY not found. AI Judge validation will be disabled.")
             self.openai_client = None
         else:
-            self.openai_client = OpenAI(api_key=openai_api_key)
+            self.openai_client = self.llm_gateway
+
+    def _format_problem_for_judge(self, problem: Dict, korean_type: str) -> str:
+        choices = problem.get('choices', [])
+        choices_text = '\n'.join([f"{chr(65+i)}. {choice}" for i, choice in enumerate(choices)]) if choices else 'None'
+        return f"""- Question: {problem.get('question', '')}
+- Choices:
+{choices_text}
+- Correct Answer: {problem.get('correct_answer', '')}
+- Explanation: {problem.get('explanation', '')}
+- Korean Type: {korean_type}"""
+
+    def _get_scores_schema(self, type_specific_criteria: str) -> str:
+        # 기준 이름 추출
+        criteria_lines = type_specific_criteria.strip().split('\n')
+        criterion_names = []
+        for line in criteria_lines:
+            if line.strip() and '. ' in line:
+                # "1. literary_accuracy (1-5): ..." -> "literary_accuracy"
+                name = line.split('. ')[1].split(' ')[0]
+                criterion_names.append(name)
+
+        # JSON 스키마 생성
+        return ', '.join([f'"{name}": <score>' for name in criterion_names])
+
+    def _build_judge_messages(self, problem: Dict, korean_type: str) -> List[Dict]:
+        # 국어 유형별 검증 기준 설정
+        type_specific_criteria = self._get_validation_criteria(korean_type)
+        scores_schema = self._get_scores_schema(type_specific_criteria)
+
+        validation_prompt = f"""You are an expert Korean language teacher. Please validate the following Korean language problem.
+
+The problem data is as follows:
+{self._format_problem_for_judge(problem, korean_type)}
+
+Evaluation criteria (score 1-5 for each):
+{type_specific_criteria}
+
+Return ONLY valid JSON (no markdown, no code blocks):
+{{
+  "scores": {{{scores_schema}}},
+  "overall_score": <average of all scores>,
+  "decision": "VALID" or "INVALID",
+  "feedback": "<brief feedback in Korean>"
+}}
+
+Decision rule: All scores must be 3.5 or higher to be "VALID".
+"""
+        return [
+            {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
+            {"role": "user", "content": validation_prompt}
+        ]
+
+    @staticmethod
+    def _judge_verdict(result: Dict) -> Tuple[bool, Dict, str]:
+        """판정 JSON → (is_valid, scores, feedback)"""
+        is_valid = result.get('decision') == 'VALID'
+        scores = dict(result.get('scores') or {})
+        scores['overall_score'] = result.get('overall_score', 0)
+        feedback = result.get('feedback', 'No feedback')
+        return is_valid, scores, feedback
 
     def validate_problem(self, problem: Dict, korean_type: str) -> Tuple[bool, Dict, str]:
         """
@@ -37,80 +105,147 @@ class AIJudgeValidator:
             return True, {"overall_score": 5.0}, "AI Judge not available"
 
         try:
-            question = problem.get('question', '')
-            correct_answer = problem.get('correct_answer', '')
-            explanation = problem.get('explanation', '')
-            choices = problem.get('choices', [])
-            choices_text = '\n'.join([f"{chr(65+i)}. {choice}" for i, choice in enumerate(choices)]) if choices else 'None'
+            messages = self._build_judge_messages(problem, korean_type)
+
+            def call_judge() -> str:
+                # OpenAI API 호출
+                response = self.openai_client.chat_completion(
+                    model=JUDGE_MODEL,
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=800,
+                    response_format={"type": "json_object"}
+                )
+                return response.choices[0].message.content.strip()
+
+            # 동일한 문제에 대한 판정은 결정적이므로 캐시 재사용
+            result_text = llm_response_cache.cached_call(
+                "korean_ai_judge", JUDGE_MODEL, messages, call_judge,
+                config=JUDGE_CACHE_CONFIG,
+                temperature=0.1,
+                validate=self._is_json_object
+            )
+            return self._judge_verdict(json.loads(result_text))
+
+        except json.JSONDecodeError as e:
+            print(f"❌ AI Judge 응답 JSON 파싱 실패: {str(e)}")
+            raise Exception(f"AI Judge validation failed - invalid JSON response: {str(e)}")
 
-            # 국어 유형별 검증 기준 설정
-            type_specific_criteria = self._get_validation_criteria(korean_type)
+        except Exception as e:
+            print(f"❌ AI Judge 검증 오류: {str(e)}")
+            raise Exception(f"AI Judge validation error: {str(e)}")
 
-            # 기준 이름 추출
-            criteria_lines = type_specific_criteria.strip().split('\n')
-            criterion_names = []
-            for line in criteria_lines:
-                if line.strip() and '. ' in line:
-                    # "1. literary_accuracy (1-5): ..." -> "literary_accuracy"
-                    name = line.split('. ')[1].split(' ')[0]
-                    criterion_names.append(name)
+    def validate_problems_batch(self, problems: List[Dict], korean_type: str) -> List[Union[Tuple[bool, Dict, str], Exception]]:
+        """
+        여러 문제를 AI Judge 한 번의 호출로 검증 (최대 AI_JUDGE_MAX_BATCH_SIZE개씩)
 
-            # JSON 스키마 생성
-            scores_schema = ', '.join([f'"{name}": <score>' for name in criterion_names])
+        - 항목별 캐시(단건 검증과 같은 키)를 먼저 확인하고, 미스만 배치로 호출
+        - 배치 응답이 스키마 검증에 실패하면 해당 배치는 단건 호출로 폴백
 
-            validation_prompt = f"""You are an expert Korean language teacher. Please validate the following Korean language problem.
+        Returns:
+            문제 순서대로 (is_valid, scores, feedback) 또는 실패 시 Exception 인스턴스
+        """
+        if not self.openai_client:
+            return [self.validate_problem(problem, korean_type) for problem in problems]
 
-The problem data is as follows:
-- Question: {question}
-- Choices:
-{choices_text}
-- Correct Answer: {correct_answer}
-- Explanation: {explanation}
-- Korean Type: {korean_type}
+        results: List = [None] * len(problems)
+        misses = []
+        for idx, problem in enumerate(problems):
+            key = llm_response_cache.key_for(
+                "korean_ai_judge", JUDGE_MODEL, self._build_judge_messages(problem, korean_type), JUDGE_CACHE_CONFIG
+            )
+            cached = llm_response_cache.get(key)
+            if cached is not None and self._is_json_object(cached):
+                results[idx] = self._judge_verdict(json.loads(cached))
+            else:
+                misses.append((idx, key))
+
+        for start in range(0, len(misses), AI_JUDGE_MAX_BATCH_SIZE):
+            chunk = misses[start:start + AI_JUDGE_MAX_BATCH_SIZE]
+            items = self._call_batch_judge([problems[idx] for idx, _ in chunk], korean_type) if len(chunk) > 1 else None
+
+            if items is None:
+                # 단건 검증으로 폴백
+                for idx, _ in chunk:
+                    try:
+                        results[idx] = self.validate_problem(problems[idx], korean_type)
+                    except Exception as e:
+                        results[idx] = e
+                continue
+
+            for (idx, key), item in zip(chunk, items):
+                llm_response_cache.set(key, json.dumps(item, ensure_ascii=False), CACHE_TTLS["korean_ai_judge"])
+                results[idx] = self._judge_verdict(item)
+
+        return results
+
+    def _call_batch_judge(self, problems: List[Dict], korean_type: str) -> Optional[List[Dict]]:
+        """배치 AI Judge 호출 - 스키마 검증 실패 시 None"""
+        type_specific_criteria = self._get_validation_criteria(korean_type)
+        scores_schema = self._get_scores_schema(type_specific_criteria)
+        problems_text = "\n\n".join(
+            f"### Problem {idx}\n{self._format_problem_for_judge(problem, korean_type)}"
+            for idx, problem in enumerate(problems)
+        )
+
+        validation_prompt = f"""You are an expert Korean language teacher. Please validate each of the following {len(problems)} Korean language problems independently.
+
+{problems_text}
 
 Evaluation criteria (score 1-5 for each):
 {type_specific_criteria}
 
-Return ONLY valid JSON (no markdown, no code blocks):
+Return ONLY valid JSON (no markdown, no code blocks) with exactly one result per problem:
 {{
-  "scores": {{{scores_schema}}},
-  "overall_score": <average of all scores>,
-  "decision": "VALID" or "INVALID",
-  "feedback": "<brief feedback in Korean>"
+  "results": [
+    {{
+      "index": <problem number>,
+      "scores": {{{scores_schema}}},
+      "overall_score": <average of all scores>,
+      "decision": "VALID" or "INVALID",
+      "feedback": "<brief feedback in Korean>"
+    }}
+  ]
 }}
 
 Decision rule: All scores must be 3.5 or higher to be "VALID".
 """
-
-            # OpenAI API 호출
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
+        try:
+            response = self.openai_client.chat_completion(
+                model=JUDGE_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a Korean language education expert who validates Korean language problems and returns structured JSON responses."},
+                    {"role": "system", "content": JUDGE_SYSTEM_PROMPT},
                     {"role": "user", "content": validation_prompt}
                 ],
                 temperature=0.1,
-                max_tokens=800,
+                max_tokens=800 * len(problems),
                 response_format={"type": "json_object"}
             )
+            result = json.loads(response.choices[0].message.content.strip())
+        except Exception as e:
+            print(f"⚠️ 배치 AI Judge 호출 실패, 단건 검증으로 폴백: {str(e)}")
+            return None
 
-            result_text = response.choices[0].message.content.strip()
-            result = json.loads(result_text)
-
-            is_valid = result.get('decision') == 'VALID'
-            scores = result.get('scores', {})
-            scores['overall_score'] = result.get('overall_score', 0)
-            feedback = result.get('feedback', 'No feedback')
+        by_index = {}
+        for item in (result.get('results') if isinstance(result, dict) else None) or []:
+            if (isinstance(item, dict) and isinstance(item.get('index'), int)
+                    and item.get('decision') in ('VALID', 'INVALID') and isinstance(item.get('scores'), dict)):
+                by_index[item['index']] = item
 
-            return is_valid, scores, feedback
+        if sorted(by_index) != list(range(len(problems))):
+            print(f"⚠️ 배치 AI Judge 응답 스키마 불일치 ({len(by_index)}/{len(problems)}), 단건 검증으로 폴백")
+            return None
 
-        except json.JSONDecodeError as e:
-            print(f"❌ AI Judge 응답 JSON 파싱 실패: {str(e)}")
-            raise Exception(f"AI Judge validation failed - invalid JSON response: {str(e)}")
+        print(f"🔍 배치 AI Judge: {len(problems)}개 문제를 1회 호출로 검증")
+        return [by_index[idx] for idx in range(len(problems))]
 
-        except Exception as e:
-            print(f"❌ AI Judge 검증 오류: {str(e)}")
-            raise Exception(f"AI Judge validation error: {str(e)}")
+    @staticmethod
+    def _is_json_object(text: str) -> bool:
+        """캐시 저장 전 응답이 JSON 객체인지 확인"""
+        try:
+            return isinstance(json.loads(text), dict)
+        except ValueError:
+            return False
 
     def _get_validation_criteria(self, korean_type: str) -> str:
         """국어 유형별 AI Judge 검증 기준 반환"""
@@ -1,6 +1,6 @@
 from celery import current_task
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, insert
 import uuid
 import json
 from datetime import datetime
@@ -203,8 +203,13 @@ def generate_korean_problems_task(self, request_data: dict, user_id: int):
 
 
 @celery_app.task(bind=True)
-def grade_korean_problems_task(self, worksheet_id: int, user_id: int = 1):
-    """국어 문제 채점 태스크"""
+def grade_korean_problems_task(self, worksheet_id: int, user_id: int = 1, answers: dict = None,
+                               student_id: int = None):
+    """국어 문제 채점 태스크
+
+    answers: {"problem_id": "답안"} - 객관식은 바로 비교, 서술형은 동시에 AI 채점 후
+    문제별 결과를 한 번의 INSERT 로 저장
+    """
     try:
         db = SessionLocal()
         ai_service = AIService()
@@ -225,9 +230,11 @@ def grade_korean_problems_task(self, worksheet_id: int, user_id: int = 1):
 
         # 채점 세션 생성
         from .models.grading_result import KoreanGradingSession, KoreanProblemGradingResult
+        from .services.grading_service import needs_essay_grading
 
         grading_session = KoreanGradingSession(
             worksheet_id=worksheet_id,
+            student_id=student_id if student_id is not None else user_id,
             graded_by=user_id,
             total_problems=len(problems),
             max_possible_score=float(len(problems) * 100),
@@ -240,56 +247,66 @@ def grade_korean_problems_task(self, worksheet_id: int, user_id: int = 1):
         db.add(grading_session)
         db.flush()
 
-        # 문제별 채점
-        total_score = 0
-        correct_count = 0
-
-        for idx, problem in enumerate(problems):
-            current_task.update_state(
-                state='PROGRESS',
-                meta={
-                    'current': 30 + int((idx / len(problems)) * 60),
-                    'total': 100,
-                    'status': f'{idx + 1}/{len(problems)} 문제 채점 중...'
-                }
-            )
+        # 문제별 답안 (answers 가 없으면 기존 기본값 사용 - 실제로는 assignment 제출시 problem_results로 처리)
+        input_method = "manual"
+        items = []
+        for problem in problems:
+            if answers is None:
+                student_answer = "1"
+            else:
+                student_answer = str(answers.get(str(problem.id), "") or "")
+            items.append({
+                "question": problem.question,
+                "correct_answer": problem.correct_answer,
+                "student_answer": student_answer,
+                "explanation": problem.explanation,
+                "question_type": problem.problem_type.value if hasattr(problem.problem_type, 'value') else str(problem.problem_type)
+            })
+
+        essay_count = sum(1 for item in items if needs_essay_grading(item))
+        current_task.update_state(
+            state='PROGRESS',
+            meta={
+                'current': 30,
+                'total': 100,
+                'status': f'{len(problems)}문제 채점 중... (서술형 AI 채점 {essay_count}개)'
+            }
+        )
 
-            # 국어는 객관식 문제로 problem_results에서 답안을 가져옴
-            student_answer = "1"  # 기본값 (실제로는 assignment 제출시 problem_results로 처리)
-            input_method = "manual"
-
-            # AI 채점
-            grading_result = ai_service.grade_korean_answer(
-                question=problem.question,
-                correct_answer=problem.correct_answer,
-                student_answer=student_answer,
-                explanation=problem.explanation,
-                question_type=problem.problem_type.value if hasattr(problem.problem_type, 'value') else str(problem.problem_type)
-            )
+        # 일괄 채점 (서술형은 동시에 AI 채점)
+        grading_results = ai_service.grade_korean_answers(items)
 
-            # 채점 결과 저장
-            problem_result = KoreanProblemGradingResult(
-                grading_session_id=grading_session.id,
-                problem_id=problem.id,
-                user_answer=student_answer,
-                correct_answer=problem.correct_answer,
-                is_correct=grading_result['is_correct'],
-                score=float(grading_result['score']),
-                points_per_problem=100.0,
-                problem_type=problem.problem_type.value if hasattr(problem.problem_type, 'value') else str(problem.problem_type),
-                input_method=input_method,
-                ai_score=grading_result.get('score'),
-                ai_feedback=grading_result.get('ai_feedback', ''),
-                strengths=grading_result.get('strengths', ''),
-                improvements=grading_result.get('improvements', ''),
-                keyword_score_ratio=grading_result.get('keyword_score_ratio', 0.0),
-                explanation=problem.explanation
-            )
-            db.add(problem_result)
+        current_task.update_state(
+            state='PROGRESS',
+            meta={'current': 90, 'total': 100, 'status': '채점 결과 저장 중...'}
+        )
+
+        # 채점 결과 저장 (다중 행 INSERT 1회)
+        rows = [
+            {
+                "grading_session_id": grading_session.id,
+                "problem_id": problem.id,
+                "user_answer": item["student_answer"],
+                "correct_answer": problem.correct_answer,
+                "is_correct": bool(grading_result['is_correct']),
+                "score": float(grading_result['score']),
+                "points_per_problem": 100.0,
+                "problem_type": item["question_type"],
+                "input_method": input_method,
+                "ai_score": grading_result.get('score'),
+                "ai_feedback": grading_result.get('ai_feedback', ''),
+                "strengths": grading_result.get('strengths', ''),
+                "improvements": grading_result.get('improvements', ''),
+                "keyword_score_ratio": grading_result.get('keyword_score_ratio', 0.0),
+                "explanation": problem.explanation
+            }
+            for problem, item, grading_result in zip(problems, items, grading_results)
+        ]
+        if rows:
+            db.execute(insert(KoreanProblemGradingResult), rows)
 
-            total_score += grading_result['score']
-            if grading_result['is_correct']:
-                correct_count += 1
+        total_score = sum(row["score"] for row in rows)
+        correct_count = sum(1 for row in rows if row["is_correct"])
 
         # 채점 세션 결과 업데이트
         grading_session.total_score = float(total_score)
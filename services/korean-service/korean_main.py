@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.routers import korean_generation, market_integration, assignment, grading
 from app.database import engine
 from app.models import Base
+from app.services.assignment_deploy import ensure_deployment_unique_constraint
 # Import all models to ensure they are registered with Base.metadata
 import app.models.worksheet
 import app.models.problem
@@ -11,6 +12,9 @@ import app.models.grading_result
 
 Base.metadata.create_all(bind=engine)
 
+# 기존 배포 테이블에도 (assignment_id, student_id) 유니크 인덱스 적용 (일괄 배포의 ON CONFLICT 대상)
+ensure_deployment_unique_constraint(engine)
+
 app = FastAPI(title="Korean Problem Generation API", version="1.0.0")
 
 app.add_middleware(
@@ -30,6 +34,13 @@ app.include_router(grading.router, prefix="/api/grading", tags=["grading"])
 async def root():
     return {"message": "Korean Problem Generation API is running"}
 
+@app.get("/llm-gateway/stats")
+async def llm_gateway_stats():
+    """LLM 게이트웨이 대기열/지연 시간 카운터 (현재 프로세스 기준)"""
+    from app.services.llm_gateway import get_llm_gateway
+    from app.services.llm_cache import llm_response_cache
+    return {**get_llm_gateway().get_stats(), "cache": llm_response_cache.get_stats()}
+
 if __name__ == "__main__":
     import uvicorn
     import os
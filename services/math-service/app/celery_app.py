@@ -47,9 +47,21 @@ celery_app.conf.update(
     worker_task_log_format='[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s',
     # 수학 서비스 전용 큐 설정
     task_default_queue='math_queue',
+    # 손글씨 답안 OCR 은 전용 큐(math_ocr), 문제 은행 보충은 낮은 우선순위 전용 큐(math_bank)에서 별도 워커로 처리
     task_routes={
+        'app.tasks.ocr_test_answer_task': {'queue': 'math_ocr'},
+        'app.tasks.replenish_problem_bank_task': {'queue': 'math_bank'},
+        'app.tasks.replenish_problem_pool_task': {'queue': 'math_bank'},
         'app.tasks.*': {'queue': 'math_queue'},
     },
+    # 문제 은행 보충 주기 작업 (celery beat)
+    beat_schedule={
+        'replenish-problem-bank': {
+            'task': 'app.tasks.replenish_problem_bank_task',
+            'schedule': float(os.getenv("PROBLEM_BANK_REPLENISH_INTERVAL", "600")),
+            'options': {'queue': 'math_bank', 'expires': 600},
+        },
+    },
 )
 
 # 태스크 발견을 위한 autodiscover
@@ -1,5 +1,6 @@
 from .worksheet import Worksheet, WorksheetStatus
 from .problem import Problem
+from .problem_bank import ProblemBankItem
 from ..database import Base
 
-__all__ = ["Worksheet", "WorksheetStatus", "Problem", "Base"]
\ No newline at end of file
+__all__ = ["Worksheet", "WorksheetStatus", "Problem", "ProblemBankItem", "Base"]
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from ..database import Base
+
+
+class ProblemBankItem(Base):
+    """문제 은행 - (소단원, 난이도, 문제 유형)별로 미리 생성·검증된 문제 풀"""
+    __tablename__ = "problem_bank"
+    __table_args__ = (
+        Index("ix_problem_bank_pool", "grade", "semester", "chapter_name", "difficulty", "problem_type"),
+        {"schema": "math_service"},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # 풀 구분 키
+    grade = Column(String, nullable=False)  # "중1"
+    semester = Column(String, nullable=False)  # "1학기"
+    unit_name = Column(String, nullable=False)
+    chapter_name = Column(String, nullable=False)
+    difficulty = Column(String, nullable=False)  # "A", "B", "C"
+    problem_type = Column(String, nullable=False)  # "multiple_choice", "short_answer"
+
+    # AI Judge 검증을 통과한 문제 원본 (generate_problems_parallel 결과 dict)
+    problem_data = Column(JSON, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -8,6 +8,7 @@ import enum
 class WorksheetStatus(str, enum.Enum):
     DRAFT = "draft"
     PROCESSING = "processing"
+    PARTIAL = "partial"  # 스트리밍 생성 중 - 일부 문제 저장됨
     COMPLETED = "completed"
     FAILED = "failed"
     PUBLISHED = "published"
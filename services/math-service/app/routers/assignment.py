@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 import logging
@@ -8,8 +8,9 @@ from datetime import datetime
 
 from ..database import get_db
 from ..core.auth import get_current_student
-from ..schemas.math_generation import AssignmentDeployRequest, AssignmentDeploymentResponse, StudentAssignmentResponse, TestSessionResponse
+from ..schemas.math_generation import AssignmentDeployRequest, BulkAssignmentDeployRequest, AssignmentDeploymentResponse, StudentAssignmentResponse, TestSessionResponse
 from ..services.math_generation_service import MathGenerationService
+from ..services.assignment_deploy import resolve_assignments, deploy_students, notify_assignment_deployed
 from ..models.math_generation import TestSession
 
 router = APIRouter()
@@ -66,11 +67,11 @@ logger = logging.getLogger(__name__)
 @router.post("/deploy", response_model=List[AssignmentDeploymentResponse])
 async def deploy_assignment(
     deploy_request: AssignmentDeployRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    # This logic should be moved to a dedicated AssignmentService
     from ..models.worksheet import Worksheet
-    from ..models.math_generation import Assignment, AssignmentDeployment
+    from ..models.math_generation import Assignment
 
     # 먼저 assignment_id로 Assignment를 찾기
     assignment = db.query(Assignment).filter(Assignment.id == deploy_request.assignment_id).first()
@@ -85,24 +86,82 @@ async def deploy_assignment(
     # assignment 상태를 deployed로 변경
     assignment.is_deployed = "deployed"
 
-    deployments = []
-    for student_id in deploy_request.student_ids:
-        existing_deployment = db.query(AssignmentDeployment).filter(
-            AssignmentDeployment.assignment_id == assignment.id, 
-            AssignmentDeployment.student_id == student_id
-        ).first()
-        if not existing_deployment:
-            deployment = AssignmentDeployment(
-                assignment_id=assignment.id, student_id=student_id, 
-                classroom_id=deploy_request.classroom_id, status="assigned"
-            )
-            db.add(deployment)
-            deployments.append(deployment)
-        else:
-            deployments.append(existing_deployment)
-    
+    # 기존 배포 조회 1회 + 다중 행 INSERT 1회
+    deployments, new_students = deploy_students(
+        db, [(assignment, deploy_request.classroom_id, deploy_request.student_ids)]
+    )
+    response = [AssignmentDeploymentResponse.from_orm(d) for d in deployments]
     db.commit()
-    return [AssignmentDeploymentResponse.from_orm(d) for d in deployments]
+
+    background_tasks.add_task(notify_assignment_deployed, [{
+        "assignment_id": assignment.id,
+        "title": assignment.title,
+        "classroom_id": deploy_request.classroom_id,
+        "student_ids": new_students.get(assignment.id, [])
+    }], assignment.teacher_id)
+    return response
+
+@router.post("/deploy-bulk")
+async def deploy_assignments_bulk(
+    deploy_request: BulkAssignmentDeployRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """여러 과제를 여러 클래스룸에 일괄 배포 (클래스룸에 과제가 없으면 원본 과제를 복사해 생성)"""
+    from ..models.math_generation import Assignment
+
+    sources = db.query(Assignment).filter(Assignment.id.in_(deploy_request.assignment_ids)).all()
+    missing_ids = set(deploy_request.assignment_ids) - {source.id for source in sources}
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"Assignment not found: {sorted(missing_ids)}")
+
+    try:
+        assignments = resolve_assignments(
+            db, sources, [classroom.classroom_id for classroom in deploy_request.classrooms]
+        )
+        targets = [
+            (assignments[(source.worksheet_id, classroom.classroom_id)], classroom.classroom_id, classroom.student_ids)
+            for source in sources
+            for classroom in deploy_request.classrooms
+        ]
+        deployments, new_students = deploy_students(db, targets)
+
+        results = [
+            {
+                "assignment_id": assignment.id,
+                "worksheet_id": assignment.worksheet_id,
+                "classroom_id": classroom_id,
+                "title": assignment.title,
+                "deployed_count": len(new_students.get(assignment.id, [])),
+                "total_students": len(set(student_ids))
+            }
+            for assignment, classroom_id, student_ids in targets
+        ]
+        teacher_id = sources[0].teacher_id if sources else None
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[MATH_SERVICE] 과제 일괄 배포 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"Bulk deploy failed: {str(e)}")
+
+    background_tasks.add_task(notify_assignment_deployed, [
+        {
+            "assignment_id": result["assignment_id"],
+            "title": result["title"],
+            "classroom_id": result["classroom_id"],
+            "student_ids": new_students.get(result["assignment_id"], [])
+        }
+        for result in results
+    ], teacher_id)
+
+    deployed_count = sum(result["deployed_count"] for result in results)
+    return {
+        "success": True,
+        "message": f"Deployed {len(results)} assignments ({deployed_count} new deployments)",
+        "assignments": results,
+        "deployed_count": deployed_count,
+        "total_deployments": len(deployments)
+    }
 
 @router.get("/student/{student_id}", response_model=List[StudentAssignmentResponse])
 async def get_student_assignments(
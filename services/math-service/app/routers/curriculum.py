@@ -1,49 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status, Query, Header, Response
 from typing import Optional
 
-from ..database import get_db
 from ..schemas.math_generation import SchoolLevel
-from ..services.math_generation_service import MathGenerationService
+from ..services.curriculum_index import curriculum_index, etag_matches
 
 router = APIRouter()
-math_service = MathGenerationService()
+
+
+def _cached_response(kind: str, key: str, if_none_match: Optional[str]) -> Response:
+    """미리 직렬화된 교육과정 응답 (ETag 일치 시 304)"""
+    cached = curriculum_index.get_response(kind, key)
+    if cached is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=curriculum_index.error or "교육과정 데이터 파일을 찾을 수 없습니다."
+        )
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.get("/structure")
 async def get_curriculum_structure(
     school_level: Optional[SchoolLevel] = Query(None, description="학교급 필터"),
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None)
 ):
-    try:
-        structure = math_service.get_curriculum_structure(
-            db, 
-            school_level.value if school_level else None
-        )
-        return {"structure": structure}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"교육과정 구조 조회 중 오류: {str(e)}"
-        )
+    return _cached_response("structure", "", if_none_match)
 
 @router.get("/units")
-async def get_units():
-    try:
-        units = math_service.get_units()
-        return {"units": units}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"대단원 목록 조회 중 오류: {str(e)}"
-        )
+async def get_units(if_none_match: Optional[str] = Header(None)):
+    return _cached_response("units", "", if_none_match)
 
 @router.get("/chapters")
-async def get_chapters_by_unit(unit_name: str = Query(..., description="대단원명")):
-    try:
-        chapters = math_service.get_chapters_by_unit(unit_name)
-        return {"chapters": chapters}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"소단원 목록 조회 중 오류: {str(e)}"
-        )
\ No newline at end of file
+async def get_chapters_by_unit(
+    unit_name: str = Query(..., description="대단원명"),
+    if_none_match: Optional[str] = Header(None)
+):
+    return _cached_response("chapters", unit_name, if_none_match)
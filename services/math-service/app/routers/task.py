@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from celery.result import AsyncResult
 from ..celery_app import celery_app
+from ..services.problem_stream import get_streamed_problems, stream_task_events
 
 router = APIRouter()
 
@@ -21,7 +23,9 @@ async def get_task_status(task_id: str):
                 "status": "PROGRESS",
                 "current": result.info.get('current', 0),
                 "total": result.info.get('total', 100),
-                "message": result.info.get('status', '처리 중...')
+                "message": result.info.get('status', '처리 중...'),
+                # 스트리밍 생성 중 먼저 완성되어 저장된 문제들
+                "problems": await get_streamed_problems(task_id)
             }
         elif result.state == 'SUCCESS':
             return {
@@ -51,3 +55,22 @@ async def get_task_status(task_id: str):
 async def get_task_status_alias(task_id: str):
     """작업 상태 조회 - 호환성을 위한 별칭"""
     return await get_task_status(task_id)
+
+
+@router.get("/{task_id}/stream")
+async def stream_task_problems(task_id: str):
+    """문제 생성 스트림 (SSE) - 문제가 완성되어 저장될 때마다 전송, completed/failed 이벤트로 종료"""
+
+    def finished_event():
+        state = AsyncResult(task_id, app=celery_app).state
+        return {"SUCCESS": "completed", "FAILURE": "failed"}.get(state)
+
+    return StreamingResponse(
+        stream_task_events(task_id, finished_event),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
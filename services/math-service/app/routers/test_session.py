@@ -10,11 +10,15 @@ from ..models.grading_result import GradingSession, ProblemGradingResult
 from ..schemas.math_generation import TestSubmissionResponse
 from ..core.auth import get_current_user
 from ..services.ocr_service import OCRService
+import os
 import json
 import base64
 
 router = APIRouter()
 
+# 손글씨 답안 OCR 방식 - inline: 요청 안에서 비동기 처리, deferred: 이미지로 먼저 저장 후 OCR 큐(math_ocr)에서 텍스트로 교체
+OCR_MODE = os.getenv("MATH_OCR_MODE", "inline").lower()
+
 @router.post("/test-sessions/{session_id}/submit", response_model=TestSubmissionResponse)
 async def submit_test(
     session_id: str,
@@ -197,29 +201,37 @@ async def save_answer_with_ocr(
 
     # 손글씨 이미지가 있으면 OCR 처리
     final_answer = answer
+    ocr_deferred = False
     if handwriting_image:
         try:
             # 이미지 데이터 읽기
             image_data = await handwriting_image.read()
+            image_base64 = base64.b64encode(image_data).decode('utf-8')
+            image_answer = f"data:image/{handwriting_image.content_type.split('/')[-1]};base64,{image_base64}"
 
-            # OCR 서비스 사용
-            ocr_service = OCRService()
-            ocr_text = ocr_service.extract_text_from_image(image_data)
-
-            if ocr_text and ocr_text.strip():
-                # OCR이 성공한 경우 텍스트 사용
-                final_answer = ocr_text.strip()
-                print(f"OCR 성공: {final_answer}")
+            if OCR_MODE == "deferred":
+                # 이미지로 먼저 저장하고 OCR 은 큐에서 처리 (처리 전 채점 시에는 채점 태스크의 OCR 이 이미지 답안을 처리)
+                final_answer = image_answer
+                ocr_deferred = True
             else:
-                # OCR 실패 시 이미지를 base64로 저장
-                image_base64 = base64.b64encode(image_data).decode('utf-8')
-                final_answer = f"data:image/{handwriting_image.content_type.split('/')[-1]};base64,{image_base64}"
-                print(f"OCR 실패, 이미지 저장")
+                # OCR 서비스 사용 (전처리는 프로세스 풀, Vision API 는 비동기 호출)
+                ocr_service = OCRService()
+                ocr_text = await ocr_service.extract_text_from_image_async(image_data)
+
+                if ocr_text and ocr_text.strip():
+                    # OCR이 성공한 경우 텍스트 사용
+                    final_answer = ocr_text.strip()
+                    print(f"OCR 성공: {final_answer}")
+                else:
+                    # OCR 실패 시 이미지를 base64로 저장
+                    final_answer = image_answer
+                    print(f"OCR 실패, 이미지 저장")
 
         except Exception as e:
             print(f"OCR 처리 중 오류 발생: {e}")
             # OCR 처리 실패 시 원본 답안 사용
             final_answer = answer
+            ocr_deferred = False
     else:
         final_answer = answer
 
@@ -231,13 +243,26 @@ async def save_answer_with_ocr(
 
     if existing_answer:
         existing_answer.answer = final_answer
+        saved_answer = existing_answer
     else:
-        new_answer = TestAnswer(
+        saved_answer = TestAnswer(
             session_id=session_id,
             problem_id=problem_id,
             answer=final_answer
         )
-        db.add(new_answer)
+        db.add(saved_answer)
 
     db.commit()
+
+    if ocr_deferred:
+        try:
+            from ..tasks import ocr_test_answer_task
+            ocr_test_answer_task.apply_async(args=[saved_answer.id])
+        except Exception as e:
+            # 큐 등록 실패 시에도 이미지 답안은 저장되어 채점 시 OCR 처리됨
+            print(f"⚠️ OCR 태스크 등록 실패: {e}")
+            ocr_deferred = False
+
+        return {"message": "Answer saved with OCR support", "ocr_pending": ocr_deferred}
+
     return {"message": "Answer saved with OCR support"}
@@ -152,6 +152,18 @@ class AssignmentDeployRequest(BaseModel):
     classroom_id: int
 
 
+class ClassroomDeployTarget(BaseModel):
+    """일괄 배포 대상 클래스룸"""
+    classroom_id: int
+    student_ids: List[int]
+
+
+class BulkAssignmentDeployRequest(BaseModel):
+    """과제 일괄 배포 요청 (과제 x 클래스룸)"""
+    assignment_ids: List[int]
+    classrooms: List[ClassroomDeployTarget]
+
+
 class AssignmentDeploymentResponse(BaseModel):
     """과제 배포 응답"""
     id: int
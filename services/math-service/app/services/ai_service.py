@@ -1,9 +1,9 @@
 import os
 import json
-import google.generativeai as genai
 from typing import Dict, List
 from dotenv import load_dotenv
 from .problem_generator import ProblemGenerator
+from .llm_gateway import get_llm_gateway
 from .ocr_service import OCRService
 
 load_dotenv()
@@ -15,8 +15,7 @@ class AIService:
         if not gemini_api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
 
-        genai.configure(api_key=gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        self.model = get_llm_gateway().gemini_model('gemini-2.5-pro')
 
         # 서비스 인스턴스 초기화
         self.problem_generator = ProblemGenerator()
@@ -0,0 +1,154 @@
+"""
+과제 일괄 배포 - 학생 수와 관계없이 조회 1회 + 다중 행 INSERT 1회 + 알림 요청 1회
+
+- 기존 배포 조회: (assignment_id, student_id) 를 IN 조건으로 한 번에 조회
+- 신규 배포: INSERT ... VALUES (...), (...) ON CONFLICT DO NOTHING RETURNING *
+  (uq_assignment_deployments_assignment_student 유니크 제약으로 동시 배포 시에도 중복 행 없음)
+- 알림: notification-service(/api/notifications/assignment)로 새로 배포된 학생 목록을 한 번에 전송
+"""
+import os
+import json
+import urllib.request
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models.math_generation import Assignment, AssignmentDeployment
+
+SERVICE_NAME = "math"
+NOTIFICATION_SERVICE_URL = os.getenv("NOTIFICATION_SERVICE_URL", "http://localhost:8006")
+NOTIFICATION_TIMEOUT = float(os.getenv("NOTIFICATION_TIMEOUT", "5"))
+
+DEPLOYMENT_UNIQUE_CONSTRAINT = "uq_assignment_deployments_assignment_student"
+
+# 다른 클래스룸용 과제를 만들 때 원본에서 복사하지 않는 컬럼
+_ASSIGNMENT_SKIP_COLUMNS = {"id", "classroom_id", "is_deployed", "created_at", "updated_at"}
+
+
+def resolve_assignments(db: Session, sources: Sequence[Assignment],
+                        classroom_ids: Sequence[int]) -> Dict[Tuple[int, int], Assignment]:
+    """(워크시트, 클래스룸) 별 과제 - 없으면 원본 과제를 복사해 생성, 모두 deployed 로 변경 (flush 까지)"""
+    sources_by_worksheet = {source.worksheet_id: source for source in sources}
+    wanted = {(worksheet_id, classroom_id) for worksheet_id in sources_by_worksheet for classroom_id in classroom_ids}
+
+    assignments = {(source.worksheet_id, source.classroom_id): source for source in sources}
+    missing = wanted - assignments.keys()
+    if missing:
+        for assignment in db.query(Assignment).filter(
+            Assignment.worksheet_id.in_(list(sources_by_worksheet)),
+            Assignment.classroom_id.in_(list(classroom_ids))
+        ).all():
+            assignments.setdefault((assignment.worksheet_id, assignment.classroom_id), assignment)
+
+    created = []
+    for worksheet_id, classroom_id in wanted - assignments.keys():
+        source = sources_by_worksheet[worksheet_id]
+        assignment = Assignment(
+            classroom_id=classroom_id,
+            **{
+                column.key: getattr(source, column.key)
+                for column in Assignment.__table__.columns
+                if column.key not in _ASSIGNMENT_SKIP_COLUMNS
+            }
+        )
+        assignments[(worksheet_id, classroom_id)] = assignment
+        created.append(assignment)
+    if created:
+        db.add_all(created)
+
+    for key in wanted:
+        assignments[key].is_deployed = "deployed"
+    db.flush()
+    return {key: assignments[key] for key in wanted}
+
+
+def deploy_students(db: Session, targets: Iterable[Tuple[Assignment, int, Sequence[int]]]
+                    ) -> Tuple[List[AssignmentDeployment], Dict[int, List[int]]]:
+    """(과제, 클래스룸, 학생 목록) 배포 - (요청한 모든 배포 행, 과제별 새로 배포된 학생) 반환 (커밋은 호출자)"""
+    targets = [(assignment, classroom_id, list(dict.fromkeys(student_ids)))
+               for assignment, classroom_id, student_ids in targets]
+    assignment_ids = {assignment.id for assignment, _, _ in targets}
+    student_ids = {student_id for _, _, ids in targets for student_id in ids}
+    if not assignment_ids or not student_ids:
+        return [], {}
+
+    existing = {
+        (deployment.assignment_id, deployment.student_id): deployment
+        for deployment in db.query(AssignmentDeployment).filter(
+            AssignmentDeployment.assignment_id.in_(assignment_ids),
+            AssignmentDeployment.student_id.in_(student_ids)
+        ).all()
+    }
+
+    rows = [
+        {"assignment_id": assignment.id, "student_id": student_id, "classroom_id": classroom_id, "status": "assigned"}
+        for assignment, classroom_id, ids in targets
+        for student_id in ids
+        if (assignment.id, student_id) not in existing
+    ]
+    inserted = {}
+    if rows:
+        stmt = insert(AssignmentDeployment).values(rows).on_conflict_do_nothing().returning(AssignmentDeployment)
+        inserted = {
+            (deployment.assignment_id, deployment.student_id): deployment
+            for deployment in db.scalars(stmt).all()
+        }
+        if len(inserted) < len(rows):
+            # 동시에 다른 요청이 먼저 배포한 행
+            for deployment in db.query(AssignmentDeployment).filter(
+                AssignmentDeployment.assignment_id.in_(assignment_ids),
+                AssignmentDeployment.student_id.in_(student_ids)
+            ).all():
+                existing.setdefault((deployment.assignment_id, deployment.student_id), deployment)
+
+    deployments, new_students = [], {}
+    for assignment, _, ids in targets:
+        for student_id in ids:
+            key = (assignment.id, student_id)
+            if key in inserted:
+                deployments.append(inserted[key])
+                new_students.setdefault(assignment.id, []).append(student_id)
+            elif key in existing:
+                deployments.append(existing[key])
+    return deployments, new_students
+
+
+def notify_assignment_deployed(assignments: Sequence[Dict[str, Any]], teacher_id: Optional[int] = None) -> int:
+    """새로 배포된 학생들에게 과제 알림 (요청 1회) - 전송 수 반환, 실패해도 배포에는 영향 없음
+
+    assignments: [{"assignment_id", "title", "classroom_id", "student_ids"}]
+    """
+    assignments = [assignment for assignment in assignments if assignment["student_ids"]]
+    if not assignments:
+        return 0
+    request = urllib.request.Request(
+        f"{NOTIFICATION_SERVICE_URL}/api/notifications/assignment",
+        data=json.dumps({"service": SERVICE_NAME, "teacher_id": teacher_id, "assignments": assignments}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=NOTIFICATION_TIMEOUT) as response:
+            return json.loads(response.read()).get("sent_count", 0)
+    except Exception as e:
+        print(f"⚠️ 과제 배포 알림 전송 실패: {str(e)}")
+        return 0
+
+
+def ensure_deployment_unique_constraint(engine) -> bool:
+    """기존 테이블에 (assignment_id, student_id) 유니크 인덱스 추가 (create_all 은 기존 테이블을 변경하지 않음)
+
+    중복 배포 행이 이미 있으면 실패하며, 이 경우에도 일괄 배포는 사전 조회로 중복을 걸러 동작
+    """
+    table = AssignmentDeployment.__table__
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {DEPLOYMENT_UNIQUE_CONSTRAINT} "
+                f"ON {table.schema}.{table.name} (assignment_id, student_id)"
+            ))
+        return True
+    except Exception as e:
+        print(f"⚠️ 과제 배포 유니크 인덱스 생성 실패 (중복 배포 행 확인 필요): {str(e)}")
+        return False
@@ -0,0 +1,205 @@
+"""
+교육과정 인메모리 인덱스 - middle1_math_curriculum.json 을 한 번만 읽어 조회용 구조와 응답을 미리 만들어 둠
+
+- (학교급, 학년, 학기, 대단원 번호, 소단원 번호) → 소단원 dict (difficulty_levels 파싱 완료)
+- /api/curriculum/* 응답 본문과 ETag 를 미리 직렬화 (If-None-Match 일치 시 304)
+- 파일 mtime 이 바뀌면 다음 조회 때 다시 로드 (CURRICULUM_RELOAD_INTERVAL 초마다 확인)
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional, Tuple
+
+CURRICULUM_FILE_PATH = os.path.join(os.path.dirname(__file__), "../../data/middle1_math_curriculum.json")
+
+# mtime 확인 주기 (초)
+CURRICULUM_RELOAD_INTERVAL = float(os.getenv("CURRICULUM_RELOAD_INTERVAL", "2"))
+
+SCHOOL_LEVEL_PREFIXES = {"초": "초등학교", "중": "중학교", "고": "고등학교"}
+
+SCHOOL_LEVELS = [
+    {"value": "초등학교", "label": "초등학교", "grades": list(range(1, 7))},
+    {"value": "중학교", "label": "중학교", "grades": list(range(1, 4))},
+    {"value": "고등학교", "label": "고등학교", "grades": list(range(1, 4))}
+]
+
+
+def _serialize(payload) -> Tuple[bytes, str]:
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return body, f'"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 ETag 와 일치하는지 (약한 비교)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class _Snapshot:
+    """한 번 로드한 교육과정 파일로 만든 조회 구조 (불변)"""
+
+    def __init__(self, items: List[Dict], mtime: float):
+        self.mtime = mtime
+        self.chapters: Dict[Tuple[str, int, str, str, str], Dict] = {}
+        self.chapters_by_name: Dict[Tuple[str, str, str], Dict] = {}
+
+        units: Dict[str, Dict] = {}
+        unit_summaries: Dict[str, Dict] = {}
+        chapters_by_unit: Dict[str, List[Dict]] = {}
+
+        for item in items:
+            grade_label = item["grade"]  # "중1"
+            school_level = SCHOOL_LEVEL_PREFIXES.get(grade_label[:1], grade_label[:1])
+            grade = int(grade_label[1:]) if grade_label[1:].isdigit() else 0
+            difficulty_levels = item.get("difficulty_levels")
+            if isinstance(difficulty_levels, str):
+                difficulty_levels = json.loads(difficulty_levels)
+
+            chapter = {
+                "grade": grade_label,
+                "semester": item["semester"],
+                "unit_number": item["unit_number"],
+                "unit_name": item["unit_name"],
+                "chapter_number": item["chapter_number"],
+                "chapter_name": item["chapter_name"],
+                "learning_objectives": item.get("learning_objectives", ""),
+                "keywords": item.get("keywords", item["chapter_name"]),
+                "difficulty_levels": difficulty_levels,
+            }
+            self.chapters[(school_level, grade, item["semester"], item["unit_number"], item["chapter_number"])] = chapter
+            self.chapters_by_name[(grade_label, item["semester"], item["chapter_name"])] = chapter
+
+            # 화면용 구조는 기존과 같이 중1 1학기만 제공
+            if grade_label != "중1" or item["semester"] != "1학기":
+                continue
+
+            unit_name = item["unit_name"]
+            unit = units.setdefault(item["unit_number"], {
+                "unit_number": item["unit_number"],
+                "unit_name": unit_name,
+                "chapters": []
+            })
+            unit["chapters"].append({
+                "chapter_number": item["chapter_number"],
+                "chapter_name": item["chapter_name"],
+                "unit_name": unit_name,
+                "learning_objectives": chapter["learning_objectives"],
+                "keywords": chapter["keywords"],
+                "difficulty_levels": difficulty_levels
+            })
+            unit_summaries.setdefault(unit_name, {"unit_number": item["unit_number"], "unit_name": unit_name})
+            chapters_by_unit.setdefault(unit_name, []).append({
+                "unit_name": unit_name,
+                "chapter_number": item["chapter_number"],
+                "chapter_name": item["chapter_name"],
+                "learning_objectives": chapter["learning_objectives"],
+                "keywords": chapter["keywords"]
+            })
+
+        self.structure = {
+            "school_levels": SCHOOL_LEVELS,
+            "middle1_1semester": {
+                "grade": "중1",
+                "semester": "1학기",
+                "units": list(units.values())
+            }
+        }
+        self.units = list(unit_summaries.values())
+        self.chapters_by_unit = chapters_by_unit
+
+        # 라우터 응답 본문/ETag 미리 직렬화
+        self.responses: Dict[Tuple[str, str], Tuple[bytes, str]] = {
+            ("structure", ""): _serialize({"structure": self.structure}),
+            ("units", ""): _serialize({"units": self.units}),
+            ("chapters", ""): _serialize({"chapters": []}),
+        }
+        for unit_name, chapters in chapters_by_unit.items():
+            self.responses[("chapters", unit_name)] = _serialize({"chapters": chapters})
+
+
+class CurriculumIndex:
+    """교육과정 파일 인덱스 (mtime 변경 시 자동 재로드)"""
+
+    def __init__(self, path: str = CURRICULUM_FILE_PATH):
+        self.path = path
+        self._snapshot: Optional[_Snapshot] = None
+        self._error: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self) -> Optional[_Snapshot]:
+        now = time.monotonic()
+        if self._snapshot is not None and now - self._checked_at < CURRICULUM_RELOAD_INTERVAL:
+            return self._snapshot
+
+        with self._lock:
+            if self._snapshot is not None and now - self._checked_at < CURRICULUM_RELOAD_INTERVAL:
+                return self._snapshot
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except FileNotFoundError:
+                self._error = "교육과정 데이터 파일을 찾을 수 없습니다."
+                return self._snapshot
+
+            if self._snapshot is None or self._snapshot.mtime != mtime:
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self._snapshot = _Snapshot(json.load(f), mtime)
+                    self._error = None
+                    print(f"✅ 교육과정 인덱스 로드: {len(self._snapshot.chapters)}개 소단원")
+                except (json.JSONDecodeError, KeyError, ValueError) as e:
+                    # 편집 중인 파일 등 - 기존 인덱스 유지
+                    self._error = "교육과정 데이터 파일 형식이 올바르지 않습니다."
+                    print(f"⚠️ 교육과정 파일 로드 실패, 기존 인덱스 유지: {str(e)}")
+            return self._snapshot
+
+    def load(self) -> bool:
+        """시작 시 미리 로드"""
+        return self._current() is not None
+
+    @property
+    def error(self) -> Optional[str]:
+        return self._error
+
+    def get_structure(self) -> Optional[Dict]:
+        snapshot = self._current()
+        return snapshot.structure if snapshot else None
+
+    def get_units(self) -> List[Dict]:
+        snapshot = self._current()
+        return snapshot.units if snapshot else []
+
+    def get_chapters_by_unit(self, unit_name: str) -> List[Dict]:
+        snapshot = self._current()
+        return snapshot.chapters_by_unit.get(unit_name, []) if snapshot else []
+
+    def get_chapter(self, school_level: str, grade: int, semester: str,
+                    unit_number: str, chapter_number: str) -> Optional[Dict]:
+        snapshot = self._current()
+        return snapshot.chapters.get((school_level, grade, semester, unit_number, chapter_number)) if snapshot else None
+
+    def get_chapter_by_name(self, grade_label: str, semester: str, chapter_name: str) -> Optional[Dict]:
+        snapshot = self._current()
+        return snapshot.chapters_by_name.get((grade_label, semester, chapter_name)) if snapshot else None
+
+    def iter_chapters(self) -> List[Dict]:
+        snapshot = self._current()
+        return list(snapshot.chapters.values()) if snapshot else []
+
+    def get_response(self, kind: str, key: str = "") -> Optional[Tuple[bytes, str]]:
+        """미리 직렬화된 (응답 본문, ETag) - 없는 대단원은 빈 목록 응답"""
+        snapshot = self._current()
+        if snapshot is None:
+            return None
+        return snapshot.responses.get((kind, key)) or snapshot.responses.get((kind, ""))
+
+
+curriculum_index = CurriculumIndex()
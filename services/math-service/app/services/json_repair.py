@@ -0,0 +1,296 @@
+"""
+관대한 JSON 파서 - LLM 응답의 흔한 JSON 결함을 한 번의 선형 스캔으로 복구
+
+복구 대상:
+- 코드 블록(```json) 및 앞뒤 설명 문장
+- 이스케이프되지 않은 LaTeX 백슬래시 (\\frac, \\times, \\sqrt ...)
+- 문자열 내부의 줄바꿈/제어 문자, 이스케이프되지 않은 따옴표, 작은따옴표 문자열
+- 끝부분 쉼표, 누락된 쉼표/콜론, 따옴표 없는 키, Python 리터럴(True/False/None)
+- 이어 붙은 여러 최상위 객체 ({...}{...} → [{...},{...}])
+- 잘린 응답 (열린 문자열과 괄호를 자동으로 닫음)
+"""
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+_TOP_LEVEL_SKIP = re.compile(r"[^{\[`]+")
+_DQ_CHUNK = re.compile(r'[^"\\\x00-\x1f]+')
+_SQ_CHUNK = re.compile(r"[^'\"\\\x00-\x1f]+")
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_NUMBER = re.compile(r"-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_LETTERS = re.compile(r"[A-Za-z]+")
+_HEX4 = re.compile(r"[0-9a-fA-F]{4}")
+
+_LITERALS = {
+    "true": "true", "True": "true",
+    "false": "false", "False": "false",
+    "null": "null", "None": "null", "undefined": "null",
+    "NaN": "null", "Infinity": "null",
+}
+
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+# \n, \r, \t 로 시작해 JSON 이스케이프와 겹치는 LaTeX 명령
+# (\b, \f 로 시작하는 두 글자 이상 단어는 항상 LaTeX로 간주)
+_LATEX_COMMANDS = {
+    "text", "textbf", "textit", "textrm", "textsf", "times", "theta", "tan", "tanh", "to",
+    "triangle", "top", "tau", "tfrac", "tbinom", "tilde", "therefore",
+    "neq", "ne", "nabla", "not", "notin", "nu", "ni", "newline", "nleq", "ngeq",
+    "nmid", "nparallel", "neg", "nless", "ngtr", "nsubseteq", "nexists",
+    "right", "rightarrow", "rightleftharpoons", "rho", "rm", "rangle", "rfloor",
+    "rceil", "rbrace", "rvert", "root",
+}
+
+# 문자열을 닫는 따옴표 뒤에 올 수 있는 문자 (그 외에는 문자열 내부의 따옴표로 간주)
+_STRING_TERMINATORS = set(",:}]\"'`")
+
+
+def _is_latex_command(word: str) -> bool:
+    if word[0] in "bf":
+        return len(word) >= 2
+    return word in _LATEX_COMMANDS
+
+
+def _closes_string(text: str, i: int, n: int) -> bool:
+    m = _WHITESPACE.match(text, i)
+    if m:
+        i = m.end()
+    return i >= n or text[i] in _STRING_TERMINATORS
+
+
+def _scan_escape(text: str, i: int, n: int) -> Tuple[str, int]:
+    """text[i] == '\\' 인 이스케이프를 JSON 이스케이프로 변환"""
+    if i + 1 >= n:
+        return "\\\\", i + 1
+    nxt = text[i + 1]
+    if nxt in "\"\\/":
+        return "\\" + nxt, i + 2
+    if nxt == "'":
+        return "'", i + 2
+    if nxt == "u" and _HEX4.match(text, i + 2):
+        return text[i:i + 6], i + 6
+    if nxt in "bfnrt" and not _is_latex_command(_LETTERS.match(text, i + 1).group(0)):
+        return "\\" + nxt, i + 2
+    # LaTeX 명령 등 JSON에서 허용되지 않는 이스케이프 → 백슬래시 자체를 이스케이프
+    return "\\\\", i + 1
+
+
+def _scan_string(text: str, i: int, n: int) -> Tuple[str, int]:
+    """text[i]의 따옴표로 시작하는 문자열을 JSON 문자열로 변환"""
+    quote = text[i]
+    chunk = _DQ_CHUNK if quote == '"' else _SQ_CHUNK
+    buf = ['"']
+    i += 1
+    while i < n:
+        m = chunk.match(text, i)
+        if m:
+            buf.append(m.group(0))
+            i = m.end()
+            if i >= n:
+                break
+        ch = text[i]
+        if ch == quote:
+            if _closes_string(text, i + 1, n):
+                buf.append('"')
+                return "".join(buf), i + 1
+            buf.append('\\"')
+            i += 1
+        elif ch == "\\":
+            escaped, i = _scan_escape(text, i, n)
+            buf.append(escaped)
+        elif ch == '"':
+            buf.append('\\"')
+            i += 1
+        else:
+            buf.append(_CONTROL_ESCAPES.get(ch, ""))
+            i += 1
+    # 잘린 응답 - 열린 문자열 닫기
+    buf.append('"')
+    return "".join(buf), n
+
+
+def repair_json(text: str) -> str:
+    """
+    LLM 응답 텍스트를 유효한 JSON 문자열로 복구 (단일 선형 스캔)
+
+    최상위 값이 여러 개면 배열로 묶어 반환, JSON 구조가 없으면 빈 문자열 반환
+    """
+    if not text:
+        return ""
+
+    n = len(text)
+    i = 0
+    fence = text.find("```json")
+    if fence != -1:
+        i = fence + 7
+
+    values: List[str] = []
+    out: List[str] = []
+    stack: List[str] = []
+    # 직전 토큰: open | comma | colon | key | value
+    last = "open"
+
+    def close_top():
+        nonlocal last
+        if last == "comma":
+            out.pop()
+        elif last == "colon":
+            out.append("null")
+        elif last == "key":
+            out.append(":null")
+        out.append("}" if stack.pop() == "{" else "]")
+        last = "value"
+
+    while i < n:
+        if not stack:
+            if out:
+                values.append("".join(out))
+                out = []
+            # 최상위: 설명 문장은 건너뛰고, 값 이후의 코드 블록 닫힘에서 종료
+            m = _TOP_LEVEL_SKIP.match(text, i)
+            if m:
+                i = m.end()
+                continue
+            ch = text[i]
+            if ch == "`":
+                if values and text.startswith("```", i):
+                    break
+                i += 1
+                continue
+            stack.append(ch)
+            out.append(ch)
+            last = "open"
+            i += 1
+            continue
+
+        ch = text[i]
+
+        if ch in " \t\r\n":
+            i = _WHITESPACE.match(text, i).end()
+            continue
+
+        if ch == ",":
+            if last == "value":
+                out.append(",")
+                last = "comma"
+            elif last == "key":
+                out.append(":null,")
+                last = "comma"
+            i += 1
+            continue
+
+        if ch == ":":
+            if last == "key":
+                out.append(":")
+                last = "colon"
+            i += 1
+            continue
+
+        if ch == "}" or ch == "]":
+            want = "{" if ch == "}" else "["
+            if want in stack:
+                while stack[-1] != want:
+                    close_top()
+                close_top()
+            i += 1
+            continue
+
+        if ch == "/" and i + 1 < n and text[i + 1] in "/*":
+            # 주석 제거
+            if text[i + 1] == "/":
+                end = text.find("\n", i)
+                i = n if end == -1 else end
+            else:
+                end = text.find("*/", i + 2)
+                i = n if end == -1 else end + 2
+            continue
+
+        # 여기부터는 값(또는 키)의 시작
+        token = None
+        if ch == '"' or ch == "'":
+            token, i = _scan_string(text, i, n)
+        elif ch == "{" or ch == "[":
+            token = ch
+            i += 1
+        elif ch in "-+.0123456789":
+            m = _NUMBER.match(text, i + 1 if ch == "+" else i)
+            if m:
+                token = m.group(0)
+                if token.startswith("."):
+                    token = "0" + token
+                elif token.startswith("-."):
+                    token = "-0" + token[1:]
+                if token.endswith("."):
+                    token += "0"
+                i = m.end()
+        else:
+            m = _IDENTIFIER.match(text, i)
+            if m:
+                token = m.group(0)
+                i = m.end()
+
+        if token is None:
+            # 구조 밖의 알 수 없는 문자는 무시
+            i += 1
+            continue
+
+        # 누락된 쉼표/콜론 보정
+        if last == "value":
+            out.append(",")
+            last = "comma"
+        elif last == "key":
+            out.append(":")
+            last = "colon"
+        is_key = stack[-1] == "{" and last in ("open", "comma")
+
+        if token == "{" or token == "[":
+            if is_key:
+                # 키 자리에 온 중첩 구조는 복구 불가 - 무시
+                continue
+            stack.append(token)
+            out.append(token)
+            last = "open"
+            continue
+
+        if token[0] == '"':
+            out.append(token)
+        elif is_key:
+            out.append('"' + token + '"')
+        elif token[0].isalpha() or token[0] == "_":
+            out.append(_LITERALS.get(token) or '"' + token + '"')
+        else:
+            out.append(token)
+        last = "key" if is_key else "value"
+
+    # 잘린 응답 - 열린 괄호 닫기
+    while stack:
+        close_top()
+    if out:
+        values.append("".join(out))
+
+    if not values:
+        return ""
+    if len(values) == 1:
+        return values[0]
+    return "[" + ",".join(values) + "]"
+
+
+def loads_tolerant(text: str) -> Any:
+    """LLM 응답을 JSON으로 파싱 - 복구 불가 시 json.JSONDecodeError"""
+    stripped = text.strip() if text else ""
+    # 백슬래시가 없는 정상 JSON은 바로 파싱 (\f, \t 등이 LaTeX인지 판단할 필요 없음)
+    if stripped[:1] in ("{", "[") and "\\" not in stripped:
+        try:
+            return json.loads(stripped)
+        except json.JSONDecodeError:
+            pass
+    return json.loads(repair_json(text))
+
+
+def loads_json_list(text: str) -> List[Dict]:
+    """LLM 응답을 객체 리스트로 파싱 (단일 객체면 리스트로 감쌈)"""
+    result = loads_tolerant(text)
+    if isinstance(result, dict):
+        return [result]
+    return [item for item in result if isinstance(item, dict)] if isinstance(result, list) else []
@@ -0,0 +1,83 @@
+"""
+AI Judge 마이크로 배처 - 여러 스레드에서 동시에 들어오는 검증 요청을 모아 한 번의 배치 호출로 처리
+
+- 대기 요청이 max_batch_size 에 도달하면 즉시 실행
+- 그 전에는 첫 요청 후 max_wait 초가 지나면 모인 만큼 실행
+"""
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+AI_JUDGE_MAX_BATCH_SIZE = int(os.getenv("AI_JUDGE_MAX_BATCH_SIZE", "8"))
+AI_JUDGE_BATCH_WINDOW_MS = int(os.getenv("AI_JUDGE_BATCH_WINDOW_MS", "300"))
+
+
+class JudgeBatcher:
+    """검증 요청 마이크로 배처
+
+    batch_fn은 항목 리스트를 받아 같은 순서의 결과 리스트를 반환 (실패 항목은 Exception 인스턴스)
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = AI_JUDGE_MAX_BATCH_SIZE,
+                 max_wait: float = AI_JUDGE_BATCH_WINDOW_MS / 1000):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[Any, Future]] = []
+        self._timer = None
+        self.stats = {"items": 0, "batches": 0}
+
+    def submit(self, item: Any) -> Any:
+        """항목 하나를 검증 (배치 실행이 끝날 때까지 대기)"""
+        future = Future()
+        batch = None
+        with self._lock:
+            self._pending.append((item, future))
+            if len(self._pending) >= self.max_batch_size:
+                batch = self._take_pending()
+            elif self._timer is None:
+                timer = threading.Timer(self.max_wait, self._flush_on_timer)
+                timer.daemon = True
+                self._timer = timer
+                timer.start()
+
+        if batch:
+            self._run(batch)
+
+        result = future.result()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _take_pending(self) -> List[Tuple[Any, Future]]:
+        batch, self._pending = self._pending, []
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+    def _flush_on_timer(self):
+        with self._lock:
+            if self._timer is not threading.current_thread():
+                # 이미 크기 도달로 실행된 배치의 타이머
+                return
+            batch = self._take_pending()
+        if batch:
+            self._run(batch)
+
+    def _run(self, batch: List[Tuple[Any, Future]]):
+        self.stats["items"] += len(batch)
+        self.stats["batches"] += 1
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise Exception(f"배치 결과 개수 불일치: {len(results)}/{len(batch)}")
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
@@ -0,0 +1,175 @@
+"""
+LLM 응답 캐시 - (모델, 생성 설정, 정규화된 프롬프트) 해시 기반
+
+- 1차: 프로세스 내부 LRU
+- 2차: Redis (여러 워커 프로세스가 공유, 오류 후 LLM_CACHE_REDIS_RETRY_SECONDS 동안 로컬만 사용하고 다시 연결)
+- 호출 지점별 TTL, 샘플링 온도가 높은 호출은 캐시하지 않음
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from dotenv import load_dotenv
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from .fake_llm import FAKE_LLM_ENABLED
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Redis 오류 후 다시 연결을 시도하기까지 대기 (초)
+LLM_CACHE_REDIS_RETRY_SECONDS = 30
+
+# 이 온도를 넘는 샘플링 호출은 응답이 매번 달라야 하므로 캐시하지 않음
+MAX_CACHEABLE_TEMPERATURE = 0.2
+
+# 호출 지점별 TTL (초)
+CACHE_TTLS = {
+    "math_ai_judge": 7 * 24 * 3600,
+}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class LLMResponseCache:
+    """2단계(LRU + Redis) LLM 응답 캐시"""
+
+    def __init__(self, namespace: str, max_local_entries: int = 2048, redis_url: str = REDIS_URL):
+        # 가짜 프로바이더(부하 테스트) 응답이 실제 캐시와 섞이지 않도록 분리
+        self.namespace = f"{namespace}:fake" if FAKE_LLM_ENABLED else namespace
+        self.max_local_entries = max_local_entries
+        self.redis_url = redis_url
+        self._local: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        # LLM_CACHE_DISABLED=1 만 영구적으로 Redis 를 끔 (연결 오류는 잠시 후 다시 시도)
+        self._redis_disabled = not REDIS_AVAILABLE or os.getenv("LLM_CACHE_DISABLED") == "1"
+        self._redis_retry_at = 0.0
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "bypassed": 0}
+
+    @staticmethod
+    def make_key(model: str, prompt: Any, config: Optional[Dict] = None) -> str:
+        """(모델, 생성 설정, 정규화된 프롬프트) → sha256"""
+        if not isinstance(prompt, str):
+            prompt = json.dumps(prompt, ensure_ascii=False, sort_keys=True, default=str)
+        normalized = _WHITESPACE.sub(" ", prompt).strip()
+        payload = json.dumps(
+            {"model": model, "config": config or {}, "prompt": normalized},
+            ensure_ascii=False, sort_keys=True, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _redis_key(self, key: str) -> str:
+        return f"llm_cache:{self.namespace}:{key}"
+
+    def _get_redis(self):
+        if self._redis_disabled:
+            return None
+        if self._redis is None:
+            if time.time() < self._redis_retry_at:
+                return None
+            try:
+                client = redis.Redis.from_url(self.redis_url, decode_responses=True, socket_timeout=0.5)
+                client.ping()
+                self._redis = client
+            except Exception as e:
+                self._redis_failed(e)
+        return self._redis
+
+    def _redis_failed(self, e: Exception):
+        print(f"⚠️ LLM 캐시 Redis 오류, {LLM_CACHE_REDIS_RETRY_SECONDS}초 동안 로컬 캐시만 사용: {str(e)}")
+        self._redis = None
+        self._redis_retry_at = time.time() + LLM_CACHE_REDIS_RETRY_SECONDS
+
+    def _set_local(self, key: str, value: str):
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._local.get(key)
+            if value is not None:
+                self._local.move_to_end(key)
+                self.stats["local_hits"] += 1
+                return value
+
+        client = self._get_redis()
+        if client is not None:
+            try:
+                value = client.get(self._redis_key(key))
+            except Exception as e:
+                self._redis_failed(e)
+                value = None
+            if value is not None:
+                self.stats["redis_hits"] += 1
+                self._set_local(key, value)
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, value: str, ttl: int):
+        self._set_local(key, value)
+        client = self._get_redis()
+        if client is not None:
+            try:
+                client.set(self._redis_key(key), value, ex=ttl)
+            except Exception as e:
+                self._redis_failed(e)
+
+    def key_for(self, call_site: str, model: str, prompt: Any, config: Optional[Dict] = None) -> str:
+        """cached_call과 동일한 캐시 키 (배치 호출 결과를 항목별로 저장/조회할 때 사용)"""
+        return f"{call_site}:{self.make_key(model, prompt, config)}"
+
+    def cached_call(self, call_site: str, model: str, prompt: Any, compute: Callable[[], str],
+                    config: Optional[Dict] = None, temperature: Optional[float] = None,
+                    ttl: Optional[int] = None, validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        캐시를 거쳐 LLM 호출
+
+        Args:
+            call_site: 호출 지점 이름 (TTL 조회 및 키 분리용)
+            model: 모델 이름
+            prompt: 프롬프트 (문자열 또는 메시지 리스트)
+            compute: 캐시 미스 시 실제 호출을 수행하고 응답 텍스트를 반환하는 함수
+            config: 응답에 영향을 주는 생성 설정
+            temperature: 샘플링 온도 (MAX_CACHEABLE_TEMPERATURE 초과 시 캐시 미사용)
+            ttl: TTL(초), 없으면 CACHE_TTLS[call_site]
+            validate: 응답을 캐시에 저장해도 되는지 판단하는 함수 (파싱 불가 응답 저장 방지)
+        """
+        if temperature is not None and temperature > MAX_CACHEABLE_TEMPERATURE:
+            self.stats["bypassed"] += 1
+            return compute()
+
+        key = self.key_for(call_site, model, prompt, config)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        value = compute()
+        if value and (validate is None or validate(value)):
+            self.set(key, value, ttl or CACHE_TTLS.get(call_site, 24 * 3600))
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "local_entries": len(self._local),
+            "backend": "local" if self._redis_disabled or self._redis is None else "redis",
+        }
+
+
+llm_response_cache = LLMResponseCache(namespace="math")
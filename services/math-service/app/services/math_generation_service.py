@@ -1,9 +1,10 @@
 import json
-import os
 from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 from ..schemas.math_generation import MathProblemGenerationRequest, MathProblemGenerationResponse
 from .ai_client import problem_generator_instance
+from .curriculum_index import curriculum_index
+from .problem_bank_service import problem_bank_service, PROBLEM_BANK_LOW_WATER, PROBLEM_BANK_TARGET, PROBLEM_BANK_MAX_BATCH
 from ..models.problem import Problem
 from ..models.worksheet import Worksheet, WorksheetStatus
 import uuid
@@ -16,115 +17,21 @@ class MathGenerationService:
     def __init__(self):
         self.problem_generator = problem_generator_instance
     
-    def get_curriculum_structure(self, db: Session, school_level: Optional[str] = None) -> Dict:
-        """교육과정 구조 조회 - 중1 1학기에 초점"""
-        
-        # middle1_math_curriculum.json 파일 읽기
-        curriculum_file_path = os.path.join(os.path.dirname(__file__), "../../data/middle1_math_curriculum.json")
-        
-        try:
-            with open(curriculum_file_path, 'r', encoding='utf-8') as f:
-                curriculum_data = json.load(f)
-        except FileNotFoundError:
-            return {"error": "교육과정 데이터 파일을 찾을 수 없습니다."}
-        except json.JSONDecodeError:
-            return {"error": "교육과정 데이터 파일 형식이 올바르지 않습니다."}
-        
-        # 중1 1학기에 초점을 맞춘 구조화
-        structure = {
-            "school_levels": [
-                {"value": "초등학교", "label": "초등학교", "grades": list(range(1, 7))},
-                {"value": "중학교", "label": "중학교", "grades": list(range(1, 4))},
-                {"value": "고등학교", "label": "고등학교", "grades": list(range(1, 4))}
-            ]
-        }
-        
-        # 중1 1학기 데이터를 기반으로 상세 구조 생성
-        middle1_1semester = {}
-        units = {}
-        
-        for item in curriculum_data:
-            if item["grade"] == "중1" and item["semester"] == "1학기":
-                unit_number = item["unit_number"]
-                unit_name = item["unit_name"]
-                
-                if unit_number not in units:
-                    units[unit_number] = {
-                        "unit_number": unit_number,
-                        "unit_name": unit_name,
-                        "chapters": []
-                    }
-                
-                units[unit_number]["chapters"].append({
-                    "chapter_number": item["chapter_number"],
-                    "chapter_name": item["chapter_name"],
-                    "unit_name": unit_name,
-                    "learning_objectives": item["learning_objectives"],
-                    "keywords": item["keywords"],
-                    "difficulty_levels": json.loads(item["difficulty_levels"]) if isinstance(item["difficulty_levels"], str) else item["difficulty_levels"]
-                })
-        
-        middle1_1semester = {
-            "grade": "중1",
-            "semester": "1학기", 
-            "units": list(units.values())
-        }
-        
-        structure["middle1_1semester"] = middle1_1semester
-        
+    def get_curriculum_structure(self, db: Session = None, school_level: Optional[str] = None) -> Dict:
+        """교육과정 구조 조회 - 중1 1학기에 초점 (인메모리 인덱스, 읽기 전용)"""
+        structure = curriculum_index.get_structure()
+        if structure is None:
+            return {"error": curriculum_index.error or "교육과정 데이터 파일을 찾을 수 없습니다."}
         return structure
-    
+
     def get_units(self) -> List[Dict]:
         """대단원 목록 조회"""
-        curriculum_file_path = os.path.join(os.path.dirname(__file__), "../../data/middle1_math_curriculum.json")
-        
-        try:
-            with open(curriculum_file_path, 'r', encoding='utf-8') as f:
-                curriculum_data = json.load(f)
-        except FileNotFoundError:
-            return []
-        except json.JSONDecodeError:
-            return []
-        
-        units = {}
-        for item in curriculum_data:
-            if item["grade"] == "중1" and item["semester"] == "1학기":
-                unit_name = item["unit_name"]
-                if unit_name not in units:
-                    units[unit_name] = {
-                        "unit_number": item["unit_number"],
-                        "unit_name": unit_name
-                    }
-        
-        return list(units.values())
-    
+        return curriculum_index.get_units()
+
     def get_chapters_by_unit(self, unit_name: str) -> List[Dict]:
         """특정 대단원의 소단원 목록 조회"""
-        curriculum_file_path = os.path.join(os.path.dirname(__file__), "../../data/middle1_math_curriculum.json")
-        
-        try:
-            with open(curriculum_file_path, 'r', encoding='utf-8') as f:
-                curriculum_data = json.load(f)
-        except FileNotFoundError:
-            return []
-        except json.JSONDecodeError:
-            return []
-        
-        chapters = []
-        for item in curriculum_data:
-            if (item["grade"] == "중1" and 
-                item["semester"] == "1학기" and 
-                item["unit_name"] == unit_name):
-                chapters.append({
-                    "unit_name": item["unit_name"],
-                    "chapter_number": item["chapter_number"],
-                    "chapter_name": item["chapter_name"],
-                    "learning_objectives": item["learning_objectives"],
-                    "keywords": item["keywords"]
-                })
-        
-        return chapters
-    
+        return curriculum_index.get_chapters_by_unit(unit_name)
+
     def generate_problems(self, db: Session, request: MathProblemGenerationRequest, user_id: int) -> MathProblemGenerationResponse:
         """수학 문제 생성"""
         
@@ -244,14 +151,18 @@ class MathGenerationService:
     
     
     def _get_curriculum_data(self, request: MathProblemGenerationRequest) -> Dict:
-        """요청에서 교육과정 데이터 추출"""
+        """요청에서 교육과정 데이터 추출 (학습 목표/키워드는 교육과정 인덱스에서 조회)"""
+        chapter = curriculum_index.get_chapter(
+            request.school_level.value, request.grade, request.semester.value,
+            request.unit_number, request.chapter.chapter_number
+        )
         return {
             'grade': f"{request.school_level.value[:-2]}{request.grade}",  # "중1"
             'semester': request.semester.value,
             'unit_name': request.chapter.unit_name,
             'chapter_name': request.chapter.chapter_name,
-            'learning_objectives': getattr(request.chapter, 'learning_objectives', ''),
-            'keywords': getattr(request.chapter, 'keywords', request.chapter.chapter_name)
+            'learning_objectives': chapter['learning_objectives'] if chapter else getattr(request.chapter, 'learning_objectives', ''),
+            'keywords': chapter['keywords'] if chapter else getattr(request.chapter, 'keywords', request.chapter.chapter_name)
         }
     
     def _generate_problems_with_ai(self, curriculum_data: Dict, request: MathProblemGenerationRequest) -> List[Dict]:
@@ -373,9 +284,11 @@ class MathGenerationService:
 
         return result
 
-    def _generate_problems_with_ratio(self, curriculum_data: Dict, request) -> List[Dict]:
+    def _generate_problems_with_ratio(self, curriculum_data: Dict, request, on_problem=None) -> List[Dict]:
         """
         비율에 따른 문제 생성 - 병렬 처리
+
+        on_problem이 주어지면 문제가 완성되는 즉시 호출 (스트리밍 저장용)
         """
         total_count = request.problem_count.value_int
         ratio_counts = self._calculate_problem_counts_by_ratio(
@@ -406,17 +319,22 @@ class MathGenerationService:
                 "count": ratio_counts["short_answer"]
             })
 
+        # 사용자 세부사항이 없는 요청만 문제 은행 사용 (세부사항이 있으면 항상 새로 생성)
+        use_problem_bank = not request.user_text.strip()
+
         # 병렬로 각 유형 생성
         with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
             future_to_type = {}
             for task in tasks:
                 print(f"📝 {task['type']} 문제 {task['count']}개 생성 시작...")
                 future = executor.submit(
-                    self._generate_specific_type_problems_parallel,
+                    self._get_type_problems_from_bank_or_ai if use_problem_bank
+                    else self._generate_specific_type_problems_parallel,
                     count=task['count'],
                     problem_type=task['type'],
                     curriculum_data=curriculum_data,
-                    request=request
+                    request=request,
+                    on_problem=on_problem
                 )
                 future_to_type[future] = task['type']
 
@@ -439,16 +357,79 @@ class MathGenerationService:
         print(f"🎉 총 {len(problems)}개 문제 생성 완료")
         return problems
 
-    def _generate_specific_type_problems_parallel(self, count: int, problem_type: str, curriculum_data: Dict, request) -> List[Dict]:
+    def _get_type_problems_from_bank_or_ai(self, count: int, problem_type: str, curriculum_data: Dict, request,
+                                           on_problem=None) -> List[Dict]:
         """
-        특정 유형의 문제를 병렬로 생성 (개선된 버전)
+        문제 은행에서 먼저 꺼내고, 부족한 난이도만 AI로 생성
         """
-        print(f"🎯 {problem_type} 유형 {count}개 문제 병렬 생성 시작")
+        difficulties = self.problem_generator._assign_difficulties_to_problems(
+            count, request.difficulty_ratio.model_dump()
+        )
+        drawn, shortfall = problem_bank_service.draw_problems(curriculum_data, problem_type, difficulties)
+        if on_problem:
+            for problem in drawn:
+                on_problem(problem)
 
-        # 유형별 명확한 프롬프트 생성
+        if not shortfall:
+            return drawn
+
+        generated = self._generate_specific_type_problems_parallel(
+            count=len(shortfall),
+            problem_type=problem_type,
+            curriculum_data=curriculum_data,
+            request=request,
+            difficulties=shortfall,
+            on_problem=on_problem
+        )
+        return drawn + generated
+
+    def find_low_pools(self, low_water: int = PROBLEM_BANK_LOW_WATER) -> List[Dict]:
+        """low_water 미만인 풀 목록 (beat 태스크가 풀별 보충 태스크로 분배)"""
+        levels = problem_bank_service.get_pool_levels()
+        low_pools = []
+        for pool in problem_bank_service.get_pool_targets():
+            curriculum_data = pool["curriculum_data"]
+            current = levels.get((
+                curriculum_data['grade'], curriculum_data['semester'],
+                curriculum_data['chapter_name'], pool["difficulty"], pool["problem_type"]
+            ), 0)
+            if current < low_water:
+                low_pools.append({**pool, "current": current})
+        return low_pools
+
+    def replenish_pool(self, curriculum_data: Dict, difficulty: str, problem_type: str,
+                       low_water: int = PROBLEM_BANK_LOW_WATER, target: int = PROBLEM_BANK_TARGET) -> int:
+        """풀 하나를 보충 (한 번에 최대 PROBLEM_BANK_MAX_BATCH 개) - 추가한 개수 반환
+
+        분배 후 대기하는 동안 다른 요청이 채웠을 수 있으므로 생성 직전에 보유 개수를 다시 확인
+        """
+        current = problem_bank_service.get_pool_level(curriculum_data, difficulty, problem_type)
+        if current >= low_water:
+            return 0
+
+        needed = min(target - current, PROBLEM_BANK_MAX_BATCH)
+        print(f"🏦 문제 은행 보충: {curriculum_data['chapter_name']} {difficulty} {problem_type} {current}개 → +{needed}개")
+
+        generated = self.problem_generator.generate_problems_parallel(
+            curriculum_data=curriculum_data,
+            user_prompt=self._build_type_specific_prompt(problem_type, ""),
+            problem_count=needed,
+            problem_type=problem_type,
+            max_workers=min(needed, 10),
+            difficulties=[difficulty] * needed,
+            allow_partial=True,
+            speculative_extra=0  # 백그라운드 보충은 지연 시간보다 호출 비용 우선
+        )
+        validated = self._enforce_problem_type(generated, problem_type)
+        if not validated:
+            return 0
+        return problem_bank_service.add_problems(curriculum_data, problem_type, validated)
+
+    def _build_type_specific_prompt(self, problem_type: str, user_text: str) -> str:
+        """유형별 명확한 프롬프트 생성"""
         if problem_type == "multiple_choice":
-            type_specific_prompt = f"""
-{request.user_text}
+            return f"""
+{user_text}
 
 **반드시 지킬 조건 (절대 위반 금지):**
 1. 객관식(multiple_choice) 문제만 생성
@@ -459,8 +440,8 @@ class MathGenerationService:
 6. problem_type은 반드시 "multiple_choice"
 """
         else:  # short_answer
-            type_specific_prompt = f"""
-{request.user_text}
+            return f"""
+{user_text}
 
 **반드시 지킬 조건 (절대 위반 금지):**
 1. 단답형(short_answer) 문제만 생성
@@ -470,6 +451,50 @@ class MathGenerationService:
 5. problem_type은 반드시 "short_answer"
 """
 
+    def _enforce_problem_type(self, generated_problems: List[Dict], problem_type: str) -> List[Dict]:
+        """생성된 문제의 타입을 강제로 설정하고 검증"""
+        validated_problems = []
+        for problem in generated_problems:
+            # 타입 강제 설정
+            problem["problem_type"] = problem_type
+
+            # 객관식 문제 검증 및 수정
+            if problem_type == "multiple_choice":
+                # 선택지가 없거나 4개가 아니면 기본값 설정
+                if not problem.get("choices") or len(problem["choices"]) != 4:
+                    problem["choices"] = ["선택지 A", "선택지 B", "선택지 C", "선택지 D"]
+
+                # 정답이 A,B,C,D가 아니면 A로 설정
+                if problem.get("correct_answer") not in ["A", "B", "C", "D"]:
+                    problem["correct_answer"] = "A"
+
+            # 단답형 문제 검증 및 수정
+            elif problem_type == "short_answer":
+                # 선택지 제거
+                problem["choices"] = None
+
+            validated_problems.append(problem)
+        return validated_problems
+
+    def _generate_specific_type_problems_parallel(self, count: int, problem_type: str, curriculum_data: Dict, request,
+                                                  difficulties: List[str] = None, on_problem=None) -> List[Dict]:
+        """
+        특정 유형의 문제를 병렬로 생성 (개선된 버전)
+        """
+        print(f"🎯 {problem_type} 유형 {count}개 문제 병렬 생성 시작")
+
+        type_specific_prompt = self._build_type_specific_prompt(problem_type, request.user_text)
+
+        # 스트리밍 저장 전에 유형 강제 설정 (이후 일괄 검증과 동일한 결과)
+        # 이미 스트리밍된 문제는 폴백 시 다시 생성하지 않도록 기록
+        streamed: List[Dict] = []
+        stream_callback = None
+        if on_problem:
+            def stream_callback(problem: Dict):
+                validated = self._enforce_problem_type([problem], problem_type)[0]
+                streamed.append(validated)
+                on_problem(validated)
+
         try:
             # ProblemGenerator의 병렬 생성 메서드 사용
             generated_problems = self.problem_generator.generate_problems_parallel(
@@ -478,48 +503,42 @@ class MathGenerationService:
                 problem_count=count,
                 difficulty_ratio=request.difficulty_ratio.model_dump(),
                 problem_type=problem_type,
-                max_workers=min(count, 10)  # 최대 10개 동시 실행
+                max_workers=min(count, 10),  # 최대 10개 동시 실행
+                difficulties=difficulties,
+                on_problem=stream_callback
             )
 
-            # 생성된 문제의 타입을 강제로 설정하고 검증
-            validated_problems = []
-            for problem in generated_problems:
-                # 타입 강제 설정
-                problem["problem_type"] = problem_type
-
-                # 객관식 문제 검증 및 수정
-                if problem_type == "multiple_choice":
-                    # 선택지가 없거나 4개가 아니면 기본값 설정
-                    if not problem.get("choices") or len(problem["choices"]) != 4:
-                        problem["choices"] = ["선택지 A", "선택지 B", "선택지 C", "선택지 D"]
-
-                    # 정답이 A,B,C,D가 아니면 A로 설정
-                    if problem.get("correct_answer") not in ["A", "B", "C", "D"]:
-                        problem["correct_answer"] = "A"
-
-                # 단답형 문제 검증 및 수정
-                elif problem_type == "short_answer":
-                    # 선택지 제거
-                    problem["choices"] = None
-
-                validated_problems.append(problem)
+            validated_problems = self._enforce_problem_type(generated_problems, problem_type)
 
             print(f"✅ {problem_type} 유형 {len(validated_problems)}개 문제 병렬 생성 완료")
             return validated_problems
 
         except Exception as e:
-            print(f"❌ 병렬 생성 실패, 순차 생성으로 폴백: {str(e)}")
-            # 순차 생성으로 폴백
-            return self._generate_specific_type_problems(
-                count=count,
+            # 순차 생성으로 폴백 (이미 스트리밍되어 저장된 문제를 뺀 부족분만)
+            remaining = count - len(streamed)
+            print(f"❌ 병렬 생성 실패, 순차 생성으로 폴백 ({remaining}개, 스트리밍 {len(streamed)}개 유지): {str(e)}")
+            if remaining <= 0:
+                return streamed[:count]
+            # 요청된 난이도가 있으면 스트리밍된 문제가 채운 난이도를 뺀 나머지만 생성
+            remaining_difficulties = None
+            if difficulties:
+                remaining_difficulties = list(difficulties)
+                for problem in streamed:
+                    if problem.get("difficulty") in remaining_difficulties:
+                        remaining_difficulties.remove(problem["difficulty"])
+                remaining_difficulties = (remaining_difficulties + ["B"] * remaining)[:remaining]
+            return list(streamed) + self._generate_specific_type_problems(
+                count=remaining,
                 problem_type=problem_type,
                 curriculum_data=curriculum_data,
-                request=request
+                request=request,
+                difficulties=remaining_difficulties
             )
 
-    def _generate_specific_type_problems(self, count: int, problem_type: str, curriculum_data: Dict, request) -> List[Dict]:
+    def _generate_specific_type_problems(self, count: int, problem_type: str, curriculum_data: Dict, request,
+                                         difficulties: List[str] = None) -> List[Dict]:
         """
-        특정 유형의 문제를 지정된 개수만큼 생성
+        특정 유형의 문제를 지정된 개수만큼 생성 (difficulties 가 있으면 요청 비율 대신 해당 난이도로)
         """
         print(f"🎯 {problem_type} 유형 {count}개 문제 생성 시작")
 
@@ -559,7 +578,8 @@ JSON 형식에서 모든 문제의 problem_type이 "short_answer"인지 확인
                 user_prompt=type_specific_prompt,
                 problem_count=count,
                 difficulty_ratio=request.difficulty_ratio.model_dump(),
-                problem_type=problem_type
+                problem_type=problem_type,
+                difficulties=difficulties
             )
 
             # 생성된 문제의 타입을 강제로 설정하고 검증
@@ -600,7 +620,7 @@ JSON 형식에서 모든 문제의 problem_type이 "short_answer"인지 확인
                         "correct_answer": "A",
                         "explanation": f"{curriculum_data.get('chapter_name', '수학')} 관련 해설",
                         "problem_type": "multiple_choice",
-                        "difficulty": "B"
+                        "difficulty": difficulties[i] if difficulties and i < len(difficulties) else "B"
                     }
                 else:  # short_answer
                     problem = {
@@ -608,7 +628,7 @@ JSON 형식에서 모든 문제의 problem_type이 "short_answer"인지 확인
                         "correct_answer": "답안",
                         "explanation": f"{curriculum_data.get('chapter_name', '수학')} 관련 해설",
                         "problem_type": "short_answer",
-                        "difficulty": "B"
+                        "difficulty": difficulties[i] if difficulties and i < len(difficulties) else "B"
                     }
                 problems.append(problem)
             return problems
@@ -1,13 +1,28 @@
 """
 OCR 서비스 로직 분리 - 수학 필기체 답안 인식 최적화
+
+- extract_text_from_image: 동기 버전 (Celery 태스크용)
+- extract_text_from_image_async: API 요청 처리용 - 이벤트 루프를 막지 않음
+  이미지 전처리(OpenCV/PIL, CPU 작업)는 프로세스 풀에서, Vision API 호출은 공유 비동기 HTTP 클라이언트로 실행
 """
 import os
+import asyncio
+import threading
+import multiprocessing
 import requests
 import base64
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, Optional
 import io
 import re
 
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
 try:
     from PIL import Image, ImageEnhance, ImageFilter
     PIL_AVAILABLE = True
@@ -23,6 +38,48 @@ except ImportError:
     CV2_AVAILABLE = False
     
 
+VISION_API_URL = "https://vision.googleapis.com/v1/images:annotate"
+VISION_API_TIMEOUT = float(os.getenv("OCR_VISION_TIMEOUT", "30"))
+OCR_PREPROCESS_WORKERS = int(os.getenv("OCR_PREPROCESS_WORKERS", "2"))
+
+# 프로세스당 하나씩 (처음 사용할 때 생성)
+_preprocess_pool: Optional[ProcessPoolExecutor] = None
+_vision_client = None
+_pool_lock = threading.Lock()
+
+
+def get_preprocess_pool() -> ProcessPoolExecutor:
+    """이미지 전처리용 프로세스 풀 - 스레드가 있는 서버 프로세스를 fork 하지 않도록 spawn 사용"""
+    global _preprocess_pool
+    if _preprocess_pool is None:
+        with _pool_lock:
+            if _preprocess_pool is None:
+                _preprocess_pool = ProcessPoolExecutor(
+                    max_workers=max(1, OCR_PREPROCESS_WORKERS),
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _preprocess_pool
+
+
+def _reset_preprocess_pool():
+    """워커 프로세스가 죽어 풀이 깨진 경우 다음 요청에서 새로 생성"""
+    global _preprocess_pool
+    with _pool_lock:
+        if _preprocess_pool is not None:
+            _preprocess_pool.shutdown(wait=False)
+            _preprocess_pool = None
+
+
+def get_vision_client():
+    """Vision API 호출용 공유 비동기 HTTP 클라이언트 (연결 재사용)"""
+    global _vision_client
+    if _vision_client is None or _vision_client.is_closed:
+        _vision_client = httpx.AsyncClient(
+            timeout=VISION_API_TIMEOUT,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+    return _vision_client
+
 
 class OCRService:
     """OCR 전용 클래스 - 수학 필기체 답안 인식에 특화"""
@@ -88,6 +145,60 @@ class OCRService:
                 print(traceback.format_exc())
             return ""
 
+    async def extract_text_from_image_async(self, image_data: bytes) -> str:
+        """extract_text_from_image 의 비동기 버전 (결과 동일)"""
+        try:
+            self._log(f"image_data 타입: {type(image_data)}, 크기: {len(image_data) if image_data else 0} bytes")
+
+            if not image_data or len(image_data) < 50:
+                self._log(f"이미지 데이터가 비어있거나 너무 작음")
+                return ""
+
+            if self.debug_mode:
+                await asyncio.to_thread(self._save_debug_image, image_data, "original")
+
+            # 이미지 전처리 (프로세스 풀)
+            processed_data = await self._preprocess_image_async(image_data)
+            if processed_data:
+                image_data = processed_data
+                if self.debug_mode:
+                    await asyncio.to_thread(self._save_debug_image, image_data, "processed")
+
+            # Google Vision API 호출 (공유 비동기 클라이언트)
+            image_base64 = base64.b64encode(image_data).decode('utf-8')
+            result = await self._call_vision_api_async(image_base64)
+
+            if result:
+                self._log(f"원본 인식 텍스트: {result[:100]}")
+                cleaned_text = self._clean_math_text(result)
+                self._log(f"후처리된 텍스트: {cleaned_text[:100]}")
+                return cleaned_text
+
+            return ""
+
+        except Exception as e:
+            print(f"❌ OCR 처리 오류: {str(e)}")
+            if self.debug_mode:
+                import traceback
+                print(traceback.format_exc())
+            return ""
+
+    async def _preprocess_image_async(self, image_data: bytes) -> Optional[bytes]:
+        """전처리를 프로세스 풀에서 실행 (풀을 쓸 수 없으면 스레드에서 실행)"""
+        if not CV2_AVAILABLE and not PIL_AVAILABLE:
+            self._log("전처리 라이브러리 없음 - 원본 사용")
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(get_preprocess_pool(), self._preprocess_image, image_data)
+        except BrokenProcessPool as e:
+            print(f"⚠️ OCR 전처리 프로세스 풀 오류, 스레드에서 처리: {str(e)}")
+            _reset_preprocess_pool()
+        except Exception as e:
+            self._log(f"프로세스 풀 전처리 실패, 스레드에서 처리: {e}")
+        return await asyncio.to_thread(self._preprocess_image, image_data)
+
     def _save_debug_image(self, image_data: bytes, suffix: str):
         """디버그용 이미지 저장"""
         try:
@@ -100,62 +211,94 @@ class OCRService:
         except Exception as e:
             self._log(f"디버그 이미지 저장 실패: {e}")
 
-    def _call_vision_api(self, image_base64: str) -> Optional[str]:
+    def _vision_payload(self, image_base64: str) -> Dict:
         """
-        Google Vision API REST 호출
+        Vision API 요청 본문
         - DOCUMENT_TEXT_DETECTION: 필기체 인식에 최적화
         - 언어 힌트 제거: 숫자와 수학 기호 인식 개선
         """
+        return {
+            "requests": [
+                {
+                    "image": {
+                        "content": image_base64
+                    },
+                    "features": [
+                        {
+                            "type": "DOCUMENT_TEXT_DETECTION",
+                            "maxResults": 10
+                        }
+                    ]
+                    # 언어 힌트 제거 - 숫자와 수학 기호는 언어 독립적
+                }
+            ]
+        }
+
+    def _parse_vision_result(self, result: Dict) -> Optional[str]:
+        """Vision API 응답에서 인식 텍스트 추출"""
+        if 'responses' in result and result['responses']:
+            response_data = result['responses'][0]
+
+            # DOCUMENT_TEXT_DETECTION 결과 확인
+            if 'fullTextAnnotation' in response_data:
+                text = response_data['fullTextAnnotation'].get('text', '').strip()
+                if text:
+                    return text
+
+            # TEXT_DETECTION fallback
+            if 'textAnnotations' in response_data and response_data['textAnnotations']:
+                text = response_data['textAnnotations'][0]['description'].strip()
+                if text:
+                    return text
+
+            self._log("텍스트 인식 결과 없음")
+
+        return None
+
+    def _call_vision_api(self, image_base64: str) -> Optional[str]:
+        """Google Vision API REST 호출"""
         try:
-            url = f"https://vision.googleapis.com/v1/images:annotate?key={self.vision_api_key}"
-
-            payload = {
-                "requests": [
-                    {
-                        "image": {
-                            "content": image_base64
-                        },
-                        "features": [
-                            {
-                                "type": "DOCUMENT_TEXT_DETECTION",
-                                "maxResults": 10
-                            }
-                        ]
-                        # 언어 힌트 제거 - 숫자와 수학 기호는 언어 독립적
-                    }
-                ]
-            }
+            url = f"{VISION_API_URL}?key={self.vision_api_key}"
 
             self._log("Google Vision API 호출 시작")
-            response = requests.post(url, json=payload, headers={'Content-Type': 'application/json'}, timeout=30)
+            response = requests.post(url, json=self._vision_payload(image_base64),
+                                     headers={'Content-Type': 'application/json'}, timeout=VISION_API_TIMEOUT)
             self._log(f"응답 상태코드: {response.status_code}")
 
             if response.status_code != 200:
                 print(f"❌ Vision API 오류: {response.status_code} - {response.text}")
                 return None
 
-            result = response.json()
+            return self._parse_vision_result(response.json())
 
-            if 'responses' in result and result['responses']:
-                response_data = result['responses'][0]
+        except requests.RequestException as e:
+            print(f"❌ Vision API 요청 오류: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"❌ Vision API 처리 오류: {str(e)}")
+            return None
 
-                # DOCUMENT_TEXT_DETECTION 결과 확인
-                if 'fullTextAnnotation' in response_data:
-                    text = response_data['fullTextAnnotation'].get('text', '').strip()
-                    if text:
-                        return text
+    async def _call_vision_api_async(self, image_base64: str) -> Optional[str]:
+        """Google Vision API REST 호출 (비동기, httpx 가 없으면 스레드에서 동기 호출)"""
+        if not HTTPX_AVAILABLE:
+            return await asyncio.to_thread(self._call_vision_api, image_base64)
 
-                # TEXT_DETECTION fallback
-                if 'textAnnotations' in response_data and response_data['textAnnotations']:
-                    text = response_data['textAnnotations'][0]['description'].strip()
-                    if text:
-                        return text
+        try:
+            self._log("Google Vision API 호출 시작")
+            response = await get_vision_client().post(
+                VISION_API_URL,
+                params={"key": self.vision_api_key},
+                json=self._vision_payload(image_base64)
+            )
+            self._log(f"응답 상태코드: {response.status_code}")
 
-                self._log("텍스트 인식 결과 없음")
+            if response.status_code != 200:
+                print(f"❌ Vision API 오류: {response.status_code} - {response.text}")
+                return None
 
-            return None
+            return self._parse_vision_result(response.json())
 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"❌ Vision API 요청 오류: {str(e)}")
             return None
         except Exception as e:
@@ -0,0 +1,213 @@
+"""
+문제 은행 서비스 - 미리 생성·검증된 문제 풀에서 꺼내 쓰고, 부족한 풀은 백그라운드로 보충
+
+- 보충은 beat 태스크가 부족한 풀만 골라 풀 하나당 태스크 하나로 math_bank 큐에 분배
+- 풀별 Redis 락(SET NX EX)을 분배 시점에 잡고 해당 풀 태스크가 끝날 때 해제
+  (이전 주기의 태스크가 대기/실행 중인 풀은 다시 분배하지 않음)
+"""
+import os
+import uuid
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+from ..database import SessionLocal
+from ..models.problem_bank import ProblemBankItem
+from .curriculum_index import curriculum_index
+
+# 풀 하나당 유지할 최소 개수 / 보충 시 목표 개수
+PROBLEM_BANK_LOW_WATER = int(os.getenv("PROBLEM_BANK_LOW_WATER", "10"))
+PROBLEM_BANK_TARGET = int(os.getenv("PROBLEM_BANK_TARGET", "20"))
+# 한 번의 보충 작업에서 풀 하나당 최대 생성 개수 (AI 호출량 제한)
+PROBLEM_BANK_MAX_BATCH = int(os.getenv("PROBLEM_BANK_MAX_BATCH", "10"))
+# 보충 주기 (beat) / 풀 락 유지 시간 (대기 + 생성 시간보다 길게)
+PROBLEM_BANK_REPLENISH_INTERVAL = float(os.getenv("PROBLEM_BANK_REPLENISH_INTERVAL", "600"))
+PROBLEM_BANK_POOL_LOCK_TTL = int(os.getenv("PROBLEM_BANK_POOL_LOCK_TTL", "1800"))
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+REPLENISH_LOCK_KEY = "math_service:problem_bank:replenish"
+POOL_LOCK_KEY = "math_service:problem_bank:pool:{grade}:{semester}:{chapter_name}:{difficulty}:{problem_type}"
+
+# 토큰이 같을 때만 삭제 (만료 후 다른 작업이 잡은 락을 지우지 않도록)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+PROBLEM_TYPES = ["multiple_choice", "short_answer"]
+DIFFICULTIES = ["A", "B", "C"]
+
+
+class ProblemBankService:
+    """(소단원, 난이도, 문제 유형)별 문제 풀 관리"""
+
+    def __init__(self):
+        self._redis = None
+
+    def _get_redis(self):
+        if not REDIS_AVAILABLE:
+            return None
+        if self._redis is None:
+            try:
+                self._redis = redis.Redis.from_url(REDIS_URL, decode_responses=True, socket_timeout=1)
+            except Exception as e:
+                print(f"⚠️ 문제 은행 Redis 연결 실패: {str(e)}")
+                return None
+        return self._redis
+
+    def acquire_lock(self, key: str, ttl: int) -> Optional[str]:
+        """SET NX EX 락 - 획득하면 토큰, 이미 잡혀 있거나 Redis 오류면 None"""
+        client = self._get_redis()
+        if client is None:
+            return None
+        token = uuid.uuid4().hex
+        try:
+            return token if client.set(key, token, nx=True, ex=ttl) else None
+        except Exception as e:
+            print(f"⚠️ 문제 은행 락 획득 실패 ({key}): {str(e)}")
+            return None
+
+    def release_lock(self, key: str, token: Optional[str]) -> None:
+        client = self._get_redis()
+        if client is None or not token:
+            return
+        try:
+            client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token)
+        except Exception as e:
+            print(f"⚠️ 문제 은행 락 해제 실패 ({key}): {str(e)}")
+
+    @staticmethod
+    def pool_lock_key(curriculum_data: Dict, difficulty: str, problem_type: str) -> str:
+        return POOL_LOCK_KEY.format(
+            grade=curriculum_data['grade'], semester=curriculum_data['semester'],
+            chapter_name=curriculum_data['chapter_name'], difficulty=difficulty, problem_type=problem_type
+        )
+
+    def draw_problems(self, curriculum_data: Dict, problem_type: str, difficulties: List[str]) -> Tuple[List[Dict], List[str]]:
+        """
+        풀에서 난이도별로 문제를 꺼냄 (꺼낸 문제는 풀에서 삭제)
+
+        Returns:
+            (꺼낸 문제 리스트, 풀이 부족해 새로 생성해야 하는 난이도 리스트)
+        """
+        drawn = []
+        shortfall = []
+        db = SessionLocal()
+        try:
+            for difficulty, needed in Counter(difficulties).items():
+                # 동시에 실행되는 워커끼리 같은 문제를 꺼내지 않도록 SKIP LOCKED
+                items = db.query(ProblemBankItem).filter(
+                    ProblemBankItem.grade == curriculum_data['grade'],
+                    ProblemBankItem.semester == curriculum_data['semester'],
+                    ProblemBankItem.chapter_name == curriculum_data['chapter_name'],
+                    ProblemBankItem.difficulty == difficulty,
+                    ProblemBankItem.problem_type == problem_type
+                ).order_by(ProblemBankItem.id).limit(needed).with_for_update(skip_locked=True).all()
+
+                for item in items:
+                    drawn.append(dict(item.problem_data))
+                    db.delete(item)
+                shortfall.extend([difficulty] * (needed - len(items)))
+
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️ 문제 은행 조회 실패, 전체 AI 생성으로 진행: {str(e)}")
+            return [], list(difficulties)
+        finally:
+            db.close()
+
+        print(f"🏦 문제 은행 {problem_type}: {len(drawn)}개 사용, {len(shortfall)}개 부족")
+        return drawn, shortfall
+
+    def add_problems(self, curriculum_data: Dict, problem_type: str, problems: List[Dict]) -> int:
+        """검증된 문제를 풀에 추가"""
+        db = SessionLocal()
+        try:
+            items = [
+                ProblemBankItem(
+                    grade=curriculum_data['grade'],
+                    semester=curriculum_data['semester'],
+                    unit_name=curriculum_data['unit_name'],
+                    chapter_name=curriculum_data['chapter_name'],
+                    difficulty=problem.get("difficulty", "B"),
+                    problem_type=problem_type,
+                    problem_data=problem
+                )
+                for problem in problems
+            ]
+            db.add_all(items)
+            db.commit()
+            return len(items)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get_pool_levels(self) -> Dict[Tuple[str, str, str, str, str], int]:
+        """풀별 현재 보유 개수"""
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                ProblemBankItem.grade,
+                ProblemBankItem.semester,
+                ProblemBankItem.chapter_name,
+                ProblemBankItem.difficulty,
+                ProblemBankItem.problem_type,
+                func.count(ProblemBankItem.id)
+            ).group_by(
+                ProblemBankItem.grade,
+                ProblemBankItem.semester,
+                ProblemBankItem.chapter_name,
+                ProblemBankItem.difficulty,
+                ProblemBankItem.problem_type
+            ).all()
+            return {tuple(row[:5]): row[5] for row in rows}
+        finally:
+            db.close()
+
+    def get_pool_level(self, curriculum_data: Dict, difficulty: str, problem_type: str) -> int:
+        """풀 하나의 현재 보유 개수 (보충 직전 확인용)"""
+        db = SessionLocal()
+        try:
+            return db.query(func.count(ProblemBankItem.id)).filter(
+                ProblemBankItem.grade == curriculum_data['grade'],
+                ProblemBankItem.semester == curriculum_data['semester'],
+                ProblemBankItem.chapter_name == curriculum_data['chapter_name'],
+                ProblemBankItem.difficulty == difficulty,
+                ProblemBankItem.problem_type == problem_type
+            ).scalar() or 0
+        finally:
+            db.close()
+
+    def get_pool_targets(self) -> List[Dict]:
+        """보충 대상 풀 목록 (교육과정의 모든 소단원 × 난이도 × 문제 유형)"""
+        targets = []
+        for chapter in curriculum_index.iter_chapters():
+            curriculum_data = {
+                'grade': chapter["grade"],
+                'semester': chapter["semester"],
+                'unit_name': chapter["unit_name"],
+                'chapter_name': chapter["chapter_name"],
+                'learning_objectives': chapter["learning_objectives"],
+                'keywords': chapter["keywords"]
+            }
+            for difficulty in DIFFICULTIES:
+                for problem_type in PROBLEM_TYPES:
+                    targets.append({
+                        "curriculum_data": curriculum_data,
+                        "difficulty": difficulty,
+                        "problem_type": problem_type
+                    })
+        return targets
+
+
+problem_bank_service = ProblemBankService()
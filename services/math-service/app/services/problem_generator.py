@@ -4,33 +4,65 @@
 import os
 import json
 import re
+import math
+import threading
+from collections import Counter
 import google.generativeai as genai
-from openai import OpenAI
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from .prompt_templates import PromptTemplates
+from .prompt_cache import CompiledPrompt
+from .llm_gateway import get_llm_gateway
+from .llm_cache import llm_response_cache, CACHE_TTLS
+from .judge_batcher import JudgeBatcher, AI_JUDGE_MAX_BATCH_SIZE
+from .json_repair import loads_json_list, loads_tolerant
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 load_dotenv()
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# 워커 프로세스들의 추측 생성 통계를 합산하는 Redis 해시 (/llm-gateway/stats 에서 조회)
+SPECULATION_STATS_KEY = "math_service:speculation_stats"
+SPECULATION_COUNTERS = (
+    "runs", "slots_launched", "accepted", "surplus_valid", "cancelled_before_start", "model_calls", "wasted_model_calls",
+)
+# Redis 오류 후 다시 시도하기까지 대기 시간 (초)
+SPECULATION_REDIS_RETRY_SECONDS = 30
+
+# 추측 생성 여분 슬롯 비율 (0이면 사용 안 함, 예: 0.2 → 10문제당 2개 여분)
+SPECULATIVE_EXTRA_RATIO = float(os.getenv("MATH_SPECULATIVE_EXTRA_RATIO", "0"))
+
+
+def _is_json_object(text: str) -> bool:
+    """캐시 저장 전 응답이 JSON 객체인지 확인"""
+    try:
+        return isinstance(json.loads(text), dict)
+    except ValueError:
+        return False
+
+
 class ProblemGenerator:
     """수학 문제 생성 전용 클래스"""
     
     def __init__(self):
-        # AI 모델 직접 초기화 (순환 import 방지)
+        # AI 모델은 프로세스 공용 LLM 게이트웨이를 통해 호출 (동시성/RPM/TPM 예산 공유)
         gemini_api_key = os.getenv("GEMINI_API_KEY")
         if not gemini_api_key:
             raise ValueError("GEMINI_API_KEY environment variable is required")
 
-        genai.configure(api_key=gemini_api_key)
-
-        # OpenAI 클라이언트 초기화 (AI Judge용)
+        # OpenAI API 키 확인 (AI Judge용)
         openai_api_key = os.getenv("OPENAI_API_KEY")
         if not openai_api_key:
             raise ValueError("OPENAI_API_KEY environment variable is required")
 
-        self.openai_client = OpenAI(api_key=openai_api_key)
+        self.llm_gateway = get_llm_gateway()
 
         # 기본 설정으로 복원 (타임아웃 해결을 위해 토큰 수 조정)
         generation_config = genai.types.GenerationConfig(
@@ -40,13 +72,25 @@ class ProblemGenerator:
             top_k=40
         )
 
-        self.model = genai.GenerativeModel(
+        self.model = self.llm_gateway.gemini_model(
             'gemini-2.5-pro',
             generation_config=generation_config
         )
 
         self.prompt_templates = PromptTemplates()
 
+        # 병렬 생성 스레드들의 AI Judge 요청을 모아 배치로 검증
+        self.judge_batcher = JudgeBatcher(self._validate_with_ai_judge_batch)
+
+        # 추측 생성 누적 통계 (현재 프로세스 기준)
+        self._speculation_lock = threading.Lock()
+        self._stats_redis = None
+        self._stats_redis_retry_at = 0.0
+        self.speculation_stats = {
+            "runs": 0, "slots_launched": 0, "accepted": 0, "surplus_valid": 0,
+            "cancelled_before_start": 0, "model_calls": 0, "wasted_model_calls": 0, "wasted_ratio": 0.0,
+        }
+
     def generate_problems_parallel(
         self,
         curriculum_data: Dict,
@@ -54,9 +98,19 @@ class ProblemGenerator:
         problem_count: int = 1,
         difficulty_ratio: Dict = None,
         problem_type: str = None,
-        max_workers: int = 5
+        max_workers: int = 5,
+        difficulties: List[str] = None,
+        allow_partial: bool = False,
+        on_problem: Callable[[Dict], None] = None,
+        speculative_extra: int = None
     ) -> List[Dict]:
-        """병렬 문제 생성 - 각 문제를 개별적으로 동시에 생성"""
+        """병렬 문제 생성 - 각 문제를 개별적으로 동시에 생성
+
+        difficulties가 주어지면 비율 대신 해당 난이도 목록을 그대로 사용 (문제 은행 부족분 생성용)
+        allow_partial이면 일부만 성공해도 예외 없이 성공한 문제만 반환 (문제 은행 보충용)
+        on_problem이 주어지면 문제가 완성되는 즉시 호출 (스트리밍 저장용)
+        speculative_extra: 추가로 띄울 여분 슬롯 수 (None이면 MATH_SPECULATIVE_EXTRA_RATIO 기준, 0이면 사용 안 함)
+        """
 
         print(f"\n{'='*60}")
         print(f"🚀 병렬 문제 생성 시작 ({problem_count}개 문제)")
@@ -71,25 +125,48 @@ class ProblemGenerator:
         )
 
         # 각 문제별 난이도 할당
-        problem_difficulties = self._assign_difficulties_to_problems(
-            problem_count, difficulty_ratio
-        )
+        if difficulties:
+            problem_difficulties = list(difficulties)
+            problem_count = len(problem_difficulties)
+        else:
+            problem_difficulties = self._assign_difficulties_to_problems(
+                problem_count, difficulty_ratio
+            )
+
+        # 추측 실행: problem_count + k 슬롯을 띄우고 난이도 분포를 채우는 먼저 끝난 K개만 채택
+        if speculative_extra is None:
+            speculative_extra = math.ceil(problem_count * SPECULATIVE_EXTRA_RATIO)
+        speculative_extra = max(0, speculative_extra)
+        # 추가 슬롯은 필요한 난이도 목록을 순환하며 배정 (분포 비율 유지)
+        slot_difficulties = problem_difficulties + [
+            problem_difficulties[i % problem_count] for i in range(speculative_extra)
+        ] if problem_count else []
+        remaining_quota = Counter(problem_difficulties)
+        if speculative_extra:
+            print(f"🎲 추측 생성: {problem_count}개 + 여분 {speculative_extra}개 슬롯")
 
         # 병렬 생성 작업 준비
         valid_problems = []
+        cancel_event = threading.Event()
+        slot_stats = {slot: {"calls": 0} for slot in range(1, len(slot_difficulties) + 1)}
+        accepted_slots = set()
+        surplus = 0
 
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers + speculative_extra))
+        try:
             # 각 문제를 개별 작업으로 제출
             future_to_index = {}
-            for i in range(problem_count):
+            for i, difficulty in enumerate(slot_difficulties):
                 future = executor.submit(
                     self._generate_single_problem,
                     curriculum_data=curriculum_data,
                     user_prompt=user_prompt,
                     problem_number=i + 1,
-                    difficulty=problem_difficulties[i],
+                    difficulty=difficulty,
                     problem_type=problem_type,
-                    max_retries=3
+                    max_retries=3,
+                    cancel_event=cancel_event,
+                    slot_stats=slot_stats[i + 1]
                 )
                 future_to_index[future] = i + 1
 
@@ -98,26 +175,117 @@ class ProblemGenerator:
                 problem_num = future_to_index[future]
                 try:
                     problem = future.result()
-                    if problem:
-                        valid_problems.append(problem)
-                        print(f"✅ {problem_num}번 문제 생성 완료 ({len(valid_problems)}/{problem_count})")
-                    else:
+                    if not problem:
                         print(f"❌ {problem_num}번 문제 생성 실패")
+                        continue
+                    difficulty = slot_difficulties[problem_num - 1]
+                    if remaining_quota[difficulty] <= 0:
+                        # 해당 난이도는 이미 채워짐 - 여분 결과 폐기
+                        surplus += 1
+                        continue
+                    remaining_quota[difficulty] -= 1
+                    accepted_slots.add(problem_num)
+                    valid_problems.append(problem)
+                    print(f"✅ {problem_num}번 문제 생성 완료 ({len(valid_problems)}/{problem_count})")
+                    if on_problem:
+                        on_problem(problem)
+                    if len(valid_problems) >= problem_count:
+                        # 목표 달성 - 남은 슬롯 취소
+                        break
                 except Exception as e:
                     print(f"❌ {problem_num}번 문제 생성 중 오류: {str(e)}")
+        finally:
+            cancel_event.set()
+            # 시작 전 슬롯은 취소, 실행 중인 슬롯은 다음 단계 진입 전에 스스로 중단
+            executor.shutdown(wait=False, cancel_futures=True)
 
         elapsed_time = time.time() - start_time
         print(f"\n{'='*60}")
         print(f"✅ 병렬 생성 완료: {len(valid_problems)}/{problem_count}개 성공")
         print(f"   소요 시간: {elapsed_time:.2f}초")
+        if speculative_extra:
+            self._record_speculation(len(slot_difficulties), accepted_slots, surplus, slot_stats)
         print(f"{'='*60}\n")
 
-        if len(valid_problems) < problem_count:
+        if len(valid_problems) < problem_count and not allow_partial:
             shortage = problem_count - len(valid_problems)
             raise Exception(f"문제 생성 부족: {shortage}개 부족 ({len(valid_problems)}/{problem_count})")
 
         return valid_problems[:problem_count]
 
+    def _get_stats_redis(self):
+        if not REDIS_AVAILABLE or time.time() < self._stats_redis_retry_at:
+            return None
+        if self._stats_redis is None:
+            self._stats_redis = redis.Redis.from_url(REDIS_URL, decode_responses=True, socket_timeout=0.5)
+        return self._stats_redis
+
+    def _stats_redis_failed(self, e: Exception):
+        print(f"⚠️ 추측 생성 통계 Redis 오류, {SPECULATION_REDIS_RETRY_SECONDS}초 후 재시도: {str(e)}")
+        self._stats_redis = None
+        self._stats_redis_retry_at = time.time() + SPECULATION_REDIS_RETRY_SECONDS
+
+    @staticmethod
+    def _with_wasted_ratio(stats: Dict) -> Dict:
+        stats["wasted_ratio"] = round(stats["wasted_model_calls"] / stats["model_calls"], 3) if stats.get("model_calls") else 0.0
+        return stats
+
+    def speculation_snapshot(self) -> Dict:
+        """현재 프로세스 누적 통계 사본 (태스크별 증가분 계산용)"""
+        with self._speculation_lock:
+            return dict(self.speculation_stats)
+
+    def speculation_delta(self, before: Dict) -> Dict:
+        """before 이후 증가분 (워크시트 하나의 추측 생성 비용)"""
+        after = self.speculation_snapshot()
+        return self._with_wasted_ratio({key: after[key] - before.get(key, 0) for key in SPECULATION_COUNTERS})
+
+    def get_speculation_stats(self) -> Dict:
+        """추측 생성 통계 - 현재 프로세스 + 전체 워커 합산 (Redis 를 쓸 수 없으면 None)"""
+        all_workers = None
+        try:
+            client = self._get_stats_redis()
+            if client is not None:
+                totals = client.hgetall(SPECULATION_STATS_KEY)
+                all_workers = self._with_wasted_ratio({key: int(totals.get(key, 0)) for key in SPECULATION_COUNTERS})
+        except Exception as e:
+            self._stats_redis_failed(e)
+        return {"process": self.speculation_snapshot(), "all_workers": all_workers}
+
+    def _record_speculation(self, slots: int, accepted_slots: set, surplus: int, slot_stats: Dict[int, Dict]):
+        """추측 생성의 낭비 호출 집계 (여분 비율 조정용)"""
+        model_calls = sum(stat["calls"] for stat in slot_stats.values())
+        wasted_calls = sum(stat["calls"] for slot, stat in slot_stats.items() if slot not in accepted_slots)
+        cancelled = sum(1 for stat in slot_stats.values() if stat["calls"] == 0)
+
+        with self._speculation_lock:
+            stats = self.speculation_stats
+            stats["runs"] += 1
+            stats["slots_launched"] += slots
+            stats["accepted"] += len(accepted_slots)
+            stats["surplus_valid"] += surplus
+            stats["cancelled_before_start"] += cancelled
+            stats["model_calls"] += model_calls
+            stats["wasted_model_calls"] += wasted_calls
+            self._with_wasted_ratio(stats)
+
+        # 전체 워커 합산 (실패해도 생성에는 영향 없음)
+        try:
+            client = self._get_stats_redis()
+            if client is not None:
+                pipe = client.pipeline()
+                for key, value in (
+                    ("runs", 1), ("slots_launched", slots), ("accepted", len(accepted_slots)), ("surplus_valid", surplus),
+                    ("cancelled_before_start", cancelled), ("model_calls", model_calls), ("wasted_model_calls", wasted_calls),
+                ):
+                    pipe.hincrby(SPECULATION_STATS_KEY, key, value)
+                pipe.execute()
+        except Exception as e:
+            self._stats_redis_failed(e)
+
+        print(f"   추측 생성: 슬롯 {slots}개 중 채택 {len(accepted_slots)}개, 여분 폐기 {surplus}개, 미시작 취소 {cancelled}개")
+        print(f"   모델 호출 {model_calls}회 중 낭비 {wasted_calls}회")
+
     def _assign_difficulties_to_problems(self, problem_count: int, difficulty_ratio: Dict) -> List[str]:
         """각 문제에 난이도 할당"""
         if not difficulty_ratio:
@@ -144,11 +312,18 @@ class ProblemGenerator:
         problem_number: int,
         difficulty: str,
         problem_type: str = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        cancel_event: threading.Event = None,
+        slot_stats: Dict = None
     ) -> Optional[Dict]:
-        """개별 문제 생성 (병렬 실행용)"""
+        """개별 문제 생성 (병렬 실행용)
+
+        cancel_event가 설정되면 다음 AI 호출 전에 중단 (추측 생성에서 목표 달성 시)
+        """
 
         for attempt in range(max_retries):
+            if cancel_event is not None and cancel_event.is_set():
+                return None
             try:
                 # 1개 문제만 생성하도록 프롬프트 구성
                 if problem_type:
@@ -184,6 +359,8 @@ class ProblemGenerator:
                 )
 
                 # AI 호출
+                if slot_stats is not None:
+                    slot_stats["calls"] += 1
                 response = self.model.generate_content(prompt)
                 content = response.text
 
@@ -203,8 +380,11 @@ class ProblemGenerator:
                 # 기본 구조 검증
                 validated_problem = self._validate_basic_structure(problem)
 
-                # AI Judge 검증
-                is_valid, scores, feedback = self._validate_with_ai_judge(validated_problem)
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+
+                # AI Judge 검증 (동시에 완성된 다른 문제들과 묶어 배치 호출)
+                is_valid, scores, feedback = self.judge_batcher.submit(validated_problem)
 
                 if is_valid:
                     print(f"  ✅ {problem_number}번: VALID - {scores['overall_score']:.1f}점")
@@ -234,14 +414,19 @@ class ProblemGenerator:
         user_prompt: str,
         problem_count: int = 1,
         difficulty_ratio: Dict = None,
-        problem_type: str = None
+        problem_type: str = None,
+        difficulties: List[str] = None
     ) -> List[Dict]:
-        """수학 문제 생성 메인 로직"""
+        """수학 문제 생성 메인 로직 (difficulties 가 있으면 비율 대신 해당 난이도 구성 사용)"""
         
         # 난이도 분배 계산
-        difficulty_distribution = self._calculate_difficulty_distribution(
-            problem_count, difficulty_ratio
-        )
+        if difficulties:
+            counts = Counter(difficulties)
+            difficulty_distribution = ", ".join(f"{level}단계 {counts[level]}개" for level in ("A", "B", "C"))
+        else:
+            difficulty_distribution = self._calculate_difficulty_distribution(
+                problem_count, difficulty_ratio
+            )
 
         # problem_type이 지정된 경우 강제 제약 추가
         enhanced_user_prompt = user_prompt
@@ -349,8 +534,11 @@ class ProblemGenerator:
                 invalid_problems = []
 
                 current_batch_valid_count = 0
+                judge_results = self._validate_with_ai_judge_batch(validated_problems)
                 for idx, problem in enumerate(validated_problems):
-                    is_valid, scores, feedback = self._validate_with_ai_judge(problem)
+                    if isinstance(judge_results[idx], Exception):
+                        raise judge_results[idx]
+                    is_valid, scores, feedback = judge_results[idx]
 
                     # 상세 점수 출력
                     score_detail = f"[수학정확성:{scores.get('mathematical_accuracy', 0):.1f} " \
@@ -408,249 +596,12 @@ class ProblemGenerator:
         raise Exception(f"문제 생성 실패: {max_retries}회 시도 모두 실패 (현재 {len(valid_problems)}/{target_count})")
     
     def _extract_and_parse_json(self, content: str) -> List[Dict]:
-        """JSON 추출 및 파싱 - 완전 개선 버전"""
-        # 1. JSON 블록 추출
-        json_str = self._extract_json_block(content)
-        
-        # 2. JSON 문자열 전처리
-        preprocessed = self._preprocess_json_string(json_str)
-        
-        # 3. JSON 파싱 시도
+        """JSON 추출 및 파싱 - 단일 패스 관대한 파서 사용"""
         try:
-            result = json.loads(preprocessed)
-            return result if isinstance(result, list) else [result]
+            return loads_json_list(content)
         except json.JSONDecodeError as e:
-            # 4. 고급 복구 시도
-            recovered = self._advanced_json_recovery(preprocessed)
-            if recovered:
-                return recovered
-            
-            # 5. 최후의 수단: 개별 객체 파싱
-            individual_problems = self._parse_individual_problems(preprocessed)
-            if individual_problems:
-                return individual_problems
-            
-            raise Exception(f"JSON 파싱 실패: {str(e)}\n원본: {json_str[:500]}...")
-    
-    def _extract_json_block(self, content: str) -> str:
-        """JSON 블록 추출"""
-        # JSON 코드 블록 찾기
-        if "```json" in content:
-            json_start = content.find("```json") + 7
-            json_end = content.find("```", json_start)
-            if json_end != -1:
-                return content[json_start:json_end].strip()
-        
-        # 배열 패턴 찾기
-        array_match = re.search(r'\[\s*\{.*?\}\s*\]', content, re.DOTALL)
-        if array_match:
-            return array_match.group(0)
-        
-        # 그냥 전체 반환
-        return content.strip()
-    
-    def _preprocess_json_string(self, json_str: str) -> str:
-        """JSON 문자열 전처리 - 완전 개선"""
-        if not json_str:
-            return "[]"
-        
-        # 1. 기본 정리
-        cleaned = json_str.strip()
-        
-        # 2. LaTeX 수식 보호 (임시 플레이스홀더로 교체)
-        math_expressions = []
-        
-        def protect_math(match):
-            expr = match.group(1)
-            placeholder = f"__MATH_{len(math_expressions)}__"
-            math_expressions.append(expr)
-            return f'"{placeholder}"' if match.group(0).startswith('"') else placeholder
-        
-        # $ ... $ 형태의 수식 보호
-        cleaned = re.sub(r'\$([^$]+)\$', protect_math, cleaned)
-        
-        # 3. 제어 문자 및 잘못된 문자 제거
-        cleaned = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]', '', cleaned)
-        
-        # 4. 문자열 내 줄바꿈 처리
-        def fix_multiline_strings(match):
-            content = match.group(1)
-            # 문자열 내부의 줄바꿈을 공백으로 변경
-            content = re.sub(r'\s*\n\s*', ' ', content)
-            return f'"{content}"'
-        
-        # 따옴표로 둘러싸인 문자열 내부 정리
-        cleaned = re.sub(r'"([^"]*)"', fix_multiline_strings, cleaned)
-        
-        # 5. JSON 구조 정리
-        # 끝부분 쉼표 제거
-        cleaned = re.sub(r',\s*}', '}', cleaned)
-        cleaned = re.sub(r',\s*]', ']', cleaned)
-        
-        # 누락된 쉼표 추가
-        cleaned = re.sub(r'}\s*{', '},{', cleaned)
-        cleaned = re.sub(r']\s*\[', '],[', cleaned)
-        
-        # 6. 필드명 정리 (따옴표 확인)
-        field_names = ['question', 'choices', 'correct_answer', 'explanation', 
-                      'problem_type', 'difficulty', 'has_diagram', 'diagram_type', 
-                      'diagram_elements']
-        
-        for field in field_names:
-            # 따옴표 없는 필드명에 따옴표 추가
-            cleaned = re.sub(f'(?<!")\\b{field}\\b(?!")', f'"{field}"', cleaned)
-        
-        # 7. 수식 복원
-        for i, expr in enumerate(math_expressions):
-            placeholder = f"__MATH_{i}__"
-            # LaTeX 백슬래시 이스케이프
-            escaped_expr = expr.replace('\\', '\\\\').replace('"', '\\"')
-            cleaned = cleaned.replace(placeholder, f"${escaped_expr}$")
-        
-        # 8. 최종 정리
-        cleaned = re.sub(r'\s+', ' ', cleaned)  # 다중 공백 제거
-        
-        return cleaned
-    
-    def _advanced_json_recovery(self, json_str: str) -> Optional[List[Dict]]:
-        """고급 JSON 복구 시도"""
-        try:
-            # 1. 배열 구조 확인 및 수정
-            if not json_str.startswith('['):
-                json_str = '[' + json_str
-            if not json_str.endswith(']'):
-                json_str = json_str + ']'
-            
-            # 2. 개별 객체 추출 시도
-            object_pattern = r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}'
-            matches = re.findall(object_pattern, json_str)
-            
-            if matches:
-                problems = []
-                for match in matches:
-                    try:
-                        # 개별 객체 파싱
-                        obj = json.loads(match)
-                        if self._is_valid_problem(obj):
-                            problems.append(obj)
-                    except:
-                        continue
-                
-                if problems:
-                    return problems
-            
-            # 3. 구조 복구 시도
-            # 잘못된 중첩 구조 수정
-            json_str = re.sub(r'(\w+):\s*{', r'"\1": {', json_str)
-            json_str = re.sub(r'(\w+):\s*\[', r'"\1": [', json_str)
-            json_str = re.sub(r'(\w+):\s*"', r'"\1": "', json_str)
-            json_str = re.sub(r'(\w+):\s*(\d+)', r'"\1": \2', json_str)
-            json_str = re.sub(r'(\w+):\s*(true|false|null)', r'"\1": \2', json_str)
-            
-            return json.loads(json_str)
-            
-        except:
-            return None
-    
-    def _parse_individual_problems(self, json_str: str) -> Optional[List[Dict]]:
-        """개별 문제 객체 파싱 - 최후의 수단"""
-        problems = []
-        
-        # 각 문제 객체를 개별적으로 찾아서 파싱
-        current_pos = 0
-        while True:
-            # { 찾기
-            start = json_str.find('{', current_pos)
-            if start == -1:
-                break
-            
-            # 매칭되는 } 찾기
-            bracket_count = 0
-            end = start
-            for i in range(start, len(json_str)):
-                if json_str[i] == '{':
-                    bracket_count += 1
-                elif json_str[i] == '}':
-                    bracket_count -= 1
-                    if bracket_count == 0:
-                        end = i + 1
-                        break
-            
-            if end > start:
-                obj_str = json_str[start:end]
-                try:
-                    # 개별 객체 파싱 시도
-                    obj = json.loads(obj_str)
-                    if self._is_valid_problem(obj):
-                        problems.append(obj)
-                except:
-                    # 파싱 실패 시 수동 파싱 시도
-                    manual_obj = self._manual_parse_problem(obj_str)
-                    if manual_obj:
-                        problems.append(manual_obj)
-                
-                current_pos = end
-            else:
-                break
-        
-        return problems if problems else None
-    
-    def _manual_parse_problem(self, obj_str: str) -> Optional[Dict]:
-        """수동으로 문제 객체 파싱"""
-        try:
-            problem = {}
-            
-            # 필드 추출 패턴
-            patterns = {
-                'question': r'"question"\s*:\s*"([^"]*(?:\\"[^"]*)*)"',
-                'correct_answer': r'"correct_answer"\s*:\s*"([^"]*(?:\\"[^"]*)*)"',
-                'explanation': r'"explanation"\s*:\s*"([^"]*(?:\\"[^"]*)*)"',
-                'problem_type': r'"problem_type"\s*:\s*"([^"]*)"',
-                'difficulty': r'"difficulty"\s*:\s*"([ABC])"',
-                'has_diagram': r'"has_diagram"\s*:\s*(true|false)',
-            }
-            
-            for field, pattern in patterns.items():
-                match = re.search(pattern, obj_str, re.IGNORECASE)
-                if match:
-                    value = match.group(1)
-                    if field == 'has_diagram':
-                        problem[field] = value.lower() == 'true'
-                    else:
-                        # 이스케이프된 따옴표 복원
-                        value = value.replace('\\"', '"')
-                        problem[field] = value
-            
-            # choices 배열 추출
-            choices_match = re.search(r'"choices"\s*:\s*\[([^\]]*)\]', obj_str)
-            if choices_match:
-                choices_str = choices_match.group(1)
-                choices = []
-                for choice_match in re.finditer(r'"([^"]*(?:\\"[^"]*)*)"', choices_str):
-                    choice = choice_match.group(1).replace('\\"', '"')
-                    choices.append(choice)
-                problem['choices'] = choices
-            
-            # 필수 필드 확인
-            if 'question' in problem and 'correct_answer' in problem:
-                # 기본값 설정
-                problem.setdefault('problem_type', 'short_answer')
-                problem.setdefault('difficulty', 'B')
-                problem.setdefault('has_diagram', False)
-                problem.setdefault('explanation', '')
-                
-                return problem
-            
-        except:
-            pass
-        
-        return None
-    
-    def _is_valid_problem(self, obj: Dict) -> bool:
-        """문제 객체 유효성 검사"""
-        required_fields = ['question', 'correct_answer']
-        return all(field in obj for field in required_fields)
-    
+            raise Exception(f"JSON 파싱 실패: {str(e)}\n원본: {content[:500]}...")
+
     def _validate_basic_structure(self, problem: Dict) -> Dict:
         """기본 구조 검증만 수행 - LaTeX는 Gemini가 완벽하게 생성"""
         # 1. 필수 필드 확인 및 기본값 설정
@@ -714,40 +665,37 @@ class ProblemGenerator:
 
         return problem
 
-    def _validate_with_ai_judge(self, problem: Dict) -> tuple:
-        """
-        AI Judge로 문제 검증 (OpenAI GPT-4o-mini) - 안전 필터 문제 해결
+    # AI Judge 공통 설정
+    JUDGE_MODEL = "gpt-4o-mini"
+    JUDGE_SYSTEM_PROMPT = "You are a math education expert who validates math problems and returns structured JSON responses."
+    JUDGE_CRITERIA = """Evaluation criteria:
+1. mathematical_accuracy (1-5): No mathematical or logical errors.
+2. consistency (1-5): The final answer in the explanation matches the correct_answer.
+3. completeness (1-5): All required fields are present (e.g., multiple_choice must have 4 choices). IGNORE optional fields like tikz_code, diagram_type, has_diagram.
+4. logic_flow (1-5): The explanation is logical and easy to follow."""
+    JUDGE_DECISION_RULE = 'Decision rule: `consistency` must be 4 or higher, AND the average of the other scores must be 3.5 or higher to be "VALID".'
 
-        Returns:
-            (is_valid: bool, scores: dict, feedback: str)
-        """
-        try:
-            # 원본 데이터 그대로 사용 (OpenAI는 LaTeX 처리 가능)
-            question = problem.get('question', '')
-            correct_answer = problem.get('correct_answer', '')
-            explanation = problem.get('explanation', '')
-            problem_type = problem.get('problem_type', '')
-            choices = problem.get('choices', [])
-            choices_text = ', '.join(map(str, choices)) if choices else 'None'
+    def _format_problem_for_judge(self, problem: Dict) -> str:
+        """AI Judge 프롬프트용 문제 데이터 (원본 그대로 - OpenAI는 LaTeX 처리 가능)"""
+        choices = problem.get('choices', [])
+        choices_text = ', '.join(map(str, choices)) if choices else 'None'
+
+        # tikz_code와 diagram 관련 필드는 검증에서 제외 (선택적 필드)
+        diagram_note = " (Note: This problem may include graph/diagram fields which are optional and should not affect validation.)" if problem.get('has_diagram', False) else ""
 
-            # tikz_code와 diagram 관련 필드는 검증에서 제외 (선택적 필드)
-            has_diagram = problem.get('has_diagram', False)
-            diagram_note = " (Note: This problem may include graph/diagram fields which are optional and should not affect validation.)" if has_diagram else ""
+        return f"""- Question: {problem.get('question', '')}
+- Correct Answer: {problem.get('correct_answer', '')}
+- Explanation: {problem.get('explanation', '')}
+- Problem Type: {problem.get('problem_type', '')}
+- Choices: {choices_text}{diagram_note}"""
 
-            validation_prompt = f"""You are a math education expert. Please validate the following math problem.
+    def _build_judge_messages(self, problem: Dict) -> List[Dict]:
+        validation_prompt = f"""You are a math education expert. Please validate the following math problem.
 
 The problem data is as follows:
-- Question: {question}
-- Correct Answer: {correct_answer}
-- Explanation: {explanation}
-- Problem Type: {problem_type}
-- Choices: {choices_text}{diagram_note}
+{self._format_problem_for_judge(problem)}
 
-Evaluation criteria:
-1. mathematical_accuracy (1-5): No mathematical or logical errors.
-2. consistency (1-5): The final answer in the explanation matches the correct_answer.
-3. completeness (1-5): All required fields are present (e.g., multiple_choice must have 4 choices). IGNORE optional fields like tikz_code, diagram_type, has_diagram.
-4. logic_flow (1-5): The explanation is logical and easy to follow.
+{self.JUDGE_CRITERIA}
 
 Return ONLY valid JSON (no markdown, no code blocks):
 {{
@@ -757,32 +705,62 @@ Return ONLY valid JSON (no markdown, no code blocks):
   "feedback": "<brief feedback>"
 }}
 
-Decision rule: `consistency` must be 4 or higher, AND the average of the other scores must be 3.5 or higher to be "VALID".
+{self.JUDGE_DECISION_RULE}
 """
+        return [
+            {"role": "system", "content": self.JUDGE_SYSTEM_PROMPT},
+            {"role": "user", "content": validation_prompt}
+        ]
 
-            # OpenAI API 호출
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a math education expert who validates math problems and returns structured JSON responses."},
-                    {"role": "user", "content": validation_prompt}
-                ],
-                temperature=0.1,
-                max_tokens=500,
-                response_format={"type": "json_object"}  # JSON 모드 강제
-            )
+    @staticmethod
+    def _judge_verdict(result: Dict) -> tuple:
+        """판정 JSON → (is_valid, scores, feedback)"""
+        is_valid = result.get('decision') == 'VALID'
+        scores = dict(result.get('scores') or {})
+        scores['overall_score'] = result.get('overall_score', 0)
+        feedback = result.get('feedback', 'No feedback')
+        return is_valid, scores, feedback
+
+    @staticmethod
+    def _is_valid_judge_item(item: Any) -> bool:
+        return (
+            isinstance(item, dict)
+            and item.get('decision') in ('VALID', 'INVALID')
+            and isinstance(item.get('scores'), dict)
+        )
 
-            result_text = response.choices[0].message.content.strip()
+    def _validate_with_ai_judge(self, problem: Dict) -> tuple:
+        """
+        AI Judge로 문제 검증 (OpenAI GPT-4o-mini) - 안전 필터 문제 해결
 
-            # JSON 파싱
-            result = json.loads(result_text)
+        Returns:
+            (is_valid: bool, scores: dict, feedback: str)
+        """
+        result_text = ""
+        try:
+            messages = self._build_judge_messages(problem)
+
+            def call_judge() -> str:
+                # OpenAI API 호출
+                response = self.llm_gateway.chat_completion(
+                    model=self.JUDGE_MODEL,
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=500,
+                    response_format={"type": "json_object"}  # JSON 모드 강제
+                )
+                return response.choices[0].message.content.strip()
 
-            is_valid = result.get('decision') == 'VALID'
-            scores = result.get('scores', {})
-            scores['overall_score'] = result.get('overall_score', 0)
-            feedback = result.get('feedback', 'No feedback')
+            # 동일한 문제에 대한 판정은 결정적이므로 캐시 재사용
+            result_text = llm_response_cache.cached_call(
+                "math_ai_judge", self.JUDGE_MODEL, messages, call_judge,
+                config={"max_tokens": 500, "response_format": "json_object"},
+                temperature=0.1,
+                validate=_is_json_object
+            )
 
-            return is_valid, scores, feedback
+            # JSON 파싱
+            return self._judge_verdict(loads_tolerant(result_text))
 
         except json.JSONDecodeError as e:
             # JSON 파싱 오류는 재발생시켜 재시도 유도
@@ -795,6 +773,107 @@ Decision rule: `consistency` must be 4 or higher, AND the average of the other s
             print(f"❌ AI Judge 검증 오류: {str(e)}")
             raise Exception(f"AI Judge validation error: {str(e)}")
 
+    def _validate_with_ai_judge_batch(self, problems: List[Dict]) -> List[Any]:
+        """
+        여러 문제를 AI Judge 한 번의 호출로 검증 (최대 AI_JUDGE_MAX_BATCH_SIZE개씩)
+
+        - 항목별 캐시(단건 검증과 같은 키)를 먼저 확인하고, 미스만 배치로 호출
+        - 배치 응답이 스키마 검증에 실패하면 해당 배치는 단건 호출로 폴백
+
+        Returns:
+            문제 순서대로 (is_valid, scores, feedback) 또는 실패 시 Exception 인스턴스
+        """
+        results: List[Any] = [None] * len(problems)
+        cache_config = {"max_tokens": 500, "response_format": "json_object"}
+        misses = []
+
+        for idx, problem in enumerate(problems):
+            key = llm_response_cache.key_for(
+                "math_ai_judge", self.JUDGE_MODEL, self._build_judge_messages(problem), cache_config
+            )
+            cached = llm_response_cache.get(key)
+            if cached is not None:
+                try:
+                    results[idx] = self._judge_verdict(loads_tolerant(cached))
+                    continue
+                except ValueError:
+                    pass
+            misses.append((idx, key))
+
+        for start in range(0, len(misses), AI_JUDGE_MAX_BATCH_SIZE):
+            chunk = misses[start:start + AI_JUDGE_MAX_BATCH_SIZE]
+            items = self._call_batch_judge([problems[idx] for idx, _ in chunk]) if len(chunk) > 1 else None
+
+            if items is None:
+                # 단건 검증으로 폴백
+                for idx, _ in chunk:
+                    try:
+                        results[idx] = self._validate_with_ai_judge(problems[idx])
+                    except Exception as e:
+                        results[idx] = e
+                continue
+
+            for (idx, key), item in zip(chunk, items):
+                llm_response_cache.set(key, json.dumps(item, ensure_ascii=False), CACHE_TTLS["math_ai_judge"])
+                results[idx] = self._judge_verdict(item)
+
+        return results
+
+    def _call_batch_judge(self, problems: List[Dict]) -> Optional[List[Dict]]:
+        """배치 AI Judge 호출 - 스키마 검증 실패 시 None"""
+        problems_text = "\n\n".join(
+            f"### Problem {idx}\n{self._format_problem_for_judge(problem)}"
+            for idx, problem in enumerate(problems)
+        )
+        validation_prompt = f"""You are a math education expert. Please validate each of the following {len(problems)} math problems independently.
+
+{problems_text}
+
+{self.JUDGE_CRITERIA}
+
+Return ONLY valid JSON (no markdown, no code blocks) with exactly one result per problem:
+{{
+  "results": [
+    {{
+      "index": <problem number>,
+      "scores": {{"mathematical_accuracy": <score>, "consistency": <score>, "completeness": <score>, "logic_flow": <score>}},
+      "overall_score": <average>,
+      "decision": "VALID" or "INVALID",
+      "feedback": "<brief feedback>"
+    }}
+  ]
+}}
+
+{self.JUDGE_DECISION_RULE}
+"""
+        try:
+            response = self.llm_gateway.chat_completion(
+                model=self.JUDGE_MODEL,
+                messages=[
+                    {"role": "system", "content": self.JUDGE_SYSTEM_PROMPT},
+                    {"role": "user", "content": validation_prompt}
+                ],
+                temperature=0.1,
+                max_tokens=500 * len(problems),
+                response_format={"type": "json_object"}
+            )
+            result = loads_tolerant(response.choices[0].message.content.strip())
+        except Exception as e:
+            print(f"⚠️ 배치 AI Judge 호출 실패, 단건 검증으로 폴백: {str(e)}")
+            return None
+
+        by_index = {}
+        for item in (result.get('results') if isinstance(result, dict) else None) or []:
+            if self._is_valid_judge_item(item) and isinstance(item.get('index'), int):
+                by_index[item['index']] = item
+
+        if sorted(by_index) != list(range(len(problems))):
+            print(f"⚠️ 배치 AI Judge 응답 스키마 불일치 ({len(by_index)}/{len(problems)}), 단건 검증으로 폴백")
+            return None
+
+        print(f"🔍 배치 AI Judge: {len(problems)}개 문제를 1회 호출로 검증")
+        return [by_index[idx] for idx in range(len(problems))]
+
     def _adjust_prompt_for_needed_count(self, original_prompt: str, needed_count: int) -> str:
         """부족한 개수만큼만 생성하도록 프롬프트 조정"""
         import re
@@ -809,9 +888,13 @@ Decision rule: `consistency` must be 4 or higher, AND the average of the other s
             (r'Ensure the total count is\s+(\d+)', f'Ensure the total count is {needed_count}')
         ]
 
-        adjusted = original_prompt
+        # 정적 접두부는 그대로 두고 문제별 접미부만 조정 (컨텍스트 캐시 유지)
+        compiled = isinstance(original_prompt, CompiledPrompt)
+        adjusted = original_prompt.suffix if compiled else original_prompt
         for pattern, replacement in patterns:
             adjusted = re.sub(pattern, replacement, adjusted, flags=re.IGNORECASE)
+        if compiled:
+            adjusted = original_prompt.with_suffix(adjusted)
 
         print(f"📝 프롬프트 조정: {needed_count}개 생성하도록 수정")
         return adjusted
@@ -0,0 +1,271 @@
+"""
+문제 스트리밍 저장 - 완성된 문제를 즉시 저장하고 태스크별 Redis 채널로 발행
+
+- 문제 하나가 완성될 때마다 math_service.problems 에 최종 sequence_order 로 저장
+- 첫 문제 저장 시 워크시트 상태를 PARTIAL 로 변경
+- math:task:{task_id}:events 채널 발행 + math:task:{task_id}:problems 리스트 보관 (늦게 접속한 클라이언트용)
+"""
+import os
+import json
+import random
+import asyncio
+import threading
+from typing import AsyncGenerator, Dict, List, Optional
+from dotenv import load_dotenv
+from fastapi.concurrency import run_in_threadpool
+
+try:
+    import redis
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+from ..database import SessionLocal
+from ..models.problem import Problem
+from ..models.worksheet import Worksheet, WorksheetStatus
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# 스트리밍된 문제 목록 보관 시간 (초)
+STREAM_TTL = 3600
+
+
+def _events_channel(task_id: str) -> str:
+    return f"math:task:{task_id}:events"
+
+
+def _problems_key(task_id: str) -> str:
+    return f"math:task:{task_id}:problems"
+
+
+def build_problem_row(worksheet_id: int, sequence_order: int, problem_data: Dict) -> Problem:
+    """생성된 문제 dict → Problem 모델"""
+    return Problem(
+        worksheet_id=worksheet_id, sequence_order=sequence_order,
+        problem_type=problem_data.get("problem_type", "multiple_choice"),
+        difficulty=problem_data.get("difficulty", "B"),
+        question=problem_data.get("question", ""),
+        choices=json.dumps(problem_data.get("choices")) if problem_data.get("choices") else None,
+        correct_answer=problem_data.get("correct_answer", ""),
+        explanation=problem_data.get("explanation", ""),
+        latex_content=problem_data.get("latex_content"),
+        has_diagram=str(problem_data.get("has_diagram", False)).lower(),
+        diagram_type=problem_data.get("diagram_type"),
+        diagram_elements=json.dumps(problem_data.get("diagram_elements")) if problem_data.get("diagram_elements") else None,
+        tikz_code=problem_data.get("tikz_code")
+    )
+
+
+def _serialize_problem(problem: Problem, problem_data: Dict) -> Dict:
+    return {
+        "id": problem.id,
+        "sequence_order": problem.sequence_order,
+        "problem_type": problem.problem_type,
+        "difficulty": problem.difficulty,
+        "question": problem.question,
+        "choices": problem_data.get("choices"),
+        "correct_answer": problem.correct_answer,
+        "explanation": problem.explanation,
+        "latex_content": problem.latex_content,
+        "has_diagram": problem.has_diagram,
+        "diagram_type": problem.diagram_type,
+        "diagram_elements": problem_data.get("diagram_elements"),
+        "tikz_code": problem.tikz_code,
+    }
+
+
+class ProblemStreamWriter:
+    """생성 태스크 하나의 문제 스트리밍 저장/발행 (여러 생성 스레드에서 동시에 호출됨)"""
+
+    def __init__(self, worksheet_id: int, task_id: str, total_count: int):
+        self.worksheet_id = worksheet_id
+        self.task_id = task_id
+        self.total_count = total_count
+        # 기존의 최종 랜덤 섞기를 대신해 순서 슬롯을 미리 섞어 두고 완성 순서대로 배정
+        self._slots = list(range(1, total_count + 1))
+        random.shuffle(self._slots)
+        # id(dict) → dict (참조를 유지해 id 재사용으로 인한 오판 방지)
+        self._saved: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+        self._partial_marked = False
+        self._redis = None
+        if REDIS_AVAILABLE:
+            try:
+                self._redis = redis.Redis.from_url(REDIS_URL, socket_timeout=1)
+            except Exception as e:
+                print(f"⚠️ 문제 스트림 Redis 연결 실패, 발행 없이 저장만 진행: {str(e)}")
+
+    @property
+    def saved_count(self) -> int:
+        return len(self._saved)
+
+    def _take_slot(self, problem_data: Dict) -> Optional[tuple]:
+        with self._lock:
+            if id(problem_data) in self._saved or not self._slots:
+                return None
+            self._saved[id(problem_data)] = problem_data
+            mark_partial = not self._partial_marked
+            self._partial_marked = True
+            return self._slots.pop(), mark_partial
+
+    def add(self, problem_data: Dict):
+        """완성된 문제 하나를 즉시 저장하고 발행"""
+        taken = self._take_slot(problem_data)
+        if not taken:
+            return
+        sequence_order, mark_partial = taken
+
+        db = SessionLocal()
+        try:
+            problem = build_problem_row(self.worksheet_id, sequence_order, problem_data)
+            db.add(problem)
+            if mark_partial:
+                db.query(Worksheet).filter(Worksheet.id == self.worksheet_id).update(
+                    {"status": WorksheetStatus.PARTIAL}, synchronize_session=False
+                )
+            db.commit()
+            db.refresh(problem)
+            payload = _serialize_problem(problem, problem_data)
+        except Exception as e:
+            db.rollback()
+            # 저장 실패한 문제는 태스크 마지막 일괄 저장에서 다시 시도
+            with self._lock:
+                self._saved.pop(id(problem_data), None)
+                self._slots.append(sequence_order)
+            print(f"⚠️ 문제 스트리밍 저장 실패: {str(e)}")
+            return
+        finally:
+            db.close()
+
+        self._publish({
+            "event": "problem",
+            "worksheet_id": self.worksheet_id,
+            "saved": self.saved_count,
+            "total": self.total_count,
+            "problem": payload,
+        }, store=payload)
+
+    def finalize_rows(self, problems: List[Dict]) -> List[Problem]:
+        """스트리밍되지 않은 문제를 남은 순서 슬롯으로 Problem 모델 생성 (태스크에서 일괄 저장)"""
+        rows = []
+        with self._lock:
+            for problem_data in problems:
+                if not isinstance(problem_data, dict) or id(problem_data) in self._saved:
+                    continue
+                if not self._slots:
+                    break
+                self._saved[id(problem_data)] = problem_data
+                rows.append(build_problem_row(self.worksheet_id, self._slots.pop(), problem_data))
+        return rows
+
+    def saved_problems(self) -> List[Dict]:
+        """저장된(스트리밍 + finalize_rows) 문제 - 실제 저장된 행 기준 분포 계산용"""
+        with self._lock:
+            return list(self._saved.values())
+
+    def discard(self):
+        """워크시트 실패 시 보관 중인 스트리밍 문제 목록 삭제 (DB 행은 태스크에서 삭제)"""
+        with self._lock:
+            self._saved.clear()
+        if self._redis is None:
+            return
+        try:
+            self._redis.delete(_problems_key(self.task_id))
+        except Exception as e:
+            print(f"⚠️ 문제 스트림 삭제 실패: {str(e)}")
+
+    def publish_status(self, event: str, **data):
+        """completed / failed 등 종료 이벤트 발행"""
+        self._publish({"event": event, "worksheet_id": self.worksheet_id, "total": self.total_count, **data})
+
+    def _publish(self, message: Dict, store: Optional[Dict] = None):
+        if self._redis is None:
+            return
+        try:
+            encoded = json.dumps(message, ensure_ascii=False, default=str)
+            pipe = self._redis.pipeline()
+            if store is not None:
+                pipe.rpush(_problems_key(self.task_id), json.dumps(store, ensure_ascii=False, default=str))
+                pipe.expire(_problems_key(self.task_id), STREAM_TTL)
+            pipe.publish(_events_channel(self.task_id), encoded)
+            pipe.execute()
+        except Exception as e:
+            print(f"⚠️ 문제 스트림 발행 실패: {str(e)}")
+
+
+async def get_streamed_problems(task_id: str) -> List[Dict]:
+    """지금까지 스트리밍된 문제 목록"""
+    if not REDIS_AVAILABLE:
+        return []
+    client = aioredis.from_url(REDIS_URL)
+    try:
+        items = await client.lrange(_problems_key(task_id), 0, -1)
+        return [json.loads(item) for item in items]
+    except Exception:
+        return []
+    finally:
+        await client.close()
+
+
+async def stream_task_events(task_id: str, is_finished) -> AsyncGenerator[str, None]:
+    """
+    태스크 문제 스트림 SSE 생성
+
+    Args:
+        is_finished: 태스크 종료 여부를 반환하는 함수 (구독 전에 끝난 태스크 처리용)
+    """
+    if not REDIS_AVAILABLE:
+        yield f"data: {json.dumps({'event': 'error', 'message': 'Redis를 사용할 수 없습니다.'})}\n\n"
+        return
+
+    client = aioredis.from_url(REDIS_URL)
+    pubsub = client.pubsub()
+    sent_ids = set()
+    try:
+        # 구독 먼저 → 이미 저장된 문제 전송 (그 사이 발행된 문제는 id로 중복 제거)
+        await pubsub.subscribe(_events_channel(task_id))
+        for problem in await get_streamed_problems(task_id):
+            sent_ids.add(problem.get("id"))
+            yield f"data: {json.dumps({'event': 'problem', 'problem': problem}, ensure_ascii=False)}\n\n"
+
+        # is_finished 는 Celery 결과 백엔드(Redis)를 동기 호출하므로 스레드풀에서 실행
+        finished = await run_in_threadpool(is_finished)
+        if finished:
+            yield f"data: {json.dumps({'event': finished}, ensure_ascii=False)}\n\n"
+            return
+
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    pubsub.get_message(ignore_subscribe_messages=True, timeout=5.0), timeout=6.0
+                )
+            except asyncio.TimeoutError:
+                message = None
+
+            if not message or message.get("type") != "message":
+                finished = await run_in_threadpool(is_finished)
+                if finished:
+                    yield f"data: {json.dumps({'event': finished}, ensure_ascii=False)}\n\n"
+                    return
+                yield ": heartbeat\n\n"
+                continue
+
+            data = message["data"]
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            event = json.loads(data)
+            if event.get("event") == "problem":
+                problem_id = event.get("problem", {}).get("id")
+                if problem_id in sent_ids:
+                    continue
+                sent_ids.add(problem_id)
+            yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if event.get("event") in ("completed", "failed"):
+                return
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.close()
+        await client.close()
@@ -0,0 +1,54 @@
+"""
+프롬프트 정적 접두부 - 문제마다 바뀌지 않는 시스템 지침/가이드라인/출력 형식을 한 번만 만들어 재사용
+
+- static_prefix(key, build): (과목, 수준, 유형) 키별로 접두부 문자열을 프로세스당 한 번만 생성
+- CompiledPrompt: 정적 접두부 + 문제별 가변 접미부
+  str 을 상속하므로 기존 문자열 처리(+, 정규식, 캐시 키)와 그대로 호환
+  LLM 게이트웨이가 접두부를 Gemini 컨텍스트 캐시로 보내고 접미부만 전송
+  (컨텍스트 캐시를 쓸 수 없어도 접두부가 항상 같은 바이트로 앞에 오므로 프로바이더 암묵적 캐시에 적중)
+"""
+import threading
+from typing import Callable, Dict, Hashable
+
+
+class CompiledPrompt(str):
+    """정적 접두부(prefix) + 가변 접미부(suffix) 프롬프트"""
+
+    def __new__(cls, prefix: str, suffix: str):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        return prompt
+
+    def with_suffix(self, suffix: str) -> "CompiledPrompt":
+        """같은 접두부에 접미부만 교체"""
+        return CompiledPrompt(self.prefix, suffix)
+
+    def __add__(self, other):
+        # 재시도 피드백 추가 시에도 접두부 유지
+        if isinstance(other, str):
+            return CompiledPrompt(self.prefix, self.suffix + other)
+        return NotImplemented
+
+    def __reduce__(self):
+        return (CompiledPrompt, (self.prefix, self.suffix))
+
+
+_prefixes: Dict[Hashable, str] = {}
+_prefix_lock = threading.Lock()
+prefix_stats = {"built": 0, "reused": 0}
+
+
+def static_prefix(key: Hashable, build: Callable[[], str]) -> str:
+    """키별 정적 접두부 (처음 요청 시 build() 로 생성 후 재사용)"""
+    prefix = _prefixes.get(key)
+    if prefix is not None:
+        prefix_stats["reused"] += 1
+        return prefix
+    with _prefix_lock:
+        prefix = _prefixes.get(key)
+        if prefix is None:
+            prefix = build()
+            _prefixes[key] = prefix
+            prefix_stats["built"] += 1
+        return prefix
@@ -1,7 +1,11 @@
 """
 AI 프롬프트 템플릿 관리 모듈 
+
+문제 생성 프롬프트 = 정적 접두부(역할, 난이도 샌드박스, 생성 절차, 출력 형식) + 문제별 접미부(단원, 요청, 개수)
+정적 접두부는 (과목, 그래프 단원 여부) 별로 한 번만 만들어 재사용 (prompt_cache 참고)
 """
 from typing import Dict
+from .prompt_cache import CompiledPrompt, static_prefix
 
 class PromptTemplates:
     """AI 프롬프트 템플릿 관리 클래스"""
@@ -12,7 +16,7 @@ class PromptTemplates:
         user_prompt: str,
         problem_count: int,
         difficulty_distribution: str
-    ) -> str:
+    ) -> CompiledPrompt:
         """
         [REVISED] Advanced prompt for generating math problems with strict difficulty separation.
         Instructions are in English for logical clarity, but the output content must be in Korean.
@@ -21,6 +25,26 @@ class PromptTemplates:
         unit_name = curriculum_data.get('unit_name', '')
         is_graph_unit = unit_name == "그래프와 비례"
 
+        prefix = static_prefix(
+            ("math", "problem_generation", is_graph_unit),
+            lambda: PromptTemplates._build_static_prefix(is_graph_unit)
+        )
+
+        suffix = f"""
+**#5. CORE MISSION (THIS REQUEST)**
+- **Topic**: {curriculum_data.get('grade')} {curriculum_data.get('semester')} - {curriculum_data.get('unit_name')} > {curriculum_data.get('chapter_name')}
+- **User Request**: "{user_prompt}"
+- **Total Problems to Generate**: {problem_count}
+- **Required Distribution**: {difficulty_distribution}
+- Ensure the total count is {problem_count}.
+
+Now, execute the **Step-by-Step Generation Process** to create {problem_count} perfectly differentiated math problems in Korean.
+"""
+        return CompiledPrompt(prefix, suffix)
+
+    @staticmethod
+    def _build_static_prefix(is_graph_unit: bool) -> str:
+        """요청과 무관한 지침 부분 (단원 유형별로 한 번만 생성)"""
         graph_instruction = ""
         if is_graph_unit:
             graph_instruction = """
@@ -107,13 +131,9 @@ Since this unit focuses on coordinate planes and graphs, you MUST include graph
 When generating problems for this unit, actively create graph-based questions with TikZ visualizations.
 """
 
-        return f"""You are a Master Test Creator for the top-selling South Korean math textbook series, "SSEN". You are an expert in educational design and a master of LaTeX and TikZ. Your task is to generate a set of math problems with perfectly distinct difficulty levels.{graph_instruction}
+        return f"""You are a Master Test Creator for the top-selling South Korean math textbook series, "SSEN". You are an expert in educational design and a master of LaTeX and TikZ. Your task is to generate a set of math problems with perfectly distinct difficulty levels. The topic, user request, problem count and difficulty distribution are given in **#5. CORE MISSION** at the end.{graph_instruction}
 
-**#1. CORE MISSION**
-- **Topic**: {curriculum_data.get('grade')} {curriculum_data.get('semester')} - {curriculum_data.get('unit_name')} > {curriculum_data.get('chapter_name')}
-- **User Request**: "{user_prompt}"
-- **Total Problems to Generate**: {problem_count}
-- **Required Distribution**: {difficulty_distribution}
+**#1. OUTPUT LANGUAGE**
 - **CRITICAL INSTRUCTION**: The final JSON output's content (values for "question", "choices", "correct_answer", "explanation") MUST BE IN KOREAN.
 
 **#2. MENTAL SANDBOX FOR EACH DIFFICULTY LEVEL**
@@ -163,7 +183,7 @@ To ensure perfect separation, you must operate in three different "mental sandbo
 
 **#3. STEP-BY-STEP GENERATION PROCESS (MANDATORY)**
 You must follow this exact thought process:
-1.  **Generate A-Level First**: Based on the `{difficulty_distribution}`, generate ALL A-Level problems. Adhere strictly to the A-Level Sandbox rules.
+1.  **Generate A-Level First**: Based on the **Required Distribution** in #5, generate ALL A-Level problems. Adhere strictly to the A-Level Sandbox rules.
 2.  **Generate B-Level Next**: Generate ALL B-Level problems. Adhere strictly to the B-Level Sandbox rules.
 3.  **Generate C-Level Last**: Generate ALL C-Level problems. **CRITICAL**: Before finalizing each C-Level problem, ask yourself:
     - "Is this problem genuinely harder than my B-Level problems?"
@@ -171,7 +191,7 @@ You must follow this exact thought process:
     - "Would this challenge even a top-performing student?"
     - If the answer to any of these is NO, redesign the problem to be more challenging.
     - **Remember**: C-Level is for the HARDEST problems that test deep understanding and creative problem-solving.
-4.  **Combine and Finalize**: Assemble all generated problems into a single JSON array. Ensure the total count is {problem_count}.
+4.  **Combine and Finalize**: Assemble all generated problems into a single JSON array. Ensure the total count matches **Total Problems to Generate** in #5.
 
 **#4. FINAL OUTPUT FORMAT (JSON)**
 - Provide the final output as a single JSON array.
@@ -218,6 +238,4 @@ You must follow this exact thought process:
   }}
 ]
 ```
-
-Now, execute the **Step-by-Step Generation Process** to create {problem_count} perfectly differentiated math problems in Korean.
 """
\ No newline at end of file
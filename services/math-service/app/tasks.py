@@ -2,6 +2,10 @@ from celery import current_task
 from .celery_app import celery_app
 from .database import SessionLocal
 from .services.math_generation_service import MathGenerationService
+from .services.problem_stream import ProblemStreamWriter
+from .services.problem_bank_service import (
+    problem_bank_service, REPLENISH_LOCK_KEY, PROBLEM_BANK_POOL_LOCK_TTL, PROBLEM_BANK_REPLENISH_INTERVAL
+)
 from .schemas.math_generation import MathProblemGenerationRequest
 from .models.worksheet import Worksheet, WorksheetStatus
 from .models.problem import Problem
@@ -29,6 +33,7 @@ def generate_math_problems_task(self, request_data: dict, user_id: int):
 
     db = SessionLocal()
     worksheet = None
+    stream_writer = None
     try:
         self.update_state(state='PROGRESS', meta={'current': 0, 'total': 100, 'status': '요청 처리 중...'})
         request = MathProblemGenerationRequest.model_validate(request_data)
@@ -48,10 +53,22 @@ def generate_math_problems_task(self, request_data: dict, user_id: int):
         db.refresh(worksheet)
 
         self.update_state(state='PROGRESS', meta={'current': 20, 'total': 100, 'status': 'AI 문제 생성 중...'})
-        
+
+        # 완성된 문제는 즉시 저장/발행 (워크시트 PARTIAL, /api/tasks/{task_id}/stream 으로 확인 가능)
+        stream_writer = ProblemStreamWriter(worksheet.id, task_id, request.problem_count.value_int)
+
         # MathGenerationService의 비율 기반 로직 사용 (싱글톤 인스턴스 사용)
+        speculation_before = math_generation_service_instance.problem_generator.speculation_snapshot()
         curriculum_data = math_generation_service_instance._get_curriculum_data(request)
-        generated_problems = math_generation_service_instance._generate_problems_with_ratio(curriculum_data, request)
+        generated_problems = math_generation_service_instance._generate_problems_with_ratio(
+            curriculum_data, request, on_problem=stream_writer.add
+        )
+
+        # 워크시트 단위 추측 생성 비용 (prefork 워커는 프로세스당 태스크 1개라 증가분이 이 워크시트 몫)
+        speculation = math_generation_service_instance.problem_generator.speculation_delta(speculation_before)
+        if speculation["runs"]:
+            print(f"📊 워크시트 {worksheet.id} 추측 생성: 모델 호출 {speculation['model_calls']}회 중 낭비 "
+                  f"{speculation['wasted_model_calls']}회 ({speculation['wasted_ratio']:.1%}), 여분 폐기 {speculation['surplus_valid']}개")
 
         if not isinstance(generated_problems, list):
             raise AIResponseError(f"AI 응답이 잘못된 형식입니다. 리스트가 아닌 {type(generated_problems)} 타입을 받았습니다.")
@@ -59,62 +76,59 @@ def generate_math_problems_task(self, request_data: dict, user_id: int):
         self.update_state(state='PROGRESS', meta={'current': 80, 'total': 100, 'status': '문제 저장 중...'})
 
         try:
-            problems_to_save = []
-            for i, problem_data in enumerate(generated_problems):
-                if not isinstance(problem_data, dict):
-                    print(f"⚠️ 경고: 생성된 문제 목록에 잘못된 항목이 있습니다. {type(problem_data)} 타입.")
-                    continue
-                
-                problem = Problem(
-                    worksheet_id=worksheet.id, sequence_order=i + 1,
-                    problem_type=problem_data.get("problem_type", "multiple_choice"),
-                    difficulty=problem_data.get("difficulty", "B"),
-                    question=problem_data.get("question", ""),
-                    choices=json.dumps(problem_data.get("choices")) if problem_data.get("choices") else None,
-                    correct_answer=problem_data.get("correct_answer", ""),
-                    explanation=problem_data.get("explanation", ""),
-                    latex_content=problem_data.get("latex_content"),
-                    has_diagram=str(problem_data.get("has_diagram", False)).lower(),
-                    diagram_type=problem_data.get("diagram_type"),
-                    diagram_elements=json.dumps(problem_data.get("diagram_elements")) if problem_data.get("diagram_elements") else None,
-                    tikz_code=problem_data.get("tikz_code")
-                )
-                problems_to_save.append(problem)
+            # 스트리밍 중 저장되지 않은 문제만 남은 순서로 일괄 저장
+            remaining_problems = stream_writer.finalize_rows(generated_problems)
 
-            if not problems_to_save:
+            if not remaining_problems and stream_writer.saved_count == 0:
                 raise GenerationError("AI가 유효한 문제를 생성하지 못했습니다.")
 
-            db.add_all(problems_to_save)
+            db.add_all(remaining_problems)
 
             worksheet.status = WorksheetStatus.COMPLETED
             worksheet.completed_at = datetime.now()
-            worksheet.actual_difficulty_distribution = math_generation_service_instance._calculate_difficulty_distribution(generated_problems)
-            worksheet.actual_type_distribution = math_generation_service_instance._calculate_type_distribution(generated_problems)
+            # 분포는 실제 저장된 문제 기준 (생성 결과가 문제 수보다 많아도 저장된 행과 일치)
+            saved_problems = stream_writer.saved_problems()
+            worksheet.actual_difficulty_distribution = math_generation_service_instance._calculate_difficulty_distribution(saved_problems)
+            worksheet.actual_type_distribution = math_generation_service_instance._calculate_type_distribution(saved_problems)
             
             db.commit()
-            print(f"✅ 워크시트 {worksheet.id}와 문제 {len(problems_to_save)}개 저장 완료.")
+
+            problems_to_save = db.query(Problem).filter(
+                Problem.worksheet_id == worksheet.id
+            ).order_by(Problem.sequence_order).all()
+            print(f"✅ 워크시트 {worksheet.id}와 문제 {len(problems_to_save)}개 저장 완료 (스트리밍 {stream_writer.saved_count - len(remaining_problems)}개).")
 
         except Exception as e:
             db.rollback()
+            # 실패한 워크시트에 스트리밍으로 저장된 문제가 남지 않도록 삭제
+            db.query(Problem).filter(Problem.worksheet_id == worksheet.id).delete(synchronize_session=False)
             worksheet.status = WorksheetStatus.FAILED
             worksheet.error_message = f"문제 저장 중 오류 발생: {str(e)}"
             db.commit()
+            stream_writer.discard()
             raise
 
+        stream_writer.publish_status("completed", total_generated=len(problems_to_save))
+
         problem_responses = [{"id": p.id, "sequence_order": p.sequence_order, "question": p.question} for p in problems_to_save]
-        return {"generation_id": generation_id, "worksheet_id": worksheet.id, "total_generated": len(problems_to_save), "problems": problem_responses}
+        return {"generation_id": generation_id, "worksheet_id": worksheet.id, "total_generated": len(problems_to_save),
+                "problems": problem_responses, "speculation": speculation}
 
     except Exception as e:
         print(f"❌ 태스크 실패: {e}")
         db.rollback()
         if worksheet and worksheet.id and worksheet.status != WorksheetStatus.FAILED:
             try:
+                db.query(Problem).filter(Problem.worksheet_id == worksheet.id).delete(synchronize_session=False)
                 worksheet.status = WorksheetStatus.FAILED
                 worksheet.error_message = str(e)
                 db.commit()
             except Exception as update_err:
                 print(f"❌ 실패 상태 업데이트 중 추가 오류: {update_err}")
         
+        if stream_writer:
+            stream_writer.discard()
+            stream_writer.publish_status("failed", error=str(e))
         self.update_state(state='FAILURE', meta={'error': str(e), 'status': '문제 생성 실패'})
         raise
 
@@ -240,6 +254,54 @@ def regenerate_single_problem_task(self, problem_id: int, requirements: str, cur
         db.close()
 
 
+@celery_app.task(bind=True, name="app.tasks.replenish_problem_bank_task")
+def replenish_problem_bank_task(self):
+    """문제 은행 보충 분배 태스크 (Celery beat 주기 실행) - low-water 미만 풀마다 보충 태스크 1개
+
+    이미 다른 주기가 분배 중이거나, 풀의 이전 보충 태스크가 대기/실행 중이면 건너뜀
+    """
+    print(f"🏦 문제 은행 보충 태스크 시작: {self.request.id}")
+    run_token = problem_bank_service.acquire_lock(REPLENISH_LOCK_KEY, int(PROBLEM_BANK_REPLENISH_INTERVAL))
+    if run_token is None:
+        print("⏭️ 문제 은행 보충: 다른 보충 작업이 실행 중이거나 Redis 락을 잡을 수 없어 건너뜀")
+        return {"skipped": True}
+
+    summary = {"low_pools": 0, "dispatched": 0, "busy_pools": 0}
+    try:
+        for pool in math_generation_service_instance.find_low_pools():
+            summary["low_pools"] += 1
+            lock_key = problem_bank_service.pool_lock_key(pool["curriculum_data"], pool["difficulty"], pool["problem_type"])
+            pool_token = problem_bank_service.acquire_lock(lock_key, PROBLEM_BANK_POOL_LOCK_TTL)
+            if pool_token is None:
+                summary["busy_pools"] += 1
+                continue
+            replenish_problem_pool_task.apply_async(
+                args=[pool["curriculum_data"], pool["difficulty"], pool["problem_type"], pool_token],
+                expires=PROBLEM_BANK_POOL_LOCK_TTL
+            )
+            summary["dispatched"] += 1
+    finally:
+        problem_bank_service.release_lock(REPLENISH_LOCK_KEY, run_token)
+
+    print(f"✅ 문제 은행 보충 분배 완료: {summary}")
+    return summary
+
+
+@celery_app.task(bind=True, name="app.tasks.replenish_problem_pool_task")
+def replenish_problem_pool_task(self, curriculum_data: dict, difficulty: str, problem_type: str, lock_token: str):
+    """풀 하나 보충 (분배 시 잡은 풀 락은 끝나면 해제)"""
+    lock_key = problem_bank_service.pool_lock_key(curriculum_data, difficulty, problem_type)
+    try:
+        added = math_generation_service_instance.replenish_pool(curriculum_data, difficulty, problem_type)
+        return {"chapter_name": curriculum_data['chapter_name'], "difficulty": difficulty,
+                "problem_type": problem_type, "added": added}
+    except Exception as e:
+        print(f"❌ 문제 은행 보충 실패 ({curriculum_data['chapter_name']} {difficulty} {problem_type}): {str(e)}")
+        raise
+    finally:
+        problem_bank_service.release_lock(lock_key, lock_token)
+
+
 @celery_app.task(bind=True, name="app.tasks.process_assignment_ai_grading_task")
 def process_assignment_ai_grading_task(self, assignment_id: int, user_id: int):
     """과제의 손글씨 답안에 대해 OCR 추출 + 자동 채점을 비동기로 처리하는 태스크"""
@@ -524,6 +586,40 @@ def process_assignment_ai_grading_task(self, assignment_id: int, user_id: int):
         db.close()
 
 
+@celery_app.task(bind=True, name="app.tasks.ocr_test_answer_task")
+def ocr_test_answer_task(self, answer_id: int):
+    """이미지로 먼저 저장된 손글씨 답안 OCR (MATH_OCR_MODE=deferred) - 인식되면 텍스트로 교체"""
+    db = SessionLocal()
+    try:
+        answer = db.query(TestAnswer).filter(TestAnswer.id == answer_id).first()
+        if not answer or not (answer.answer or "").startswith('data:image/') or ',' not in answer.answer:
+            return {"answer_id": answer_id, "status": "skipped"}
+
+        image_answer = answer.answer
+        ocr_text = OCRService().extract_text_from_image(base64.b64decode(image_answer.split(',', 1)[1]))
+        if not ocr_text or not ocr_text.strip():
+            print(f"❌ OCR 텍스트 인식 실패: 답안 {answer_id} (이미지 답안 유지)")
+            return {"answer_id": answer_id, "status": "not_recognized"}
+
+        # 그 사이 학생이 답안을 다시 저장했거나 채점 태스크가 이미 처리했으면 덮어쓰지 않음
+        updated = db.query(TestAnswer).filter(
+            TestAnswer.id == answer_id,
+            TestAnswer.answer == image_answer
+        ).update({TestAnswer.answer: ocr_text.strip()}, synchronize_session=False)
+        db.commit()
+
+        if updated:
+            print(f"✅ OCR 처리 완료: 답안 {answer_id} → {ocr_text[:50]}")
+        return {"answer_id": answer_id, "status": "updated" if updated else "stale"}
+
+    except Exception as e:
+        db.rollback()
+        print(f"❌ OCR 처리 실패: 답안 {answer_id}, 오류: {e}")
+        raise
+    finally:
+        db.close()
+
+
 def _normalize_math_answer(answer: str) -> str:
     """수학 답안을 표준화된 형태로 변환 (OCR 텍스트와 LaTeX 모두 처리)"""
     import re
@@ -0,0 +1,90 @@
+"""
+JSON 복구 파서 벤치마크 - 파싱 시간과 복구율 추적용
+
+사용법 (math-service 디렉토리에서):
+    python benchmarks/json_repair/bench_json_repair.py [--iterations 200] [--corpus 경로]
+
+corpus.jsonl 한 줄 = 하나의 LLM 응답 샘플
+    id, source(math/korean/english), defects(결함 종류), expected_items(복구되어야 할 객체 수), response(원문)
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from app.services.json_repair import loads_tolerant  # noqa: E402
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "corpus.jsonl")
+
+
+def _baseline_loads(text: str):
+    """기존 방식: 코드 블록만 잘라내고 json.loads"""
+    if "```json" in text:
+        start = text.find("```json") + 7
+        end = text.find("```", start)
+        text = text[start:end] if end != -1 else text[start:]
+    return json.loads(text.strip())
+
+
+def _count_items(result) -> int:
+    if isinstance(result, dict):
+        problems = result.get("problems")
+        return len(problems) if isinstance(problems, list) else 1
+    if isinstance(result, list):
+        return sum(1 for item in result if isinstance(item, dict))
+    return 0
+
+
+def _measure(parse, text: str, iterations: int):
+    try:
+        items = _count_items(parse(text))
+    except ValueError:
+        return 0, None
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse(text)
+    return items, (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 복구 파서 벤치마크")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(args.corpus, "r", encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+
+    recovered = {"tolerant": 0, "baseline": 0}
+    total_us = 0.0
+
+    print(f"{'id':<34}{'bytes':>7}{'items':>9}{'tolerant(us)':>15}{'baseline':>10}")
+    for case in cases:
+        text = case["response"]
+        expected = case["expected_items"]
+
+        items, elapsed = _measure(loads_tolerant, text, args.iterations)
+        ok = items == expected
+        recovered["tolerant"] += ok
+        total_us += elapsed or 0.0
+
+        base_items, _ = _measure(_baseline_loads, text, 1)
+        base_ok = base_items == expected
+        recovered["baseline"] += base_ok
+
+        print(f"{case['id']:<34}{len(text.encode('utf-8')):>7}{f'{items}/{expected}':>9}"
+              f"{(f'{elapsed:.1f}' if elapsed is not None else 'FAIL'):>15}{('ok' if base_ok else 'FAIL'):>10}")
+
+    total = len(cases)
+    print()
+    print(f"✅ 복구율: tolerant {recovered['tolerant']}/{total}, baseline(json.loads) {recovered['baseline']}/{total}")
+    print(f"⏱️ 평균 파싱 시간: {total_us / max(total, 1):.1f}us")
+
+    return 0 if recovered["tolerant"] == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
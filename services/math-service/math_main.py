@@ -1,12 +1,16 @@
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 from app.database import engine
 from app.models import Base
+from app.services.curriculum_index import curriculum_index
+from app.services.assignment_deploy import ensure_deployment_unique_constraint
 from app.routers import curriculum, worksheet, grading, assignment, problem, task, market_integration, test_session
 
 # Import all models to ensure they are registered with Base.metadata
 import app.models.worksheet  # noqa: F401
 import app.models.problem  # noqa: F401
+import app.models.problem_bank  # noqa: F401
 import app.models.math_generation  # noqa: F401
 import app.models.grading_result  # noqa: F401
 import app.models.curriculum  # noqa: F401
@@ -14,6 +18,19 @@ import app.models.user  # noqa: F401
 
 Base.metadata.create_all(bind=engine)
 
+# create_all은 기존 enum 타입을 변경하지 않으므로 스트리밍 생성용 PARTIAL 상태를 직접 추가
+try:
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ALTER TYPE worksheetstatus ADD VALUE IF NOT EXISTS 'PARTIAL'"))
+except Exception as e:
+    print(f"⚠️ worksheetstatus 타입 업데이트 실패: {str(e)}")
+
+# 기존 배포 테이블에도 (assignment_id, student_id) 유니크 인덱스 적용 (일괄 배포의 ON CONFLICT 대상)
+ensure_deployment_unique_constraint(engine)
+
+# 교육과정 인덱스 미리 로드 (이후 파일 변경 시 자동 재로드)
+curriculum_index.load()
+
 app = FastAPI(title="Math Problem Generation API", version="1.0.0")
 
 app.add_middleware(
@@ -42,6 +59,18 @@ app.include_router(api_router)
 async def root():
     return {"message": "Math Problem Generation API is running"}
 
+@app.get("/llm-gateway/stats")
+async def llm_gateway_stats():
+    """LLM 게이트웨이 대기열/지연 시간 카운터 (현재 프로세스 기준) + 추측 생성 낭비 호출 (전체 워커 합산 포함)"""
+    from app.services.llm_gateway import get_llm_gateway
+    from app.services.llm_cache import llm_response_cache
+    from app.services.ai_client import problem_generator_instance
+    return {
+        **get_llm_gateway().get_stats(),
+        "cache": llm_response_cache.get_stats(),
+        "speculation": problem_generator_instance.get_speculation_stats(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -3,6 +3,8 @@ from fastapi.responses import StreamingResponse
 from typing import List
 from ..schemas.notification import (
     MessageNotificationRequest,
+    GradingNotificationRequest,
+    AssignmentNotificationRequest,
     BulkNotificationRequest,
     StoredNotificationsResponse
 )
@@ -51,6 +53,45 @@ async def send_message_notification(request: MessageNotificationRequest):
         logger.error(f"Error sending notification: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/grading")
+async def send_grading_notification(request: GradingNotificationRequest):
+    """채점 완료 알림 전송"""
+    if request.receiver_type not in ["teacher", "student"]:
+        raise HTTPException(status_code=400, detail="Invalid user type")
+
+    try:
+        success = notification_service.send_grading_notification(request.dict())
+
+        if success:
+            return {"success": True, "message": "Notification sent successfully"}
+        else:
+            raise HTTPException(status_code=500, detail="Failed to send notification")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error sending grading notification: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/assignment")
+async def send_assignment_notifications(request: AssignmentNotificationRequest):
+    """과제 배포 알림 전송 (여러 과제의 학생들에게 한 번에)"""
+    try:
+        assignment_data = request.dict()
+        total_count = sum(len(assignment["student_ids"]) for assignment in assignment_data["assignments"])
+        sent_count = notification_service.send_assignment_notifications(assignment_data)
+
+        return {
+            "success": sent_count == total_count,
+            "message": f"Sent {sent_count}/{total_count} notifications",
+            "sent_count": sent_count,
+            "total_count": total_count
+        }
+
+    except Exception as e:
+        logger.error(f"Error sending assignment notifications: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/bulk")
 async def send_bulk_notifications(request: BulkNotificationRequest):
     """대량 알림 전송"""
@@ -13,6 +13,31 @@ class MessageNotificationRequest(BaseModel):
     preview: str = ""
     classroom_id: int
 
+class GradingNotificationRequest(BaseModel):
+    service: str  # 'english', 'math', 'korean'
+    receiver_id: int
+    receiver_type: str  # 'teacher' or 'student'
+    worksheet_id: int
+    assignment_id: Optional[int] = None
+    student_id: int
+    result_id: Optional[int] = None
+    task_id: Optional[str] = None
+    status: str = "completed"  # 'completed' or 'failed'
+    total_score: Optional[float] = None
+    max_score: Optional[float] = None
+    percentage: Optional[float] = None
+
+class AssignmentNotificationTarget(BaseModel):
+    assignment_id: int
+    title: str
+    classroom_id: int
+    student_ids: List[int]
+
+class AssignmentNotificationRequest(BaseModel):
+    service: str  # 'english', 'math', 'korean'
+    teacher_id: Optional[int] = None
+    assignments: List[AssignmentNotificationTarget]
+
 class BulkNotificationRequest(BaseModel):
     notifications: List[MessageNotificationRequest]
 
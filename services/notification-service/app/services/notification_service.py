@@ -46,6 +46,69 @@ class NotificationService:
             logger.error(f"Failed to send notification: {e}")
             return False
 
+    def send_grading_notification(self, grading_data: Dict[str, Any]) -> bool:
+        """채점 완료 알림 전송"""
+        try:
+            notification = {
+                "type": "grading",
+                "id": f"grading_{grading_data['service']}_{grading_data.get('result_id') or grading_data.get('task_id')}_{grading_data['receiver_type']}_{int(datetime.now().timestamp())}",
+                "data": {
+                    key: grading_data.get(key)
+                    for key in (
+                        "service", "worksheet_id", "assignment_id", "student_id", "result_id", "task_id",
+                        "status", "total_score", "max_score", "percentage"
+                    )
+                },
+                "timestamp": datetime.now().isoformat(),
+                "read": False
+            }
+
+            receiver_type = grading_data['receiver_type']
+            receiver_id = grading_data['receiver_id']
+
+            publish_success = redis_client.publish_notification(receiver_type, receiver_id, notification)
+            store_success = redis_client.store_notification(receiver_type, receiver_id, notification)
+
+            if publish_success or store_success:
+                logger.info(f"Grading notification sent to {receiver_type}:{receiver_id} for worksheet {grading_data['worksheet_id']}")
+                return True
+            else:
+                logger.warning(f"Failed to send grading notification to {receiver_type}:{receiver_id}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Failed to send grading notification: {e}")
+            return False
+
+    def send_assignment_notifications(self, assignment_data: Dict[str, Any]) -> int:
+        """과제 배포 알림 (여러 과제 x 학생) 전송 - 전송한 알림 수 반환"""
+        try:
+            timestamp = datetime.now()
+            items = []
+            for assignment in assignment_data['assignments']:
+                for student_id in assignment['student_ids']:
+                    items.append(("student", student_id, {
+                        "type": "assignment",
+                        "id": f"assignment_{assignment_data['service']}_{assignment['assignment_id']}_{student_id}_{int(timestamp.timestamp())}",
+                        "data": {
+                            "service": assignment_data['service'],
+                            "assignment_id": assignment['assignment_id'],
+                            "title": assignment['title'],
+                            "classroom_id": assignment['classroom_id'],
+                            "teacher_id": assignment_data.get('teacher_id')
+                        },
+                        "timestamp": timestamp.isoformat(),
+                        "read": False
+                    }))
+
+            sent_count = redis_client.publish_and_store_many(items)
+            logger.info(f"Sent {sent_count}/{len(items)} assignment notifications ({assignment_data['service']})")
+            return sent_count
+
+        except Exception as e:
+            logger.error(f"Failed to send assignment notifications: {e}")
+            return 0
+
     def send_bulk_notifications(self, notifications_data: List[Dict[str, Any]]) -> int:
         """대량 알림 전송"""
         success_count = 0
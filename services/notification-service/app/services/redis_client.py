@@ -1,6 +1,6 @@
 import redis
 import json
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import os
 import logging
 
@@ -47,6 +47,26 @@ class RedisClient:
             logger.error(f"Failed to store notification: {e}")
             return False
 
+    def publish_and_store_many(self, items: List[Tuple[str, int, Dict[Any, Any]]]) -> int:
+        """여러 사용자에게 알림 발행 + 저장 (파이프라인 한 번) - 처리한 알림 수 반환"""
+        if not items:
+            return 0
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for user_type, user_id, notification in items:
+                payload = json.dumps(notification)
+                key = f"stored_notifications:{user_type}:{user_id}"
+                pipe.publish(f"notifications:{user_type}:{user_id}", payload)
+                pipe.lpush(key, payload)
+                pipe.ltrim(key, 0, 99)
+                pipe.expire(key, 86400)
+            pipe.execute()
+            logger.info(f"Published and stored {len(items)} notifications")
+            return len(items)
+        except Exception as e:
+            logger.error(f"Failed to publish notifications in bulk: {e}")
+            return 0
+
     def get_stored_notifications(self, user_type: str, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """저장된 알림들 조회"""
         try: